@@ -1 +1,17 @@
+import sys
 
+from single_instance import send_to_running_instance
+
+def launch(launch_args, server_name=None):
+    """
+    Entry point. Hands off to a running instance before importing the GUI modules
+    (numpy, PIL, every dialog), so a repeat launch only pays for QtCore and QtNetwork.
+    """
+    if "--new-instance" not in launch_args and send_to_running_instance(launch_args, server_name):
+        return 0
+
+    import main
+    return main.run(launch_args)
+
+if __name__ == "__main__":
+    sys.exit(launch(sys.argv[1:]))
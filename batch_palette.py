@@ -0,0 +1,179 @@
+# Batch palette extraction: walks a directory of images and writes one JSON line per
+# image with its dominant colors, average color and nearest CSS color names, using the
+# same extraction code as the Region palette.
+#
+#   python batch_palette.py screenshots/ -o palettes.jsonl -k 6 --workers 8
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+from PIL import Image
+
+from dominant_colors import dominant_colors
+from color_logic import rgb_to_hex, nearest_named_colors
+from icc_utils import convert_array_to_srgb
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".webp", ".ppm"}
+# Images are analyzed at about this size; palettes and averages barely move below it
+DEFAULT_MAX_PIXELS = 1 << 20
+# Images handed to the pool ahead of the results written, per worker
+QUEUE_DEPTH = 2
+
+def find_images(root, recursive=True):
+    """
+    Yields image paths under root lazily, in sorted order within each directory.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    subdirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                yield entry.path
+        stack.extend(reversed(subdirs))
+
+def load_reduced(path, max_pixels=DEFAULT_MAX_PIXELS, color_managed=True):
+    """
+    Decodes an image at about max_pixels: JPEGs are scaled by the decoder itself,
+    other formats are box-reduced right after decoding. Converts from the embedded
+    ICC profile to sRGB when color_managed.
+    Returns ((H, W, 3) uint8 array, (full width, full height)).
+    """
+    with Image.open(path) as im:
+        size = im.size
+        profile = im.info.get("icc_profile")
+        factor = math.ceil(math.sqrt(size[0] * size[1] / max_pixels))
+        if factor > 1:
+            im.draft("RGB", (size[0] // factor, size[1] // factor))
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+        factor = math.ceil(math.sqrt(im.width * im.height / max_pixels))
+        if factor > 1:
+            im = im.reduce(factor)
+        array = np.asarray(im)
+    if color_managed:
+        array = convert_array_to_srgb(array, profile)
+    return array, size
+
+def analyze_image(path, k=6, method="kmeans", max_pixels=DEFAULT_MAX_PIXELS, color_managed=True):
+    """
+    One JSON-ready record for an image file:
+    {"path", "width", "height", "average", "palette", "seconds"}, where the average
+    and each palette entry carry "hex", "rgb", the nearest CSS "name" and its "delta_e".
+    Unreadable files give {"path", "error"} instead of raising.
+    """
+    start = time.perf_counter()
+    try:
+        pixels, (width, height) = load_reduced(path, max_pixels, color_managed)
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+    palette = dominant_colors(pixels, k=k, method=method)
+    average = tuple(int(c) for c in np.rint(pixels.reshape(-1, 3).mean(axis=0)))
+    names, de = nearest_named_colors([average] + [c["rgb"] for c in palette])
+
+    entries = [{"hex": rgb_to_hex(*average), "rgb": list(average)}]
+    for c in palette:
+        entries.append({"hex": c["hex"], "rgb": list(c["rgb"]), "fraction": round(c["fraction"], 4)})
+    for entry, name, d in zip(entries, names, de):
+        entry["name"] = name
+        entry["delta_e"] = round(float(d), 2)
+
+    return {
+        "path": path,
+        "width": width,
+        "height": height,
+        "average": entries[0],
+        "palette": entries[1:],
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+def run_batch(paths, out, workers=None, **options):
+    """
+    Analyzes paths on a process pool and writes each record to the text stream out
+    as a JSON line as soon as it is done (completion order). At most
+    workers * QUEUE_DEPTH images are in flight, so memory stays bounded however many
+    files there are. workers=1 runs in this process.
+    Returns {"images", "failed", "seconds", "images_per_second", "workers"}.
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = iter(paths)
+    images = failed = 0
+    start = time.perf_counter()
+
+    def emit(record):
+        nonlocal images, failed
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        images += 1
+        failed += "error" in record
+
+    if workers == 1:
+        for path in paths:
+            emit(analyze_image(path, **options))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = set()
+            while True:
+                for path in paths:
+                    pending.add(pool.submit(analyze_image, path, **options))
+                    if len(pending) >= workers * QUEUE_DEPTH:
+                        break
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    emit(future.result())
+
+    seconds = time.perf_counter() - start
+    return {
+        "images": images,
+        "failed": failed,
+        "seconds": seconds,
+        "images_per_second": images / seconds if seconds > 0 else 0.0,
+        "workers": workers,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract dominant palettes from a directory of images.")
+    parser.add_argument("directory")
+    parser.add_argument("-o", "--output", help="JSON lines file (default: stdout)")
+    parser.add_argument("-k", type=int, default=6, help="colors per palette")
+    parser.add_argument("--method", choices=("kmeans", "median_cut"), default="kmeans")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--max-pixels", type=int, default=DEFAULT_MAX_PIXELS,
+                        help="analyze images reduced to about this many pixels")
+    parser.add_argument("--no-recursive", action="store_true", help="skip subdirectories")
+    parser.add_argument("--no-color-management", action="store_true",
+                        help="ignore embedded ICC profiles")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    options = {"k": args.k, "method": args.method, "max_pixels": args.max_pixels,
+               "color_managed": not args.no_color_management}
+    paths = find_images(args.directory, recursive=not args.no_recursive)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = run_batch(paths, out, args.workers, **options)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"{stats['images']} images ({stats['failed']} failed) in {stats['seconds']:.1f} s: "
+          f"{stats['images_per_second']:.1f} images/s on {stats['workers']} workers", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# Per-grab latency of each capture backend for 1x1, 15x15 and full-screen grabs.
+# On Linux run it under Xvfb to include the X11 backend (opt-in in the app):
+#     xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/bench_capture.py
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PySide6.QtWidgets import QApplication
+
+from capture_backends import BACKENDS
+
+def time_grabs(backend, x, y, w, h, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if w == 1 and h == 1:
+            backend.pixel(x, y)
+        else:
+            backend.grab(x, y, w, h)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    geo = QApplication.primaryScreen().geometry()
+    cx, cy = geo.center().x(), geo.center().y()
+    cases = [
+        ("1x1", cx, cy, 1, 1, 500),
+        ("15x15", cx - 7, cy - 7, 15, 15, 500),
+        (f"full {geo.width()}x{geo.height()}", geo.x(), geo.y(), geo.width(), geo.height(), 20),
+    ]
+
+    print(f"Platform: {app.platformName()}")
+    print(f"{'backend':<10} {'case':<18} {'median ms':>10} {'max ms':>10}")
+    for name, cls in BACKENDS.items():
+        try:
+            backend = cls(size=(geo.width(), geo.height())) if name == "synthetic" else cls()
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+        for label, x, y, w, h, repeat in cases:
+            backend.pixel(x, y)  # warm up handles/buffers
+            median, worst = time_grabs(backend, x, y, w, h, repeat)
+            print(f"{name:<10} {label:<18} {median:>10.3f} {worst:>10.3f}")
+        backend.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Cost of formatting the same colors over and over (live readout, history, palette
+# tabs) with the plain functions versus cached Color forms, and the size of a large
+# collection as tuples versus a ColorArray.
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from color_logic import rgb_to_hex, rgb_to_hsl_string, rgb_to_cmyk
+from color_value import Color, ColorArray
+
+def per_call(fn, runs):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+def format_plain(colors):
+    for r, g, b in colors:
+        rgb_to_hex(r, g, b), rgb_to_hsl_string(r, g, b), rgb_to_cmyk(r, g, b)
+
+def format_cached(colors):
+    for c in colors:
+        c.hex, c.hsl_string, c.cmyk
+
+def allocated(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+def main(runs=200):
+    rng = np.random.default_rng(0)
+    tuples = [tuple(c) for c in rng.integers(0, 256, (64, 3)).tolist()]
+    colors = [Color(*c) for c in tuples]
+
+    plain = per_call(lambda: format_plain(tuples), runs)
+    cached = per_call(lambda: format_cached(colors), runs)
+    print(f"64 colors, hex + hsl + cmyk, functions:    {plain * 1e6:8.1f} us")
+    print(f"64 colors, hex + hsl + cmyk, cached Color: {cached * 1e6:8.1f} us ({plain / cached:.0f}x)")
+
+    big = rng.integers(0, 256, (100_000, 3)).tolist()
+    as_tuples = allocated(lambda: [tuple(c) for c in big])
+    as_array = allocated(lambda: ColorArray(big))
+    print(f"100k colors as tuples:     {as_tuples / 1e6:6.2f} MB")
+    print(f"100k colors as ColorArray: {as_array / 1e6:6.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Per-frame cost of showing the magnifier patch through the monitor profile.
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageCms
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from icc_utils import build_rgb_profile, convert_array_to_srgb, convert_to_srgb, read_profile
+from image_utils import array_to_qimage
+
+# A wide-gamut (Adobe RGB compatible) monitor profile
+WIDE_GAMUT = build_rgb_profile(((0.64, 0.33), (0.21, 0.71), (0.15, 0.06)), (0.3127, 0.3290),
+                               563 / 256, "Wide gamut")
+
+def per_call(fn, runs):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+def uncached_pick(path, rgb):
+    # What convert_to_srgb did before transforms were cached: everything rebuilt per call
+    im = Image.new("RGB", (1, 1), rgb)
+    out = ImageCms.profileToProfile(im, ImageCms.getOpenProfile(path),
+                                    ImageCms.createProfile("sRGB"), outputMode="RGB")
+    return out.getpixel((0, 0))
+
+def main(runs=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "monitor.icc")
+        with open(path, "wb") as f:
+            f.write(WIDE_GAMUT)
+
+        rebuilt = per_call(lambda: uncached_pick(path, (100, 150, 200)), runs // 20)
+        cached = per_call(lambda: convert_to_srgb(100, 150, 200, path), runs)
+        print(f"single pick, transform rebuilt: {rebuilt * 1e3:7.3f} ms")
+        print(f"single pick, cached transform:  {cached * 1e3:7.3f} ms")
+
+        rng = np.random.default_rng(0)
+        for size in (15, 31, 61):
+            patch = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+            # Profile lookup + transform + QImage for the magnifier, as in MagnifierWindow.set_frame
+            frame = per_call(lambda: array_to_qimage(convert_array_to_srgb(patch, read_profile(path))), runs)
+            print(f"magnifier frame {size}x{size}:        {frame * 1e3:7.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Throughput of the stylesheet color audit on a generated multi-megabyte bundle:
+# thousands of rules drawing on a realistic pool of colors in every syntax, with
+# custom property tokens, comments and var() references.
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stylesheet_audit import audit_file
+
+def build_bundle(size, seed=0):
+    rng = random.Random(seed)
+    def rgb():
+        return rng.randrange(256), rng.randrange(256), rng.randrange(256)
+    pool = ([f"#{rng.randrange(1 << 24):06x}" for _ in range(800)]
+            + ["rgba({}, {}, {}, .5)".format(*rgb()) for _ in range(300)]
+            + [f"hsl({rng.randrange(360)} 50% 40%)" for _ in range(200)]
+            + [f"oklch(70% 0.1 {rng.randrange(360)})" for _ in range(100)]
+            + ["red", "tomato", "white", "black", "rebeccapurple", "transparent"]
+            + [f"var(--c{i})" for i in range(200)])
+    parts = [":root {\n" + "".join(f"  --c{i}: #{rng.randrange(1 << 24):06x};\n" for i in range(200)) + "}\n"]
+    total, i = len(parts[0]), 0
+    while total < size:
+        i += 1
+        rule = (f".component-{i} .element__child:hover > a[href] {{\n  display: flex;\n  margin: 0 auto;\n"
+                f"  color: {rng.choice(pool)};\n  background-color: {rng.choice(pool)};\n"
+                f"  border: 1px solid {rng.choice(pool)};\n  box-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);\n"
+                f"  transition: all .2s ease-in-out;\n}}\n/* component {i} */\n")
+        parts.append(rule)
+        total += len(rule)
+    return "".join(parts)
+
+def main(megabytes=(1, 4, 16)):
+    for mb in megabytes:
+        with tempfile.NamedTemporaryFile("w", suffix=".css", delete=False) as f:
+            f.write(build_bundle(mb << 20))
+        try:
+            start = time.perf_counter()
+            report = audit_file(f.name)
+            seconds = time.perf_counter() - start
+        finally:
+            os.unlink(f.name)
+        print(f"{mb:3d} MB: {seconds:6.3f} s ({mb / seconds:5.1f} MB/s), {len(report['colors'])} colors, "
+              f"{report['contrast_pairs']} pairs, {report['contrast_failure_count']} failing")
+
+if __name__ == "__main__":
+    main()
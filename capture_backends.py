@@ -0,0 +1,546 @@
+import os
+import sys
+import time
+import platform
+import threading
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPoint
+from PySide6.QtGui import QImage, QPainter
+
+from image_utils import array_to_qimage
+
+IS_WINDOWS = platform.system() == 'Windows'
+BACKEND_ENV_VAR = "NCP_CAPTURE_BACKEND"
+PIXEL_TILE = 32  # QtGrabBackend.pixel() grabs this many pixels per side around the point
+PIXEL_TILE_SECONDS = 1 / 60  # and reuses them for one display frame
+
+class CaptureBackend:
+    """
+    Grabs screen pixels in global (virtual desktop) coordinates.
+    Backends keep their OS handles open between calls; call close() when done.
+    thread_safe means the backend may be driven from a worker thread
+    (one thread per instance); Qt's grab must stay on the GUI thread.
+    """
+    name = "base"
+    thread_safe = False
+
+    def grab(self, x, y, width, height):
+        """
+        Returns a QImage of the area. Parts outside the screen are black.
+        """
+        raise NotImplementedError
+
+    def pixel(self, x, y):
+        c = self.grab(x, y, 1, 1).pixelColor(0, 0)
+        return c.red(), c.green(), c.blue()
+
+    def close(self):
+        pass
+
+# --- Qt ---
+
+class QtGrabBackend(CaptureBackend):
+    """
+    QScreen.grabWindow. Works everywhere Qt does, but every call is a full round trip
+    through the platform plugin. Single pixels are read from a small tile that is
+    grabbed at most once per display frame, so a burst of nearby samples (a batched
+    API call, a loop over points) shares one round trip.
+    """
+    name = "qt"
+
+    def __init__(self):
+        self.tile = None  # ((x, y, w, h), grabbed at, QImage)
+
+    def grab(self, x, y, width, height):
+        screen = self._screen_at(x, y)
+        # grabWindow(0) on a QScreen uses coordinates relative to that screen's geometry
+        local_x = x - screen.geometry().x()
+        local_y = y - screen.geometry().y()
+        return screen.grabWindow(0, local_x, local_y, width, height).toImage()
+
+    def pixel(self, x, y):
+        now = time.monotonic()
+        tile = self.tile
+        if tile is None or now - tile[1] > PIXEL_TILE_SECONDS or not _contains(tile[0], x, y):
+            rect = self._tile_rect(x, y)
+            tile = self.tile = (rect, now, self.grab(*rect))
+        (tx, ty, _, _), _, image = tile
+        ratio = image.devicePixelRatio()
+        c = image.pixelColor(int((x - tx) * ratio), int((y - ty) * ratio))
+        return c.red(), c.green(), c.blue()
+
+    def _tile_rect(self, x, y):
+        # Aligned tile, clipped to the screen holding (x, y) so one grab covers it
+        g = self._screen_at(x, y).geometry()
+        tx, ty = x - x % PIXEL_TILE, y - y % PIXEL_TILE
+        x0, y0 = max(tx, g.x()), max(ty, g.y())
+        x1, y1 = min(tx + PIXEL_TILE, g.x() + g.width()), min(ty + PIXEL_TILE, g.y() + g.height())
+        if x1 <= x or y1 <= y or x0 > x or y0 > y:
+            return x, y, 1, 1  # off every screen
+        return x0, y0, x1 - x0, y1 - y0
+
+    @staticmethod
+    def _screen_at(x, y):
+        return QApplication.screenAt(QPoint(x, y)) or QApplication.primaryScreen()
+
+def _contains(rect, x, y):
+    rx, ry, rw, rh = rect
+    return rx <= x < rx + rw and ry <= y < ry + rh
+
+# --- Synthetic ---
+
+class SyntheticBackend(CaptureBackend):
+    """
+    In-memory "screen" for tests and benchmarks. Without an array it serves a
+    deterministic pattern: r = x % 256, g = y % 256, b = (x + y) % 256.
+    """
+    name = "synthetic"
+    thread_safe = True
+
+    def __init__(self, array=None, origin=(0, 0), size=(1920, 1080)):
+        if array is None:
+            w, h = size
+            xs = np.arange(w, dtype=np.uint16)
+            ys = np.arange(h, dtype=np.uint16)[:, None]
+            array = np.empty((h, w, 3), dtype=np.uint8)
+            array[..., 0] = xs % 256
+            array[..., 1] = ys % 256
+            array[..., 2] = (xs + ys) % 256
+        self.array = array
+        self.origin = origin
+        self.lock = threading.Lock()
+
+    def set_array(self, array, origin=None):
+        with self.lock:
+            self.array = array
+            if origin is not None:
+                self.origin = origin
+
+    def grab_array(self, x, y, width, height):
+        with self.lock:
+            return _padded_crop(self.array, x - self.origin[0], y - self.origin[1], width, height)
+
+    def grab(self, x, y, width, height):
+        return array_to_qimage(self.grab_array(x, y, width, height))
+
+    def pixel(self, x, y):
+        r, g, b = self.grab_array(x, y, 1, 1)[0, 0].tolist()
+        return r, g, b
+
+def _padded_crop(array, x, y, width, height):
+    out = np.zeros((height, width, 3), dtype=np.uint8)
+    h, w = array.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, w), min(y + height, h)
+    if x1 > x0 and y1 > y0:
+        out[y0 - y:y1 - y, x0 - x:x1 - x] = array[y0:y1, x0:x1]
+    return out
+
+# --- Native coordinates ---
+
+def native_rect(x, y, width, height, screens):
+    """
+    Maps a rect in Qt's logical desktop coordinates to native pixels (the X11 root
+    window, or physical pixels for GDI).
+    screens: [((x, y, w, h) logical geometry, device pixel ratio)]. Qt keeps each
+    screen's top-left at its native position and scales from there, so the screen
+    holding the rect's top-left decides the ratio. Returns ((x, y, w, h), ratio).
+    """
+    origin, ratio = (0, 0), 1.0
+    for (sx, sy, sw, sh), dpr in screens:
+        if sx <= x < sx + sw and sy <= y < sy + sh:
+            origin, ratio = (sx, sy), dpr
+            break
+    else:
+        if screens:
+            origin, ratio = screens[0][0][:2], screens[0][1]
+    ox, oy = origin
+    return ((ox + round((x - ox) * ratio), oy + round((y - oy) * ratio),
+             max(1, round(width * ratio)), max(1, round(height * ratio))), ratio)
+
+class ScreenLayout:
+    """
+    Snapshot of the screens' logical geometry and device pixel ratio, for native_rect().
+    Native backends grab on the worker thread, so they read a snapshot that the GUI
+    thread replaces whenever a screen is added, removed or changes geometry.
+    """
+    def __init__(self):
+        self.update()
+        app = QApplication.instance()
+        if app:
+            app.screenAdded.connect(self.watch)
+            app.screenRemoved.connect(lambda screen: self.update())
+            for screen in app.screens():
+                self.watch(screen)
+
+    def watch(self, screen):
+        screen.geometryChanged.connect(lambda rect: self.update())
+        self.update()
+
+    def update(self):
+        self.screens = [((g.x(), g.y(), g.width(), g.height()), screen.devicePixelRatio())
+                        for screen, g in ((s, s.geometry()) for s in QApplication.screens())]
+
+    def native_rect(self, x, y, width, height):
+        return native_rect(x, y, width, height, self.screens)
+
+# --- Windows GDI ---
+
+if IS_WINDOWS:
+    import ctypes
+    from ctypes import wintypes
+
+    class BITMAPINFOHEADER(ctypes.Structure):
+        _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                    ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD),
+                    ("biCompression", wintypes.DWORD), ("biSizeImage", wintypes.DWORD),
+                    ("biXPelsPerMeter", wintypes.LONG), ("biYPelsPerMeter", wintypes.LONG),
+                    ("biClrUsed", wintypes.DWORD), ("biClrImportant", wintypes.DWORD)]
+
+    SRCCOPY = 0x00CC0020
+    CAPTUREBLT = 0x40000000
+    DIB_RGB_COLORS = 0
+
+class GdiBackend(CaptureBackend):
+    """
+    GDI with one screen DC held for the backend's lifetime (instead of GetDC/ReleaseDC
+    per pixel) and a cached DIB section per grab size, so BitBlt writes straight into
+    memory we can hand to QImage.
+    """
+    name = "gdi"
+    thread_safe = True
+
+    def __init__(self):
+        if not IS_WINDOWS:
+            raise OSError("GDI capture is only available on Windows")
+        self.user32 = ctypes.windll.user32
+        self.gdi32 = ctypes.windll.gdi32
+        # Handles are pointer sized; without argtypes ctypes would truncate them to int
+        self.user32.GetDC.restype = wintypes.HDC
+        self.user32.GetDC.argtypes = [wintypes.HWND]
+        self.user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self.gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self.gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self.gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+        self.gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.c_void_p, wintypes.UINT,
+                                                ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+        self.gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self.gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self.gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                      wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        self.gdi32.GetPixel.restype = wintypes.DWORD
+        self.gdi32.GetPixel.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        self.gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self.gdi32.DeleteDC.argtypes = [wintypes.HDC]
+
+        self.screen_dc = self.user32.GetDC(0)
+        if not self.screen_dc:
+            raise OSError("GetDC failed")
+        self.mem_dc = self.gdi32.CreateCompatibleDC(self.screen_dc)
+        self.buffers = {}  # (w, h) -> (hbitmap, bits pointer)
+        # Qt 6 processes are per-monitor DPI aware, so GDI wants physical pixels
+        self.layout = ScreenLayout()
+
+    def _buffer(self, width, height):
+        key = (width, height)
+        if key not in self.buffers:
+            # Keep only a few sizes around (1x1, magnifier patch, last region)
+            if len(self.buffers) >= 4:
+                old_bmp, _ = self.buffers.pop(next(iter(self.buffers)))
+                self.gdi32.DeleteObject(old_bmp)
+            header = BITMAPINFOHEADER()
+            header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+            header.biWidth = width
+            header.biHeight = -height  # top-down rows
+            header.biPlanes = 1
+            header.biBitCount = 32
+            bits = ctypes.c_void_p()
+            bmp = self.gdi32.CreateDIBSection(self.screen_dc, ctypes.byref(header), DIB_RGB_COLORS,
+                                              ctypes.byref(bits), None, 0)
+            if not bmp:
+                raise OSError("CreateDIBSection failed")
+            self.buffers[key] = (bmp, bits)
+        return self.buffers[key]
+
+    def grab(self, x, y, width, height):
+        (x, y, width, height), ratio = self.layout.native_rect(x, y, width, height)
+        bmp, bits = self._buffer(width, height)
+        self.gdi32.SelectObject(self.mem_dc, bmp)
+        self.gdi32.BitBlt(self.mem_dc, 0, 0, width, height, self.screen_dc, x, y, SRCCOPY | CAPTUREBLT)
+        self.gdi32.GdiFlush()
+        # BGRX in memory is exactly QImage's RGB32 layout
+        raw = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        image = QImage(raw, width, height, width * 4, QImage.Format_RGB32).copy()
+        image.setDevicePixelRatio(ratio)
+        return image
+
+    def pixel(self, x, y):
+        (x, y, _, _), _ = self.layout.native_rect(x, y, 1, 1)
+        color = self.gdi32.GetPixel(self.screen_dc, x, y)
+        if color == 0xFFFFFFFF:  # CLR_INVALID
+            return 0, 0, 0
+        return color & 0xff, (color >> 8) & 0xff, (color >> 16) & 0xff
+
+    def close(self):
+        for bmp, _ in self.buffers.values():
+            self.gdi32.DeleteObject(bmp)
+        self.buffers.clear()
+        if self.mem_dc:
+            self.gdi32.DeleteDC(self.mem_dc)
+            self.mem_dc = None
+        if self.screen_dc:
+            self.user32.ReleaseDC(0, self.screen_dc)
+            self.screen_dc = None
+
+# --- X11 MIT-SHM ---
+
+def is_bgrx_format(bits_per_pixel, byte_order, red_mask, green_mask, blue_mask):
+    """
+    Whether an XImage is 32 bpp with B, G, R, X bytes in memory (QImage's RGB32).
+    """
+    return (bits_per_pixel == 32 and byte_order == LSB_FIRST
+            and (red_mask, green_mask, blue_mask) == (0xFF0000, 0x00FF00, 0x0000FF))
+
+class X11ShmBackend(CaptureBackend):
+    """
+    X11 capture through the MIT-SHM extension: one display connection and one shared
+    XImage per grab size, reused across calls, so a grab is a single XShmGetImage
+    request with the pixels landing directly in our memory.
+
+    Opt-in (NCP_CAPTURE_BACKEND=x11shm). Grabs take logical coordinates like Qt's and
+    return device pixels; visuals other than 32 bpp BGRX are refused at creation, so
+    create_backend falls back to Qt.
+    """
+    name = "x11shm"
+    thread_safe = True
+
+    def __init__(self, display_name=None):
+        import ctypes
+        import ctypes.util
+        self.ctypes = ctypes
+        self.xlib = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        self.xext = ctypes.CDLL(ctypes.util.find_library("Xext") or "libXext.so.6")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _declare_x11(ctypes, self.xlib, self.xext, self.libc)
+
+        # X errors would otherwise abort the whole process
+        self._errors = _x_errors
+        self.xlib.XSetErrorHandler(_x_error_handler)
+
+        name = display_name.encode() if display_name else None
+        self.display = self.xlib.XOpenDisplay(name)
+        if not self.display:
+            raise OSError("Cannot open X display")
+        if not self.xext.XShmQueryExtension(self.display):
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+            raise OSError("MIT-SHM extension not available")
+
+        screen = self.xlib.XDefaultScreen(self.display)
+        self.root = self.xlib.XRootWindow(self.display, screen)
+        self.visual = self.xlib.XDefaultVisual(self.display, screen)
+        self.depth = self.xlib.XDefaultDepth(self.display, screen)
+        self.root_width = self.xlib.XDisplayWidth(self.display, screen)
+        self.root_height = self.xlib.XDisplayHeight(self.display, screen)
+        self.images = {}  # (w, h) -> (XImage*, XShmSegmentInfo)
+
+        self.layout = ScreenLayout()
+
+        # Probe once so an unusable setup (e.g. remote display, unknown pixel
+        # format) fails here, not mid-pick
+        try:
+            self.grab(0, 0, 1, 1)
+        except Exception:
+            self.close()
+            raise
+
+    def _image(self, width, height):
+        key = (width, height)
+        if key in self.images:
+            return self.images[key]
+        if len(self.images) >= 4:
+            old_key = next(iter(self.images))
+            self._destroy(*self.images.pop(old_key))
+
+        ctypes = self.ctypes
+        info = XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(self.display, self.visual, self.depth, Z_PIXMAP,
+                                          None, ctypes.byref(info), width, height)
+        if not image:
+            raise OSError("XShmCreateImage failed")
+        ximage = image.contents
+        if not is_bgrx_format(ximage.bits_per_pixel, ximage.byte_order,
+                              ximage.red_mask, ximage.green_mask, ximage.blue_mask):
+            depth, bpp = ximage.depth, ximage.bits_per_pixel
+            self.xlib.XDestroyImage(image)
+            raise OSError(f"Unsupported X image format ({depth}-bit depth, {bpp} bpp)")
+        size = ximage.bytes_per_line * ximage.height
+        info.shmid = self.libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        info.shmaddr = self.libc.shmat(info.shmid, None, 0)
+        ximage.data = info.shmaddr
+        info.readOnly = 0
+        self.xext.XShmAttach(self.display, ctypes.byref(info))
+        self.xlib.XSync(self.display, 0)
+        # Mark for removal now; the kernel frees it once both sides detach
+        self.libc.shmctl(info.shmid, IPC_RMID, None)
+        if self._errors:
+            self._errors.clear()
+            self._destroy(image, info)
+            raise OSError("XShmAttach failed")
+
+        self.images[key] = (image, info)
+        return image, info
+
+    def _destroy(self, image, info):
+        self.xext.XShmDetach(self.display, self.ctypes.byref(info))
+        image.contents.data = None  # XDestroyImage must not free() shared memory
+        self.xlib.XDestroyImage(image)
+        self.libc.shmdt(info.shmaddr)
+
+    def grab(self, x, y, width, height):
+        (x, y, width, height), ratio = self.layout.native_rect(x, y, width, height)
+        image = self._grab_native(x, y, width, height)
+        image.setDevicePixelRatio(ratio)
+        return image
+
+    def _grab_native(self, x, y, width, height):
+        # XShmGetImage fails with BadMatch outside the root window, so clip and pad
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.root_width), min(y + height, self.root_height)
+        if x1 <= x0 or y1 <= y0:
+            return array_to_qimage(np.zeros((height, width, 3), dtype=np.uint8))
+
+        cw, ch = x1 - x0, y1 - y0
+        image, info = self._image(cw, ch)
+        if not self.xext.XShmGetImage(self.display, self.root, image, x0, y0, ALL_PLANES):
+            raise OSError("XShmGetImage failed")
+        ximage = image.contents
+        raw = (self.ctypes.c_ubyte * (ximage.bytes_per_line * ch)).from_address(info.shmaddr)
+        # 24/32-bit TrueColor is BGRX in memory, which is QImage's RGB32 layout
+        clipped = QImage(raw, cw, ch, ximage.bytes_per_line, QImage.Format_RGB32)
+        if (cw, ch) == (width, height):
+            return clipped.copy()
+
+        out = QImage(width, height, QImage.Format_RGB32)
+        out.fill(0xFF000000)
+        painter = QPainter(out)
+        painter.drawImage(x0 - x, y0 - y, clipped)
+        painter.end()
+        return out
+
+    def close(self):
+        if not self.display:
+            return
+        for image, info in self.images.values():
+            self._destroy(image, info)
+        self.images.clear()
+        self.xlib.XCloseDisplay(self.display)
+        self.display = None
+
+# ctypes declarations for X11ShmBackend, created lazily so importing this module
+# never loads X libraries on other platforms.
+Z_PIXMAP = 2
+LSB_FIRST = 0
+ALL_PLANES = 0xFFFFFFFFFFFFFFFF if sys.maxsize > 2**32 else 0xFFFFFFFF
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+XShmSegmentInfo = None
+_XErrorHandler = None
+_x_error_handler = None
+_x_errors = []
+
+def _declare_x11(ctypes, xlib, xext, libc):
+    global XShmSegmentInfo, _XErrorHandler, _x_error_handler
+    if XShmSegmentInfo is not None:
+        return
+
+    class XImage(ctypes.Structure):
+        _fields_ = [("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+                    ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+                    ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int),
+                    ("bitmap_pad", ctypes.c_int), ("depth", ctypes.c_int),
+                    ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int),
+                    ("red_mask", ctypes.c_ulong), ("green_mask", ctypes.c_ulong),
+                    ("blue_mask", ctypes.c_ulong), ("obdata", ctypes.c_void_p),
+                    ("funcs", ctypes.c_void_p * 6)]
+
+    class _SegmentInfo(ctypes.Structure):
+        _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                    ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+    XShmSegmentInfo = _SegmentInfo
+    _XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+    # Module-level so the callback outlives any single backend instance
+    _x_error_handler = _XErrorHandler(lambda display, event: _x_errors.append(event) or 0)
+
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    xlib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    xlib.XRootWindow.restype = ctypes.c_ulong
+    xlib.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XDefaultVisual.restype = ctypes.c_void_p
+    xlib.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    xlib.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+    xlib.XSetErrorHandler.restype = ctypes.c_void_p
+    xlib.XSetErrorHandler.argtypes = [_XErrorHandler]
+
+    xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+    xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                     ctypes.c_char_p, ctypes.POINTER(_SegmentInfo),
+                                     ctypes.c_uint, ctypes.c_uint]
+    xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_SegmentInfo)]
+    xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_SegmentInfo)]
+    xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage),
+                                  ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+
+    libc.shmget.restype = ctypes.c_int
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+# --- Selection ---
+
+BACKENDS = {
+    "qt": QtGrabBackend,
+    "gdi": GdiBackend,
+    "x11shm": X11ShmBackend,
+    "synthetic": SyntheticBackend,
+}
+
+def _auto_order():
+    if IS_WINDOWS:
+        return ["gdi", "qt"]
+    # x11shm stays opt-in (NCP_CAPTURE_BACKEND=x11shm) until it runs in CI under Xvfb;
+    # meanwhile Qt serves single pixels from a per-frame tile (QtGrabBackend.pixel)
+    return ["qt"]
+
+def create_backend(name=None):
+    """
+    Creates a capture backend. name (or the NCP_CAPTURE_BACKEND environment variable)
+    picks one explicitly; "auto" tries the fastest for this platform and falls back to Qt.
+    """
+    name = name or os.environ.get(BACKEND_ENV_VAR) or "auto"
+    order = _auto_order() if name == "auto" else [name, "qt"]
+    for candidate in order:
+        cls = BACKENDS.get(candidate)
+        if cls is None:
+            continue
+        try:
+            return cls()
+        except Exception as e:
+            if candidate != "qt":
+                print(f"Capture backend '{candidate}' unavailable: {e}")
+    return QtGrabBackend()
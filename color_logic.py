@@ -1,5 +1,8 @@
+import math
 import colorsys
 
+import numpy as np
+
 def rgb_to_hls_wrapper(r, g, b):
     """
     Convert RGB (0-255) to HLS (0-1).
@@ -40,6 +43,16 @@ def rgb_to_cmyk(r, g, b):
 
     return (round(c * 100), round(m * 100), round(y * 100), round(k * 100))
 
+def rgb_array_to_cmyk(rgb):
+    """
+    (N, 3) RGB 0-255 -> (N, 4) int CMYK 0-100, the same formula as rgb_to_cmyk.
+    """
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+    k = 1 - rgb.max(axis=1, keepdims=True)
+    white = np.where(k < 1, 1 - k, 1.0)
+    cmy = np.where(k < 1, (1 - rgb - k) / white, 0.0)
+    return np.rint(np.concatenate([cmy, k], axis=1) * 100).astype(np.int64)
+
 def rgb_to_hsl_string(r, g, b):
     h, l, s = rgb_to_hls_wrapper(r, g, b)
     return f"hsl({round(h*360)}, {round(s*100)}%, {round(l*100)}%)"
@@ -145,3 +158,391 @@ def generate_palettes(r, g, b):
         hex_palettes[name] = hex_colors
 
     return hex_palettes
+
+# --- Perceptual Color Spaces ---
+
+def srgb_to_linear(c):
+    """
+    sRGB transfer function, channel in 0-1 (IEC 61966-2-1 threshold).
+    """
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(c):
+    c = np.clip(c, 0.0, 1.0)
+    return np.where(c <= 0.0031308, c * 12.92, 1.055 * c ** (1 / 2.4) - 0.055)
+
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+def rgb_array_to_lab(rgb):
+    """
+    (..., 3) sRGB 0-255 -> (..., 3) CIELAB (D65).
+    """
+    lin = srgb_to_linear(np.asarray(rgb, dtype=np.float64) / 255.0)
+    xyz = lin @ _RGB_TO_XYZ.T / _D65_WHITE
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+def rgb_to_lab(r, g, b):
+    L, a, b_ = rgb_array_to_lab((r, g, b)).tolist()
+    return L, a, b_
+
+def delta_e_2000(lab1, lab2):
+    """
+    CIEDE2000 color difference between CIELAB arrays (broadcasts).
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    C_bar7 = ((C1 + C2) / 2) ** 7
+    G = 0.5 * (1 - np.sqrt(C_bar7 / (C_bar7 + 25.0 ** 7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(C1p * C2p == 0, 0.0, dhp)
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp) / 2)
+
+    Lp_bar = (L1 + L2) / 2
+    Cp_bar = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    hp_bar = np.where(np.abs(h1p - h2p) > 180,
+                      np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+                      h_sum / 2)
+    hp_bar = np.where(C1p * C2p == 0, h_sum, hp_bar)
+
+    T = (1 - 0.17 * np.cos(np.radians(hp_bar - 30)) + 0.24 * np.cos(np.radians(2 * hp_bar))
+         + 0.32 * np.cos(np.radians(3 * hp_bar + 6)) - 0.20 * np.cos(np.radians(4 * hp_bar - 63)))
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    Cp_bar7 = Cp_bar ** 7
+    R_C = 2 * np.sqrt(Cp_bar7 / (Cp_bar7 + 25.0 ** 7))
+    S_L = 1 + (0.015 * (Lp_bar - 50) ** 2) / np.sqrt(20 + (Lp_bar - 50) ** 2)
+    S_C = 1 + 0.045 * Cp_bar
+    S_H = 1 + 0.015 * Cp_bar * T
+    R_T = -np.sin(np.radians(2 * d_theta)) * R_C
+
+    return np.sqrt((dLp / S_L) ** 2 + (dCp / S_C) ** 2 + (dHp / S_H) ** 2
+                   + R_T * (dCp / S_C) * (dHp / S_H))
+
+def delta_e(rgb1, rgb2):
+    """
+    CIEDE2000 difference between two RGB (0-255) colors.
+    """
+    return float(delta_e_2000(rgb_array_to_lab(rgb1), rgb_array_to_lab(rgb2)))
+
+_LMS_TO_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_RGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_OKLAB_TO_LMS = np.linalg.inv(_LMS_TO_OKLAB)
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+def rgb_array_to_oklab(rgb):
+    """
+    (..., 3) sRGB 0-255 -> (..., 3) OKLab.
+    """
+    lin = srgb_to_linear(np.asarray(rgb, dtype=np.float64) / 255.0)
+    return np.cbrt(lin @ _RGB_TO_LMS.T) @ _LMS_TO_OKLAB.T
+
+def oklab_array_to_linear(lab):
+    """
+    (..., 3) OKLab -> (..., 3) linear sRGB, unclipped (values outside 0-1 are out of gamut).
+    """
+    return (np.asarray(lab, dtype=np.float64) @ _OKLAB_TO_LMS.T) ** 3 @ _LMS_TO_RGB.T
+
+def _srgb_to_linear_scalar(c):
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+def _linear_to_srgb_scalar(c):
+    c = max(0.0, min(1.0, c))
+    return c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+def _oklab_to_linear_scalar(L, a, b):
+    # Plain floats: the per-keystroke solvers call this hundreds of times,
+    # where numpy's per-call overhead would dominate
+    l_ = (L + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m_ = (L - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s_ = (L - 0.0894841775 * a - 1.2914855480 * b) ** 3
+    return (4.0767416621 * l_ - 3.3077115913 * m_ + 0.2309699292 * s_,
+            -1.2684380046 * l_ + 2.6097574011 * m_ - 0.3413193965 * s_,
+            -0.0041960863 * l_ - 0.7034186147 * m_ + 1.7076147010 * s_)
+
+def rgb_to_oklab(r, g, b):
+    lr, lg, lb = (_srgb_to_linear_scalar(c / 255.0) for c in (r, g, b))
+    l_ = (0.4122214708 * lr + 0.5363325363 * lg + 0.0514459929 * lb) ** (1 / 3)
+    m_ = (0.2119034982 * lr + 0.6806995451 * lg + 0.1073969566 * lb) ** (1 / 3)
+    s_ = (0.0883024619 * lr + 0.2817188376 * lg + 0.6299787005 * lb) ** (1 / 3)
+    return (0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+            1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+            0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_)
+
+def rgb_to_oklch(r, g, b):
+    L, a, b_ = rgb_to_oklab(r, g, b)
+    return L, math.hypot(a, b_), math.degrees(math.atan2(b_, a)) % 360
+
+def oklch_to_rgb(L, C, h):
+    """
+    OKLCH -> sRGB (0-255). Out-of-gamut colors keep L and h and lose chroma
+    until they fit, so hue is preserved.
+    """
+    L = max(0.0, min(1.0, L))
+    h_rad = math.radians(h)
+    cos_h, sin_h = math.cos(h_rad), math.sin(h_rad)
+    eps = 1e-6
+
+    def in_gamut(lin):
+        return min(lin) >= -eps and max(lin) <= 1 + eps
+
+    lin = _oklab_to_linear_scalar(L, C * cos_h, C * sin_h)
+    if not in_gamut(lin):
+        lo, hi = 0.0, C
+        for _ in range(16):
+            mid = (lo + hi) / 2
+            if in_gamut(_oklab_to_linear_scalar(L, mid * cos_h, mid * sin_h)):
+                lo = mid
+            else:
+                hi = mid
+        lin = _oklab_to_linear_scalar(L, lo * cos_h, lo * sin_h)
+    return tuple(int(round(_linear_to_srgb_scalar(c) * 255)) for c in lin)
+
+# --- Accessible Palettes ---
+
+HARMONY_SCHEMES = {
+    "Monochromatic": get_monochromatic,
+    "Analogous": get_analogous,
+    "Complementary": get_complementary,
+    "Split Complementary": get_split_complementary,
+    "Triadic": get_triadic,
+    "Tetradic": get_tetradic,
+}
+
+_candidate_cache = None
+
+def oklch_candidates():
+    """
+    Every distinct in-gamut 8-bit color on a regular OKLCH grid, as (rgb uint8 (N, 3),
+    CIELAB (N, 3)). Built once; the grid is the same for every background and seed.
+    """
+    global _candidate_cache
+    if _candidate_cache is None:
+        L, C, h = np.meshgrid(np.linspace(0.08, 0.99, 60),
+                              np.linspace(0.0, 0.32, 17),
+                              np.radians(np.arange(0, 360, 4)), indexing="ij")
+        lab = np.stack([L, C * np.cos(h), C * np.sin(h)], axis=-1).reshape(-1, 3)
+        lin = oklab_array_to_linear(lab)
+        lin = lin[np.all((lin >= -1e-6) & (lin <= 1 + 1e-6), axis=1)]
+        rgb = np.rint(linear_to_srgb(lin) * 255).astype(np.uint32)
+        packed = np.unique((rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2])
+        rgb = np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=1).astype(np.uint8)
+        _candidate_cache = (rgb, rgb_array_to_lab(rgb))
+    return _candidate_cache
+
+def harmony_anchors(r, g, b, scheme=None):
+    """
+    RGB colors the palette is steered towards: the seed alone, or the colors of one
+    of the harmony schemes built from it.
+    """
+    if scheme is None:
+        return [(r, g, b)]
+    if scheme not in HARMONY_SCHEMES:
+        raise ValueError(f"Unknown harmony scheme: {scheme!r}")
+    h, l, s = rgb_to_hls_wrapper(r, g, b)
+    return [hls_to_rgb_wrapper(*c) for c in HARMONY_SCHEMES[scheme](h, l, s)]
+
+def generate_accessible_palette(bg_rgb, seed_rgb, count=6, target_ratio=4.5,
+                                min_delta_e=10.0, scheme=None):
+    """
+    Picks up to `count` colors that each reach target_ratio against bg_rgb and are at
+    least min_delta_e (CIEDE2000) apart from each other.
+
+    The search runs over the precomputed OKLCH candidate grid: one vectorized contrast
+    filter, then a greedy pass where each pick is the allowed candidate closest to the
+    next harmony anchor (cycling through them), with the pairwise-ΔE constraint kept
+    as a running minimum. Returns fewer colors when the constraints run out of room.
+
+    Each entry is {"hex", "rgb", "ratio", "delta_e"} (ΔE from its anchor).
+    """
+    # Imported here: contrast_utils builds on this module
+    from contrast_utils import luminance_array, contrast_ratio_array
+
+    rgb, lab = oklch_candidates()
+    bg_lum = luminance_array(np.array(bg_rgb, dtype=np.uint8))
+    ratios = contrast_ratio_array(luminance_array(rgb), bg_lum)
+    passing = ratios >= target_ratio
+    rgb, lab, ratios = rgb[passing], lab[passing], ratios[passing]
+
+    anchors = harmony_anchors(*seed_rgb, scheme=scheme)
+    anchor_de = delta_e_2000(lab[None, :, :], rgb_array_to_lab(anchors)[:, None, :])
+
+    nearest_pick = np.full(len(rgb), np.inf)
+    palette = []
+    for i in range(count):
+        allowed = nearest_pick >= min_delta_e
+        if not allowed.any():
+            break
+        a = i % len(anchors)
+        scores = np.where(allowed, anchor_de[a], np.inf)
+        k = int(np.argmin(scores))
+        r, g, b = (int(c) for c in rgb[k])
+        palette.append({
+            "hex": rgb_to_hex(r, g, b),
+            "rgb": (r, g, b),
+            "ratio": float(ratios[k]),
+            "delta_e": float(anchor_de[a, k]),
+        })
+        nearest_pick = np.minimum(nearest_pick, delta_e_2000(lab, lab[k]))
+    return palette
+
+# --- Color Vision Deficiency ---
+# Machado, Oliveira & Fernandes (2009) matrices at full severity, applied to linear
+# RGB. Achromatopsia maps every channel to relative luminance.
+
+CVD_MATRICES = {
+    "protanopia": np.array([
+        [0.152286, 1.052583, -0.204868],
+        [0.114503, 0.786281, 0.099216],
+        [-0.003882, -0.048116, 1.051998],
+    ]),
+    "deuteranopia": np.array([
+        [0.367322, 0.860646, -0.227968],
+        [0.280085, 0.672501, 0.047413],
+        [-0.011820, 0.042940, 0.968881],
+    ]),
+    "tritanopia": np.array([
+        [1.255528, -0.076749, -0.178779],
+        [-0.078411, 0.930809, 0.147602],
+        [0.004733, 0.691367, 0.303900],
+    ]),
+    "achromatopsia": np.array([[0.2126729, 0.7151522, 0.0721750]] * 3),
+}
+
+# Decode through a 256-entry table and encode through a 16-bit one, so a frame
+# costs two lookups and one 3x3 matmul per pixel
+_DECODE_LUT = srgb_to_linear(np.arange(256) / 255.0).astype(np.float32)
+_ENCODE_STEPS = 65535
+_ENCODE_LUT = np.rint(linear_to_srgb(np.arange(_ENCODE_STEPS + 1) / _ENCODE_STEPS) * 255).astype(np.uint8)
+_CVD_MATRICES_F32 = {name: m.T.astype(np.float32) for name, m in CVD_MATRICES.items()}
+
+def simulate_cvd_array(rgb, kind):
+    """
+    Simulates a color vision deficiency on an (..., 3) uint8 sRGB array.
+    kind is a CVD_MATRICES key; None or "none" returns the input unchanged.
+    """
+    if not kind or kind == "none":
+        return rgb
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    lin = _DECODE_LUT[rgb] @ _CVD_MATRICES_F32[kind]
+    np.clip(lin, 0.0, 1.0, out=lin)
+    idx = (lin * _ENCODE_STEPS + 0.5).astype(np.uint16)
+    return _ENCODE_LUT[idx]
+
+def simulate_cvd(r, g, b, kind):
+    """
+    Scalar simulate_cvd_array: returns the (r, g, b) seen with the given deficiency.
+    """
+    r, g, b = simulate_cvd_array(np.array([r, g, b], dtype=np.uint8), kind).tolist()
+    return r, g, b
+
+# --- Named Colors ---
+
+# CSS Color Module Level 4 keywords (transparent excluded). Aliases such as aqua/cyan
+# and gray/grey share a value; lookups report the alphabetically first.
+CSS_NAMED_COLORS = {
+    "aliceblue": "#F0F8FF", "antiquewhite": "#FAEBD7", "aqua": "#00FFFF", "aquamarine": "#7FFFD4",
+    "azure": "#F0FFFF", "beige": "#F5F5DC", "bisque": "#FFE4C4", "black": "#000000",
+    "blanchedalmond": "#FFEBCD", "blue": "#0000FF", "blueviolet": "#8A2BE2", "brown": "#A52A2A",
+    "burlywood": "#DEB887", "cadetblue": "#5F9EA0", "chartreuse": "#7FFF00",
+    "chocolate": "#D2691E", "coral": "#FF7F50", "cornflowerblue": "#6495ED", "cornsilk": "#FFF8DC",
+    "crimson": "#DC143C", "cyan": "#00FFFF", "darkblue": "#00008B", "darkcyan": "#008B8B",
+    "darkgoldenrod": "#B8860B", "darkgray": "#A9A9A9", "darkgreen": "#006400",
+    "darkgrey": "#A9A9A9", "darkkhaki": "#BDB76B", "darkmagenta": "#8B008B",
+    "darkolivegreen": "#556B2F", "darkorange": "#FF8C00", "darkorchid": "#9932CC",
+    "darkred": "#8B0000", "darksalmon": "#E9967A", "darkseagreen": "#8FBC8F",
+    "darkslateblue": "#483D8B", "darkslategray": "#2F4F4F", "darkslategrey": "#2F4F4F",
+    "darkturquoise": "#00CED1", "darkviolet": "#9400D3", "deeppink": "#FF1493",
+    "deepskyblue": "#00BFFF", "dimgray": "#696969", "dimgrey": "#696969", "dodgerblue": "#1E90FF",
+    "firebrick": "#B22222", "floralwhite": "#FFFAF0", "forestgreen": "#228B22",
+    "fuchsia": "#FF00FF", "gainsboro": "#DCDCDC", "ghostwhite": "#F8F8FF", "gold": "#FFD700",
+    "goldenrod": "#DAA520", "gray": "#808080", "green": "#008000", "greenyellow": "#ADFF2F",
+    "grey": "#808080", "honeydew": "#F0FFF0", "hotpink": "#FF69B4", "indianred": "#CD5C5C",
+    "indigo": "#4B0082", "ivory": "#FFFFF0", "khaki": "#F0E68C", "lavender": "#E6E6FA",
+    "lavenderblush": "#FFF0F5", "lawngreen": "#7CFC00", "lemonchiffon": "#FFFACD",
+    "lightblue": "#ADD8E6", "lightcoral": "#F08080", "lightcyan": "#E0FFFF",
+    "lightgoldenrodyellow": "#FAFAD2", "lightgray": "#D3D3D3", "lightgreen": "#90EE90",
+    "lightgrey": "#D3D3D3", "lightpink": "#FFB6C1", "lightsalmon": "#FFA07A",
+    "lightseagreen": "#20B2AA", "lightskyblue": "#87CEFA", "lightslategray": "#778899",
+    "lightslategrey": "#778899", "lightsteelblue": "#B0C4DE", "lightyellow": "#FFFFE0",
+    "lime": "#00FF00", "limegreen": "#32CD32", "linen": "#FAF0E6", "magenta": "#FF00FF",
+    "maroon": "#800000", "mediumaquamarine": "#66CDAA", "mediumblue": "#0000CD",
+    "mediumorchid": "#BA55D3", "mediumpurple": "#9370DB", "mediumseagreen": "#3CB371",
+    "mediumslateblue": "#7B68EE", "mediumspringgreen": "#00FA9A", "mediumturquoise": "#48D1CC",
+    "mediumvioletred": "#C71585", "midnightblue": "#191970", "mintcream": "#F5FFFA",
+    "mistyrose": "#FFE4E1", "moccasin": "#FFE4B5", "navajowhite": "#FFDEAD", "navy": "#000080",
+    "oldlace": "#FDF5E6", "olive": "#808000", "olivedrab": "#6B8E23", "orange": "#FFA500",
+    "orangered": "#FF4500", "orchid": "#DA70D6", "palegoldenrod": "#EEE8AA",
+    "palegreen": "#98FB98", "paleturquoise": "#AFEEEE", "palevioletred": "#DB7093",
+    "papayawhip": "#FFEFD5", "peachpuff": "#FFDAB9", "peru": "#CD853F", "pink": "#FFC0CB",
+    "plum": "#DDA0DD", "powderblue": "#B0E0E6", "purple": "#800080", "rebeccapurple": "#663399",
+    "red": "#FF0000", "rosybrown": "#BC8F8F", "royalblue": "#4169E1", "saddlebrown": "#8B4513",
+    "salmon": "#FA8072", "sandybrown": "#F4A460", "seagreen": "#2E8B57", "seashell": "#FFF5EE",
+    "sienna": "#A0522D", "silver": "#C0C0C0", "skyblue": "#87CEEB", "slateblue": "#6A5ACD",
+    "slategray": "#708090", "slategrey": "#708090", "snow": "#FFFAFA", "springgreen": "#00FF7F",
+    "steelblue": "#4682B4", "tan": "#D2B48C", "teal": "#008080", "thistle": "#D8BFD8",
+    "tomato": "#FF6347", "turquoise": "#40E0D0", "violet": "#EE82EE", "wheat": "#F5DEB3",
+    "white": "#FFFFFF", "whitesmoke": "#F5F5F5", "yellow": "#FFFF00", "yellowgreen": "#9ACD32",
+}
+
+_named_cache = None
+
+def _named_color_table():
+    """
+    (names, CIELAB (N, 3)) of CSS_NAMED_COLORS, built once.
+    """
+    global _named_cache
+    if _named_cache is None:
+        names = list(CSS_NAMED_COLORS)
+        rgb = np.array([[int(h[i:i + 2], 16) for i in (1, 3, 5)] for h in CSS_NAMED_COLORS.values()])
+        _named_cache = (names, rgb_array_to_lab(rgb))
+    return _named_cache
+
+def nearest_named_colors(rgb):
+    """
+    Closest CSS named color (CIEDE2000) for each color of an (N, 3) sRGB array.
+    Returns (names list, delta_e (N,)).
+    """
+    names, table = _named_color_table()
+    lab = rgb_array_to_lab(np.asarray(rgb).reshape(-1, 3))
+    de = delta_e_2000(lab[:, None, :], table[None, :, :])
+    idx = np.argmin(de, axis=1)
+    return [names[i] for i in idx], de[np.arange(len(idx)), idx]
+
+def nearest_named_color(r, g, b):
+    """
+    (name, delta_e) of the CSS named color closest to an RGB (0-255) color.
+    """
+    names, de = nearest_named_colors([(r, g, b)])
+    return names[0], float(de[0])
@@ -0,0 +1,219 @@
+import weakref
+from functools import lru_cache
+
+import numpy as np
+
+from color_logic import rgb_to_hls_wrapper, rgb_to_cmyk, rgb_array_to_lab, rgb_array_to_cmyk
+
+_HEX_DIGITS = tuple(f"{i:02X}" for i in range(256))
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+
+@lru_cache(maxsize=4096)
+def _parse_hex(text):
+    """
+    "#RRGGBB", "RRGGBB", "#RGB" or "RGB" -> packed 0xRRGGBB. Raises ValueError otherwise.
+    """
+    digits = text.strip().lstrip("#")
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) != 6 or not _HEX_CHARS.issuperset(digits):
+        raise ValueError(f"Invalid hex color: {text!r}")
+    return int(digits, 16)
+
+class Color:
+    """
+    An immutable sRGB color. Instances are interned: while one is alive, Color(r, g, b)
+    returns it again, so its hex, HSL, CMYK and Lab forms are worked out once however
+    often the color is shown. It unpacks, indexes, hashes and compares like an
+    (r, g, b) tuple, so it can be passed wherever those are expected.
+    """
+    __slots__ = ("value", "rgb", "_hex", "_hls", "_hsl", "_cmyk", "_lab", "__weakref__")
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, r, g, b):
+        r, g, b = int(r), int(g), int(b)
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            raise ValueError(f"Color channels must be 0-255, got {(r, g, b)}")
+        return cls.from_value((r << 16) | (g << 8) | b)
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        The color for a packed 0xRRGGBB int.
+        """
+        color = cls._interned.get(value)
+        if color is None:
+            color = object.__new__(cls)
+            init = object.__setattr__
+            init(color, "value", value)
+            init(color, "rgb", (value >> 16, (value >> 8) & 0xFF, value & 0xFF))
+            for name in ("_hex", "_hls", "_hsl", "_cmyk", "_lab"):
+                init(color, name, None)
+            cls._interned[value] = color
+        return color
+
+    @classmethod
+    def from_hex(cls, text):
+        return cls.from_value(_parse_hex(text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Color is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Color is immutable")
+
+    def __reduce__(self):
+        return Color.from_value, (self.value,)
+
+    # --- Tuple behaviour ---
+
+    def __iter__(self):
+        return iter(self.rgb)
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return self.rgb[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Color):
+            return self is other or self.value == other.value
+        if isinstance(other, (tuple, list)):
+            return self.rgb == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.rgb)
+
+    def __repr__(self):
+        return f"Color{self.rgb}"
+
+    # --- Derived forms, computed on first use ---
+
+    @property
+    def r(self):
+        return self.rgb[0]
+
+    @property
+    def g(self):
+        return self.rgb[1]
+
+    @property
+    def b(self):
+        return self.rgb[2]
+
+    @property
+    def hex(self):
+        """
+        "#RRGGBB", upper case like rgb_to_hex.
+        """
+        if self._hex is None:
+            r, g, b = self.rgb
+            object.__setattr__(self, "_hex", "#" + _HEX_DIGITS[r] + _HEX_DIGITS[g] + _HEX_DIGITS[b])
+        return self._hex
+
+    @property
+    def hls(self):
+        """
+        (h, l, s) in 0-1, as rgb_to_hls_wrapper.
+        """
+        if self._hls is None:
+            object.__setattr__(self, "_hls", rgb_to_hls_wrapper(*self.rgb))
+        return self._hls
+
+    @property
+    def hsl_string(self):
+        """
+        "hsl(h, s%, l%)", as rgb_to_hsl_string.
+        """
+        if self._hsl is None:
+            h, l, s = self.hls
+            object.__setattr__(self, "_hsl", f"hsl({round(h*360)}, {round(s*100)}%, {round(l*100)}%)")
+        return self._hsl
+
+    @property
+    def cmyk(self):
+        """
+        (c, m, y, k) in 0-100 from the plain formula; see icc_utils.cmyk_array for press profiles.
+        """
+        if self._cmyk is None:
+            object.__setattr__(self, "_cmyk", rgb_to_cmyk(*self.rgb))
+        return self._cmyk
+
+    @property
+    def lab(self):
+        """
+        CIELAB (D65) as an (L, a, b) tuple.
+        """
+        if self._lab is None:
+            object.__setattr__(self, "_lab", tuple(rgb_array_to_lab(self.rgb).tolist()))
+        return self._lab
+
+def as_color(value):
+    """
+    A Color from a Color, an (r, g, b) sequence or a hex string.
+    """
+    if isinstance(value, Color):
+        return value
+    if isinstance(value, str):
+        return Color.from_hex(value)
+    return Color(*value)
+
+class ColorArray:
+    """
+    A collection of colors stored as one (N, 3) uint8 array rather than N objects.
+    Items come out as (interned) Colors; hex, CMYK and Lab are computed for the
+    whole array at once.
+    """
+    __slots__ = ("rgb",)
+
+    def __init__(self, colors=()):
+        if isinstance(colors, ColorArray):
+            rgb = colors.rgb
+        elif isinstance(colors, np.ndarray):
+            rgb = colors.reshape(-1, 3).astype(np.uint8, copy=False)
+        else:
+            items = list(colors)
+            if items and not isinstance(items[0], (tuple, list)):
+                items = [as_color(c).rgb for c in items]
+            rgb = np.array(items, dtype=np.uint8).reshape(-1, 3)
+        self.rgb = rgb
+
+    def __len__(self):
+        return len(self.rgb)
+
+    def __iter__(self):
+        return map(Color.from_value, self.values().tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            r, g, b = self.rgb[index].tolist()
+            return Color.from_value((r << 16) | (g << 8) | b)
+        return ColorArray(self.rgb[index])
+
+    def __array__(self, dtype=None, copy=None):
+        return self.rgb if dtype is None else self.rgb.astype(dtype)
+
+    def __repr__(self):
+        return f"ColorArray({self.hex()})"
+
+    def values(self):
+        """
+        Packed 0xRRGGBB ints, (N,) uint32.
+        """
+        rgb = self.rgb.astype(np.uint32)
+        return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+    def hex(self):
+        return ["#%06X" % v for v in self.values().tolist()]
+
+    def cmyk(self):
+        """
+        (N, 4) int CMYK from the plain formula.
+        """
+        return rgb_array_to_cmyk(self.rgb)
+
+    def lab(self):
+        return rgb_array_to_lab(self.rgb)
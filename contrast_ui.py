@@ -1,16 +1,43 @@
+from functools import lru_cache
+
 from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                               QLineEdit, QPushButton, QFrame, QGridLayout)
-from PySide6.QtCore import Qt, Signal
+                               QLineEdit, QPushButton, QFrame, QGridLayout, QComboBox, QCheckBox)
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QIcon
 
-from contrast_utils import calculate_contrast, suggest_passing_color, hex_to_rgb
+from contrast_utils import (calculate_contrast, suggest_passing_colors, TARGET_LEVELS,
+                            calculate_apca, apca_font_guidance, suggest_apca_colors, APCA_LEVELS)
 from widgets import FlashFrame, CopyLabel
+from color_logic import simulate_cvd, CVD_MATRICES
+from color_value import Color, as_color
+from css_colors import parse_color
+
+# Typing and key repeat settle for this long before the dialog re-evaluates
+EVAL_DEBOUNCE_MS = 40
+
+@lru_cache(maxsize=1024)
+def evaluate_pair(fg_hex, bg_hex):
+    """
+    (WCAG ratio, APCA Lc) for a pair of upper-case hex colors.
+    """
+    return calculate_contrast(fg_hex, bg_hex), calculate_apca(fg_hex, bg_hex)
+
+@lru_cache(maxsize=256)
+def cached_suggestions(fg_hex, bg_hex, level, mode):
+    """
+    Suggestion candidates for a target level name (WCAG or APCA). Shared between
+    calls, so callers must not modify the result.
+    """
+    if level in APCA_LEVELS:
+        return suggest_apca_colors(fg_hex, bg_hex, APCA_LEVELS[level], mode)
+    return suggest_passing_colors(fg_hex, bg_hex, TARGET_LEVELS[level], mode)
 
 class ContrastCheckerDialog(QDialog):
     """
     Modal dialog for Contrast Checking.
     """
     request_color_pick = Signal(bool) # True for FG, False for BG
+    request_region_check = Signal(str) # FG hex to measure over a screen region
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,8 +46,16 @@ class ContrastCheckerDialog(QDialog):
         self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint)
 
         # Colors
-        self.fg_color = "#FFFFFF"
-        self.bg_color = "#000000"
+        self.fg = Color(255, 255, 255)
+        self.bg = Color(0, 0, 0)
+
+        # Coalesces keystrokes and repeated picks into one evaluation
+        self.eval_timer = QTimer(self)
+        self.eval_timer.setSingleShot(True)
+        self.eval_timer.setInterval(EVAL_DEBOUNCE_MS)
+        self.eval_timer.timeout.connect(self.update_results)
+        self.shown_key = None
+        self.preview_colors = None
 
         self.setup_ui()
         self.update_results()
@@ -59,6 +94,17 @@ class ContrastCheckerDialog(QDialog):
         self.preview_lbl.setStyleSheet(f"font-size: 18px; font-weight: bold;")
         preview_layout.addWidget(self.preview_lbl)
 
+        cvd_row = QHBoxLayout()
+        cvd_row.addStretch()
+        cvd_row.addWidget(QLabel("Simulate:", objectName="SuggestionLabel"))
+        self.cvd_combo = QComboBox()
+        self.cvd_combo.addItem("Normal Vision", "none")
+        for kind in CVD_MATRICES:
+            self.cvd_combo.addItem(kind.title(), kind)
+        self.cvd_combo.currentIndexChanged.connect(self.update_preview)
+        cvd_row.addWidget(self.cvd_combo)
+        preview_layout.addLayout(cvd_row)
+
         layout.addWidget(preview_group)
 
         # --- 3. Results Area ---
@@ -84,24 +130,56 @@ class ContrastCheckerDialog(QDialog):
         results_grid.addWidget(self.large_aa, 2, 1)
         results_grid.addWidget(self.large_aaa, 2, 2)
 
+        # APCA
+        results_grid.addWidget(QLabel("APCA", objectName="ResultLabel"), 3, 0)
+        self.apca_lbl = QLabel("Lc 0.0")
+        self.apca_lbl.setStyleSheet("font-weight: bold;")
+        results_grid.addWidget(self.apca_lbl, 3, 1)
+        self.apca_guidance_lbl = QLabel("", objectName="ResultLabel")
+        self.apca_guidance_lbl.setWordWrap(True)
+        results_grid.addWidget(self.apca_guidance_lbl, 4, 0, 1, 3)
+
         layout.addLayout(results_grid)
 
         # --- 4. Suggestion Area ---
+        target_row = QHBoxLayout()
+        target_row.addWidget(QLabel("Target:", objectName="SuggestionLabel"))
+        self.target_combo = QComboBox()
+        for name, ratio in TARGET_LEVELS.items():
+            self.target_combo.addItem(f"{name} ({ratio:g}:1)", name)
+        for name in APCA_LEVELS:
+            self.target_combo.addItem(name, name)
+        self.target_combo.currentIndexChanged.connect(self.update_results)
+        target_row.addWidget(self.target_combo)
+        self.oklch_check = QCheckBox("Preserve hue (OKLCH)")
+        self.oklch_check.toggled.connect(self.update_results)
+        target_row.addWidget(self.oklch_check)
+        target_row.addStretch()
+        layout.addLayout(target_row)
+
         self.suggestion_frame = QFrame()
-        suggestion_layout = QHBoxLayout(self.suggestion_frame)
+        suggestion_layout = QGridLayout(self.suggestion_frame)
         suggestion_layout.setContentsMargins(0,0,0,0)
 
-        lbl = QLabel("Suggestion (AA): ", objectName="SuggestionLabel")
-        self.suggestion_val = CopyLabel("#AAAAAA")
-        self.suggestion_apply = QPushButton("Apply")
-        self.suggestion_apply.clicked.connect(self.apply_suggestion)
-
-        suggestion_layout.addWidget(lbl)
-        suggestion_layout.addWidget(self.suggestion_val)
-        suggestion_layout.addWidget(self.suggestion_apply)
-        suggestion_layout.addStretch()
+        self.suggestion_rows = {}
+        for row, direction in enumerate(["lighter", "darker"]):
+            lbl = QLabel(f"{direction.title()}:", objectName="SuggestionLabel")
+            val = CopyLabel("#AAAAAA")
+            info = QLabel("", objectName="SuggestionLabel")
+            apply_btn = QPushButton("Apply")
+            apply_btn.clicked.connect(lambda _=False, d=direction: self.apply_suggestion(d))
+            suggestion_layout.addWidget(lbl, row, 0)
+            suggestion_layout.addWidget(val, row, 1)
+            suggestion_layout.addWidget(info, row, 2)
+            suggestion_layout.addWidget(apply_btn, row, 3)
+            self.suggestion_rows[direction] = (lbl, val, info, apply_btn)
+        suggestion_layout.setColumnStretch(4, 1)
 
         layout.addWidget(self.suggestion_frame)
+
+        region_btn = QPushButton("Check FG Over Screen Region…")
+        region_btn.clicked.connect(lambda: self.request_region_check.emit(self.fg_color))
+        layout.addWidget(region_btn)
         layout.addStretch()
 
     def create_color_input(self, title, default_hex, is_fg):
@@ -115,9 +193,9 @@ class ContrastCheckerDialog(QDialog):
         # Input Row: Edit + Picker + Copy
         hbox = QHBoxLayout()
 
-        # Hex Edit
+        # Color Edit: hex or any other CSS color syntax
         le = QLineEdit(default_hex)
-        le.setMaxLength(7)
+        le.setToolTip("Hex or any CSS color: rgb(), hsl(), hwb(), lab(), oklch(), color(), names")
         le.textChanged.connect(lambda t: self.on_hex_changed(t, is_fg))
         if is_fg: self.fg_le = le
         else: self.bg_le = le
@@ -152,60 +230,124 @@ class ContrastCheckerDialog(QDialog):
         lbl.setAlignment(Qt.AlignCenter)
         return lbl
 
-    def set_color(self, hex_val, is_fg):
-        if not hex_val.startswith('#'): hex_val = '#' + hex_val
-        hex_val = hex_val.upper()
+    @property
+    def fg_color(self):
+        return self.fg.hex
 
+    @property
+    def bg_color(self):
+        return self.bg.hex
+
+    def set_color(self, color, is_fg):
+        """
+        color: a Color, an (r, g, b) tuple or a hex string (the # is optional).
+        """
+        color = as_color(color)
         if is_fg:
-            self.fg_color = hex_val
-            self.fg_le.setText(hex_val)
+            self.fg = color
+            self.fg_le.setText(color.hex)
         else:
-            self.bg_color = hex_val
-            self.bg_le.setText(hex_val)
+            self.bg = color
+            self.bg_le.setText(color.hex)
 
-        self.update_results()
+        self.schedule_update()
 
     def on_hex_changed(self, text, is_fg):
-        if len(text) == 7 and text.startswith('#'):
-            try:
-                hex_to_rgb(text)
-                if is_fg: self.fg_color = text
-                else: self.bg_color = text
-                self.update_results()
-            except:
-                pass
+        # Any CSS color string; alpha is ignored, contrast is between the opaque colors
+        try:
+            color, _alpha = parse_color(text)
+        except ValueError:
+            return
+        if is_fg: self.fg = color
+        else: self.bg = color
+        self.schedule_update()
+
+    def schedule_update(self):
+        self.eval_timer.start()
 
     def swap_colors(self):
-        fg, bg = self.fg_color, self.bg_color
+        fg, bg = self.fg, self.bg
         self.set_color(bg, True)
         self.set_color(fg, False)
 
+    @staticmethod
+    def set_badge(lbl, passed, text):
+        # Only repolish when the state flips; the stylesheet does the coloring
+        if lbl.property("passed") != passed:
+            lbl.setProperty("passed", passed)
+            lbl.style().unpolish(lbl)
+            lbl.style().polish(lbl)
+        if lbl.text() != text:
+            lbl.setText(text)
+
     def update_results(self):
-        ratio = calculate_contrast(self.fg_color, self.bg_color)
+        self.eval_timer.stop()
+        level = self.target_combo.currentData()
+        mode = "oklch" if self.oklch_check.isChecked() else "hsl"
+        key = (self.fg_color, self.bg_color, level, mode)
+        if key == self.shown_key:
+            return
+        self.shown_key = key
+
+        ratio, lc = evaluate_pair(self.fg_color, self.bg_color)
         self.ratio_lbl.setText(f"Ratio: {ratio:.2f}:1")
-        self.preview_lbl.setStyleSheet(f"background-color: {self.bg_color}; color: {self.fg_color}; font-size: 18px; font-weight: bold; padding: 10px; border-radius: 6px;")
+        self.update_preview()
 
-        def set_lbl(lbl, passed, text):
-            lbl.setText(text)
-            color = "#4CAF50" if passed else "#F44336"
-            lbl.setStyleSheet(f"background-color: {color}; color: #ffffff; border-radius: 4px; padding: 2px 6px;")
+        set_badge = self.set_badge
+        set_badge(self.normal_aa, ratio >= 4.5, "AA Pass" if ratio >= 4.5 else "AA Fail")
+        set_badge(self.normal_aaa, ratio >= 7.0, "AAA Pass" if ratio >= 7.0 else "AAA Fail")
+        set_badge(self.large_aa, ratio >= 3.0, "AA Pass" if ratio >= 3.0 else "AA Fail")
+        set_badge(self.large_aaa, ratio >= 4.5, "AAA Pass" if ratio >= 4.5 else "AAA Fail")
 
-        set_lbl(self.normal_aa, ratio >= 4.5, "AA Pass" if ratio >= 4.5 else "AA Fail")
-        set_lbl(self.normal_aaa, ratio >= 7.0, "AAA Pass" if ratio >= 7.0 else "AAA Fail")
-        set_lbl(self.large_aa, ratio >= 3.0, "AA Pass" if ratio >= 3.0 else "AA Fail")
-        set_lbl(self.large_aaa, ratio >= 4.5, "AAA Pass" if ratio >= 4.5 else "AAA Fail")
+        self.apca_lbl.setText(f"Lc {lc:.1f}")
+        self.apca_guidance_lbl.setText(self.format_apca_guidance(lc))
 
-        if ratio < 4.5:
+        if level in APCA_LEVELS:
+            failing = abs(lc) < APCA_LEVELS[level]
+            describe = lambda c: f"Lc {c['lc']:.1f}  ΔE {c['delta_e']:.1f}"
+        else:
+            failing = ratio < TARGET_LEVELS[level]
+            describe = lambda c: f"{c['ratio']:.2f}:1  ΔE {c['delta_e']:.1f}"
+
+        if failing:
             self.suggestion_frame.show()
-            better = suggest_passing_color(self.fg_color, self.bg_color)
-            self.suggestion_val.setText(better)
+            found = cached_suggestions(self.fg_color, self.bg_color, level, mode)
+            for direction, (lbl, val, info, apply_btn) in self.suggestion_rows.items():
+                candidate = found[direction]
+                for w in (lbl, val, info, apply_btn):
+                    w.setVisible(candidate is not None)
+                if candidate:
+                    val.setText(candidate["hex"])
+                    info.setText(describe(candidate))
         else:
             self.suggestion_frame.hide()
 
-    def apply_suggestion(self):
-        self.set_color(self.suggestion_val.text(), True)
-
-    def receive_picked_color(self, hex_val, is_fg):
-        self.set_color(hex_val, is_fg)
+    def update_preview(self):
+        cvd_mode = self.cvd_combo.currentData()
+        key = (self.fg, self.bg, cvd_mode)
+        if self.preview_colors == key:
+            return
+        self.preview_colors = key
+        fg, bg = self.fg.hex, self.bg.hex
+        if cvd_mode != "none":
+            fg = Color(*simulate_cvd(*self.fg, cvd_mode)).hex
+            bg = Color(*simulate_cvd(*self.bg, cvd_mode)).hex
+        self.preview_lbl.setStyleSheet(f"background-color: {bg}; color: {fg}; font-size: 18px; font-weight: bold; padding: 10px; border-radius: 6px;")
+
+    @staticmethod
+    def format_apca_guidance(lc):
+        sizes = apca_font_guidance(lc)
+        if not sizes:
+            return "Not readable as text" if abs(lc) < 15 else "Non-text elements only"
+        parts = [f"{px:g}px @ {weight}" for weight, px in sizes.items() if weight in (300, 400, 700)]
+        if not parts:
+            parts = [f"{px:g}px @ {weight}" for weight, px in sizes.items()]
+        return "Min. font size: " + " · ".join(parts)
+
+    def apply_suggestion(self, direction):
+        self.set_color(self.suggestion_rows[direction][1].text(), True)
+
+    def receive_picked_color(self, color, is_fg):
+        self.set_color(color, is_fg)
         self.raise_()
         self.activateWindow()
@@ -1,28 +1,31 @@
 import colorsys
 
+import numpy as np
+
+from color_logic import delta_e, rgb_to_hex, rgb_to_oklch, oklch_to_rgb
+from color_value import Color, ColorArray
+
 def hex_to_rgb(hex_str):
-    hex_str = hex_str.lstrip('#')
-    if len(hex_str) == 3:
-        hex_str = ''.join([c*2 for c in hex_str])
-    return tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+    """
+    "#RRGGBB" or "#RGB" (the # is optional) -> (r, g, b). Raises ValueError otherwise.
+    """
+    return Color.from_hex(hex_str).rgb
 
-def rgb_to_hex(r, g, b):
-    return f"#{r:02X}{g:02X}{b:02X}"
+def _srgb_channel_to_linear(v):
+    # WCAG 2.x uses 0.03928 here (not the IEC 0.04045); kept for identical ratios
+    return v / 12.92 if v <= 0.03928 else ((v + 0.055) / 1.055) ** 2.4
+
+# 8-bit sRGB channel -> linear light, so luminance is three lookups instead of three ** 2.4
+LINEAR_LUT = tuple(_srgb_channel_to_linear(i / 255.0) for i in range(256))
+_LINEAR_LUT_NP = np.array(LINEAR_LUT)
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
 
 def calculate_luminance(r, g, b):
     """
     Calculates relative luminance using WCAG 2.0 formula.
     """
-    components = []
-    for c in [r, g, b]:
-        v = c / 255.0
-        if v <= 0.03928:
-            components.append(v / 12.92)
-        else:
-            components.append(((v + 0.055) / 1.055) ** 2.4)
-
-    r_lin, g_lin, b_lin = components
-    return (0.2126 * r_lin) + (0.7152 * g_lin) + (0.0722 * b_lin)
+    lut = LINEAR_LUT
+    return (0.2126 * lut[r]) + (0.7152 * lut[g]) + (0.0722 * lut[b])
 
 def calculate_contrast(fg_hex, bg_hex):
     """
@@ -42,83 +45,397 @@ def calculate_contrast(fg_hex, bg_hex):
     else:
         return (l2 + 0.05) / (l1 + 0.05)
 
-def suggest_passing_color(fg_hex, bg_hex, target_ratio=4.5):
+# --- WCAG Targets ---
+
+WCAG_AA = 4.5
+WCAG_AAA = 7.0
+WCAG_AA_LARGE = 3.0
+WCAG_AAA_LARGE = 4.5
+WCAG_UI = 3.0
+
+TARGET_LEVELS = {
+    "AA": WCAG_AA,
+    "AAA": WCAG_AAA,
+    "AA Large": WCAG_AA_LARGE,
+    "UI Components": WCAG_UI,
+}
+
+def contrast_from_luminance(l1, l2):
+    if l1 < l2:
+        l1, l2 = l2, l1
+    return (l1 + 0.05) / (l2 + 0.05)
+
+# --- Vectorized Contrast ---
+
+def to_rgb_array(colors):
     """
-    Adjusts FG lightness to meet target_ratio against BG.
-    Returns suggested hex string.
+    Normalizes hex strings, RGB tuples, Colors, a ColorArray or an (..., 3) array into a
+    uint8 (N, 3) array.
+    """
+    return ColorArray(colors).rgb
+
+def luminance_array(rgb):
+    """
+    Relative luminance of an (..., 3) uint8 array via the lookup table.
+    """
+    rgb = np.asarray(rgb)
+    return _LINEAR_LUT_NP[rgb] @ _LUMINANCE_WEIGHTS
+
+def contrast_ratio_array(lum_a, lum_b):
+    """
+    Elementwise WCAG ratio between two broadcastable luminance arrays.
+    """
+    hi = np.maximum(lum_a, lum_b)
+    lo = np.minimum(lum_a, lum_b)
+    return (hi + 0.05) / (lo + 0.05)
+
+def contrast_matrix(fg_colors, bg_colors):
+    """
+    (N, M) matrix of contrast ratios for every foreground/background pair.
+    """
+    fg_lum = luminance_array(to_rgb_array(fg_colors))
+    bg_lum = luminance_array(to_rgb_array(bg_colors))
+    return contrast_ratio_array(fg_lum[:, None], bg_lum[None, :])
+
+# Per-channel luminance contributions, float32, for whole-image work
+_LUMINANCE_LUTS_F32 = tuple((_LINEAR_LUT_NP * w).astype(np.float32) for w in _LUMINANCE_WEIGHTS)
+
+LUMINANCE_BAND_PIXELS = 1 << 15
+
+def luminance_image(pixels):
+    """
+    Relative luminance of an (H, W, 3) uint8 image as float32. Three table lookups
+    and two adds per pixel; cheaper than luminance_array's float64 matmul on large buffers.
+    """
+    lut_r, lut_g, lut_b = _LUMINANCE_LUTS_F32
+    lum = np.empty(pixels.shape[:2], dtype=np.float32)
+    # In bands of rows, so each gathered channel is still in cache when it is added
+    rows = max(1, LUMINANCE_BAND_PIXELS // max(1, pixels.shape[1]))
+    scratch = np.empty((rows, pixels.shape[1]), dtype=np.float32)
+    for y in range(0, pixels.shape[0], rows):
+        band = pixels[y:y + rows]
+        out = lum[y:y + rows]
+        tmp = scratch[:len(band)]
+        np.take(lut_r, band[..., 0], out=out)
+        out += np.take(lut_g, band[..., 1], out=tmp)
+        out += np.take(lut_b, band[..., 2], out=tmp)
+    return lum
+
+# Above this many pixels, region percentiles are taken over an evenly strided sample
+REGION_SAMPLE_PIXELS = 1 << 18
+
+def region_contrast(text_rgb, pixels, target_ratio=WCAG_AA, percentiles=(1, 5, 50)):
+    """
+    Contrast of one text color against every pixel of an (H, W, 3) region.
+
+    Returns {"worst", "worst_pos" (x, y), "percentiles" {p: ratio}, "fail_fraction",
+    "target", "ratios" (H, W) float32, "fail_mask" (H, W) bool}. Low percentiles are the useful
+    ones: "5% of the background is worse than this". Worst and fail fraction are
+    exact; percentiles are exact up to REGION_SAMPLE_PIXELS pixels and sampled above.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    if pixels.size == 0:
+        raise ValueError("empty region")
+    text_lum = np.float32(calculate_luminance(*text_rgb))
+    lum = luminance_image(pixels)
+    # In-place version of contrast_ratio_array, the region can be millions of pixels
+    hi = np.maximum(lum, text_lum)
+    np.minimum(lum, text_lum, out=lum)
+    hi += np.float32(0.05)
+    lum += np.float32(0.05)
+    np.divide(hi, lum, out=hi)
+    ratios = hi
+
+    flat = ratios.reshape(-1)
+    worst_idx = int(np.argmin(flat))
+    fail_mask = ratios < target_ratio
+    # Percentiles of a large region come from an even sample of its pixels; partitioning
+    # all of a full-HD grab would cost more than everything else here together
+    sample = flat[::-(-flat.size // REGION_SAMPLE_PIXELS)]
+    # One partition for all requested ranks (lower-rank percentiles, no interpolation)
+    ranks = [int(p / 100 * (sample.size - 1)) for p in percentiles]
+    values = np.partition(sample, ranks)[ranks] if ranks else []
+    return {
+        "worst": float(flat[worst_idx]),
+        "worst_pos": (worst_idx % ratios.shape[1], worst_idx // ratios.shape[1]),
+        "percentiles": {p: float(v) for p, v in zip(percentiles, values)},
+        "fail_fraction": float(np.count_nonzero(fail_mask)) / flat.size,
+        "target": target_ratio,
+        "ratios": ratios,
+        "fail_mask": fail_mask,
+    }
+
+def wcag_masks(ratios):
+    """
+    Pass/fail masks for each WCAG level, same shape as ratios.
+    """
+    masks = {name: ratios >= target for name, target in TARGET_LEVELS.items()}
+    masks["AAA Large"] = ratios >= WCAG_AAA_LARGE
+    return masks
+
+# --- APCA (Lc) ---
+# APCA-W3 0.0.98G-4g. Lc is signed: positive for dark text on a light background,
+# negative for light text on a dark background.
+
+APCA_LUT = tuple((i / 255.0) ** 2.4 for i in range(256))
+_APCA_LUT_NP = np.array(APCA_LUT)
+_APCA_WEIGHTS = np.array([0.2126729, 0.7151522, 0.0721750])
+
+_APCA_NORM_BG, _APCA_NORM_TXT = 0.56, 0.57
+_APCA_REV_BG, _APCA_REV_TXT = 0.65, 0.62
+_APCA_BLACK_THRESH, _APCA_BLACK_CLAMP = 0.022, 1.414
+_APCA_SCALE = 1.14
+_APCA_OFFSET = 0.027
+_APCA_DELTA_Y_MIN = 0.0005
+_APCA_LO_CLIP = 0.1
+
+APCA_LEVELS = {
+    "APCA Lc 90": 90.0,  # preferred for body text
+    "APCA Lc 75": 75.0,  # minimum for body text
+    "APCA Lc 60": 60.0,  # other content text
+    "APCA Lc 45": 45.0,  # headlines, large text
+    "APCA Lc 30": 30.0,  # non-text, placeholder, disabled
+}
+
+# Minimum font size in px per weight (100..900) for each Lc step, from the APCA
+# font lookup table. 999 means text is not usable at that contrast, 777 means
+# non-text elements only.
+APCA_FONT_WEIGHTS = (100, 200, 300, 400, 500, 600, 700, 800, 900)
+APCA_FONT_TABLE = (
+    (0, (999, 999, 999, 999, 999, 999, 999, 999, 999)),
+    (10, (999, 999, 999, 999, 999, 999, 999, 999, 999)),
+    (15, (777, 777, 777, 777, 777, 777, 777, 777, 777)),
+    (20, (777, 777, 777, 777, 777, 777, 777, 777, 777)),
+    (25, (777, 777, 777, 120, 120, 108, 96, 96, 96)),
+    (30, (777, 777, 120, 108, 108, 96, 72, 72, 72)),
+    (35, (777, 120, 108, 96, 72, 60, 48, 48, 48)),
+    (40, (120, 108, 96, 60, 48, 42, 32, 32, 32)),
+    (45, (108, 96, 72, 42, 32, 28, 24, 24, 24)),
+    (50, (96, 72, 60, 32, 28, 24, 21, 21, 21)),
+    (55, (80, 60, 48, 28, 24, 21, 18, 18, 18)),
+    (60, (72, 48, 42, 24, 21, 18, 16, 16, 18)),
+    (65, (68, 46, 32, 21.75, 19, 17, 15, 16, 18)),
+    (70, (64, 44, 28, 19.5, 18, 16, 14.5, 16, 18)),
+    (75, (60, 42, 24, 18, 16, 15, 14, 16, 18)),
+    (80, (56, 38.25, 23, 17.25, 15.81, 14.81, 14, 16, 18)),
+    (85, (52, 34.5, 22, 16.5, 15.625, 14.625, 14, 16, 18)),
+    (90, (48, 32, 21, 16, 15.5, 14.5, 14, 16, 18)),
+    (95, (45, 28, 19.5, 15.5, 15, 14, 13.5, 16, 18)),
+    (100, (42, 26.5, 18.5, 15, 14.5, 13.5, 13, 16, 18)),
+    (105, (39, 25, 18, 14.5, 14, 13, 12, 16, 18)),
+    (110, (36, 24, 18, 14, 13, 12, 11, 16, 18)),
+    (115, (34.5, 22.5, 17.25, 12.5, 11.875, 11.25, 10.625, 14.5, 16.5)),
+    (120, (33, 21, 16.5, 11, 10.75, 10.5, 10.25, 13, 15)),
+    (125, (32, 20, 16, 10, 10, 10, 10, 12, 14)),
+)
+
+def apca_luminance(r, g, b):
+    """
+    APCA screen luminance (Ys) of an 8-bit sRGB color.
+    """
+    lut = APCA_LUT
+    return (0.2126729 * lut[r]) + (0.7151522 * lut[g]) + (0.0721750 * lut[b])
+
+def _apca_soft_clamp(y):
+    if y > _APCA_BLACK_THRESH:
+        return y
+    return y + (_APCA_BLACK_THRESH - y) ** _APCA_BLACK_CLAMP
+
+def apca_from_luminance(text_y, bg_y):
+    """
+    Lc from two APCA luminances (text first, order matters).
+    """
+    text_y = _apca_soft_clamp(text_y)
+    bg_y = _apca_soft_clamp(bg_y)
+    if abs(bg_y - text_y) < _APCA_DELTA_Y_MIN:
+        return 0.0
+    if bg_y > text_y:
+        sapc = (bg_y ** _APCA_NORM_BG - text_y ** _APCA_NORM_TXT) * _APCA_SCALE
+        return 0.0 if sapc < _APCA_LO_CLIP else (sapc - _APCA_OFFSET) * 100.0
+    sapc = (bg_y ** _APCA_REV_BG - text_y ** _APCA_REV_TXT) * _APCA_SCALE
+    return 0.0 if sapc > -_APCA_LO_CLIP else (sapc + _APCA_OFFSET) * 100.0
+
+def calculate_apca(text_hex, bg_hex):
+    """
+    Returns the APCA Lc (signed float) of text_hex on bg_hex.
     """
     try:
-        fg_rgb = hex_to_rgb(fg_hex)
+        text_rgb = hex_to_rgb(text_hex)
         bg_rgb = hex_to_rgb(bg_hex)
     except ValueError:
-        return fg_hex
+        return 0.0
+    return apca_from_luminance(apca_luminance(*text_rgb), apca_luminance(*bg_rgb))
 
-    bg_lum = calculate_luminance(*bg_rgb)
+def apca_luminance_array(rgb):
+    """
+    APCA luminance of an (..., 3) uint8 array via the lookup table.
+    """
+    rgb = np.asarray(rgb)
+    return _APCA_LUT_NP[rgb] @ _APCA_WEIGHTS
+
+def apca_array(text_y, bg_y):
+    """
+    Elementwise Lc between two broadcastable APCA luminance arrays.
+    """
+    text_y, bg_y = np.broadcast_arrays(np.asarray(text_y, dtype=float), np.asarray(bg_y, dtype=float))
+    thresh = _APCA_BLACK_THRESH
+    text_y = np.where(text_y > thresh, text_y, text_y + np.abs(thresh - text_y) ** _APCA_BLACK_CLAMP)
+    bg_y = np.where(bg_y > thresh, bg_y, bg_y + np.abs(thresh - bg_y) ** _APCA_BLACK_CLAMP)
+
+    normal = (bg_y ** _APCA_NORM_BG - text_y ** _APCA_NORM_TXT) * _APCA_SCALE
+    reverse = (bg_y ** _APCA_REV_BG - text_y ** _APCA_REV_TXT) * _APCA_SCALE
+    lc = np.where(bg_y > text_y,
+                  np.where(normal < _APCA_LO_CLIP, 0.0, normal - _APCA_OFFSET),
+                  np.where(reverse > -_APCA_LO_CLIP, 0.0, reverse + _APCA_OFFSET))
+    lc[np.abs(bg_y - text_y) < _APCA_DELTA_Y_MIN] = 0.0
+    return lc * 100.0
+
+def apca_matrix(text_colors, bg_colors):
+    """
+    (N, M) matrix of Lc values for every text/background pair.
+    """
+    text_y = apca_luminance_array(to_rgb_array(text_colors))
+    bg_y = apca_luminance_array(to_rgb_array(bg_colors))
+    return apca_array(text_y[:, None], bg_y[None, :])
+
+def apca_font_guidance(lc):
+    """
+    Minimum font size in px for each usable weight at |lc|, as {weight: px}.
+    Uses the table row at or below |lc|, so the guidance never overstates.
+    Empty when the contrast is too low for any text.
+    """
+    lc = abs(lc)
+    sizes = APCA_FONT_TABLE[0][1]
+    for step, row in APCA_FONT_TABLE:
+        if step > lc:
+            break
+        sizes = row
+    return {w: px for w, px in zip(APCA_FONT_WEIGHTS, sizes) if px < 777}
+
+def _bisect_path(color_at, passes, start, end, iterations=20):
+    """
+    Finds the point closest to `start` on the path start -> end where passes() holds,
+    assuming it stays true once reached. Returns an RGB tuple or None.
+    Invariant: lo never passes, hi always does, so the result is guaranteed to pass.
+    """
+    rgb = color_at(start)
+    if passes(rgb):
+        return rgb
+    best = color_at(end)
+    if not passes(best):
+        return None
+    lo, hi = start, end
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        rgb = color_at(mid)
+        if passes(rgb):
+            hi, best = mid, rgb
+        else:
+            lo = mid
+    return best
+
+def _lightness_path(fg_rgb, mode):
+    """
+    Returns (color_at(t), t_now) for moving the foreground's lightness only.
+    hsl keeps HSL hue/saturation; oklch keeps perceptual hue and chroma.
+    In both, luminance rises monotonically with t.
+    """
+    if mode == "oklch":
+        L, C, h = rgb_to_oklch(*fg_rgb)
+        return (lambda t: oklch_to_rgb(t, C, h)), L
 
-    # Current HSL
     h, l, s = colorsys.rgb_to_hls(fg_rgb[0]/255.0, fg_rgb[1]/255.0, fg_rgb[2]/255.0)
 
-    # Determine direction: should we go lighter or darker?
-    # If BG is dark, we likely need lighter FG. If BG is light, darker FG.
-    # Using simple iteration for robustness
+    def color_at(t):
+        r, g, b = colorsys.hls_to_rgb(h, t, s)
+        return (int(round(r * 255)), int(round(g * 255)), int(round(b * 255)))
+    return color_at, l
 
-    best_hex = fg_hex
+def _lightness_candidates(fg_rgb, mode, lighter_passes, darker_passes, describe):
+    """
+    Bisects the FG lightness path both ways and wraps what passes into candidates:
+    {"hex", "rgb", "delta_e"} (CIEDE2000 from the original FG) plus describe(rgb).
+    """
+    color_at, t_now = _lightness_path(fg_rgb, mode)
+    lighter = _bisect_path(color_at, lighter_passes, t_now, 1.0) if lighter_passes else None
+    darker = _bisect_path(color_at, darker_passes, t_now, 0.0) if darker_passes else None
 
-    # Scan lightness from 0.0 to 1.0 in steps
-    # We want the value closest to original L that passes
+    def candidate(rgb):
+        if rgb is None:
+            return None
+        found = {"hex": rgb_to_hex(*rgb), "rgb": rgb, "delta_e": delta_e(fg_rgb, rgb)}
+        found.update(describe(rgb))
+        return found
 
-    search_step = 0.01
-    # Search upwards
-    passed_up = None
-    curr_l = l
-    while curr_l <= 1.0:
-        r, g, b = colorsys.hls_to_rgb(h, curr_l, s)
-        test_rgb = (int(r*255), int(g*255), int(b*255))
-        test_lum = calculate_luminance(*test_rgb)
+    return {"lighter": candidate(lighter), "darker": candidate(darker)}
 
-        ratio = 0
-        if test_lum > bg_lum:
-            ratio = (test_lum + 0.05) / (bg_lum + 0.05)
-        else:
-            ratio = (bg_lum + 0.05) / (test_lum + 0.05)
+def suggest_passing_colors(fg_hex, bg_hex, target_ratio=WCAG_AA, mode="hsl"):
+    """
+    Finds the smallest lightness change of FG that reaches target_ratio against BG,
+    once going lighter and once going darker.
 
-        if ratio >= target_ratio:
-            passed_up = rgb_to_hex(*test_rgb)
-            break
-        curr_l += search_step
-
-    # Search downwards
-    passed_down = None
-    curr_l = l
-    while curr_l >= 0.0:
-        r, g, b = colorsys.hls_to_rgb(h, curr_l, s)
-        test_rgb = (int(r*255), int(g*255), int(b*255))
-        test_lum = calculate_luminance(*test_rgb)
-
-        ratio = 0
-        if test_lum > bg_lum:
-            ratio = (test_lum + 0.05) / (bg_lum + 0.05)
-        else:
-            ratio = (bg_lum + 0.05) / (test_lum + 0.05)
+    Instead of stepping through lightness, the target is turned into a luminance
+    bound (Y >= target * (Yb + 0.05) - 0.05 when lighter, Y <= (Yb + 0.05) / target - 0.05
+    when darker) and the lightness reaching it is found by bisection.
 
-        if ratio >= target_ratio:
-            passed_down = rgb_to_hex(*test_rgb)
-            break
-        curr_l -= search_step
+    Returns {"lighter": candidate or None, "darker": candidate or None}, where a
+    candidate is {"hex", "rgb", "ratio", "delta_e"} (CIEDE2000 from the original FG).
+    """
+    try:
+        fg_rgb = hex_to_rgb(fg_hex)
+        bg_rgb = hex_to_rgb(bg_hex)
+    except ValueError:
+        return {"lighter": None, "darker": None}
+
+    bg_lum = calculate_luminance(*bg_rgb)
+    min_lum = target_ratio * (bg_lum + 0.05) - 0.05
+    max_lum = (bg_lum + 0.05) / target_ratio - 0.05
+
+    lighter_passes = None
+    if min_lum <= 1.0:
+        lighter_passes = lambda rgb: calculate_luminance(*rgb) >= min_lum
+    darker_passes = None
+    if max_lum >= 0.0:
+        darker_passes = lambda rgb: calculate_luminance(*rgb) <= max_lum
+
+    return _lightness_candidates(
+        fg_rgb, mode, lighter_passes, darker_passes,
+        lambda rgb: {"ratio": contrast_from_luminance(calculate_luminance(*rgb), bg_lum)})
 
-    # Return closest
-    if passed_up and passed_down:
-        # Which is closer to original L?
-        # Re-calculate L for results to compare
-        # ... actually simple heuristic: |l - l_up| vs |l - l_down|
-        # Since we stepped incrementally, the number of steps tells us distance.
-        # But we don't have step count here easily.
-        # Just pick one. Usually preserving the intended "vibe" (dark/light) is hard.
-        # Let's calculate distance.
+def suggest_passing_color(fg_hex, bg_hex, target_ratio=WCAG_AA, mode="hsl"):
+    """
+    Adjusts FG lightness to meet target_ratio against BG.
+    Returns the suggested hex string closest to FG (by ΔE), or fg_hex if there is none.
+    """
+    found = suggest_passing_colors(fg_hex, bg_hex, target_ratio, mode)
+    options = [c for c in (found["lighter"], found["darker"]) if c]
+    if not options:
+        return fg_hex
+    return min(options, key=lambda c: c["delta_e"])["hex"]
+
+def suggest_apca_colors(fg_hex, bg_hex, target_lc=75.0, mode="hsl"):
+    """
+    APCA counterpart of suggest_passing_colors: the smallest lightness change of the
+    text color reaching |Lc| >= target_lc on BG. Going lighter means light text on the
+    background (negative Lc), going darker means dark text (positive Lc); within each
+    polarity |Lc| grows monotonically along the path, so the same bisection applies.
+
+    Candidates are {"hex", "rgb", "lc", "delta_e"}.
+    """
+    try:
+        fg_rgb = hex_to_rgb(fg_hex)
+        bg_rgb = hex_to_rgb(bg_hex)
+    except ValueError:
+        return {"lighter": None, "darker": None}
 
-        return passed_up # Prefer lighter? Or just arbitrary.
+    bg_y = apca_luminance(*bg_rgb)
+    target_lc = abs(target_lc)
 
-    if passed_up: return passed_up
-    if passed_down: return passed_down
+    def lc_of(rgb):
+        return apca_from_luminance(apca_luminance(*rgb), bg_y)
 
-    return fg_hex # No solution found (unlikely unless color is weird)
+    return _lightness_candidates(
+        fg_rgb, mode,
+        lambda rgb: lc_of(rgb) <= -target_lc,
+        lambda rgb: lc_of(rgb) >= target_lc,
+        lambda rgb: {"lc": lc_of(rgb)})
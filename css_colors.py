@@ -0,0 +1,216 @@
+import re
+import math
+import colorsys
+from functools import lru_cache
+
+import numpy as np
+
+from color_logic import (CSS_NAMED_COLORS, srgb_to_linear, linear_to_srgb, oklch_to_rgb,
+                         _RGB_TO_XYZ, _RGB_TO_LMS, _LMS_TO_OKLAB)
+from color_value import Color
+
+# --- CSS Color 4 parsing ---
+#
+# parse_color() turns any CSS color string into an 8-bit sRGB Color and an alpha:
+# hex (#RGB, #RGBA, #RRGGBB, #RRGGBBAA), named colors, transparent, rgb()/rgba(),
+# hsl()/hsla(), hwb(), lab(), lch(), oklab(), oklch() and color() with the predefined
+# RGB and XYZ spaces. Colors outside sRGB are gamut mapped the way CSS Color 4
+# suggests: lightness and hue are kept and OKLCH chroma is reduced until they fit.
+
+_NUMBER = re.compile(r"([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(%|deg|grad|rad|turn)?$", re.IGNORECASE)
+_FUNCTION = re.compile(r"([a-z-]+)\(\s*(.*?)\s*\)$", re.IGNORECASE | re.DOTALL)
+_HEX = re.compile(r"#([0-9a-f]{3,4}|[0-9a-f]{6}|[0-9a-f]{8})$", re.IGNORECASE)
+
+_HUE_UNITS = {None: 1.0, "deg": 1.0, "grad": 0.9, "rad": 180 / math.pi, "turn": 360.0}
+
+_D50_TO_D65 = np.array([
+    [0.955473421488075, -0.02309845494876471, 0.06325924320057072],
+    [-0.0283697093338637, 1.0099953980813041, 0.021041441191917323],
+    [0.012314014864481998, -0.020507649298898964, 1.330365926242124],
+])
+_D50_WHITE = np.array([0.3457 / 0.3585, 1.0, (1 - 0.3457 - 0.3585) / 0.3585])
+_XYZ_TO_LINEAR = np.linalg.inv(_RGB_TO_XYZ)
+
+def _rgb_to_xyz_matrix(primaries, white):
+    xyz = np.array([[x / y, 1.0, (1 - x - y) / y] for x, y in primaries]).T
+    wx, wy = white
+    return xyz * np.linalg.solve(xyz, [wx / wy, 1.0, (1 - wx - wy) / wy])
+
+def _gamma(exponent):
+    return lambda c: np.sign(c) * np.abs(c) ** exponent
+
+def _rec2020_to_linear(c):
+    alpha, beta = 1.09929682680944, 0.018053968510807
+    a = np.abs(c)
+    return np.sign(c) * np.where(a < beta * 4.5, a / 4.5, ((a + alpha - 1) / alpha) ** (1 / 0.45))
+
+def _prophoto_to_linear(c):
+    a = np.abs(c)
+    return np.sign(c) * np.where(a <= 16 / 512, a / 16, a ** 1.8)
+
+def _srgb_extended_to_linear(c):
+    return np.sign(c) * srgb_to_linear(np.abs(c))
+
+_D65 = (0.3127, 0.3290)
+_D50 = (0.3457, 0.3585)
+
+# color() spaces: (transfer function to linear, linear -> linear sRGB matrix)
+_COLOR_SPACES = {
+    "srgb": (_srgb_extended_to_linear, np.eye(3)),
+    "srgb-linear": (lambda c: c, np.eye(3)),
+    "display-p3": (_srgb_extended_to_linear, _XYZ_TO_LINEAR @ _rgb_to_xyz_matrix(
+        ((0.680, 0.320), (0.265, 0.690), (0.150, 0.060)), _D65)),
+    "a98-rgb": (_gamma(563 / 256), _XYZ_TO_LINEAR @ _rgb_to_xyz_matrix(
+        ((0.64, 0.33), (0.21, 0.71), (0.15, 0.06)), _D65)),
+    "rec2020": (_rec2020_to_linear, _XYZ_TO_LINEAR @ _rgb_to_xyz_matrix(
+        ((0.708, 0.292), (0.170, 0.797), (0.131, 0.046)), _D65)),
+    "prophoto-rgb": (_prophoto_to_linear, _XYZ_TO_LINEAR @ _D50_TO_D65 @ _rgb_to_xyz_matrix(
+        ((0.734699, 0.265301), (0.159597, 0.840403), (0.036598, 0.000105)), _D50)),
+    "xyz": (lambda c: c, _XYZ_TO_LINEAR),
+    "xyz-d65": (lambda c: c, _XYZ_TO_LINEAR),
+    "xyz-d50": (lambda c: c, _XYZ_TO_LINEAR @ _D50_TO_D65),
+}
+
+def _number(token, percent=1.0):
+    """
+    A CSS <number> or <percentage> (scaled so 100% = percent); "none" is 0.
+    """
+    if token.lower() == "none":
+        return 0.0
+    m = _NUMBER.match(token)
+    if not m or m.group(2) not in (None, "%"):
+        raise ValueError(f"Invalid number: {token!r}")
+    value = float(m.group(1))
+    return value * percent / 100 if m.group(2) else value
+
+def _hue(token):
+    if token.lower() == "none":
+        return 0.0
+    m = _NUMBER.match(token)
+    unit = m and (m.group(2) or "").lower() or None
+    if not m or unit == "%":
+        raise ValueError(f"Invalid hue: {token!r}")
+    return float(m.group(1)) * _HUE_UNITS[unit] % 360
+
+def _alpha(token):
+    return min(1.0, max(0.0, _number(token, 1.0))) if token is not None else 1.0
+
+def _arguments(body):
+    """
+    Splits function arguments, legacy (commas) or modern (spaces, "/ alpha"),
+    into (channel tokens, alpha token or None).
+    """
+    if "," in body:
+        parts = [p.strip() for p in body.split(",")]
+        if len(parts) == 4:
+            return parts[:3], parts[3]
+        return parts, None
+    main, _, alpha = body.partition("/")
+    return main.split(), alpha.strip() or None
+
+def _encode(rgb):
+    r, g, b = (int(round(min(1.0, max(0.0, c)) * 255)) for c in rgb)
+    return Color(r, g, b)
+
+def _from_linear(lin):
+    """
+    Linear sRGB (any range) -> Color, gamut mapped by OKLCH chroma reduction.
+    """
+    lin = np.asarray(lin, dtype=np.float64)
+    if lin.min() >= -1e-4 and lin.max() <= 1 + 1e-4:
+        return _encode(linear_to_srgb(lin))
+    L, a, b = np.cbrt(lin @ _RGB_TO_LMS.T) @ _LMS_TO_OKLAB.T
+    return _from_oklch(L, math.hypot(a, b), math.degrees(math.atan2(b, a)) % 360)
+
+def _from_oklch(L, C, h):
+    if L >= 1:
+        return Color(255, 255, 255)
+    if L <= 0:
+        return Color(0, 0, 0)
+    return Color(*oklch_to_rgb(L, max(0.0, C), h))
+
+def _from_lab_d50(L, a, b):
+    fy = (L + 16) / 116
+    f = np.array([fy + a / 500, fy, fy - b / 200])
+    xyz = np.where(f > 6 / 29, f ** 3, (116 * f - 16) * 27 / 24389) * _D50_WHITE
+    return _from_linear(_XYZ_TO_LINEAR @ _D50_TO_D65 @ xyz)
+
+def _hsl(h, s, l):
+    r, g, b = colorsys.hls_to_rgb(h / 360, min(1.0, max(0.0, l)), min(1.0, max(0.0, s)))
+    return _encode((r, g, b))
+
+_FUNCTIONS = {"rgb", "rgba", "hsl", "hsla", "hwb", "lab", "lch", "oklab", "oklch", "color"}
+
+def _parse_function(name, body):
+    if name not in _FUNCTIONS:
+        raise ValueError(f"Unknown color function: {name}()")
+    if name == "color":
+        space, _, rest = body.partition(" ")
+        if space.lower() not in _COLOR_SPACES:
+            raise ValueError(f"Unknown color space: {space!r}")
+        args, alpha = _arguments(rest)
+        if len(args) != 3:
+            raise ValueError(f"color() needs 3 channels, got {body!r}")
+        to_linear, matrix = _COLOR_SPACES[space.lower()]
+        channels = np.array([_number(t, 1.0) for t in args])
+        return _from_linear(matrix @ to_linear(channels)), _alpha(alpha)
+
+    args, alpha = _arguments(body)
+    if len(args) != 3:
+        raise ValueError(f"{name}() needs 3 channels, got {body!r}")
+    a, b, c = args
+    if name in ("rgb", "rgba"):
+        return _encode([_number(t, 255.0) / 255 for t in args]), _alpha(alpha)
+    if name in ("hsl", "hsla"):
+        return _hsl(_hue(a), _number(b, 100.0) / 100, _number(c, 100.0) / 100), _alpha(alpha)
+    if name == "hwb":
+        h, w, k = _hue(a), _number(b, 100.0) / 100, _number(c, 100.0) / 100
+        if w + k >= 1:
+            gray = w / (w + k)
+            return _encode((gray, gray, gray)), _alpha(alpha)
+        pure = colorsys.hls_to_rgb(h / 360, 0.5, 1.0)
+        return _encode([v * (1 - w - k) + w for v in pure]), _alpha(alpha)
+    if name == "lab":
+        return _from_lab_d50(_number(a, 100.0), _number(b, 125.0), _number(c, 125.0)), _alpha(alpha)
+    if name == "lch":
+        L, C, h = _number(a, 100.0), max(0.0, _number(b, 150.0)), math.radians(_hue(c))
+        return _from_lab_d50(L, C * math.cos(h), C * math.sin(h)), _alpha(alpha)
+    if name == "oklab":
+        L, A, B = _number(a, 1.0), _number(b, 0.4), _number(c, 0.4)
+        return _from_oklch(L, math.hypot(A, B), math.degrees(math.atan2(B, A)) % 360), _alpha(alpha)
+    return _from_oklch(_number(a, 1.0), _number(b, 0.4), _hue(c)), _alpha(alpha)
+
+@lru_cache(maxsize=8192)
+def parse_color(text):
+    """
+    Any CSS Color 4 color string -> (Color, alpha 0-1). Raises ValueError for anything
+    that is not a color (including currentcolor and var(), which need context).
+    A bare 3/6-digit hex without "#" is accepted too, like hex_to_rgb.
+    """
+    s = text.strip()
+    lower = s.lower()
+    if lower in CSS_NAMED_COLORS:
+        return Color.from_hex(CSS_NAMED_COLORS[lower]), 1.0
+    if lower == "transparent":
+        return Color(0, 0, 0), 0.0
+
+    m = _HEX.match(s) or (len(s) in (3, 6) and _HEX.match("#" + s))
+    if m:
+        digits = m.group(1)
+        if len(digits) <= 4:
+            digits = "".join(c * 2 for c in digits)
+        value = int(digits, 16)
+        if len(digits) == 8:
+            return Color.from_value(value >> 8), round((value & 0xFF) / 255, 4)
+        return Color.from_value(value), 1.0
+
+    m = _FUNCTION.match(s)
+    if not m:
+        raise ValueError(f"Invalid color: {text!r}")
+    return _parse_function(m.group(1).lower(), m.group(2))
+
+def parse_rgb(text):
+    """
+    (r, g, b) of any CSS color string, alpha dropped.
+    """
+    return parse_color(text)[0].rgb
@@ -0,0 +1,181 @@
+import numpy as np
+
+from color_logic import rgb_to_hex, rgb_array_to_oklab
+
+DEFAULT_MAX_SAMPLES = 1 << 18
+HISTOGRAM_BITS = 5
+
+def pack_rgb(pixels):
+    """
+    (..., 3) uint8 -> flat uint32 array of 0xRRGGBB values.
+    Builds the 4-byte words in place and reinterprets them, instead of three
+    shifts and two ORs over widened copies.
+    """
+    flat = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    words = np.zeros((flat.shape[0], 4), dtype=np.uint8)
+    words[:, :3] = flat[:, ::-1]
+    return words.view("<u4").ravel()
+
+def unpack_rgb(packed):
+    packed = np.asarray(packed, dtype=np.uint32)
+    return np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1).astype(np.uint8)
+
+def color_histogram(pixels):
+    """
+    Exact histogram of an (H, W, 3) region: (colors (N, 3) uint8, counts (N,)),
+    most frequent first.
+    """
+    values, counts = np.unique(pack_rgb(pixels), return_counts=True)
+    order = np.argsort(counts, kind="stable")[::-1]
+    return unpack_rgb(values[order]), counts[order]
+
+def count_unique_colors(pixels):
+    """
+    Number of distinct colors in an (H, W, 3) region. Marks a 2**24 presence bitmap
+    instead of sorting like np.unique, so a 4K region takes a single linear pass.
+    """
+    seen = np.zeros(1 << 24, dtype=bool)
+    seen[pack_rgb(pixels)] = True
+    return int(np.count_nonzero(seen))
+
+def subsample(pixels, max_samples=DEFAULT_MAX_SAMPLES):
+    """
+    Regular-grid subsample of an (H, W, 3) region down to about max_samples pixels.
+    """
+    h, w = pixels.shape[:2]
+    step = int(np.ceil(np.sqrt(h * w / max_samples))) if h * w > max_samples else 1
+    return pixels[::step, ::step]
+
+def binned_histogram(pixels, bits=HISTOGRAM_BITS):
+    """
+    Histogram over 2**(3 * bits) bins. Returns (mean color of each occupied bin as
+    float (N, 3), pixel count (N,)), so the colors are exact averages, not bin centers.
+    """
+    flat = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    shift = 8 - bits
+    q = flat >> shift
+    index = (q[:, 0].astype(np.int64) << (2 * bits)) | (q[:, 1].astype(np.int64) << bits) | q[:, 2]
+    size = 1 << (3 * bits)
+    counts = np.bincount(index, minlength=size)
+    occupied = np.flatnonzero(counts)
+    sums = np.stack([np.bincount(index, weights=flat[:, c], minlength=size)[occupied] for c in range(3)], axis=1)
+    counts = counts[occupied]
+    return sums / counts[:, None], counts
+
+def _box_sse(colors, weights):
+    mean = np.average(colors, axis=0, weights=weights)
+    return float((weights[:, None] * (colors - mean) ** 2).sum())
+
+def _best_cut(values, weights):
+    """
+    Index splitting sorted values into two parts with the least total weighted
+    squared error, from cumulative sums (one pass, no loop over cut points).
+    """
+    w = np.cumsum(weights)
+    s = np.cumsum(weights * values)
+    q = np.cumsum(weights * values * values)
+    wl, sl, ql = w[:-1], s[:-1], q[:-1]
+    wr, sr, qr = w[-1] - wl, s[-1] - sl, q[-1] - ql
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sse = (ql - sl * sl / wl) + (qr - sr * sr / wr)
+    sse[(wl <= 0) | (wr <= 0)] = np.inf
+    return int(np.argmin(sse)) + 1
+
+def median_cut(colors, weights, k):
+    """
+    Weighted median cut, variance-based: the box with the largest weighted squared
+    error is split along its widest channel where the two halves' error is smallest
+    (rather than at the plain median, which cuts through large flat regions).
+    Returns (centers (M, 3), weights (M,)) with M <= k.
+    """
+    boxes = [np.arange(len(colors))]
+    errors = [_box_sse(colors, weights)]
+    while len(boxes) < k:
+        best = int(np.argmax(errors))
+        idx = boxes[best]
+        if len(idx) < 2 or errors[best] <= 0:
+            break
+        channel = int(np.argmax(np.ptp(colors[idx], axis=0)))
+        idx = idx[np.argsort(colors[idx, channel], kind="stable")]
+        cut = _best_cut(colors[idx, channel], weights[idx])
+        boxes[best:best + 1] = [idx[:cut], idx[cut:]]
+        errors[best:best + 1] = [_box_sse(colors[part], weights[part]) for part in (idx[:cut], idx[cut:])]
+
+    box_weights = np.array([weights[idx].sum() for idx in boxes], dtype=np.float64)
+    centers = np.array([np.average(colors[idx], axis=0, weights=weights[idx]) for idx in boxes])
+    return centers, box_weights
+
+def kmeans(colors, weights, k, iterations=25, seed=0, tol=1e-4):
+    """
+    Weighted k-means in OKLab with k-means++ seeding.
+    Returns (centers in RGB (M, 3), weights (M,)) with M <= k.
+    """
+    rng = np.random.default_rng(seed)
+    points = rgb_array_to_oklab(colors)
+    weights = np.asarray(weights, dtype=np.float64)
+    k = min(k, len(points))
+
+    # k-means++: each new center is drawn proportionally to weight * squared distance
+    centers = [points[rng.choice(len(points), p=weights / weights.sum())]]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        p = weights * closest
+        if p.sum() <= 0:
+            break
+        centers.append(points[rng.choice(len(points), p=p / p.sum())])
+        closest = np.minimum(closest, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    sq_norms = (points ** 2).sum(axis=1)
+
+    def assign(centers):
+        # |p - c|^2 = |p|^2 - 2 p.c + |c|^2, as one matmul instead of an (N, k, 3) temporary
+        dist = sq_norms[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+        return np.argmin(dist, axis=1)
+
+    for _ in range(iterations):
+        labels = assign(centers)
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        new = np.stack([np.bincount(labels, weights=weights * points[:, c], minlength=len(centers))
+                        for c in range(3)], axis=1)
+        keep = totals > 0
+        new[keep] /= totals[keep, None]
+        new[~keep] = centers[~keep]
+        shift = np.abs(new - centers).max()
+        centers = new
+        if shift < tol:
+            break
+
+    labels = assign(centers)
+    totals = np.bincount(labels, weights=weights, minlength=len(centers))
+    # Report clusters as the weighted mean of their member colors in RGB
+    rgb = np.stack([np.bincount(labels, weights=weights * colors[:, c], minlength=len(centers))
+                    for c in range(3)], axis=1)
+    keep = totals > 0
+    return rgb[keep] / totals[keep, None], totals[keep]
+
+def dominant_colors(pixels, k=6, method="kmeans", max_samples=DEFAULT_MAX_SAMPLES, seed=0):
+    """
+    The k dominant colors of an (H, W, 3) uint8 region, most common first, as
+    [{"hex", "rgb", "fraction"}]. Large regions are subsampled on a regular grid
+    and reduced to a 15-bit histogram before clustering, so the cost is bounded
+    no matter how big the region is.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    if pixels.size == 0:
+        return []
+    colors, weights = binned_histogram(subsample(pixels, max_samples))
+    if method == "kmeans":
+        centers, totals = kmeans(colors, weights, k, seed=seed)
+    elif method == "median_cut":
+        centers, totals = median_cut(colors, weights, k)
+    else:
+        raise ValueError(f"Unknown method: {method!r}")
+
+    order = np.argsort(totals)[::-1]
+    total = totals.sum()
+    result = []
+    for i in order:
+        r, g, b = (int(c) for c in np.clip(np.rint(centers[i]), 0, 255))
+        result.append({"hex": rgb_to_hex(r, g, b), "rgb": (r, g, b), "fraction": float(totals[i] / total)})
+    return result
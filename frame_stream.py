@@ -0,0 +1,233 @@
+# Shared-memory ring buffer that publishes the magnifier capture to other local processes.
+#
+# Layout (little endian):
+#   header  | magic, version, slot_count, slot_size, max_width, max_height, latest_seq, writer_pid
+#   slot[i] | seq_begin, timestamp, cursor_x, cursor_y, r, g, b, width, height, seq_end, pixels (RGB)
+#
+# The writer never waits on readers. Each slot is guarded by a sequence lock:
+# seq_begin is written before the pixels and seq_end after, so a reader can tell
+# whether the slot it is looking at was overwritten while it was using it.
+
+import os
+import sys
+import mmap
+import time
+import struct
+
+import numpy as np
+from multiprocessing import shared_memory
+
+DEFAULT_NAME = "NullColorPicker-frames"
+MAGIC = b"NCPF"
+VERSION = 1
+
+HEADER = struct.Struct("<4sIIIIIQ")
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct("<QdiiBBBxIIQ")
+SLOT_HEADER_SIZE = 48
+LATEST_SEQ_OFFSET = HEADER.size - 8
+# Writer's process id, in what used to be header padding, so a block left by a crash
+# can be told apart from one a live writer owns
+WRITER_PID_OFFSET = HEADER.size
+
+_SEQ = struct.Struct("<Q")
+
+class Frame:
+    """
+    One published frame. `pixels` is a zero-copy (H, W, 3) view into shared memory;
+    call is_valid() after using it to make sure the writer did not lap the reader.
+    """
+    __slots__ = ("seq", "timestamp", "cursor", "color", "pixels", "_buf", "_offset")
+
+    def __init__(self, seq, timestamp, cursor, color, pixels, buf, offset):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.cursor = cursor
+        self.color = color
+        self.pixels = pixels
+        self._buf = buf
+        self._offset = offset
+
+    def is_valid(self):
+        return _SEQ.unpack_from(self._buf, self._offset)[0] == self.seq
+
+class FrameStreamWriter:
+    """
+    Creates the shared block and publishes frames into it. publish() runs on the
+    sampling worker thread, under the worker's writer_lock, which
+    BackgroundSampler.set_frame_writer() also takes; so once a writer has been swapped
+    out no publish into it is in progress and the GUI thread can close() it. The
+    writer itself does no locking: publish() is a couple of struct packs and one memcpy.
+    """
+    def __init__(self, name=DEFAULT_NAME, slot_count=8, max_width=64, max_height=64):
+        self.name = name
+        self.slot_count = slot_count
+        self.max_width = max_width
+        self.max_height = max_height
+        self.slot_size = SLOT_HEADER_SIZE + max_width * max_height * 3
+        size = HEADER_SIZE + self.slot_count * self.slot_size
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Only a frame stream whose writer died may be taken over; anything else
+            # (another running instance, some other program's block) is left alone
+            if not _is_stale_stream(name):
+                raise FileExistsError(f"Shared memory block {name!r} is in use by another process") from None
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.buf = self.shm.buf
+        self.seq = 0
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, slot_count, self.slot_size, max_width, max_height, 0)
+        _SEQ.pack_into(self.buf, WRITER_PID_OFFSET, os.getpid())
+
+    def publish(self, pixels, cursor, color, timestamp=None):
+        """
+        pixels: (H, W, 3) uint8 array, cropped to max_width x max_height.
+        cursor: (x, y) in global screen coordinates. color: (r, g, b) sampled color.
+        """
+        pixels = pixels[:self.max_height, :self.max_width]
+        h, w = pixels.shape[:2]
+        self.seq += 1
+        seq = self.seq
+        offset = HEADER_SIZE + (seq % self.slot_count) * self.slot_size
+
+        # Open the slot: seq_begin moves ahead of seq_end until the write completes
+        _SEQ.pack_into(self.buf, offset, seq)
+        data_start = offset + SLOT_HEADER_SIZE
+        dest = np.ndarray((h, w, 3), dtype=np.uint8, buffer=self.buf, offset=data_start)
+        dest[...] = pixels
+        SLOT_HEADER.pack_into(self.buf, offset, seq, timestamp or time.time(),
+                              int(cursor[0]), int(cursor[1]),
+                              int(color[0]), int(color[1]), int(color[2]), w, h, seq)
+        _SEQ.pack_into(self.buf, LATEST_SEQ_OFFSET, seq)
+        return seq
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class FrameStreamReader:
+    """
+    Attaches to a writer's block by name. Reading never copies pixel data.
+    """
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, self.slot_count, self.slot_size, self.max_width, self.max_height, _ = \
+            HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{name} is not a Null Color Picker frame stream")
+
+    def latest_seq(self):
+        return _SEQ.unpack_from(self.buf, LATEST_SEQ_OFFSET)[0]
+
+    def read(self, seq=None):
+        """
+        Returns the frame with the given sequence number (default: the newest),
+        or None if nothing was published yet or the slot has been overwritten.
+        """
+        if seq is None:
+            seq = self.latest_seq()
+        if seq == 0:
+            return None
+        offset = HEADER_SIZE + (seq % self.slot_count) * self.slot_size
+        seq_begin, timestamp, cx, cy, r, g, b, w, h, seq_end = SLOT_HEADER.unpack_from(self.buf, offset)
+        if seq_begin != seq or seq_end != seq:
+            return None
+        pixels = np.ndarray((h, w, 3), dtype=np.uint8, buffer=self.buf, offset=offset + SLOT_HEADER_SIZE)
+        pixels.flags.writeable = False
+        return Frame(seq, timestamp, (cx, cy), (r, g, b), pixels, self.buf, offset)
+
+    def wait_next(self, after_seq, timeout=1.0, poll_interval=0.001):
+        """
+        Polls until a frame newer than after_seq is published. Returns it or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            seq = self.latest_seq()
+            if seq > after_seq:
+                frame = self.read(seq)
+                if frame is not None:
+                    return frame
+            time.sleep(poll_interval)
+        return None
+
+    def close(self):
+        self.buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a Frame view; the mapping goes away with it
+            pass
+
+def _is_stale_stream(name):
+    """
+    Whether the existing block `name` is a frame stream left behind by a writer that
+    is no longer running. On Windows a named block only exists while some process
+    holds it open, so an existing one is never stale.
+    """
+    if sys.platform == "win32":
+        return False
+    try:
+        block = _attach(name)
+    except FileNotFoundError:
+        return True  # gone in the meantime
+    except (OSError, ValueError):
+        return False
+    try:
+        if len(block.buf) < HEADER_SIZE or bytes(block.buf[:4]) != MAGIC:
+            return False
+        pid = _SEQ.unpack_from(block.buf, WRITER_PID_OFFSET)[0]
+    finally:
+        block.close()
+    return not _process_alive(pid)
+
+def _process_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by someone else
+    return True
+
+def _attach(name):
+    """
+    Attaches without registering the block with this process's resource tracker.
+    Before Python 3.13 a plain SharedMemory(name) would have the tracker unlink the
+    block when the reader exits, tearing the stream down under the writer (POSIX).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if sys.platform == "win32":
+        return shared_memory.SharedMemory(name=name)
+    return _PosixBlock(name)
+
+class _PosixBlock:
+    """
+    Read/write mapping of an existing POSIX shared-memory block, with the same
+    buf/close() surface as SharedMemory.
+    """
+    def __init__(self, name):
+        import _posixshmem
+        fd = _posixshmem.shm_open("/" + name.lstrip("/"), os.O_RDWR, mode=0o600)
+        try:
+            self._mmap = mmap.mmap(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        self.buf.release()
+        self._mmap.close()
@@ -0,0 +1,181 @@
+import numpy as np
+
+from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QComboBox, QSpinBox, QDoubleSpinBox, QLineEdit, QApplication)
+from PySide6.QtCore import Qt, Signal, QPoint, QRect
+from PySide6.QtGui import QColor, QPainter, QPen, QLinearGradient
+
+from region_contrast_ui import RegionSelectWindow
+from line_gradient import (sample_line, simplify_stops, css_angle, css_linear_gradient,
+                           DEFAULT_TOLERANCE)
+from image_utils import array_to_qimage
+
+class LineSelectWindow(RegionSelectWindow):
+    """
+    Dims the whole desktop and lets the user drag a line.
+    Emits line_selected with both ends in global coordinates.
+    """
+    line_selected = Signal(QPoint, QPoint)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 60))
+        if self.origin is not None and self.current is not None:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor(0, 0, 0, 160), 3))
+            painter.drawLine(self.origin, self.current)
+            painter.setPen(QPen(QColor("#ffffff"), 1, Qt.DashLine))
+            painter.drawLine(self.origin, self.current)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self.origin is None:
+            return
+        start, end = self.origin, self.current
+        self.close()
+        if (end - start).manhattanLength() < 2:
+            self.cancelled.emit()
+            return
+        offset = self.geometry().topLeft()
+        self.line_selected.emit(start + offset, end + offset)
+
+class GradientPreview(QWidget):
+    """
+    The sampled profile (top half) over the simplified CSS gradient (bottom half),
+    with a tick at every stop.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(56)
+        self.profile = None
+        self.stops = []
+
+    def set_gradient(self, colors, stops):
+        colors = np.asarray(colors, dtype=np.uint8).reshape(1, -1, 3)
+        self.profile = array_to_qimage(colors) if colors.shape[1] else None
+        self.stops = stops
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        if self.profile is None:
+            return
+        w, h = self.width(), self.height()
+        painter.drawImage(QRect(0, 0, w, h // 2), self.profile)
+
+        gradient = QLinearGradient(0, 0, w, 0)
+        for color, pos in self.stops:
+            gradient.setColorAt(pos, QColor(*color))
+        painter.fillRect(QRect(0, h // 2, w, h - h // 2), gradient)
+
+        painter.setPen(QPen(QColor("#ffffff"), 1))
+        for _, pos in self.stops:
+            x = round(pos * (w - 1))
+            painter.drawLine(x, h // 2 - 4, x, h // 2 + 4)
+
+class GradientDialog(QDialog):
+    """
+    Color profile along a screen line, simplified to the fewest gradient stops within
+    a ΔE tolerance and shown as CSS. grab_array(x, y, w, h) -> (H, W, 3) uint8;
+    to_srgb, if set, converts (1, N, 3) arrays from the display profile.
+    """
+    request_reselect = Signal()
+    stops_to_history = Signal(list)
+
+    def __init__(self, grab_array, start, end, sample_size=1, to_srgb=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Gradient")
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.WindowStaysOnTopHint)
+        self.grab_array = grab_array
+        self.sample_size = sample_size
+        self.to_srgb = to_srgb
+        self.colors = np.zeros((0, 3), dtype=np.uint8)
+        self.positions = np.zeros(0)
+        self.stops = []
+        self.setup_ui()
+        self.set_line(start, end)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSizeConstraint(QVBoxLayout.SetMinimumSize)
+
+        controls = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Every Pixel", "pixels")
+        self.mode_combo.addItem("Evenly Spaced", "even")
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        controls.addWidget(self.mode_combo)
+        self.samples_spin = QSpinBox()
+        self.samples_spin.setRange(2, 4096)
+        self.samples_spin.setValue(64)
+        self.samples_spin.setSuffix(" samples")
+        self.samples_spin.setEnabled(False)
+        self.samples_spin.valueChanged.connect(self.resample)
+        controls.addWidget(self.samples_spin)
+        controls.addWidget(QLabel("Tolerance ΔE"))
+        self.tolerance_spin = QDoubleSpinBox()
+        self.tolerance_spin.setRange(0.1, 20.0)
+        self.tolerance_spin.setSingleStep(0.5)
+        self.tolerance_spin.setValue(DEFAULT_TOLERANCE)
+        self.tolerance_spin.valueChanged.connect(self.simplify)
+        controls.addWidget(self.tolerance_spin)
+        layout.addLayout(controls)
+
+        self.preview = GradientPreview()
+        self.preview.setMinimumWidth(420)
+        layout.addWidget(self.preview)
+
+        self.info_lbl = QLabel("")
+        self.info_lbl.setObjectName("ResultLabel")
+        layout.addWidget(self.info_lbl)
+
+        css_row = QHBoxLayout()
+        self.css_le = QLineEdit()
+        self.css_le.setReadOnly(True)
+        css_row.addWidget(self.css_le)
+        copy_btn = QPushButton("Copy CSS")
+        copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(self.css_le.text()))
+        css_row.addWidget(copy_btn)
+        layout.addLayout(css_row)
+
+        buttons = QHBoxLayout()
+        history_btn = QPushButton("Add Stops to History")
+        history_btn.clicked.connect(lambda: self.stops_to_history.emit([c for c, _ in self.stops]))
+        buttons.addWidget(history_btn)
+        reselect_btn = QPushButton("Reselect")
+        reselect_btn.clicked.connect(self.request_reselect.emit)
+        buttons.addWidget(reselect_btn)
+        layout.addLayout(buttons)
+
+    def set_line(self, start, end):
+        self.start = QPoint(start)
+        self.end = QPoint(end)
+        self.resample()
+
+    def on_mode_changed(self):
+        self.samples_spin.setEnabled(self.mode_combo.currentData() == "even")
+        self.resample()
+
+    def resample(self):
+        samples = self.samples_spin.value() if self.mode_combo.currentData() == "even" else None
+        try:
+            colors, positions = sample_line(self.grab_array, self.start.x(), self.start.y(),
+                                            self.end.x(), self.end.y(), samples, self.sample_size)
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return
+        if self.to_srgb is not None:
+            colors = np.asarray(self.to_srgb(colors[None]))[0]
+        self.colors, self.positions = colors, positions
+        self.simplify()
+
+    def simplify(self):
+        if not len(self.colors):
+            return
+        keep = simplify_stops(self.colors, self.positions, self.tolerance_spin.value())
+        self.stops = [(tuple(self.colors[i].tolist()), float(self.positions[i])) for i in keep]
+        angle = css_angle(self.start.x(), self.start.y(), self.end.x(), self.end.y())
+        self.css_le.setText(css_linear_gradient(self.stops, angle))
+        self.css_le.setCursorPosition(0)
+        self.preview.set_gradient(self.colors, self.stops)
+        self.info_lbl.setText(f"{len(self.colors):,} samples → {len(self.stops)} stops")
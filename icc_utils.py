@@ -1,89 +1,318 @@
 
 import sys
 import os
+import stat
+import struct
 import platform
+from io import BytesIO
+from functools import lru_cache
+
+import numpy as np
 from PIL import ImageCms, Image
 
+from color_logic import rgb_array_to_lab, rgb_array_to_cmyk, delta_e_2000
+
 IS_WINDOWS = platform.system() == 'Windows'
+# Real profiles (even large DeviceLinks) stay well below this
+MAX_PROFILE_BYTES = 16 * 1024 * 1024
 
 if IS_WINDOWS:
     import ctypes
     from ctypes import wintypes
 
-    # Define necessary constants and structures for Windows ICM
-    MIG_ALL_DISPLAY_PROFILES = 2
-
-    # Function prototypes would go here if we were doing complex enumeration
-    # But for now we will rely on mscms WcsGetDefaultColorProfile or similar.
-    # Or easier: Standard GetICMProfile from GDI.
-
     gdi32 = ctypes.windll.gdi32
-    user32 = ctypes.windll.user32
-    mscms = ctypes.windll.mscms
 
-def get_system_monitor_profile_path():
+    # Per-display queries pass DC handles around, which must not be truncated to int
+    gdi32.CreateDCW.restype = wintypes.HDC
+    gdi32.CreateDCW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p]
+    gdi32.DeleteDC.argtypes = [wintypes.HDC]
+    gdi32.GetICMProfileW.restype = wintypes.BOOL
+    gdi32.GetICMProfileW.argtypes = [wintypes.HDC, ctypes.POINTER(wintypes.DWORD), wintypes.LPWSTR]
+
+def get_screen_profile_path(device_name):
     """
-    Attempts to retrieve the ICC profile path for the primary monitor on Windows.
-    Returns None on failure or non-Windows (fallback to sRGB/standard).
+    ICC profile path of one display by its device name (QScreen.name() on Windows,
+    e.g. "\\\\.\\DISPLAY2"). Returns None on failure or non-Windows.
     """
-    if not IS_WINDOWS:
-        # Linux/Mac implementation would require colord or ColorSync interaction
-        # For now, return None to imply standard handling
+    if not IS_WINDOWS or not device_name:
         return None
 
     try:
-        # Get Device Context for screen
-        hdc = user32.GetDC(0)
-
-        # GetICMProfile
-        # BOOL GetICMProfileA(HDC hdc, LPDWORD pBufSize, LPSTR pszFilename);
-        # We use the W (Unicode) version
-
-        MAX_PATH = 260
-        filename_buffer = ctypes.create_unicode_buffer(MAX_PATH)
-        lpcbName = ctypes.c_ulong(MAX_PATH)
-
-        # checking return
-        res = gdi32.GetICMProfileW(hdc, ctypes.byref(lpcbName), filename_buffer)
-
-        user32.ReleaseDC(0, hdc)
-
-        if res:
-            return filename_buffer.value
-        else:
-            # Error or no profile associated
+        hdc = gdi32.CreateDCW("DISPLAY", device_name, None, None)
+        if not hdc:
             return None
-
+        try:
+            MAX_PATH = 260
+            filename_buffer = ctypes.create_unicode_buffer(MAX_PATH)
+            lpcbName = wintypes.DWORD(MAX_PATH)
+            if gdi32.GetICMProfileW(hdc, ctypes.byref(lpcbName), filename_buffer):
+                return filename_buffer.value
+            return None
+        finally:
+            gdi32.DeleteDC(hdc)
     except Exception as e:
         print(f"ICC Error: {e}")
         return None
 
+def read_profile(path):
+    """
+    Bytes of an ICC profile file, or None. Cached until the file changes, so callers
+    can look a profile up per frame. Only regular files up to MAX_PROFILE_BYTES are read;
+    devices, pipes and directories give None.
+    """
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode) or st.st_size > MAX_PROFILE_BYTES:
+        return None
+    return _read_profile(path, st.st_mtime_ns)
+
+@lru_cache(maxsize=8)
+def _read_profile(path, mtime):
+    try:
+        # Non-blocking open: a file swapped for a FIFO after the stat must not hang us
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_BINARY", 0))
+        with os.fdopen(fd, "rb") as f:
+            if not stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+                return None
+            data = f.read(MAX_PROFILE_BYTES + 1)
+    except OSError as e:
+        print(f"ICC Error: {e}")
+        return None
+    return data if len(data) <= MAX_PROFILE_BYTES else None
+
 def convert_to_srgb(r, g, b, source_profile_path=None):
     """
     Converts an RGB tuple (0-255) from source_profile to sRGB.
     If source_profile_path is None, assumes raw/sRGB (no-op).
     """
-    if not source_profile_path or not os.path.exists(source_profile_path):
+    profile = read_profile(source_profile_path)
+    if profile is None:
         return r, g, b
+    r, g, b = convert_array_to_srgb(np.array([[[r, g, b]]], dtype=np.uint8), profile)[0, 0].tolist()
+    return r, g, b
 
+def get_embedded_profile(path):
+    """
+    Returns the ICC profile embedded in an image file as bytes, or None.
+    Only the file header is parsed, so this is cheap even for huge images.
+    """
     try:
-        # Create a 1x1 image
-        im = Image.new("RGB", (1, 1), (r, g, b))
-
-        # Create transform
-        # We cache this in a real app, but for simplicity here we recreate
-        # Or better, rely on Pillow's built-in conversion if we load the profile
-
-        # Target sRGB
-        srgb_profile = ImageCms.createProfile("sRGB")
-        source_profile = ImageCms.getOpenProfile(source_profile_path)
+        with Image.open(path) as im:
+            return im.info.get("icc_profile") or None
+    except Exception as e:
+        print(f"ICC Error: {e}")
+        return None
 
-        # Transform
-        out_im = ImageCms.profileToProfile(im, source_profile, srgb_profile, outputMode='RGB')
+def profile_description(profile_bytes):
+    """
+    Human readable name of an ICC profile, e.g. "Adobe RGB (1998)".
+    """
+    try:
+        return ImageCms.getProfileDescription(ImageCms.ImageCmsProfile(BytesIO(profile_bytes))).strip()
+    except Exception:
+        return "Unknown profile"
 
-        # Get pixel
-        return out_im.getpixel((0, 0))
+@lru_cache(maxsize=8)
+def _to_srgb_transform(profile_bytes):
+    """
+    Transform from an RGB profile (embedded or a monitor's) to sRGB, built once per
+    profile: building one costs milliseconds, applying it to a small patch microseconds.
+    None for profiles that do not describe RGB data (gray, CMYK).
+    """
+    source = ImageCms.ImageCmsProfile(BytesIO(profile_bytes))
+    if source.profile.xcolor_space.strip() != "RGB":
+        return None
+    return ImageCms.buildTransform(source, ImageCms.createProfile("sRGB"), "RGB", "RGB")
 
+def convert_array_to_srgb(array, profile_bytes):
+    """
+    Converts an (H, W, 3) uint8 array from an embedded or monitor profile to sRGB
+    in one call. Returns the array unchanged when there is no usable profile.
+    """
+    if not profile_bytes:
+        return array
+    try:
+        transform = _to_srgb_transform(profile_bytes)
+        if transform is None:
+            return array
+        im = Image.fromarray(np.ascontiguousarray(array, dtype=np.uint8), "RGB")
+        return np.asarray(ImageCms.applyTransform(im, transform))
     except Exception as e:
         print(f"Conversion Error: {e}")
-        return r, g, b
+        return array
+
+# --- Press (CMYK) Profiles ---
+
+# Round trip CIEDE2000 above which a color is reported as out of the press gamut;
+# in-gamut colors mostly come back within 1-2 (8-bit CMYK plus LUT interpolation)
+GAMUT_WARNING_DELTA_E = 3.0
+
+if IS_WINDOWS:
+    PROFILE_DIRECTORIES = [os.path.join(os.environ.get("SystemRoot", r"C:\Windows"),
+                                        "System32", "spool", "drivers", "color")]
+elif sys.platform == "darwin":
+    PROFILE_DIRECTORIES = ["/Library/ColorSync/Profiles", "/System/Library/ColorSync/Profiles",
+                           os.path.expanduser("~/Library/ColorSync/Profiles")]
+else:
+    PROFILE_DIRECTORIES = ["/usr/share/color/icc", "/usr/local/share/color/icc",
+                           os.path.expanduser("~/.local/share/icc"), os.path.expanduser("~/.color/icc")]
+
+def is_cmyk_profile(profile_bytes):
+    """
+    Whether an ICC profile describes CMYK data (header data color space).
+    """
+    return bool(profile_bytes) and profile_bytes[16:20] == b"CMYK"
+
+def find_cmyk_profiles(directories=None):
+    """
+    Installed CMYK profiles (FOGRA, GRACoL, SWOP, ...) as sorted [(description, path)].
+    Only the 128-byte headers are read to pick them out.
+    """
+    found = []
+    for directory in PROFILE_DIRECTORIES if directories is None else directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if not name.lower().endswith((".icc", ".icm")):
+                    continue
+                path = os.path.join(root, name)
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    with open(path, "rb") as f:
+                        header = f.read(128)
+                except OSError:
+                    continue
+                if is_cmyk_profile(header):
+                    found.append((profile_description(read_profile(path) or b""), path))
+    return sorted(found, key=lambda item: item[0].lower())
+
+@lru_cache(maxsize=8)
+def _press_transforms(profile_bytes):
+    """
+    (sRGB -> CMYK, CMYK -> sRGB) transforms for a press profile, built once. Relative
+    colorimetric with black point compensation, like the usual print proofing setup.
+    """
+    press = ImageCms.ImageCmsProfile(BytesIO(profile_bytes))
+    srgb = ImageCms.createProfile("sRGB")
+    intent = ImageCms.Intent.RELATIVE_COLORIMETRIC
+    flags = ImageCms.Flags.BLACKPOINTCOMPENSATION
+    return (ImageCms.buildTransform(srgb, press, "RGB", "CMYK", intent, flags),
+            ImageCms.buildTransform(press, srgb, "CMYK", "RGB", intent, flags))
+
+def srgb_to_press_cmyk(colors, profile_bytes):
+    """
+    Converts (N, 3) sRGB colors through a press profile in one transform call.
+    Returns ((N, 4) int CMYK percentages, (N,) CIEDE2000 between each color and its
+    printed result); colors above GAMUT_WARNING_DELTA_E are out of the press gamut.
+    Raises ValueError for profiles that are not CMYK.
+    """
+    if not is_cmyk_profile(profile_bytes):
+        raise ValueError("not a CMYK profile")
+    colors = np.ascontiguousarray(np.asarray(colors, dtype=np.uint8).reshape(1, -1, 3))
+    if not colors.shape[1]:
+        return np.zeros((0, 4), dtype=np.int64), np.zeros(0)
+    to_cmyk, to_rgb = _press_transforms(profile_bytes)
+
+    cmyk = ImageCms.applyTransform(Image.fromarray(colors, "RGB"), to_cmyk)
+    printed = np.asarray(ImageCms.applyTransform(cmyk, to_rgb))[0]
+    percent = np.rint(np.asarray(cmyk)[0] / 2.55).astype(np.int64)
+    error = delta_e_2000(rgb_array_to_lab(colors[0]), rgb_array_to_lab(printed))
+    return percent, error
+
+def cmyk_array(colors, profile_bytes=None):
+    """
+    CMYK for (N, 3) sRGB colors: through a press profile when one is given, else the
+    plain formula (which has no gamut, so every error is 0). Returns like srgb_to_press_cmyk.
+    Falls back to the formula if the profile cannot be used.
+    """
+    if profile_bytes:
+        try:
+            return srgb_to_press_cmyk(colors, profile_bytes)
+        except Exception as e:
+            print(f"Conversion Error: {e}")
+    cmyk = rgb_array_to_cmyk(colors)
+    return cmyk, np.zeros(len(cmyk))
+
+# --- Synthetic Profiles ---
+
+# Common display color spaces by name: (primaries, white point, transfer curve)
+STANDARD_PROFILES = {
+    "sRGB": (((0.64, 0.33), (0.30, 0.60), (0.15, 0.06)), (0.3127, 0.3290), "srgb"),
+    "Display P3": (((0.680, 0.320), (0.265, 0.690), (0.150, 0.060)), (0.3127, 0.3290), "srgb"),
+    "Adobe RGB": (((0.64, 0.33), (0.21, 0.71), (0.15, 0.06)), (0.3127, 0.3290), 563 / 256),
+}
+
+_BRADFORD = np.array([[0.8951, 0.2664, -0.1614],
+                      [-0.7502, 1.7135, 0.0367],
+                      [0.0389, -0.0685, 1.0296]])
+_D50 = np.array([0.9642, 1.0, 0.8249])
+
+def _xy_to_xyz(x, y):
+    return np.array([x / y, 1.0, (1 - x - y) / y])
+
+def _s15f16(values):
+    return b"".join(struct.pack(">i", round(v * 65536)) for v in values)
+
+def _tag(signature, data):
+    return signature, data + b"\0" * (-len(data) % 4)
+
+def build_rgb_profile(primaries, white, trc=2.2, description="RGB"):
+    """
+    A matrix/TRC display profile (ICC v2) as bytes, for monitors without an installed
+    profile or for tests. primaries: ((xr, yr), (xg, yg), (xb, yb)) chromaticities,
+    white: (x, y); trc: a gamma or "srgb" for the sRGB curve.
+    """
+    # RGB -> XYZ at the native white, then Bradford-adapted to the D50 PCS
+    xyz = np.stack([_xy_to_xyz(*p) for p in primaries], axis=1)
+    white_xyz = _xy_to_xyz(*white)
+    matrix = xyz * np.linalg.solve(xyz, white_xyz)
+    cone = (_BRADFORD @ _D50) / (_BRADFORD @ white_xyz)
+    adapt = np.linalg.inv(_BRADFORD) @ np.diag(cone) @ _BRADFORD
+    colorants = adapt @ matrix
+
+    if trc == "srgb":
+        c = np.linspace(0, 1, 1024)
+        curve = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+        curve_data = struct.pack(">I", 1024) + np.rint(curve * 65535).astype(">u2").tobytes()
+    else:
+        curve_data = struct.pack(">IH", 1, round(trc * 256))
+    curv = b"curv\0\0\0\0" + curve_data
+
+    text = description.encode("ascii", "replace") + b"\0"
+    tags = [
+        _tag(b"desc", b"desc\0\0\0\0" + struct.pack(">I", len(text)) + text
+             + struct.pack(">II", 0, 0) + struct.pack(">HB", 0, 0) + b"\0" * 67),
+        _tag(b"cprt", b"text\0\0\0\0No copyright\0"),
+        _tag(b"wtpt", b"XYZ \0\0\0\0" + _s15f16(_D50)),
+        _tag(b"rXYZ", b"XYZ \0\0\0\0" + _s15f16(colorants[:, 0])),
+        _tag(b"gXYZ", b"XYZ \0\0\0\0" + _s15f16(colorants[:, 1])),
+        _tag(b"bXYZ", b"XYZ \0\0\0\0" + _s15f16(colorants[:, 2])),
+        _tag(b"rTRC", curv),
+        _tag(b"gTRC", curv),
+        _tag(b"bTRC", curv),
+    ]
+
+    offset = 128 + 4 + 12 * len(tags)
+    table, body = [struct.pack(">I", len(tags))], []
+    for signature, data in tags:
+        table.append(signature + struct.pack(">II", offset, len(data)))
+        body.append(data)
+        offset += len(data)
+    size = offset
+
+    header = (struct.pack(">I", size) + b"lcms" + struct.pack(">I", 0x02100000)
+              + b"mntrRGB XYZ " + b"\0" * 12 + b"acsp" + b"\0" * 24
+              + struct.pack(">I", 0) + _s15f16(_D50) + b"\0" * 48)
+    return header + b"".join(table) + b"".join(body)
+
+@lru_cache(maxsize=None)
+def standard_profile(name):
+    """
+    Profile bytes for a STANDARD_PROFILES name, built once.
+    """
+    primaries, white, trc = STANDARD_PROFILES[name]
+    return build_rgb_profile(primaries, white, trc, name)
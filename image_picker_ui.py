@@ -0,0 +1,393 @@
+import math
+import os
+
+import numpy as np
+
+from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QFileDialog)
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF
+from PySide6.QtGui import QColor, QPainter, QGuiApplication, QKeySequence, QShortcut
+
+from image_source import open_image, qimage_source, TileCache, TileLoader
+from image_utils import array_to_qimage, center_average
+from icc_utils import profile_description
+from sampling_worker import SampleResult
+
+IMAGE_FILTER = "Images (*.png *.jpg *.jpeg *.tif *.tiff *.bmp *.ppm *.webp);;All Files (*)"
+MAX_ZOOM = 32.0
+WHEEL_STEP = 1.25
+# Mouse travel before a press turns from a pick into a pan
+DRAG_THRESHOLD = 4
+
+class ImageCanvas(QWidget):
+    """
+    Pan/zoom view of an ImageSource. Draws the tiles of the level matching the zoom
+    as they arrive, over the coarsest level stretched across the whole image, so
+    there is always something on screen while finer tiles load.
+    Drag pans, the wheel zooms around the cursor, a click picks.
+    """
+    hovered = Signal(int, int)  # full-resolution pixel under the cursor
+    left = Signal()
+    clicked = Signal(int, int)
+    view_changed = Signal()
+
+    def __init__(self, loader, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setMinimumSize(400, 300)
+        self.setCursor(Qt.CrossCursor)
+        self.loader = loader
+        self.cache = TileCache()
+        self.source = None
+        self.scale = 1.0
+        self.origin = QPointF(0, 0)  # image coordinates at the widget's top left
+        self.press_pos = None
+        self.panning = False
+        self.priority = []  # tiles wanted ahead of the visible ones (magnifier patch)
+
+    def set_source(self, source):
+        self.source = source
+        self.cache.clear()
+        self.priority = []
+        self.fit()
+
+    def add_tile(self, key, tile):
+        self.cache.put(key, tile)
+        self.update()
+
+    # --- View ---
+
+    def level(self):
+        if self.scale >= 1 or not self.source:
+            return 0
+        return min(int(math.log2(1 / self.scale)), self.source.level_count - 1)
+
+    def fit(self):
+        if not self.source:
+            return
+        self.scale = min(self.width() / self.source.width, self.height() / self.source.height, 1.0)
+        self.origin = QPointF((self.source.width - self.width() / self.scale) / 2,
+                              (self.source.height - self.height() / self.scale) / 2)
+        self.refresh_view()
+
+    def zoom_to(self, scale, anchor=None):
+        """
+        Sets the zoom, keeping the image point under anchor (widget coordinates) in place.
+        """
+        if not self.source:
+            return
+        fit = min(self.width() / self.source.width, self.height() / self.source.height)
+        scale = max(min(fit, 1.0) / 2, min(scale, MAX_ZOOM))
+        if anchor is None:
+            anchor = QPointF(self.width() / 2, self.height() / 2)
+        point = self.to_image(anchor)
+        self.scale = scale
+        self.origin = point - anchor / scale
+        self.refresh_view()
+
+    def refresh_view(self):
+        self.request_tiles()
+        self.update()
+        self.view_changed.emit()
+
+    def to_image(self, pos):
+        return self.origin + QPointF(pos) / self.scale
+
+    def pixel_at(self, pos):
+        p = self.to_image(pos)
+        x, y = math.floor(p.x()), math.floor(p.y())
+        if self.source and 0 <= x < self.source.width and 0 <= y < self.source.height:
+            return x, y
+        return None
+
+    def visible_tiles(self, level):
+        """
+        Keys of the tiles of a level that intersect the view, nearest to the center first.
+        """
+        t = self.source.tile_size << level
+        cols, rows = self.source.tile_grid(level)
+        top_left = self.to_image(QPointF(0, 0))
+        bottom_right = self.to_image(QPointF(self.width(), self.height()))
+        tx0, ty0 = max(int(top_left.x() // t), 0), max(int(top_left.y() // t), 0)
+        tx1, ty1 = min(int(bottom_right.x() // t), cols - 1), min(int(bottom_right.y() // t), rows - 1)
+        center = (top_left + bottom_right) / 2
+        keys = [(level, tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+        keys.sort(key=lambda k: ((k[1] + 0.5) * t - center.x()) ** 2 + ((k[2] + 0.5) * t - center.y()) ** 2)
+        return keys
+
+    def request_tiles(self):
+        if not self.source:
+            return
+        coarsest = self.source.level_count - 1
+        cols, rows = self.source.tile_grid(coarsest)
+        wanted = self.priority + [(coarsest, tx, ty) for ty in range(rows) for tx in range(cols)]
+        if self.level() != coarsest:
+            wanted += self.visible_tiles(self.level())
+        self.loader.request([k for k in wanted if k not in self.cache])
+
+    def tile_target(self, level, tx, ty, tile):
+        t = self.source.tile_size << level
+        f = 1 << level
+        x = (tx * t - self.origin.x()) * self.scale
+        y = (ty * t - self.origin.y()) * self.scale
+        return QRectF(x, y, tile.image.width() * f * self.scale, tile.image.height() * f * self.scale)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        if not self.source:
+            painter.setPen(QColor("#888888"))
+            painter.drawText(self.rect(), Qt.AlignCenter,
+                             "Open an image, paste one (Ctrl+V) or drop a file here")
+            return
+        # Smooth when shrinking, hard pixel edges when zoomed in
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, self.scale < 1)
+
+        coarsest = self.source.level_count - 1
+        level = self.level()
+        levels = [coarsest] if level == coarsest else [coarsest, level]
+        for lv in levels:
+            keys = self.visible_tiles(lv)
+            for key in keys:
+                tile = self.cache.get(key)
+                if tile is not None:
+                    painter.drawImage(self.tile_target(*key, tile), tile.image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_tiles()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps:
+            self.zoom_to(self.scale * WHEEL_STEP ** steps, event.position())
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.press_pos = event.position()
+            self.press_origin = QPointF(self.origin)
+            self.panning = False
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        if self.press_pos is not None:
+            delta = pos - self.press_pos
+            if self.panning or delta.manhattanLength() > DRAG_THRESHOLD:
+                self.panning = True
+                self.setCursor(Qt.ClosedHandCursor)
+                self.origin = self.press_origin - delta / self.scale
+                self.refresh_view()
+        pixel = self.pixel_at(pos)
+        if pixel:
+            self.hovered.emit(*pixel)
+        else:
+            self.left.emit()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self.press_pos is None:
+            return
+        if not self.panning:
+            pixel = self.pixel_at(event.position())
+            if pixel:
+                self.clicked.emit(*pixel)
+        self.press_pos = None
+        self.panning = False
+        self.setCursor(Qt.CrossCursor)
+
+    def leaveEvent(self, event):
+        self.left.emit()
+        super().leaveEvent(event)
+
+class ImagePickerDialog(QDialog):
+    """
+    Picks colors from an image file or the clipboard with the same magnifier and
+    averaging as the screen picker. Pixels are read tile by tile through an
+    ImageSource on a loader thread, so very large files stay responsive.
+    Picked colors are converted from the image's embedded ICC profile to sRGB
+    when color managed.
+    """
+    color_picked = Signal(tuple)
+    patch_changed = Signal(object)  # SampleResult under the cursor, None when it leaves
+
+    def __init__(self, sample_size=1, capture_size=15, color_managed=True, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pick From Image")
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.WindowMaximizeButtonHint)
+        self.setAcceptDrops(True)
+        self.resize(900, 650)
+        self.sample_size = sample_size
+        self.capture_size = capture_size
+        self.color_managed = color_managed
+        self.hover = None
+        self.seq = 0
+
+        self.loader = TileLoader(self)
+        self.loader.set_color_managed(color_managed)
+        self.loader.opened.connect(self.on_opened)
+        self.loader.failed.connect(self.on_failed)
+        self.loader.tile_ready.connect(self.on_tile_ready)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        bar = QHBoxLayout()
+        open_btn = QPushButton("Open…")
+        open_btn.clicked.connect(self.open_file_dialog)
+        bar.addWidget(open_btn)
+        paste_btn = QPushButton("Paste")
+        paste_btn.clicked.connect(self.paste_clipboard)
+        bar.addWidget(paste_btn)
+        fit_btn = QPushButton("Fit")
+        fit_btn.clicked.connect(lambda: self.canvas.fit())
+        bar.addWidget(fit_btn)
+        actual_btn = QPushButton("100%")
+        actual_btn.clicked.connect(lambda: self.canvas.zoom_to(1.0))
+        bar.addWidget(actual_btn)
+        bar.addStretch()
+        self.zoom_lbl = QLabel("")
+        self.zoom_lbl.setObjectName("ResultLabel")
+        bar.addWidget(self.zoom_lbl)
+        layout.addLayout(bar)
+
+        self.canvas = ImageCanvas(self.loader)
+        self.canvas.hovered.connect(self.on_hovered)
+        self.canvas.left.connect(self.on_left)
+        self.canvas.clicked.connect(self.pick)
+        self.canvas.view_changed.connect(self.update_zoom_label)
+        layout.addWidget(self.canvas, 1)
+
+        self.status_lbl = QLabel("")
+        self.status_lbl.setObjectName("ResultLabel")
+        layout.addWidget(self.status_lbl)
+
+        QShortcut(QKeySequence.Open, self, self.open_file_dialog)
+        QShortcut(QKeySequence.Paste, self, self.paste_clipboard)
+
+    def set_sample_size(self, size):
+        self.sample_size = size
+
+    def set_color_managed(self, enabled):
+        if enabled != self.color_managed:
+            self.color_managed = enabled
+            self.loader.set_color_managed(enabled)
+            # Display tiles were converted (or not) when loaded
+            self.canvas.cache.clear()
+            self.canvas.request_tiles()
+
+    # --- Loading ---
+
+    def open_file_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", IMAGE_FILTER)
+        if path:
+            self.open_path(path)
+
+    def open_path(self, path):
+        self.status_lbl.setText(f"Loading {os.path.basename(path)}…")
+        self.loader.open(lambda: open_image(path))
+
+    def paste_clipboard(self):
+        mime = QGuiApplication.clipboard().mimeData()
+        if mime.hasImage():
+            image = QGuiApplication.clipboard().image()
+            self.loader.open(lambda: qimage_source(image))
+        elif mime.hasUrls() and mime.urls()[0].isLocalFile():
+            self.open_path(mime.urls()[0].toLocalFile())
+        else:
+            self.status_lbl.setText("The clipboard holds no image")
+
+    def set_image(self, image, name="Clipboard"):
+        self.loader.open(lambda: qimage_source(image, name))
+
+    def on_opened(self, source):
+        self.on_left()
+        self.canvas.set_source(source)
+        profile = profile_description(source.profile) if source.profile else "no embedded profile"
+        self.status_lbl.setText(f"{source.name}  ·  {source.width:,} × {source.height:,}  ·  {profile}")
+
+    def on_failed(self, message):
+        self.status_lbl.setText(f"Could not open image: {message}")
+
+    def on_tile_ready(self, key, tile):
+        self.canvas.add_tile(key, tile)
+        if self.hover and key[0] == 0:
+            self.on_hovered(*self.hover)
+
+    def update_zoom_label(self):
+        self.zoom_lbl.setText(f"{self.canvas.scale:.0%}")
+
+    # --- Sampling ---
+
+    def cached_patch(self, x, y, size):
+        """
+        Raw full-resolution patch from loaded tiles, or None (and the missing tiles
+        move to the front of the queue).
+        """
+        source = self.canvas.source
+        keys = source.patch_tiles(x, y, size)
+        tiles = {k: t.raw for k in keys if (t := self.canvas.cache.get(k)) is not None}
+        patch = source.compose_patch(tiles, x, y, size)
+        if patch is None:
+            self.canvas.priority = [k for k in keys if k not in tiles]
+            self.canvas.request_tiles()
+        return patch
+
+    def sample_color(self, raw):
+        color = center_average(raw, self.sample_size)
+        if self.color_managed:
+            pixel = np.array([[color]], dtype=np.uint8)
+            color = tuple(int(c) for c in self.canvas.source.to_srgb(pixel)[0, 0])
+        return color
+
+    def on_hovered(self, x, y):
+        self.hover = (x, y)
+        raw = self.cached_patch(x, y, self.capture_size)
+        if raw is None:
+            return
+        display = self.canvas.source.to_srgb(raw) if self.color_managed else raw
+        self.seq += 1
+        self.patch_changed.emit(SampleResult(self.seq, 0, x, y, array_to_qimage(display), display,
+                                             self.sample_color(raw)))
+
+    def on_left(self):
+        if self.hover:
+            self.hover = None
+            self.canvas.priority = []
+            self.patch_changed.emit(None)
+
+    def pick(self, x, y):
+        """
+        Samples the full-resolution pixels at (x, y), reading them directly
+        if their tile has not been loaded yet.
+        """
+        source = self.canvas.source
+        size = self.sample_size
+        raw = self.cached_patch(x, y, size)
+        if raw is None:
+            try:
+                raw = source.read_patch(x, y, size)
+            except Exception as e:
+                print(f"Image Read Error: {e}")
+                return
+        self.color_picked.emit(self.sample_color(raw))
+
+    # --- Drag and drop ---
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls() or event.mimeData().hasImage():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        mime = event.mimeData()
+        if mime.hasUrls() and mime.urls()[0].isLocalFile():
+            self.open_path(mime.urls()[0].toLocalFile())
+        elif mime.hasImage():
+            self.set_image(mime.imageData(), "Dropped image")
+
+    def hideEvent(self, event):
+        self.on_left()
+        super().hideEvent(event)
+
+    def stop(self):
+        self.loader.stop()
@@ -0,0 +1,422 @@
+# Tiled, level-of-detail access to image files too large to hold in memory.
+#
+# Level n of an image is the picture reduced 2**n times; tiles are TILE_SIZE squares
+# of a level. Viewers ask for the tiles they can see at the level that matches their
+# zoom, so memory follows the screen, not the file.
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+from PySide6.QtCore import QObject, QThread, Signal, Qt
+
+from image_utils import qimage_to_array, array_to_qimage
+from icc_utils import get_embedded_profile, convert_array_to_srgb
+
+TILE_SIZE = 512
+TILE_CACHE_BYTES = 256 << 20
+# Levels below this are reduced on demand from full size, the rest are kept in memory
+RESIDENT_LEVEL = 2
+# Rows of a band are sized so one band of a reduction stays around this many pixels
+BAND_PIXELS = 1 << 22
+
+# Files are opened on purpose by the user; print-size images would trip Pillow's
+# decompression bomb guard (about 179 MP)
+Image.MAX_IMAGE_PIXELS = None
+
+def downsample(array, factor):
+    """
+    Box-filter reduction of an (H, W, 3) uint8 array by an integer factor.
+    Edge blocks that do not fill the factor are padded by repeating the last row/column.
+    Works in row bands, so reducing a memory-mapped file never holds it all.
+    """
+    if factor == 1:
+        return np.array(array)
+    h, w = array.shape[:2]
+    oh, ow = -(-h // factor), -(-w // factor)
+    area = factor * factor
+    # 16 bits hold a 16x16 block of 255s plus the rounding term
+    acc_type = np.uint16 if factor <= 16 else np.uint32
+    out = np.empty((oh, ow, 3), dtype=np.uint8)
+    band = max(1, BAND_PIXELS // (w * factor))
+    for top in range(0, oh, band):
+        rows = min(band, oh - top)
+        block = array[top * factor:(top + rows) * factor]
+        pad_y = rows * factor - block.shape[0]
+        pad_x = ow * factor - w
+        if pad_y or pad_x:
+            block = np.pad(block, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+        # Add whole rows first, then column phases: plain strided adds, several
+        # times faster than one sum over a 5-d view
+        block = block.reshape(rows, factor, ow * factor, 3)
+        acc = block[:, 0].astype(acc_type)
+        for i in range(1, factor):
+            acc += block[:, i]
+        acc = acc.reshape(rows, ow, factor, 3)
+        sums = acc[:, :, 0] + acc_type(area // 2)
+        for j in range(1, factor):
+            sums += acc[:, :, j]
+        out[top:top + rows] = sums // area
+    return out
+
+class ImageSource:
+    """
+    A picture read by region at power-of-two levels. Subclasses implement
+    read_region(); everything else is derived from it.
+    profile holds the embedded ICC profile (bytes) or None.
+    Reads may come from a worker thread and the GUI thread at the same time.
+    """
+    tile_size = TILE_SIZE
+
+    def __init__(self, width, height, profile=None, name=""):
+        self.width = width
+        self.height = height
+        self.profile = profile
+        self.name = name
+        self.level_count = 1
+        while max(self.level_size(self.level_count - 1)) > self.tile_size:
+            self.level_count += 1
+
+    def level_size(self, level):
+        f = 1 << level
+        return -(-self.width // f), -(-self.height // f)
+
+    def tile_grid(self, level):
+        w, h = self.level_size(level)
+        return -(-w // self.tile_size), -(-h // self.tile_size)
+
+    def tile_rect(self, level, tx, ty):
+        """
+        (x, y, width, height) of a tile in pixels of its level.
+        """
+        w, h = self.level_size(level)
+        x, y = tx * self.tile_size, ty * self.tile_size
+        return x, y, min(self.tile_size, w - x), min(self.tile_size, h - y)
+
+    def read_region(self, level, x, y, width, height):
+        """
+        Returns the (height, width, 3) uint8 pixels of an in-bounds rectangle of a level.
+        """
+        raise NotImplementedError
+
+    def read_tile(self, level, tx, ty):
+        return self.read_region(level, *self.tile_rect(level, tx, ty))
+
+    def read_patch(self, x, y, size):
+        """
+        size x size full-resolution block centered like a screen grab at (x, y);
+        parts outside the image are black.
+        """
+        left, top = x - size // 2, y - size // 2
+        out = np.zeros((size, size, 3), dtype=np.uint8)
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + size, self.width), min(top + size, self.height)
+        if x1 > x0 and y1 > y0:
+            out[y0 - top:y1 - top, x0 - left:x1 - left] = self.read_region(0, x0, y0, x1 - x0, y1 - y0)
+        return out
+
+    def patch_tiles(self, x, y, size):
+        """
+        Keys (0, tx, ty) of the full-resolution tiles a read_patch(x, y, size) touches.
+        """
+        left, top = max(x - size // 2, 0), max(y - size // 2, 0)
+        right, bottom = min(x - size // 2 + size, self.width), min(y - size // 2 + size, self.height)
+        if right <= left or bottom <= top:
+            return []
+        t = self.tile_size
+        return [(0, tx, ty) for ty in range(top // t, (bottom - 1) // t + 1)
+                for tx in range(left // t, (right - 1) // t + 1)]
+
+    def compose_patch(self, tiles, x, y, size):
+        """
+        Same result as read_patch(), assembled from already loaded full-resolution
+        tiles ({key: raw array}). Returns None if one of them is missing.
+        """
+        left, top = x - size // 2, y - size // 2
+        out = np.zeros((size, size, 3), dtype=np.uint8)
+        t = self.tile_size
+        for key in self.patch_tiles(x, y, size):
+            raw = tiles.get(key)
+            if raw is None:
+                return None
+            _, tx, ty = key
+            tx0, ty0 = tx * t, ty * t
+            x0, y0 = max(left, tx0), max(top, ty0)
+            x1, y1 = min(left + size, tx0 + raw.shape[1]), min(top + size, ty0 + raw.shape[0])
+            out[y0 - top:y1 - top, x0 - left:x1 - left] = raw[y0 - ty0:y1 - ty0, x0 - tx0:x1 - tx0]
+        return out
+
+    def to_srgb(self, array):
+        return convert_array_to_srgb(array, self.profile)
+
+class ArraySource(ImageSource):
+    """
+    An (H, W, 3) uint8 array, possibly memory mapped. Levels from RESIDENT_LEVEL on
+    are built once, band by band, and kept; the finer ones are reduced from full
+    size per read, which keeps the pyramid to about 1/12 of the image.
+    """
+    def __init__(self, array, profile=None, name=""):
+        super().__init__(array.shape[1], array.shape[0], profile, name)
+        self.levels = {0: array}
+        self.lock = threading.Lock()
+
+    def level_array(self, level):
+        if level == 0:
+            return self.levels[0]
+        with self.lock:
+            # Each resident level is reduced from the one before it, full size only once
+            for l in range(RESIDENT_LEVEL, level + 1):
+                if l not in self.levels:
+                    finer = l - 1 if l > RESIDENT_LEVEL else 0
+                    self.levels[l] = downsample(self.levels[finer], 1 << (l - finer))
+            return self.levels[level]
+
+    def read_region(self, level, x, y, width, height):
+        if level == 0 or level >= RESIDENT_LEVEL:
+            return np.array(self.level_array(level)[y:y + height, x:x + width])
+        f = 1 << level
+        return downsample(self.levels[0][y * f:(y + height) * f, x * f:(x + width) * f], f)
+
+def _raw_memmap(path, im):
+    """
+    Zero-copy view of an uncompressed 8-bit RGB file (TIFF, BMP, PPM), or None.
+    Pillow describes such files as a single "raw" tile: offset, row stride and
+    orientation are all that is needed to map the pixels directly.
+    """
+    if im.mode != "RGB" or len(im.tile) != 1:
+        return None
+    codec, extents, offset, args = im.tile[0]
+    if codec != "raw" or tuple(extents) != (0, 0) + im.size:
+        return None
+    if isinstance(args, str):
+        args = (args,)
+    rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+    if rawmode not in ("RGB", "BGR"):
+        return None
+    w, h = im.size
+    stride = stride or w * 3
+    try:
+        rows = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(h, stride))
+    except (OSError, ValueError):
+        return None
+    array = rows[:, :w * 3].reshape(h, w, 3)
+    if orientation < 0:
+        array = array[::-1]
+    if rawmode == "BGR":
+        array = array[..., ::-1]
+    return array
+
+def _decode_to_memmap(im):
+    """
+    Decodes a Pillow image once and copies it in row bands into an (H, W, 3) memmap
+    over an anonymous temporary file, so the pixels live in the page cache rather
+    than the heap and Pillow's own copy can be freed as soon as we return.
+    """
+    w, h = im.size
+    with tempfile.TemporaryFile(prefix="ncp-image-") as f:
+        # The mapping keeps its own handle, so the file may be closed right away
+        array = np.memmap(f, dtype=np.uint8, mode="w+", shape=(h, w, 3))
+    im.load()
+    band = max(1, BAND_PIXELS // w)
+    for top in range(0, h, band):
+        rows = im.crop((0, top, w, min(top + band, h)))
+        if rows.mode != "RGB":
+            rows = rows.convert("RGB")
+        array[top:top + rows.height] = np.asarray(rows)
+    return array
+
+def open_image(path):
+    """
+    Opens an image file for tiled reading. Uncompressed RGB files are memory mapped;
+    everything else (JPEG, PNG, compressed TIFF, ...) is decoded once into a temporary
+    memory-mapped file, so no tile ever has to decode the file again. The coarse
+    levels are built right away. Slow for big files, so call it off the GUI thread.
+    """
+    profile = get_embedded_profile(path)
+    with Image.open(path) as im:
+        array = _raw_memmap(path, im)
+        if array is None:
+            array = _decode_to_memmap(im)
+    source = ArraySource(array, profile, os.path.basename(path))
+    if source.level_count > RESIDENT_LEVEL:
+        source.level_array(source.level_count - 1)
+    return source
+
+def qimage_source(image, name="Clipboard"):
+    """
+    ImageSource over an in-memory QImage (e.g. pasted from the clipboard),
+    keeping its ICC profile if it carries one.
+    """
+    space = image.colorSpace()
+    profile = bytes(space.iccProfile()) if space.isValid() else b""
+    return ArraySource(qimage_to_array(image), profile or None, name)
+
+class Tile:
+    """
+    One loaded tile: raw pixels as stored in the file, for sampling, and a QImage
+    of the display pixels (converted to sRGB when color managed).
+    """
+    __slots__ = ("raw", "image")
+
+    def __init__(self, raw, display):
+        self.raw = raw
+        # An owned copy: a QImage over the array's buffer must not outlive the
+        # thread that made it, and tiles are handed from the loader to the GUI
+        self.image = array_to_qimage(display)
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes + self.image.sizeInBytes()
+
+class TileCache:
+    """
+    Least recently used tiles up to a byte budget.
+    """
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self.tiles
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def get(self, key):
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+        return tile
+
+    def put(self, key, tile):
+        old = self.tiles.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self.tiles[key] = tile
+        self.nbytes += tile.nbytes
+        while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+            _, evicted = self.tiles.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        self.tiles.clear()
+        self.nbytes = 0
+
+class _TileWorker(QObject):
+    """
+    Lives on the loader thread. Loads one tile per wake-up, so a new request list
+    takes effect between tiles.
+    """
+    tile_done = Signal(object, object, object)
+    opened = Signal(object)
+    failed = Signal(str)
+    _wake = Signal()
+    _open_requested = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.source = None
+        self.pending = []
+        self.loading = None
+        self.wake_pending = False
+        self.color_managed = True
+        self._wake.connect(self._process, Qt.QueuedConnection)
+        self._open_requested.connect(self._open, Qt.QueuedConnection)
+
+    def _open(self, opener):
+        try:
+            source = opener()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        with self.lock:
+            self.source = source
+            self.pending = []
+        self.opened.emit(source)
+
+    def _process(self):
+        with self.lock:
+            self.wake_pending = False
+            if not self.pending or self.source is None:
+                return
+            key = self.loading = self.pending.pop(0)
+            source, managed = self.source, self.color_managed
+        try:
+            raw = source.read_tile(*key)
+            tile = Tile(raw, source.to_srgb(raw) if managed else raw)
+        except Exception as e:
+            print(f"Image Read Error: {e}")
+            tile = None
+        with self.lock:
+            self.loading = None
+            more = bool(self.pending) and not self.wake_pending
+            if more:
+                self.wake_pending = True
+        if tile is not None:
+            self.tile_done.emit(source, key, tile)
+        if more:
+            self._wake.emit()
+
+class TileLoader(QObject):
+    """
+    GUI-side front end for loading tiles on a worker thread.
+
+    open() hands the worker a callable returning an ImageSource (file decoding can be
+    slow); opened or failed reports back. request() replaces the list of wanted tiles,
+    most important first, so tiles scrolled away before their turn are never read.
+    """
+    tile_ready = Signal(object, object)
+    opened = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.worker = _TileWorker()
+        self.thread = QThread()
+        self.thread.setObjectName("TileLoader")
+        self.worker.moveToThread(self.thread)
+        self.thread.start()
+
+        self.worker.tile_done.connect(self._on_tile_done, Qt.QueuedConnection)
+        self.worker.opened.connect(self.opened, Qt.QueuedConnection)
+        self.worker.failed.connect(self.failed, Qt.QueuedConnection)
+
+    @property
+    def source(self):
+        return self.worker.source
+
+    def open(self, opener):
+        with self.worker.lock:
+            self.worker.pending = []
+        self.worker._open_requested.emit(opener)
+
+    def set_color_managed(self, enabled):
+        with self.worker.lock:
+            self.worker.color_managed = enabled
+
+    def request(self, keys):
+        worker = self.worker
+        with worker.lock:
+            worker.pending = [k for k in keys if k != worker.loading]
+            if not worker.pending or worker.wake_pending:
+                return
+            worker.wake_pending = True
+        worker._wake.emit()
+
+    def stop(self):
+        with self.worker.lock:
+            self.worker.pending = []
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait(2000)
+            self.thread = None
+
+    def _on_tile_done(self, source, key, tile):
+        # Drop tiles of an image that has been replaced in the meantime
+        if source is self.worker.source:
+            self.tile_ready.emit(key, tile)
@@ -0,0 +1,43 @@
+import numpy as np
+from PySide6.QtGui import QImage
+
+def qimage_to_array(image):
+    """
+    Converts a QImage (or QPixmap) to an (H, W, 3) uint8 RGB array.
+    The result owns its memory, so it stays valid after the image is gone.
+    """
+    if hasattr(image, "toImage"):
+        image = image.toImage()
+    if image.isNull():
+        return np.zeros((0, 0, 3), dtype=np.uint8)
+    if image.format() != QImage.Format_RGB888:
+        image = image.convertToFormat(QImage.Format_RGB888)
+
+    w, h = image.width(), image.height()
+    stride = image.bytesPerLine()
+    # Scanlines are padded to 4 bytes, so view the full rows and slice the padding off
+    raw = np.frombuffer(image.constBits(), dtype=np.uint8, count=stride * h).reshape(h, stride)
+    return np.array(raw[:, :w * 3].reshape(h, w, 3))
+
+def array_to_qimage(array):
+    """
+    Wraps an (H, W, 3) uint8 RGB array as a QImage (copied, so the array can be reused).
+    """
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    h, w = array.shape[:2]
+    return QImage(array.data, w, h, w * 3, QImage.Format_RGB888).copy()
+
+def center_average(array, size):
+    """
+    Averages the size x size block at the center of an RGB array.
+    Truncates like the original ScreenSampler.get_average_color.
+    """
+    h, w = array.shape[:2]
+    if h == 0 or w == 0:
+        return 0, 0, 0
+    size = max(1, min(size, h, w))
+    top = h // 2 - size // 2
+    left = w // 2 - size // 2
+    block = array[top:top + size, left:left + size].reshape(-1, 3)
+    r, g, b = (block.sum(axis=0) // len(block)).tolist()
+    return int(r), int(g), int(b)
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+from color_logic import rgb_to_hex, rgb_array_to_lab, delta_e_2000
+
+DEFAULT_TOLERANCE = 2.0  # CIEDE2000 between a sample and the simplified gradient
+
+def line_points(x0, y0, x1, y1, samples=None):
+    """
+    Integer (xs, ys) along the line from (x0, y0) to (x1, y1), both ends included:
+    one point per pixel step when samples is None, else `samples` evenly spaced points.
+    """
+    if samples is None:
+        samples = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    t = np.linspace(0.0, 1.0, max(2, samples))
+    xs = np.rint(x0 + (x1 - x0) * t).astype(np.int64)
+    ys = np.rint(y0 + (y1 - y0) * t).astype(np.int64)
+    return xs, ys
+
+def sample_line(grab_array, x0, y0, x1, y1, samples=None, sample_size=1):
+    """
+    Colors along a line from a single grab_array(x, y, w, h) of its bounding box
+    (grown by the sample area). Each point averages the sample_size x sample_size
+    block centered on it, like center_average, via a summed-area table.
+    Returns ((N, 3) uint8 colors, (N,) positions from 0 to 1).
+    Points are in logical pixels; a HiDPI grab comes back in device pixels, so rows,
+    columns and table indices are scaled by the grab's size over the box's.
+    """
+    xs, ys = line_points(x0, y0, x1, y1, samples)
+    size = max(1, sample_size)
+    half = size // 2
+    left, top = int(xs.min()) - half, int(ys.min()) - half
+    width = int(xs.max()) - left + size - half
+    height = int(ys.max()) - top + size - half
+    pixels = grab_array(left, top, width, height)
+    sy, sx = pixels.shape[0] / height, pixels.shape[1] / width
+
+    cols, rows = xs - half - left, ys - half - top
+    if size == 1 and sy == sx == 1:
+        colors = pixels[rows, cols]
+    else:
+        r0 = np.rint(rows * sy).astype(np.int64)
+        c0 = np.rint(cols * sx).astype(np.int64)
+        r1 = np.maximum(r0 + 1, np.rint((rows + size) * sy).astype(np.int64))
+        c1 = np.maximum(c0 + 1, np.rint((cols + size) * sx).astype(np.int64))
+        sat = np.zeros((pixels.shape[0] + 1, pixels.shape[1] + 1, 3), dtype=np.int64)
+        sat[1:, 1:] = pixels.cumsum(axis=0, dtype=np.int64).cumsum(axis=1)
+        sums = sat[r1, c1] - sat[r0, c1] - sat[r1, c0] + sat[r0, c0]
+        colors = (sums // ((r1 - r0) * (c1 - c0))[:, None]).astype(np.uint8)
+
+    length = np.hypot(xs - xs[0], ys - ys[0])
+    positions = length / length[-1] if length[-1] else np.linspace(0.0, 1.0, len(xs))
+    return np.ascontiguousarray(colors, dtype=np.uint8), positions
+
+def simplify_stops(colors, positions, tolerance=DEFAULT_TOLERANCE):
+    """
+    Ramer-Douglas-Peucker over a color profile: keeps the fewest samples such that
+    linear interpolation between kept neighbours (as a CSS gradient renders it) is
+    within `tolerance` CIEDE2000 of every sample. Returns the kept indices, ends included.
+
+    Segments are split breadth first, all segments of a level in one vectorized pass,
+    so noisy profiles that keep most samples still take a handful of numpy calls per level.
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    n = len(colors)
+    if n <= 2:
+        return list(range(n))
+    lab = rgb_array_to_lab(colors)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    firsts, lasts = np.array([0]), np.array([n - 1])
+    while len(firsts):
+        inner = lasts - firsts - 1
+        firsts, lasts, inner = firsts[inner > 0], lasts[inner > 0], inner[inner > 0]
+        if not len(firsts):
+            break
+        # Interior sample indices of every segment, back to back
+        segment = np.repeat(np.arange(len(firsts)), inner)
+        starts = np.concatenate(([0], np.cumsum(inner)[:-1]))
+        idx = firsts[segment] + 1 + np.arange(len(segment)) - starts[segment]
+
+        f, l = firsts[segment], lasts[segment]
+        span = positions[l] - positions[f]
+        t = np.divide(positions[idx] - positions[f], span, out=np.zeros(len(idx)), where=span > 0)
+        lerp = colors[f] + (colors[l] - colors[f]) * t[:, None]
+        error = delta_e_2000(lab[idx], rgb_array_to_lab(lerp))
+
+        # The first worst sample of each segment
+        order = np.lexsort((-error, segment))
+        worst = order[starts]
+        split = error[worst] > tolerance
+        at = idx[worst[split]]
+        keep[at] = True
+        firsts = np.concatenate((firsts[split], at))
+        lasts = np.concatenate((at, lasts[split]))
+    return np.flatnonzero(keep).tolist()
+
+def css_angle(x0, y0, x1, y1):
+    """
+    CSS gradient angle of a screen line: 0deg points up, 90deg right (y grows down).
+    """
+    return round(math.degrees(math.atan2(x1 - x0, y0 - y1)) % 360, 1)
+
+def css_linear_gradient(stops, angle=90.0):
+    """
+    stops: [((r, g, b), position 0-1)] -> "linear-gradient(90deg, #RRGGBB 0%, ...)".
+    """
+    parts = [f"{angle:g}deg"]
+    parts += [f"{rgb_to_hex(*color)} {round(pos * 100, 2):g}%" for color, pos in stops]
+    return f"linear-gradient({', '.join(parts)})"
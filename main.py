@@ -1,24 +1,44 @@
 
 import sys
 import os
-import platform
 import json
+
+import numpy as np
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QPushButton, QLabel, QFrame, QGridLayout,
                                QScrollArea, QSizePolicy, QDialog, QComboBox, QCheckBox, QGroupBox,
-                               QTabWidget)
+                               QTabWidget, QMenu, QSystemTrayIcon)
 from PySide6.QtCore import Qt, QTimer, Signal, QSize, QPoint, QRect
 from PySide6.QtGui import QColor, QPainter, QPen, QCursor, QIcon, QPixmap, QGuiApplication, QAction
 
 from styles import STYLESHEET
-from color_logic import generate_palettes, rgb_to_hex, rgb_to_cmyk, rgb_to_hsl_string
+from color_logic import generate_palettes, generate_accessible_palette, simulate_cvd_array, CVD_MATRICES
+from color_value import Color, ColorArray, as_color
+from contrast_utils import hex_to_rgb, TARGET_LEVELS, WCAG_AA
 from icon_gen import create_app_icon, create_gear_icon
-from widgets import ToggleSwitch, CopyLabel, FlashFrame, PaletteItem
+from widgets import ToggleSwitch, CopyLabel, FlashFrame, PaletteItem, ContrastMatrixWidget
 from contrast_ui import ContrastCheckerDialog
-from icc_utils import get_system_monitor_profile_path, convert_to_srgb
+from region_contrast_ui import RegionSelectWindow, RegionContrastDialog
+from image_picker_ui import ImagePickerDialog
+from recorder_ui import RecorderDialog
+from pin_monitor_ui import PinMonitorPanel
+from pin_monitor import point_rect, group_by_screen
+from gradient_ui import LineSelectWindow, GradientDialog
+from icc_utils import STANDARD_PROFILES, read_profile, is_cmyk_profile, cmyk_array, find_cmyk_profiles
+from screen_profiles import ScreenProfiles
+from single_instance import SingleInstanceServer, send_to_running_instance
+from frame_stream import FrameStreamWriter
+from image_utils import qimage_to_array, array_to_qimage, center_average
+from capture_backends import create_backend, QtGrabBackend
+from sampling_worker import BackgroundSampler
+from dominant_colors import dominant_colors, count_unique_colors
+from rpc_server import (RpcServer, GuiInvoker, build_methods, DEFAULT_PORT as RPC_DEFAULT_PORT,
+                        TOKEN_FILE as RPC_TOKEN_FILE)
 
 # --- Constants ---
 SETTINGS_FILE = "settings.json"
+CAPTURE_SIZE = 15 # Magnifier patch (pixels per side)
+REGION_PALETTE_TOKEN = "region-palette"
 
 def load_icon():
     base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
@@ -28,64 +48,58 @@ def load_icon():
             return QIcon(path)
     return create_app_icon()
 
-# --- Platform Specific Imports ---
-IS_WINDOWS = platform.system() == 'Windows'
-if IS_WINDOWS:
-    import ctypes
-    user32 = ctypes.windll.user32
-    gdi32 = ctypes.windll.gdi32
+def analyze_region_palette(pixels):
+    """
+    (dominant colors, unique color count) of a grabbed region; runs on the sampling worker.
+    """
+    if pixels.size == 0:
+        return None
+    return dominant_colors(pixels, k=6), count_unique_colors(pixels)
 
 # --- Screen Sampler ---
 
 class ScreenSampler:
+    """
+    Static front-end over the active capture backend (see capture_backends).
+    The backend is created on first use and reused for every sample.
+    """
+    backend = None
+
+    @staticmethod
+    def get_backend():
+        if ScreenSampler.backend is None:
+            ScreenSampler.backend = create_backend()
+        return ScreenSampler.backend
+
+    @staticmethod
+    def set_backend(backend):
+        if ScreenSampler.backend is not None and ScreenSampler.backend is not backend:
+            ScreenSampler.backend.close()
+        ScreenSampler.backend = backend
+
     @staticmethod
     def get_cursor_pos():
         return QCursor.pos()
 
     @staticmethod
     def get_pixel_color(x, y):
-        if IS_WINDOWS:
-            try:
-                hdc = user32.GetDC(0)
-                color = gdi32.GetPixel(hdc, x, y)
-                user32.ReleaseDC(0, hdc)
-                if color == -1: return 0, 0, 0
-                r = color & 0xff
-                g = (color >> 8) & 0xff
-                b = (color >> 16) & 0xff
-                return r, g, b
-            except:
-                return ScreenSampler.get_pixel_qt(x, y)
-        else:
-            return ScreenSampler.get_pixel_qt(x, y)
+        try:
+            return ScreenSampler.get_backend().pixel(x, y)
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return QtGrabBackend().pixel(x, y)
 
     @staticmethod
-    def get_pixel_qt(x, y):
-        screen = QApplication.screenAt(QPoint(x, y))
-        if not screen:
-            screen = QApplication.primaryScreen()
-
-        # Convert global x,y to screen-local coordinates
-        local_x = x - screen.geometry().x()
-        local_y = y - screen.geometry().y()
-
-        pixmap = screen.grabWindow(0, local_x, local_y, 1, 1)
-        c = pixmap.toImage().pixelColor(0, 0)
-        return c.red(), c.green(), c.blue()
+    def grab_image(x, y, width, height):
+        return ScreenSampler.get_backend().grab(x, y, width, height)
 
     @staticmethod
     def grab_area(x, y, width, height):
-        # Find the screen containing the area
-        screen = QApplication.screenAt(QPoint(x, y))
-        if not screen:
-            screen = QApplication.primaryScreen()
-
-        # Convert global x,y to screen-local coordinates
-        # grabWindow(0) on a QScreen uses coordinates relative to that screen's geometry
-        local_x = x - screen.geometry().x()
-        local_y = y - screen.geometry().y()
+        return QPixmap.fromImage(ScreenSampler.grab_image(x, y, width, height))
 
-        return screen.grabWindow(0, local_x, local_y, width, height)
+    @staticmethod
+    def grab_array(x, y, width, height):
+        return qimage_to_array(ScreenSampler.grab_image(x, y, width, height))
 
     @staticmethod
     def get_average_color(x, y, size):
@@ -93,17 +107,7 @@ class ScreenSampler:
             return ScreenSampler.get_pixel_color(x, y)
         start_x = x - (size // 2)
         start_y = y - (size // 2)
-        pixmap = ScreenSampler.grab_area(start_x, start_y, size, size)
-        if pixmap.isNull(): return 0, 0, 0
-        image = pixmap.toImage()
-        total_r, total_g, total_b, count = 0, 0, 0, 0
-        for i in range(image.width()):
-            for j in range(image.height()):
-                c = image.pixelColor(i, j)
-                total_r += c.red(); total_g += c.green(); total_b += c.blue()
-                count += 1
-        if count == 0: return 0, 0, 0
-        return (int(total_r / count), int(total_g / count), int(total_b / count))
+        return center_average(ScreenSampler.grab_array(start_x, start_y, size, size), size)
 
 # --- UI Components ---
 
@@ -135,11 +139,41 @@ class SettingsDialog(QDialog):
 
         # 2. Color Management
         icc_group = QGroupBox("Color Management")
-        icc_layout = QHBoxLayout()
-        icc_layout.addWidget(QLabel("Enable ICC Correction"))
+        icc_layout = QGridLayout()
+        icc_layout.addWidget(QLabel("Enable ICC Correction"), 0, 0)
         self.icc_toggle = ToggleSwitch()
         self.icc_toggle.setChecked(self.settings.get("color_managed", True))
-        icc_layout.addWidget(self.icc_toggle)
+        icc_layout.addWidget(self.icc_toggle, 0, 1)
+
+        # Profile per screen; files can also be mapped in settings.json
+        self.profile_combos = {}
+        mapping = self.settings.get("screen_profiles", {})
+        for row, screen in enumerate(QGuiApplication.screens(), 1):
+            combo = QComboBox()
+            combo.addItem("System Profile", "")
+            for name in STANDARD_PROFILES:
+                combo.addItem(name, name)
+            current = mapping.get(screen.name(), "")
+            if current and combo.findData(current) < 0:
+                combo.addItem(os.path.basename(current), current)
+            combo.setCurrentIndex(max(0, combo.findData(current)))
+            combo.setToolTip(screen.name())
+            icc_layout.addWidget(QLabel(screen.model() or screen.name()), row, 0)
+            icc_layout.addWidget(combo, row, 1)
+            self.profile_combos[screen.name()] = combo
+
+        # Press profile for CMYK values; installed CMYK profiles are listed
+        self.cmyk_combo = QComboBox()
+        self.cmyk_combo.addItem("Formula (no profile)", "")
+        for description, path in find_cmyk_profiles():
+            self.cmyk_combo.addItem(description, path)
+        current = self.settings.get("cmyk_profile", "")
+        if current and self.cmyk_combo.findData(current) < 0:
+            self.cmyk_combo.addItem(os.path.basename(current), current)
+        self.cmyk_combo.setCurrentIndex(max(0, self.cmyk_combo.findData(current)))
+        row = icc_layout.rowCount()
+        icc_layout.addWidget(QLabel("CMYK Press"), row, 0)
+        icc_layout.addWidget(self.cmyk_combo, row, 1)
         icc_group.setLayout(icc_layout)
         layout.addWidget(icc_group)
 
@@ -158,16 +192,46 @@ class SettingsDialog(QDialog):
         vis_group.setLayout(vis_layout)
         layout.addWidget(vis_group)
 
-        # 4. Window Options
+        # 4. Color Vision Simulation
+        cvd_group = QGroupBox("Color Vision Simulation")
+        cvd_layout = QVBoxLayout()
+        self.cvd_combo = QComboBox()
+        self.cvd_combo.addItem("None", "none")
+        for kind in CVD_MATRICES:
+            self.cvd_combo.addItem(kind.title(), kind)
+        self.cvd_combo.setCurrentIndex(max(0, self.cvd_combo.findData(self.settings.get("cvd_mode", "none"))))
+        cvd_layout.addWidget(self.cvd_combo)
+        cvd_group.setLayout(cvd_layout)
+        layout.addWidget(cvd_group)
+
+        # 5. Window Options
         window_group = QGroupBox("Window Options")
-        window_layout = QHBoxLayout()
-        window_layout.addWidget(QLabel("Always on Top"))
+        window_layout = QGridLayout()
+        window_layout.addWidget(QLabel("Always on Top"), 0, 0)
         self.aot_toggle = ToggleSwitch()
         self.aot_toggle.setChecked(self.settings.get("always_on_top", False))
-        window_layout.addWidget(self.aot_toggle)
+        window_layout.addWidget(self.aot_toggle, 0, 1)
+        window_layout.addWidget(QLabel("Contrast Grids"), 1, 0)
+        self.grid_toggle = ToggleSwitch()
+        self.grid_toggle.setChecked(self.settings.get("show_contrast_grid", False))
+        window_layout.addWidget(self.grid_toggle, 1, 1)
         window_group.setLayout(window_layout)
         layout.addWidget(window_group)
 
+        # 6. Automation
+        rpc_group = QGroupBox("Automation")
+        rpc_layout = QGridLayout()
+        rpc_layout.addWidget(QLabel(f"Local API (port {self.settings.get('rpc_port', RPC_DEFAULT_PORT)})"), 0, 0)
+        self.rpc_toggle = ToggleSwitch()
+        self.rpc_toggle.setChecked(self.settings.get("rpc_enabled", False))
+        rpc_layout.addWidget(self.rpc_toggle, 0, 1)
+        rpc_layout.addWidget(QLabel("Shared-Memory Frame Stream"), 1, 0)
+        self.stream_toggle = ToggleSwitch()
+        self.stream_toggle.setChecked(self.settings.get("frame_stream", False))
+        rpc_layout.addWidget(self.stream_toggle, 1, 1)
+        rpc_group.setLayout(rpc_layout)
+        layout.addWidget(rpc_group)
+
         layout.addStretch()
 
     def save_settings(self):
@@ -177,15 +241,31 @@ class SettingsDialog(QDialog):
         elif "5x5" in size_text: size = 5
         elif "7x7" in size_text: size = 7
 
-        new_settings = {
+        # Screens that are not connected right now keep their mapping
+        screen_profiles = dict(self.settings.get("screen_profiles", {}))
+        for name, combo in self.profile_combos.items():
+            if combo.currentData():
+                screen_profiles[name] = combo.currentData()
+            else:
+                screen_profiles.pop(name, None)
+
+        # Start from the current settings so keys without a widget here are kept
+        new_settings = dict(self.settings)
+        new_settings.update({
             "sample_size": size,
             "color_managed": self.icc_toggle.isChecked(),
             "always_on_top": self.aot_toggle.isChecked(),
+            "show_contrast_grid": self.grid_toggle.isChecked(),
+            "cvd_mode": self.cvd_combo.currentData(),
             "show_hex": self.vis_toggles["hex"].isChecked(),
             "show_rgb": self.vis_toggles["rgb"].isChecked(),
             "show_hsl": self.vis_toggles["hsl"].isChecked(),
             "show_cmyk": self.vis_toggles["cmyk"].isChecked(),
-        }
+            "rpc_enabled": self.rpc_toggle.isChecked(),
+            "frame_stream": self.stream_toggle.isChecked(),
+            "screen_profiles": screen_profiles,
+            "cmyk_profile": self.cmyk_combo.currentData(),
+        })
         self.settings_changed.emit(new_settings)
 
     def closeEvent(self, event):
@@ -206,20 +286,66 @@ class MagnifierWindow(QWidget):
 
         self.sample_size = 1
         self.zoom_level = 10
+        self.cvd_mode = "none"
+        self.to_srgb = None  # display profile -> sRGB for whole patches, or None
         self.cursor_pos = QCursor.pos()
 
+        # Capture is done off the GUI thread and handed over via set_frame()
+        self.frame_image = None
+        # Live values of the sampled color, drawn above and below the patch
+        self.readout_color = None
+        self.readout = ("", "")
+
         # Visual Size
         self.setFixedSize(200, 200)
 
     def set_sample_size(self, size):
         self.sample_size = size
 
+    def set_cvd_mode(self, mode):
+        self.cvd_mode = mode
+
+    def set_transform(self, to_srgb):
+        """
+        Shows patches through to_srgb (an (H, W, 3) array converter with a cached
+        transform), so the preview matches the corrected pick.
+        """
+        self.to_srgb = to_srgb
+
     def update_pos(self, pos):
         self.cursor_pos = pos
         # Offset: +30, +30 from cursor
         self.move(pos.x() + 30, pos.y() + 30)
         self.update() # Trigger paint
 
+    def set_frame(self, result):
+        if self.to_srgb is None and self.cvd_mode == "none":
+            self.frame_image = result.image
+        else:
+            patch = result.patch
+            if self.to_srgb is not None:
+                patch = self.to_srgb(patch)
+            if self.cvd_mode != "none":
+                patch = simulate_cvd_array(patch, self.cvd_mode)
+            self.frame_image = array_to_qimage(patch)
+        self.update()
+
+    def clear_frame(self):
+        self.frame_image = None
+        self.readout_color = None
+        self.readout = ("", "")
+
+    def set_readout(self, color):
+        if color == self.readout_color:
+            return
+        color = as_color(color)
+        self.readout_color = color
+        r, g, b = color
+        h, l, s = color.hls
+        self.readout = (color.hex,
+                        f"{r} {g} {b}  ·  {round(h * 360)}° {round(s * 100)}% {round(l * 100)}%")
+        self.update()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, False)
@@ -228,8 +354,7 @@ class MagnifierWindow(QWidget):
         painter.fillRect(self.rect(), Qt.black)
 
         # Capture Specs
-        capture_size = 15
-        half_size = capture_size // 2 # 7
+        capture_size = CAPTURE_SIZE
         preview_size = capture_size * self.zoom_level # 150
 
         # Center rect inside the 200x200 widget
@@ -237,14 +362,10 @@ class MagnifierWindow(QWidget):
         box_y = (self.height() - preview_size) // 2
         target_rect = QRect(box_x, box_y, preview_size, preview_size)
 
-        # Capture
-        pix = ScreenSampler.grab_area(self.cursor_pos.x() - half_size,
-                                      self.cursor_pos.y() - half_size,
-                                      capture_size, capture_size)
-
-        if not pix.isNull():
+        # Latest frame from the sampling worker
+        if self.frame_image is not None and not self.frame_image.isNull():
             painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
-            painter.drawPixmap(target_rect, pix)
+            painter.drawImage(target_rect, self.frame_image)
 
         # Grid / Crosshair
         center_x = box_x + (preview_size // 2)
@@ -265,12 +386,28 @@ class MagnifierWindow(QWidget):
         painter.setPen(QPen(QColor(255, 255, 255), 2))
         painter.drawRect(target_rect)
 
+        # Readout in the margins: HEX above the patch, RGB and HSL below
+        if self.readout_color is not None:
+            hex_text, values_text = self.readout
+            painter.setPen(QColor(255, 255, 255))
+            font = painter.font()
+            font.setFamily("monospace")
+            font.setPixelSize(13)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.drawText(QRect(0, 0, self.width(), box_y), Qt.AlignCenter, hex_text)
+            font.setPixelSize(11)
+            font.setBold(False)
+            painter.setFont(font)
+            painter.drawText(QRect(0, box_y + preview_size, self.width(), box_y), Qt.AlignCenter, values_text)
+
 class BlockerWindow(QWidget):
     """
     Window 3: Floating window for INPUT only.
     Follows mouse CENTERED. Almost Transparent (alpha=1). Consumes clicks.
     """
     clicked = Signal()
+    cancelled = Signal()
 
     def __init__(self):
         super().__init__()
@@ -301,6 +438,13 @@ class BlockerWindow(QWidget):
             self.clicked.emit()
             event.accept()
 
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.cancelled.emit()
+            event.accept()
+        else:
+            super().keyPressEvent(event)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -312,8 +456,8 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(load_icon())
 
         # Logic: Initialize History with Black and White
-        self.history = [(0,0,0), (255,255,255)]
-        self.current_color = (255, 255, 255)
+        self.history = [Color(0, 0, 0), Color(255, 255, 255)]
+        self.current_color = Color(255, 255, 255)
         self.load_settings()
 
         self.setup_ui()
@@ -321,20 +465,61 @@ class MainWindow(QMainWindow):
         # Helper Objects
         self.magnifier_win = None
         self.blocker_win = None
+        self.picker_callback = None
+        self.sampler = None
         self.picker_timer = QTimer()
         self.picker_timer.timeout.connect(self.tick_picker)
+        self.picked_pos = None
+        # Live readout while picking: the last raw frame color and its converter
+        self.live_raw = None
+        self.live_to_srgb = None
+
+        # Recorder: its own precise timer drives the shared sampler while recording
+        self.recorder_dialog = None
+        self.record_timer = QTimer()
+        self.record_timer.setTimerType(Qt.PreciseTimer)
+        self.record_timer.timeout.connect(self.tick_recorder)
+
+        # Pinned colors: every pin is sampled on one timer, one grab per screen
+        self.pin_panel = None
+        self.pin_timer = QTimer()
+        self.pin_timer.timeout.connect(self.tick_pins)
+        self.tray_icon = None
 
         self.contrast_dialog = None
-
-        # ICC
-        self.icc_path = get_system_monitor_profile_path()
+        self.region_dialog = None
+        self.region_selector = None
+        self.gradient_dialog = None
+        self.region_text_hex = "#FFFFFF"
+        self.image_picker = None
+
+        # Dominant colors of the last extracted region ("Region" tab)
+        self.region_palette = []
+        self.region_palette_info = ""
+
+        # ICC: monitor profile per screen, looked up once per screen
+        self.screen_profiles = ScreenProfiles(self.app_settings.get("screen_profiles"))
+        QGuiApplication.instance().screenAdded.connect(self.screen_profiles.clear)
+        QGuiApplication.instance().screenRemoved.connect(self.screen_profiles.clear)
+        self.press_profile = self.load_press_profile()
+
+        # Local API
+        self.gui_invoker = GuiInvoker(self)
+        self.rpc_server = None
+        self.update_rpc_server()
+
+        # Shared-memory frame stream (created on first pick when enabled)
+        self.frame_writer = None
 
         self.update_ui_with_color((255, 255, 255))
 
     def load_settings(self):
         self.app_settings = {
             "sample_size": 1, "color_managed": True, "always_on_top": False,
-            "show_hex": True, "show_rgb": True, "show_hsl": True, "show_cmyk": True
+            "show_hex": True, "show_rgb": True, "show_hsl": True, "show_cmyk": True,
+            "rpc_enabled": False, "rpc_port": RPC_DEFAULT_PORT, "frame_stream": False,
+            "show_contrast_grid": False, "accessible_bg": "#FFFFFF", "accessible_target": "AA",
+            "cvd_mode": "none", "screen_profiles": {}, "cmyk_profile": ""
         }
         if os.path.exists(SETTINGS_FILE):
             try:
@@ -374,6 +559,34 @@ class MainWindow(QMainWindow):
         self.contrast_btn.clicked.connect(self.open_contrast_checker)
         top_bar.addWidget(self.contrast_btn)
 
+        self.region_btn = QPushButton(" Region")
+        self.region_btn.setIcon(load_icon())
+        self.region_btn.setObjectName("EyedropperButton")
+        self.region_btn.setCursor(Qt.PointingHandCursor)
+        self.region_btn.setToolTip("Extract the dominant colors of a screen region")
+        self.region_btn.clicked.connect(self.activate_region_palette)
+        top_bar.addWidget(self.region_btn)
+
+        self.image_btn = QPushButton(" Image")
+        self.image_btn.setIcon(load_icon())
+        self.image_btn.setObjectName("EyedropperButton")
+        self.image_btn.setCursor(Qt.PointingHandCursor)
+        self.image_btn.setToolTip("Pick colors from an image file or the clipboard")
+        self.image_btn.clicked.connect(self.open_image_picker)
+        top_bar.addWidget(self.image_btn)
+
+        # Continuous sampling tools share one button to keep the top bar within the window
+        self.sample_btn = QPushButton(" Sample")
+        self.sample_btn.setIcon(load_icon())
+        self.sample_btn.setObjectName("EyedropperButton")
+        self.sample_btn.setCursor(Qt.PointingHandCursor)
+        sample_menu = QMenu(self.sample_btn)
+        sample_menu.addAction("Record Over Time…", self.open_recorder)
+        sample_menu.addAction("Pinned Colors…", self.open_pin_panel)
+        sample_menu.addAction("Gradient Along Line…", self.start_gradient)
+        self.sample_btn.setMenu(sample_menu)
+        top_bar.addWidget(self.sample_btn)
+
         self.eyedropper_btn = QPushButton(" Eyedropper")
         self.eyedropper_btn.setIcon(load_icon())
         self.eyedropper_btn.setObjectName("EyedropperButton")
@@ -405,6 +618,10 @@ class MainWindow(QMainWindow):
         self.history_container.setSpacing(5)
         main_layout.addLayout(self.history_container)
 
+        self.history_matrix = ContrastMatrixWidget()
+        self.history_matrix.pair_clicked.connect(self.open_contrast_pair)
+        main_layout.addWidget(self.history_matrix, 0, Qt.AlignCenter)
+
         theory_label = QLabel("Color Theory")
         theory_label.setObjectName("SectionTitle")
         main_layout.addWidget(theory_label)
@@ -440,19 +657,364 @@ class MainWindow(QMainWindow):
             self.setWindowFlags(new_flags)
             self.show()
 
-        if self.app_settings["color_managed"] and not self.icc_path:
-            self.icc_path = get_system_monitor_profile_path()
+        self.screen_profiles.set_mapping(self.app_settings.get("screen_profiles"))
+        self.press_profile = self.load_press_profile()
 
+        self.update_rpc_server()
+        self.update_frame_stream()
+        if self.image_picker:
+            self.image_picker.set_sample_size(self.app_settings["sample_size"])
+            self.image_picker.set_color_managed(self.app_settings["color_managed"])
         self.update_ui_with_color(self.current_color)
 
+    def update_rpc_server(self):
+        """
+        Starts or stops the local JSON-RPC server to match the settings.
+        """
+        enabled = self.app_settings.get("rpc_enabled", False)
+        if enabled and not self.rpc_server:
+            server = RpcServer(build_methods(ScreenSampler, cmyk_profiles=self.rpc_cmyk_profiles),
+                               port=self.app_settings.get("rpc_port", RPC_DEFAULT_PORT),
+                               invoker=self.gui_invoker, token_path=RPC_TOKEN_FILE)
+            try:
+                server.start()
+                self.rpc_server = server
+            except OSError as e:
+                print(f"RPC Error: {e}")
+        elif not enabled and self.rpc_server:
+            self.rpc_server.stop()
+            self.rpc_server = None
+
+    def rpc_cmyk_profiles(self):
+        """
+        Press profiles API clients may use: the installed ones and the one set in settings.
+        """
+        profiles = find_cmyk_profiles()
+        configured = self.app_settings.get("cmyk_profile")
+        if configured and all(path != configured for _, path in profiles):
+            profiles.append((os.path.basename(configured), configured))
+        return profiles
+
+    def update_frame_stream(self):
+        """
+        Creates or tears down the shared-memory frame stream to match the settings.
+        """
+        enabled = self.app_settings.get("frame_stream", False)
+        if enabled and not self.frame_writer:
+            try:
+                self.frame_writer = FrameStreamWriter()
+            except OSError as e:
+                print(f"Frame Stream Error: {e}")
+        elif not enabled and self.frame_writer:
+            if self.sampler:
+                self.sampler.set_frame_writer(None)
+            self.frame_writer.close()
+            self.frame_writer = None
+
+        if self.sampler:
+            self.sampler.set_frame_writer(self.frame_writer)
+
+    def closeEvent(self, event):
+        self.record_timer.stop()
+        self.pin_timer.stop()
+        if self.rpc_server:
+            self.rpc_server.stop()
+            self.rpc_server = None
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler = None
+        if self.image_picker:
+            self.image_picker.stop()
+            self.image_picker = None
+        if self.frame_writer:
+            self.frame_writer.close()
+            self.frame_writer = None
+        super().closeEvent(event)
+
+    def handle_launch_args(self, args):
+        """
+        Applies command line arguments from this launch or one forwarded by a second launch.
+        """
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+        if "--contrast" in args:
+            self.open_contrast_checker()
+        if "--pick" in args:
+            # Let the window settle before the overlays grab focus
+            QTimer.singleShot(0, self.activate_eyedropper)
+
     def open_contrast_checker(self):
         if not self.contrast_dialog:
             self.contrast_dialog = ContrastCheckerDialog(self)
             self.contrast_dialog.request_color_pick.connect(self.activate_contrast_picker)
+            self.contrast_dialog.request_region_check.connect(self.start_region_check)
         self.contrast_dialog.show()
         self.contrast_dialog.raise_()
         self.contrast_dialog.activateWindow()
 
+    def open_contrast_pair(self, fg_hex, bg_hex):
+        self.open_contrast_checker()
+        self.contrast_dialog.set_color(fg_hex, True)
+        self.contrast_dialog.set_color(bg_hex, False)
+
+    def select_region(self, callback, cancelled=None):
+        """
+        Lets the user drag out a screen rectangle, then calls callback(rect) once
+        the dimmed selector is gone from the screen, or cancelled() if the user backs out.
+        """
+        self.region_selector = RegionSelectWindow()
+
+        def selected(rect):
+            self.region_selector = None
+            QTimer.singleShot(100, lambda: callback(rect))
+
+        def backed_out():
+            self.region_selector = None
+            if cancelled:
+                cancelled()
+        self.region_selector.region_selected.connect(selected)
+        self.region_selector.cancelled.connect(backed_out)
+        self.region_selector.show()
+        self.region_selector.activateWindow()
+
+    def select_line(self, callback):
+        """
+        Lets the user drag a line on screen, then calls callback(start, end) once
+        the dimmed selector is gone from the screen.
+        """
+        self.region_selector = LineSelectWindow()
+
+        def selected(start, end):
+            self.region_selector = None
+            QTimer.singleShot(100, lambda: callback(start, end))
+        self.region_selector.line_selected.connect(selected)
+        self.region_selector.cancelled.connect(lambda: setattr(self, "region_selector", None))
+        self.region_selector.show()
+        self.region_selector.activateWindow()
+
+    def start_region_check(self, text_hex=None):
+        if text_hex:
+            self.region_text_hex = text_hex
+        reopen = None
+        if self.region_dialog and self.region_dialog.isVisible():
+            self.region_dialog.hide()
+            # Cancelling the reselect brings the dialog back on its old region
+            reopen = self.region_dialog.show
+        self.select_region(self.show_region_dialog, cancelled=reopen)
+
+    def activate_region_palette(self):
+        self.select_region(self.extract_region_palette)
+
+    def extract_region_palette(self, rect):
+        # Grab and clustering run on the sampling worker; the result lands in on_region_ready
+        self.ensure_sampler().request_region((rect.x(), rect.y(), rect.width(), rect.height()),
+                                             analyze_region_palette, token=REGION_PALETTE_TOKEN)
+
+    def on_region_ready(self, result):
+        if result.token != REGION_PALETTE_TOKEN or result.value is None:
+            return
+        self.region_palette, unique = result.value
+        _, _, width, height = result.rect
+        self.region_palette_info = f"{width}x{height} region, {unique:,} unique colors"
+        self.update_theory_tabs(*self.current_color)
+        self.tabs.setCurrentIndex(self.tabs.count() - 1)
+        self.raise_()
+        self.activateWindow()
+
+    def add_region_palette_to_history(self):
+        self.add_colors_to_history([c["rgb"] for c in self.region_palette])
+
+    def add_colors_to_history(self, colors):
+        for c in colors:
+            if len(self.history) >= 15:
+                self.history.pop(0)
+            self.history.append(as_color(c))
+        self.update_history_ui()
+
+    def show_region_dialog(self, rect):
+        if not self.region_dialog:
+            self.region_dialog = RegionContrastDialog(self.ensure_sampler(), rect, self.region_text_hex, self)
+            self.region_dialog.request_reselect.connect(self.start_region_check)
+        else:
+            self.region_dialog.set_text_color(self.region_text_hex)
+            self.region_dialog.set_region(rect)
+        self.region_dialog.show()
+        self.region_dialog.raise_()
+
+    def start_gradient(self):
+        if self.gradient_dialog:
+            self.gradient_dialog.hide()
+        self.select_line(self.show_gradient_dialog)
+
+    def show_gradient_dialog(self, start, end):
+        if not self.gradient_dialog:
+            self.gradient_dialog = GradientDialog(ScreenSampler.grab_array, start, end, self.app_settings["sample_size"],
+                                                  self.display_to_srgb(start.x(), start.y()), self)
+            self.gradient_dialog.request_reselect.connect(self.start_gradient)
+            self.gradient_dialog.stops_to_history.connect(self.add_colors_to_history)
+        else:
+            self.gradient_dialog.sample_size = self.app_settings["sample_size"]
+            self.gradient_dialog.to_srgb = self.display_to_srgb(start.x(), start.y())
+            self.gradient_dialog.set_line(start, end)
+        self.gradient_dialog.show()
+        self.gradient_dialog.raise_()
+
+    def open_image_picker(self):
+        if not self.image_picker:
+            self.image_picker = ImagePickerDialog(self.app_settings["sample_size"], CAPTURE_SIZE,
+                                                  self.app_settings["color_managed"], self)
+            self.image_picker.color_picked.connect(self.add_image_color)
+            self.image_picker.patch_changed.connect(self.show_image_patch)
+        self.image_picker.show()
+        self.image_picker.raise_()
+        self.image_picker.activateWindow()
+
+    def show_image_patch(self, result):
+        """
+        Drives the magnifier from the image picker instead of the screen.
+        """
+        if self.picker_timer.isActive():
+            return
+        if result is None:
+            if self.magnifier_win:
+                self.magnifier_win.hide()
+            return
+        if not self.magnifier_win:
+            self.magnifier_win = MagnifierWindow()
+        self.magnifier_win.set_sample_size(self.app_settings["sample_size"])
+        self.magnifier_win.set_cvd_mode(self.app_settings.get("cvd_mode", "none"))
+        self.magnifier_win.update_pos(QCursor.pos())
+        self.magnifier_win.set_frame(result)
+        self.magnifier_win.show()
+
+    def add_image_color(self, color):
+        # Like add_color, but focus stays with the image for the next pick
+        color = as_color(color)
+        if len(self.history) >= 15:
+            self.history.pop(0)
+        self.history.append(color)
+        self.update_ui_with_color(color)
+
+    # --- Recorder ---
+
+    def open_recorder(self):
+        if not self.recorder_dialog:
+            self.recorder_dialog = RecorderDialog(parent=self)
+            self.recorder_dialog.recording_changed.connect(self.set_recording)
+            self.recorder_dialog.rate_changed.connect(self.set_record_rate)
+            self.recorder_dialog.pin_requested.connect(lambda: self.start_picker(self.pin_record_point))
+        self.recorder_dialog.show()
+        self.recorder_dialog.raise_()
+
+    def set_recording(self, recording):
+        if recording:
+            self.ensure_sampler()
+            # Exports convert each sample with the profile of the screen it came from
+            self.recorder_dialog.convert_colors = (self.screen_profiles.convert_colors
+                                                   if self.app_settings["color_managed"] else None)
+            self.set_record_rate(self.recorder_dialog.rate)
+        else:
+            self.record_timer.stop()
+
+    def set_record_rate(self, rate):
+        self.record_timer.setInterval(max(1, round(1000 / rate)))
+        if self.recorder_dialog.record_btn.isChecked():
+            self.record_timer.start()
+
+    def display_to_srgb(self, x=None, y=None):
+        """
+        Converter from the profile of the screen at (x, y), by default the one under
+        the cursor, to sRGB for (H, W, 3) arrays, or None.
+        """
+        if not self.app_settings["color_managed"]:
+            return None
+        if x is None:
+            pos = QCursor.pos()
+            x, y = pos.x(), pos.y()
+        return self.screen_profiles.converter_at(x, y)
+
+    def recording_point(self):
+        dlg = self.recorder_dialog
+        if dlg.follows_cursor:
+            pos = QCursor.pos()
+            return pos.x(), pos.y()
+        return dlg.pinned_point
+
+    def records_cursor(self):
+        return self.record_timer.isActive() and self.recorder_dialog.follows_cursor
+
+    def tick_recorder(self):
+        x, y = self.recording_point()
+        self.sampler.request_frame(x, y, CAPTURE_SIZE, self.app_settings["sample_size"])
+
+    def pin_record_point(self, color):
+        if self.recorder_dialog and self.picked_pos:
+            self.recorder_dialog.set_pinned_point(*self.picked_pos)
+            self.recorder_dialog.raise_()
+
+    # --- Pinned Colors ---
+
+    def open_pin_panel(self):
+        if not self.pin_panel:
+            self.pin_panel = PinMonitorPanel(parent=self)
+            self.pin_panel.pin_point_requested.connect(lambda: self.start_picker(self.add_point_pin))
+            self.pin_panel.pin_region_requested.connect(lambda: self.select_region(self.add_region_pin))
+            self.pin_panel.interval_changed.connect(self.pin_timer.setInterval)
+            self.pin_panel.pins_changed.connect(self.update_pin_timer)
+            self.pin_panel.color_drifted.connect(self.notify_drift)
+        self.pin_panel.show()
+        self.pin_panel.raise_()
+        self.update_pin_timer()
+
+    def add_point_pin(self, color):
+        if self.picked_pos:
+            self.pin_panel.add_pin(point_rect(*self.picked_pos, self.app_settings["sample_size"]))
+        self.open_pin_panel()
+
+    def add_region_pin(self, rect):
+        if not rect.isEmpty():
+            self.pin_panel.add_pin((rect.x(), rect.y(), rect.width(), rect.height()), kind="region")
+        self.open_pin_panel()
+
+    def update_pin_timer(self):
+        if self.pin_panel and len(self.pin_panel.monitor):
+            self.ensure_sampler()
+            self.pin_timer.start(self.pin_panel.interval)
+        else:
+            self.pin_timer.stop()
+
+    def tick_pins(self):
+        if not self.pin_panel.isVisible():
+            self.pin_timer.stop()
+            return
+        monitor = self.pin_panel.monitor
+        rects = monitor.rects()
+        screens = [(g.x(), g.y(), g.width(), g.height()) for g in (s.geometry() for s in QApplication.screens())]
+        self.sampler.request_areas(rects, group_by_screen(rects, screens), token=monitor.version)
+
+    def on_areas_ready(self, result):
+        if not self.pin_panel or result.token != self.pin_panel.monitor.version:
+            return  # sampled for a pin set that has changed since
+        colors = result.colors
+        if self.app_settings["color_managed"]:
+            centers = [(x + w // 2, y + h // 2) for x, y, w, h in self.pin_panel.monitor.rects()]
+            colors = self.screen_profiles.convert_colors(colors, centers)
+        self.pin_panel.update_colors(colors)
+
+    def notify_drift(self, label, old_hex, new_hex, de):
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        if not self.tray_icon:
+            self.tray_icon = QSystemTrayIcon(load_icon(), self)
+            self.tray_icon.setToolTip("Null Color Picker")
+        self.tray_icon.show()
+        self.tray_icon.showMessage("Pinned color changed", f"{label}: {old_hex} → {new_hex} (ΔE {de:.1f})",
+                                   QSystemTrayIcon.Information, 4000)
+
     # --- Eyedropper Logic ---
 
     def activate_eyedropper(self):
@@ -463,6 +1025,16 @@ class MainWindow(QMainWindow):
         self.contrast_target_is_fg = is_fg
         self.start_picker(self.return_contrast_color)
 
+    def ensure_sampler(self):
+        if not self.sampler:
+            self.sampler = BackgroundSampler(create_backend(), self)
+            self.sampler.frame_ready.connect(self.on_frame_ready)
+            self.sampler.sample_ready.connect(self.on_sample_ready)
+            self.sampler.areas_ready.connect(self.on_areas_ready)
+            self.sampler.region_ready.connect(self.on_region_ready)
+            self.sampler.set_frame_writer(self.frame_writer)
+        return self.sampler
+
     def start_picker(self, callback):
         # Init windows if needed
         if not self.magnifier_win:
@@ -470,9 +1042,17 @@ class MainWindow(QMainWindow):
         if not self.blocker_win:
             self.blocker_win = BlockerWindow()
             self.blocker_win.clicked.connect(self.on_blocker_clicked)
+            self.blocker_win.cancelled.connect(self.cancel_picker)
 
         # Set settings
         self.magnifier_win.set_sample_size(self.app_settings["sample_size"])
+        self.magnifier_win.set_cvd_mode(self.app_settings.get("cvd_mode", "none"))
+        self.magnifier_win.clear_frame()
+        self.live_raw = None
+        self.live_to_srgb = self.display_to_srgb()
+        self.magnifier_win.set_transform(self.live_to_srgb)
+        self.ensure_sampler()
+        self.update_frame_stream()
 
         # Store callback
         self.picker_callback = callback
@@ -480,6 +1060,7 @@ class MainWindow(QMainWindow):
         # Show Windows
         self.magnifier_win.show()
         self.blocker_win.show()
+        self.blocker_win.activateWindow() # Receive Esc
 
         # Start Tracking
         self.picker_timer.start(10) # 100Hz update
@@ -488,49 +1069,94 @@ class MainWindow(QMainWindow):
         pos = QCursor.pos()
         if self.magnifier_win and self.magnifier_win.isVisible():
             self.magnifier_win.update_pos(pos)
+            # Coalesced: if the worker is still busy only the newest position is grabbed.
+            # While recording the cursor, the record tick requests the same frames.
+            if not self.records_cursor():
+                self.sampler.request_frame(pos.x(), pos.y(), CAPTURE_SIZE, self.app_settings["sample_size"])
         if self.blocker_win and self.blocker_win.isVisible():
             self.blocker_win.update_pos(pos)
 
-    def on_blocker_clicked(self):
-        # Stop tracking
+    def on_frame_ready(self, result):
+        if self.record_timer.isActive():
+            point = None if self.recorder_dialog.follows_cursor else self.recorder_dialog.pinned_point
+            if point is None or (result.x, result.y) == point:
+                self.recorder_dialog.recorder.append(result.timestamp, result.x, result.y, result.color)
+                if point is not None:
+                    return  # the pinned point is not what the magnifier shows
+        if self.magnifier_win and self.magnifier_win.isVisible():
+            to_srgb = self.display_to_srgb(result.x, result.y)
+            if to_srgb is not self.live_to_srgb:
+                # Crossed onto a screen with another profile
+                self.live_to_srgb = to_srgb
+                self.live_raw = None
+                self.magnifier_win.set_transform(to_srgb)
+            self.magnifier_win.set_frame(result)
+            self.show_live_color(result.color)
+
+    def show_live_color(self, raw_color):
+        """
+        Shows the color under the picker, taken from the frame the magnifier already
+        grabbed, in the magnifier and the top bar. Nothing is converted or redrawn
+        while it stays the same.
+        """
+        if raw_color == self.live_raw:
+            return
+        self.live_raw = raw_color
+        color = as_color(raw_color)
+        if self.live_to_srgb is not None:
+            color = Color(*self.live_to_srgb(np.array([[raw_color]], dtype=np.uint8))[0, 0].tolist())
+        self.magnifier_win.set_readout(color)
+        self.show_color_values(color)
+
+    def stop_picker(self):
         self.picker_timer.stop()
-
-        # Hide Overlay Windows BEFORE sampling
+        if self.live_raw is not None:
+            self.live_raw = None
+            self.show_color_values(self.current_color)
+        if self.sampler:
+            self.sampler.cancel()
         if self.blocker_win: self.blocker_win.hide()
         if self.magnifier_win: self.magnifier_win.hide()
 
+    def cancel_picker(self):
+        self.stop_picker()
+        self.picker_callback = None
+
+    def on_blocker_clicked(self):
+        # Stop tracking, drop in-flight frames and hide overlays BEFORE sampling
+        self.stop_picker()
         QApplication.processEvents()
 
-        # Sample
+        # Sample (result arrives in on_sample_ready)
         pos = QCursor.pos()
-        size = self.app_settings["sample_size"]
+        self.sampler.request_sample(pos.x(), pos.y(), self.app_settings["sample_size"])
 
-        if size <= 1:
-            raw_color = ScreenSampler.get_pixel_color(pos.x(), pos.y())
-        else:
-            raw_color = ScreenSampler.get_average_color(pos.x(), pos.y(), size)
+    def on_sample_ready(self, result):
+        raw_color = result.color
+        self.picked_pos = (result.x, result.y)
 
-        # ICC
-        if self.app_settings["color_managed"] and self.icc_path:
-            final_color = convert_to_srgb(*raw_color, self.icc_path)
+        # ICC, with the profile of the screen the color was picked on
+        if self.app_settings["color_managed"]:
+            final_color = self.screen_profiles.convert_color(raw_color, result.x, result.y)
         else:
             final_color = raw_color
 
         # Callback
-        if self.picker_callback:
-            self.picker_callback(final_color)
+        callback, self.picker_callback = self.picker_callback, None
+        if callback:
+            callback(final_color)
 
     def return_contrast_color(self, color):
-        hex_val = rgb_to_hex(*color)
         if self.contrast_dialog:
-            self.contrast_dialog.receive_picked_color(hex_val, self.contrast_target_is_fg)
+            self.contrast_dialog.receive_picked_color(as_color(color), self.contrast_target_is_fg)
 
     def add_color(self, color):
+        color = as_color(color)
         if len(self.history) >= 15:
             self.history.pop(0)
-        self.history.append(tuple(color))
+        self.history.append(color)
 
-        self.update_ui_with_color(tuple(color))
+        self.update_ui_with_color(color)
         self.raise_()
         self.activateWindow()
 
@@ -542,19 +1168,21 @@ class MainWindow(QMainWindow):
         display_history = self.history[-15:] if len(self.history) > 15 else self.history
 
         for c in reversed(display_history):
-            hex_val = rgb_to_hex(*c)
-            swatch = FlashFrame(hex_val, is_history=True, interactive=True)
+            swatch = FlashFrame(c.hex, is_history=True, interactive=True)
             swatch.setFixedSize(35, 35)
             swatch.clicked.connect(lambda col=c: self.update_ui_with_color(col))
-            swatch.setToolTip(f"RGB: {c}")
+            swatch.setToolTip(f"RGB: {c.rgb}")
             self.history_container.addWidget(swatch)
 
+        show_grid = self.app_settings.get("show_contrast_grid", False)
+        self.history_matrix.setVisible(show_grid)
+        if show_grid:
+            self.history_matrix.set_colors(reversed(display_history))
+
     def update_ui_with_color(self, color):
+        color = as_color(color)
         r, g, b = color
         self.current_color = color
-        hex_val = rgb_to_hex(r, g, b)
-
-        self.selected_preview.setStyleSheet(f"background-color: {hex_val}; border: 1px solid #333; border-radius: 10px;")
 
         # Update Top Bar
         while self.color_info_layout.count():
@@ -562,27 +1190,75 @@ class MainWindow(QMainWindow):
             if child.widget(): child.widget().deleteLater()
 
         s = self.app_settings
-        def add_lbl(text):
-            lbl = CopyLabel(text)
+        self.color_labels = {}
+        def add_lbl(key):
+            lbl = CopyLabel("")
             lbl.setStyleSheet("font-size: 13px; font-family: monospace; color: #ffffff; padding: 2px 4px;")
             lbl.setAlignment(Qt.AlignRight)
             self.color_info_layout.addWidget(lbl)
+            self.color_labels[key] = lbl
 
         if s.get("show_hex", True):
-            lbl = CopyLabel(rgb_to_hex(r, g, b))
+            lbl = CopyLabel("")
             lbl.setObjectName("BigHexLabel")
             lbl.setAlignment(Qt.AlignRight)
             self.color_info_layout.addWidget(lbl)
+            self.color_labels["hex"] = lbl
 
-        if s.get("show_rgb", True): add_lbl(f"rgb({r}, {g}, {b})")
-        if s.get("show_hsl", True): add_lbl(rgb_to_hsl_string(r, g, b))
-        if s.get("show_cmyk", True): add_lbl("cmyk" + str(rgb_to_cmyk(r, g, b)))
+        if s.get("show_rgb", True): add_lbl("rgb")
+        if s.get("show_hsl", True): add_lbl("hsl")
+        if s.get("show_cmyk", True): add_lbl("cmyk")
+
+        self.shown_hex = None
+        self.show_color_values(color)
 
         self.update_history_ui()
         self.update_theory_tabs(r, g, b)
 
         QTimer.singleShot(10, self.adjustSize)
 
+    def show_color_values(self, color):
+        """
+        Puts a color into the top bar swatch and value labels, touching only the
+        ones whose text changes.
+        """
+        color = as_color(color)
+        r, g, b = color
+        hex_val = color.hex
+        if hex_val != self.shown_hex:
+            self.shown_hex = hex_val
+            self.selected_preview.setStyleSheet(f"background-color: {hex_val}; border: 1px solid #333; border-radius: 10px;")
+
+        cmyk_lbl = self.color_labels.get("cmyk")
+        if cmyk_lbl is not None:
+            cmyk, gamut_error = color.cmyk, 0.0
+            if self.press_profile:
+                values, errors = cmyk_array([color.rgb], self.press_profile)
+                cmyk, gamut_error = tuple(values[0].tolist()), float(errors[0])
+            cmyk_lbl.set_gamut_error(gamut_error)
+
+        formats = {
+            "hex": lambda: hex_val,
+            "rgb": lambda: f"rgb({r}, {g}, {b})",
+            "hsl": lambda: color.hsl_string,
+            "cmyk": lambda: "cmyk" + str(cmyk),
+        }
+        for key, lbl in self.color_labels.items():
+            text = formats[key]()
+            if lbl.text() != text:
+                lbl.setText(text)
+
+    def load_press_profile(self):
+        """
+        Bytes of the CMYK press profile chosen in settings, or None for the plain formula.
+        """
+        path = self.app_settings.get("cmyk_profile")
+        profile = read_profile(path)
+        if path and not is_cmyk_profile(profile):
+            print(f"ICC Error: {path} is not a CMYK profile")
+            return None
+        return profile
+
     def update_theory_tabs(self, r, g, b):
         current_idx = self.tabs.currentIndex()
         self.tabs.clear()
@@ -592,37 +1268,131 @@ class MainWindow(QMainWindow):
 
         for name in order:
             if name in palettes:
-                scroll = QScrollArea()
-                scroll.setWidgetResizable(True)
-                content = QWidget()
-                content.setObjectName("PaletteContainer")
-                layout = QHBoxLayout(content)
-                layout.setSpacing(10)
-                layout.setContentsMargins(10, 20, 10, 20)
-
-                layout.addStretch(1)
-                colors = palettes[name]
-                for i, c_data in enumerate(colors):
-                    if i > 0:
-                        vline = QFrame()
-                        vline.setFrameShape(QFrame.VLine)
-                        vline.setFrameShadow(QFrame.Sunken)
-                        vline.setFixedWidth(1)
-                        vline.setStyleSheet("background-color: #333333;")
-                        vline.setFixedHeight(40)
-                        layout.addWidget(vline)
-
-                    item = PaletteItem(*c_data['rgb'], self.app_settings)
-                    layout.addWidget(item)
-
-                layout.addStretch(1)
-                scroll.setWidget(content)
-                self.tabs.addTab(scroll, name)
+                self.add_palette_tab(name, palettes[name])
+
+        bg_hex = self.app_settings.get("accessible_bg", "#FFFFFF")
+        target_name = self.app_settings.get("accessible_target", "AA")
+        accessible = generate_accessible_palette(hex_to_rgb(bg_hex), (r, g, b), count=6,
+                                                 target_ratio=TARGET_LEVELS.get(target_name, WCAG_AA))
+        self.add_palette_tab("Accessible", accessible, self.create_accessible_controls(bg_hex, target_name))
+
+        if self.region_palette:
+            self.add_palette_tab("Region", self.region_palette, self.create_region_palette_header())
 
         if current_idx >= 0 and current_idx < self.tabs.count():
             self.tabs.setCurrentIndex(current_idx)
 
-if __name__ == "__main__":
+    def add_palette_tab(self, name, colors, header=None):
+        """
+        colors: dicts with 'rgb', plus 'ratio' for palettes solved against a background
+        or 'fraction' for colors extracted from a region.
+        """
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        content = QWidget()
+        content.setObjectName("PaletteContainer")
+        content_layout = QVBoxLayout(content)
+        content_layout.setContentsMargins(0, 0, 0, 0)
+        if header:
+            content_layout.addWidget(header)
+        layout = QHBoxLayout()
+        content_layout.addLayout(layout)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 20, 10, 20)
+
+        # CMYK for the whole tab in one conversion
+        palette = ColorArray([c['rgb'] for c in colors])
+        cmyk = gamut_errors = None
+        if colors and self.app_settings.get("show_cmyk", True):
+            cmyk, gamut_errors = cmyk_array(palette.rgb, self.press_profile)
+
+        layout.addStretch(1)
+        for i, c_data in enumerate(colors):
+            if i > 0:
+                vline = QFrame()
+                vline.setFrameShape(QFrame.VLine)
+                vline.setFrameShadow(QFrame.Sunken)
+                vline.setFixedWidth(1)
+                vline.setStyleSheet("background-color: #333333;")
+                vline.setFixedHeight(40)
+                layout.addWidget(vline)
+
+            item = PaletteItem(palette[i], self.app_settings,
+                               None if cmyk is None else (cmyk[i].tolist(), float(gamut_errors[i])))
+            note = None
+            if "ratio" in c_data:
+                note = f"{c_data['ratio']:.2f}:1"
+            elif "fraction" in c_data:
+                note = f"{c_data['fraction']:.0%}"
+            if note:
+                note_lbl = QLabel(note)
+                note_lbl.setObjectName("SuggestionLabel")
+                item.layout().addWidget(note_lbl, 0, Qt.AlignCenter)
+            layout.addWidget(item)
+
+        if not colors:
+            layout.addWidget(QLabel("No colors reach this target on this background."))
+        layout.addStretch(1)
+
+        if colors and self.app_settings.get("show_contrast_grid", False):
+            matrix = ContrastMatrixWidget(palette)
+            matrix.pair_clicked.connect(self.open_contrast_pair)
+            content_layout.addWidget(matrix, 0, Qt.AlignCenter)
+            content_layout.addSpacing(10)
+
+        scroll.setWidget(content)
+        self.tabs.addTab(scroll, name)
+
+    def create_accessible_controls(self, bg_hex, target_name):
+        controls = QWidget()
+        row = QHBoxLayout(controls)
+        row.setContentsMargins(10, 10, 10, 0)
+
+        row.addWidget(QLabel("Background:"))
+        for preset in ["#FFFFFF", "#121212", "#000000"]:
+            swatch = FlashFrame(preset, interactive=True)
+            swatch.setFixedSize(20, 20)
+            swatch.set_outline(preset == bg_hex)
+            swatch.default_style = swatch.styleSheet()
+            swatch.clicked.connect(lambda c=preset: self.set_accessible_option("accessible_bg", c))
+            row.addWidget(swatch)
+
+        row.addSpacing(15)
+        row.addWidget(QLabel("Target:"))
+        target_combo = QComboBox()
+        for name, ratio in TARGET_LEVELS.items():
+            target_combo.addItem(f"{name} ({ratio:g}:1)", name)
+        target_combo.setCurrentIndex(max(0, target_combo.findData(target_name)))
+        target_combo.currentIndexChanged.connect(
+            lambda _: self.set_accessible_option("accessible_target", target_combo.currentData()))
+        row.addWidget(target_combo)
+        row.addStretch()
+        return controls
+
+    def create_region_palette_header(self):
+        header = QWidget()
+        row = QHBoxLayout(header)
+        row.setContentsMargins(10, 10, 10, 0)
+        info = QLabel(self.region_palette_info)
+        info.setObjectName("SuggestionLabel")
+        row.addWidget(info)
+        row.addStretch()
+        add_btn = QPushButton("Add to History")
+        add_btn.clicked.connect(self.add_region_palette_to_history)
+        row.addWidget(add_btn)
+        return header
+
+    def set_accessible_option(self, key, value):
+        self.app_settings[key] = value
+        self.save_settings_file()
+        # Rebuilding deletes the control that sent this, so do it after the event
+        QTimer.singleShot(0, lambda: self.update_theory_tabs(*self.current_color))
+
+def run(launch_args):
+    """
+    Starts the GUI and runs until it quits. The hand-off to a running instance
+    happens before this module is imported (see NullColorPicker.py).
+    """
     os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
     app = QApplication(sys.argv)
     app.setStyleSheet(STYLESHEET)
@@ -630,4 +1400,18 @@ if __name__ == "__main__":
     window = MainWindow()
     window.show()
 
-    sys.exit(app.exec())
+    instance_server = SingleInstanceServer()
+    instance_server.message_received.connect(window.handle_launch_args)
+    if "--new-instance" not in launch_args:
+        instance_server.listen()
+
+    window.handle_launch_args(launch_args)
+
+    return app.exec()
+
+if __name__ == "__main__":
+    # Still works, but only NullColorPicker.py hands off before the imports above
+    launch_args = sys.argv[1:]
+    if "--new-instance" not in launch_args and send_to_running_instance(launch_args):
+        sys.exit(0)
+    sys.exit(run(launch_args))
@@ -0,0 +1,135 @@
+import time
+
+import numpy as np
+
+from color_logic import rgb_array_to_lab, delta_e_2000
+
+DEFAULT_THRESHOLD = 2.0  # CIEDE2000; about the smallest difference most people notice side by side
+
+def point_rect(x, y, sample_size=1):
+    """
+    The sample_size x sample_size area a point pin averages, centered like center_average.
+    """
+    size = max(1, sample_size)
+    return x - size // 2, y - size // 2, size, size
+
+def group_by_screen(rects, screens):
+    """
+    Groups (x, y, w, h) rects by the screen (x, y, w, h) holding their center, so each
+    group can be served by one grab of its bounding box. Rects off every screen form
+    one more group. Returns [((x, y, w, h) bounding box, [rect indices])].
+    """
+    groups = {}
+    for i, (x, y, w, h) in enumerate(rects):
+        cx, cy = x + w // 2, y + h // 2
+        key = next((s for s, (sx, sy, sw, sh) in enumerate(screens)
+                    if sx <= cx < sx + sw and sy <= cy < sy + sh), -1)
+        groups.setdefault(key, []).append(i)
+
+    result = []
+    for indices in groups.values():
+        x0 = min(rects[i][0] for i in indices)
+        y0 = min(rects[i][1] for i in indices)
+        x1 = max(rects[i][0] + rects[i][2] for i in indices)
+        y1 = max(rects[i][1] + rects[i][3] for i in indices)
+        result.append(((x0, y0, x1 - x0, y1 - y0), indices))
+    return result
+
+def sample_areas(grab_array, rects, groups):
+    """
+    Mean color of every rect, with one grab_array(x, y, w, h) call per group.
+    Returns an (N, 3) uint8 array in rect order (means are truncated like center_average).
+    Rects are in logical pixels; on HiDPI screens the grab comes back in device pixels,
+    so they are scaled by the grab's size over the box's before slicing.
+    """
+    colors = np.zeros((len(rects), 3), dtype=np.uint8)
+    for (bx, by, bw, bh), indices in groups:
+        pixels = grab_array(bx, by, bw, bh)
+        sy, sx = pixels.shape[0] / bh, pixels.shape[1] / bw
+        for i in indices:
+            x, y, w, h = rects[i]
+            r0, c0 = round((y - by) * sy), round((x - bx) * sx)
+            r1, c1 = max(r0 + 1, round((y - by + h) * sy)), max(c0 + 1, round((x - bx + w) * sx))
+            block = pixels[r0:r1, c0:c1].reshape(-1, 3)
+            if len(block):
+                colors[i] = block.sum(axis=0) // len(block)
+    return colors
+
+class Pin:
+    """
+    A watched point or region. `reference` is the color the last drift was measured
+    from; it moves to the new color whenever a drift is reported. `delta_e` is the
+    current color's distance from the reference.
+    """
+    __slots__ = ("rect", "label", "color", "reference", "delta_e", "changed_at")
+
+    def __init__(self, rect, label):
+        self.rect = tuple(rect)
+        self.label = label
+        self.color = None
+        self.reference = None
+        self.delta_e = 0.0
+        self.changed_at = None
+
+class PinMonitor:
+    """
+    The pinned points and regions with their latest colors. `version` changes with
+    the pin set, so results sampled for an older set can be recognized and dropped.
+    """
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.pins = []
+        self.threshold = threshold
+        self.version = 0
+        self._counter = 0
+
+    def __len__(self):
+        return len(self.pins)
+
+    def add(self, rect, label=None, kind="point"):
+        self._counter += 1
+        if label is None:
+            label = f"{kind.title()} {self._counter}"
+        pin = Pin(rect, label)
+        self.pins.append(pin)
+        self.version += 1
+        return pin
+
+    def remove(self, index):
+        del self.pins[index]
+        self.version += 1
+
+    def clear(self):
+        self.pins = []
+        self.version += 1
+
+    def rects(self):
+        return [pin.rect for pin in self.pins]
+
+    def update(self, colors, timestamp=None):
+        """
+        Stores an (N, 3) sample of every pin, in pin order. Returns the drifts as
+        [(pin, old color, new color, delta E)] for pins that moved more than threshold
+        from their reference.
+        """
+        colors = np.asarray(colors, dtype=np.uint8)
+        if len(colors) != len(self.pins):
+            raise ValueError(f"expected {len(self.pins)} colors, got {len(colors)}")
+        if not len(colors):
+            return []
+        timestamp = time.time() if timestamp is None else timestamp
+
+        refs = np.array([pin.reference or (0, 0, 0) for pin in self.pins], dtype=np.uint8)
+        de = delta_e_2000(rgb_array_to_lab(refs), rgb_array_to_lab(colors))
+
+        drifts = []
+        for pin, color, d in zip(self.pins, colors.tolist(), de.tolist()):
+            color = tuple(color)
+            pin.color = color
+            pin.delta_e = d
+            if pin.reference is None or d > self.threshold:
+                if pin.reference is not None:
+                    drifts.append((pin, pin.reference, color, d))
+                pin.reference = color
+                pin.delta_e = 0.0
+                pin.changed_at = timestamp
+        return drifts
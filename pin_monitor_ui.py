@@ -0,0 +1,132 @@
+import time
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+                               QDoubleSpinBox, QCheckBox, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QColor
+
+from color_logic import rgb_to_hex
+from pin_monitor import PinMonitor, DEFAULT_THRESHOLD
+
+DEFAULT_INTERVAL_MS = 250
+
+class PinMonitorPanel(QDialog):
+    """
+    Side panel listing pinned points and regions with their live colors. The main
+    window samples all pins together and hands the colors to update_colors().
+    """
+    pin_point_requested = Signal()
+    pin_region_requested = Signal()
+    interval_changed = Signal(int)
+    pins_changed = Signal()
+    color_drifted = Signal(str, str, str, float)  # label, old hex, new hex, delta E
+
+    COLUMNS = ("", "Pin", "Color", "ΔE", "Changed")
+
+    def __init__(self, monitor=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pinned Colors")
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.WindowStaysOnTopHint)
+        self.monitor = monitor or PinMonitor()
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        buttons = QHBoxLayout()
+        point_btn = QPushButton("Pin Point…")
+        point_btn.clicked.connect(self.pin_point_requested.emit)
+        buttons.addWidget(point_btn)
+        region_btn = QPushButton("Pin Region…")
+        region_btn.clicked.connect(self.pin_region_requested.emit)
+        buttons.addWidget(region_btn)
+        self.remove_btn = QPushButton("Remove")
+        self.remove_btn.clicked.connect(self.remove_selected)
+        buttons.addWidget(self.remove_btn)
+        layout.addLayout(buttons)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setMinimumSize(360, 180)
+        layout.addWidget(self.table)
+
+        options = QHBoxLayout()
+        options.addWidget(QLabel("Notify above ΔE"))
+        self.threshold_spin = QDoubleSpinBox()
+        self.threshold_spin.setRange(0.5, 50.0)
+        self.threshold_spin.setSingleStep(0.5)
+        self.threshold_spin.setValue(self.monitor.threshold or DEFAULT_THRESHOLD)
+        self.threshold_spin.valueChanged.connect(lambda v: setattr(self.monitor, "threshold", v))
+        options.addWidget(self.threshold_spin)
+        options.addWidget(QLabel("Every"))
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(50, 5000)
+        self.interval_spin.setSingleStep(50)
+        self.interval_spin.setValue(DEFAULT_INTERVAL_MS)
+        self.interval_spin.setSuffix(" ms")
+        self.interval_spin.valueChanged.connect(self.interval_changed.emit)
+        options.addWidget(self.interval_spin)
+        self.notify_check = QCheckBox("Notify")
+        self.notify_check.setChecked(True)
+        options.addWidget(self.notify_check)
+        layout.addLayout(options)
+
+        self.status_lbl = QLabel("Pin points or regions to watch their colors.")
+        self.status_lbl.setObjectName("ResultLabel")
+        layout.addWidget(self.status_lbl)
+
+    @property
+    def interval(self):
+        return self.interval_spin.value()
+
+    def add_pin(self, rect, label=None, kind="point"):
+        pin = self.monitor.add(rect, label, kind)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for col in range(len(self.COLUMNS)):
+            self.table.setItem(row, col, QTableWidgetItem(""))
+        x, y, w, h = pin.rect
+        self.table.item(row, 1).setText(pin.label)
+        self.table.item(row, 1).setToolTip(f"{w}x{h} at {x}, {y}")
+        self.pins_changed.emit()
+        return pin
+
+    def remove_selected(self):
+        rows = sorted({i.row() for i in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.monitor.remove(row)
+            self.table.removeRow(row)
+        if rows:
+            self.pins_changed.emit()
+
+    def update_colors(self, colors, timestamp=None):
+        """
+        colors: (N, 3) sRGB samples in pin order. Only cells whose text changes are touched.
+        """
+        drifts = self.monitor.update(colors, timestamp)
+        for row, pin in enumerate(self.monitor.pins):
+            hex_val = rgb_to_hex(*pin.color)
+            color_item = self.table.item(row, 2)
+            if color_item.text() != hex_val:
+                color_item.setText(hex_val)
+                self.table.item(row, 0).setBackground(QColor(hex_val))
+            de_text = f"{pin.delta_e:.1f}"
+            if self.table.item(row, 3).text() != de_text:
+                self.table.item(row, 3).setText(de_text)
+            changed = time.strftime("%H:%M:%S", time.localtime(pin.changed_at))
+            if self.table.item(row, 4).text() != changed:
+                self.table.item(row, 4).setText(changed)
+
+        for pin, old, new, de in drifts:
+            old_hex, new_hex = rgb_to_hex(*old), rgb_to_hex(*new)
+            self.status_lbl.setText(f"{pin.label}: {old_hex} → {new_hex} (ΔE {de:.1f})")
+            if self.notify_check.isChecked():
+                self.color_drifted.emit(pin.label, old_hex, new_hex, de)
+        return drifts
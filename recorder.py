@@ -0,0 +1,120 @@
+import csv
+
+import numpy as np
+
+from color_logic import rgb_to_hex
+
+DEFAULT_RATE = 60
+DEFAULT_CAPACITY = DEFAULT_RATE * 60 * 5  # five minutes at 60 Hz
+
+class ColorRecorder:
+    """
+    Timeline of sampled colors in a preallocated ring buffer: recording for hours
+    keeps memory flat, the oldest samples are overwritten once it is full.
+
+    Each sample also gets a moving average over the last `window` samples, which
+    steadies flickering or video content. The average is kept as a running sum,
+    so an append costs the same for any window.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, window=1):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.points = np.zeros((capacity, 2), dtype=np.int32)
+        self.colors = np.zeros((capacity, 3), dtype=np.uint8)
+        self.averaged = np.zeros((capacity, 3), dtype=np.uint8)
+        self.count = 0  # samples ever appended; the newest is at (count - 1) % capacity
+        self.window = 1
+        self._sum = [0, 0, 0]
+        self.set_window(window)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        self.count = 0
+        self._sum = [0, 0, 0]
+
+    def set_window(self, window):
+        """
+        Changes the averaging window (1 = off); later samples use the new window.
+        """
+        self.window = max(1, min(int(window), self.capacity))
+        recent = self._recent(self.window)
+        self._sum = [int(s) for s in self.colors[recent].sum(axis=0, dtype=np.int64)]
+
+    def _recent(self, n):
+        n = min(n, len(self))
+        return (np.arange(self.count - n, self.count)) % self.capacity
+
+    def append(self, timestamp, x, y, color):
+        i = self.count % self.capacity
+        r, g, b = color
+        s = self._sum
+        if self.count >= self.window:
+            # Read the sample leaving the window before slot i may overwrite it
+            old = self.colors[(self.count - self.window) % self.capacity]
+            s[0] -= int(old[0])
+            s[1] -= int(old[1])
+            s[2] -= int(old[2])
+        s[0] += r
+        s[1] += g
+        s[2] += b
+        n = min(self.count + 1, self.window)
+
+        self.times[i] = timestamp
+        self.points[i] = (x, y)
+        self.colors[i] = (r, g, b)
+        self.averaged[i] = ((s[0] + n // 2) // n, (s[1] + n // 2) // n, (s[2] + n // 2) // n)
+        self.count += 1
+
+    def latest(self):
+        """
+        (color, averaged color) of the newest sample as RGB tuples, or None.
+        """
+        if not self.count:
+            return None
+        i = (self.count - 1) % self.capacity
+        return tuple(self.colors[i].tolist()), tuple(self.averaged[i].tolist())
+
+    def rate(self, samples=60):
+        """
+        Achieved sample rate (Hz) over the most recent samples.
+        """
+        recent = self._recent(samples)
+        if len(recent) < 2:
+            return 0.0
+        span = self.times[recent[-1]] - self.times[recent[0]]
+        return (len(recent) - 1) / span if span > 0 else 0.0
+
+    def timeline(self):
+        """
+        Chronological copies of the buffer: {"times", "points", "colors", "averaged"}.
+        """
+        order = self._recent(self.capacity)
+        return {"times": self.times[order], "points": self.points[order],
+                "colors": self.colors[order], "averaged": self.averaged[order]}
+
+    def recent_averaged(self, n):
+        return self.averaged[self._recent(n)]
+
+    def export_csv(self, path, convert_colors=None):
+        """
+        Writes the timeline to CSV, time in seconds from the first kept sample.
+        convert_colors(colors, points), if given, converts (N, 3) colors sampled at
+        N (x, y) points, e.g. ScreenProfiles.convert_colors with each screen's profile.
+        """
+        data = self.timeline()
+        colors, averaged = data["colors"], data["averaged"]
+        if convert_colors is not None and len(colors):
+            points = data["points"].tolist()
+            colors = np.asarray(convert_colors(colors, points))
+            averaged = np.asarray(convert_colors(averaged, points))
+        times = data["times"] - data["times"][0] if len(colors) else data["times"]
+
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time_s", "x", "y", "hex", "r", "g", "b",
+                             "avg_hex", "avg_r", "avg_g", "avg_b"])
+            for t, (x, y), c, a in zip(times.tolist(), data["points"].tolist(),
+                                       colors.tolist(), averaged.tolist()):
+                writer.writerow([f"{t:.4f}", x, y, rgb_to_hex(*c), *c, rgb_to_hex(*a), *a])
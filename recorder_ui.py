@@ -0,0 +1,200 @@
+import numpy as np
+
+from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                               QPushButton, QComboBox, QSpinBox, QFileDialog, QFrame)
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QPainter, QColor
+
+from recorder import ColorRecorder, DEFAULT_RATE
+from color_logic import rgb_to_hex
+from image_utils import array_to_qimage
+
+# The dialog redraws at this interval, not per sample, so 60 Hz recording
+# never waits on painting
+DISPLAY_REFRESH_MS = 100
+
+class TimelineStrip(QWidget):
+    """
+    The most recent averaged samples as one-pixel color columns, newest on the right.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(36)
+        self.image = None
+
+    def set_colors(self, colors):
+        colors = np.asarray(colors, dtype=np.uint8).reshape(1, -1, 3)
+        self.image = array_to_qimage(colors) if colors.shape[1] else None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        if self.image is not None:
+            w = self.image.width()
+            painter.drawImage(self.rect().adjusted(self.width() - w, 0, 0, 0), self.image)
+        painter.setPen(QColor("#333333"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+class RecorderDialog(QDialog):
+    """
+    Controls and live view for recording the color under the cursor or at a pinned
+    point. The main window does the sampling and appends into `recorder`; this
+    dialog only reads it on a slow timer.
+    """
+    recording_changed = Signal(bool)
+    rate_changed = Signal(int)
+    pin_requested = Signal()
+    source_changed = Signal()
+
+    def __init__(self, recorder=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Color Recorder")
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.WindowStaysOnTopHint)
+        self.recorder = recorder or ColorRecorder()
+        self.pinned_point = None
+        self.convert_colors = None  # set by the owner to convert exported colors per sample point
+        self.shown_count = -1
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(DISPLAY_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Source"), 0, 0)
+        self.source_combo = QComboBox()
+        self.source_combo.addItem("Follow Cursor", "cursor")
+        self.source_combo.addItem("Pinned Point", "pinned")
+        self.source_combo.currentIndexChanged.connect(self.on_source_changed)
+        grid.addWidget(self.source_combo, 0, 1)
+        self.pin_btn = QPushButton("Pin Point…")
+        self.pin_btn.clicked.connect(self.pin_requested.emit)
+        grid.addWidget(self.pin_btn, 0, 2)
+
+        grid.addWidget(QLabel("Rate"), 1, 0)
+        self.rate_spin = QSpinBox()
+        self.rate_spin.setRange(1, 120)
+        self.rate_spin.setValue(DEFAULT_RATE)
+        self.rate_spin.setSuffix(" Hz")
+        self.rate_spin.valueChanged.connect(self.rate_changed.emit)
+        grid.addWidget(self.rate_spin, 1, 1)
+
+        grid.addWidget(QLabel("Average"), 2, 0)
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(1, 240)
+        self.window_spin.setValue(self.recorder.window)
+        self.window_spin.setSuffix(" frames")
+        self.window_spin.setToolTip("Moving average over this many samples, to steady flicker and video")
+        self.window_spin.valueChanged.connect(self.recorder.set_window)
+        grid.addWidget(self.window_spin, 2, 1)
+        layout.addLayout(grid)
+
+        current = QHBoxLayout()
+        self.swatch = QFrame()
+        self.swatch.setFixedSize(48, 48)
+        current.addWidget(self.swatch)
+        self.value_lbl = QLabel("-")
+        self.value_lbl.setStyleSheet("font-weight: bold;")
+        current.addWidget(self.value_lbl, 1)
+        layout.addLayout(current)
+
+        self.strip = TimelineStrip()
+        layout.addWidget(self.strip)
+
+        self.stats_lbl = QLabel("")
+        self.stats_lbl.setObjectName("ResultLabel")
+        layout.addWidget(self.stats_lbl)
+
+        buttons = QHBoxLayout()
+        self.record_btn = QPushButton("Record")
+        self.record_btn.setCheckable(True)
+        self.record_btn.toggled.connect(self.on_record_toggled)
+        buttons.addWidget(self.record_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear)
+        buttons.addWidget(clear_btn)
+        export_btn = QPushButton("Export CSV…")
+        export_btn.clicked.connect(self.export_csv)
+        buttons.addWidget(export_btn)
+        layout.addLayout(buttons)
+
+    @property
+    def rate(self):
+        return self.rate_spin.value()
+
+    @property
+    def follows_cursor(self):
+        return self.source_combo.currentData() == "cursor" or self.pinned_point is None
+
+    def set_pinned_point(self, x, y):
+        self.pinned_point = (x, y)
+        self.source_combo.setCurrentIndex(self.source_combo.findData("pinned"))
+        self.source_changed.emit()
+        self.refresh(force=True)
+
+    def on_source_changed(self):
+        if self.source_combo.currentData() == "pinned" and self.pinned_point is None:
+            self.pin_requested.emit()
+        self.source_changed.emit()
+        self.refresh(force=True)
+
+    def set_recording(self, recording):
+        self.record_btn.setChecked(recording)
+
+    def on_record_toggled(self, recording):
+        self.record_btn.setText("Stop" if recording else "Record")
+        if recording:
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+            self.refresh(force=True)
+        self.recording_changed.emit(recording)
+
+    def clear(self):
+        self.recorder.clear()
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        rec = self.recorder
+        if rec.count == self.shown_count and not force:
+            return
+        self.shown_count = rec.count
+
+        latest = rec.latest()
+        if latest:
+            color, averaged = latest
+            self.swatch.setStyleSheet(f"background-color: {rgb_to_hex(*averaged)}; border: 1px solid #333;")
+            text = rgb_to_hex(*color)
+            if rec.window > 1:
+                text += f"  ·  average {rgb_to_hex(*averaged)}"
+            self.value_lbl.setText(text)
+        else:
+            self.swatch.setStyleSheet("background-color: transparent; border: 1px solid #333;")
+            self.value_lbl.setText("-")
+        self.strip.set_colors(rec.recent_averaged(max(1, self.strip.width() - 2)))
+
+        source = "cursor" if self.follows_cursor else f"point {self.pinned_point[0]}, {self.pinned_point[1]}"
+        seconds = rec.capacity / max(1, self.rate)
+        self.stats_lbl.setText(f"{len(rec):,} samples at {rec.rate():.1f} Hz from {source}  ·  "
+                               f"buffer keeps the last {seconds / 60:.0f} min at {self.rate} Hz")
+
+    def export_csv(self):
+        if not len(self.recorder):
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Timeline", "color_timeline.csv",
+                                              "CSV Files (*.csv)")
+        if path:
+            try:
+                self.recorder.export_csv(path, self.convert_colors)
+            except OSError as e:
+                print(f"Export Error: {e}")
+
+    def hideEvent(self, event):
+        self.set_recording(False)
+        super().hideEvent(event)
@@ -0,0 +1,336 @@
+import math
+import ctypes
+import platform
+from functools import partial
+
+import numpy as np
+
+from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                               QLineEdit, QPushButton, QComboBox, QCheckBox)
+from PySide6.QtCore import Qt, Signal, QTimer, QRect, QPoint
+from PySide6.QtGui import QColor, QPainter, QPen, QImage, QGuiApplication
+
+from contrast_utils import region_contrast, hex_to_rgb, TARGET_LEVELS, WCAG_AA_LARGE
+from css_colors import parse_color
+
+IS_WINDOWS = platform.system() == 'Windows'
+WDA_EXCLUDEFROMCAPTURE = 0x11
+REFRESH_MS = 250
+OVERLAY_SETTLE_MS = 100  # time for a hidden overlay to leave the screen before a grab
+REGION_CONTRAST_TOKEN = "region-contrast"
+PERCENTILES = (1, 5, 50)
+HEATMAP_MAX_PIXELS = 1 << 19  # a full-HD region is shown at half resolution
+
+# Heatmap colors (RGBA) by severity: passes, fails the target, fails even AA Large
+HEATMAP_PALETTE = np.array([
+    [0, 0, 0, 0],
+    [255, 193, 7, 110],
+    [244, 67, 54, 170],
+], dtype=np.uint8)
+
+def heatmap_rgba(stats, severe_ratio=WCAG_AA_LARGE, max_pixels=HEATMAP_MAX_PIXELS):
+    """
+    (H, W, 4) overlay image from region_contrast() output. Larger regions are binned
+    to at most max_pixels, each cell showing the worst pixel under it.
+    """
+    ratios = stats["ratios"]
+    factor = math.ceil(math.sqrt(ratios.size / max_pixels))
+    if factor > 1:
+        ratios = worst_in_blocks(ratios, factor)
+        fails = ratios < stats["target"]
+    else:
+        fails = stats["fail_mask"]
+    severity = fails.astype(np.uint8)
+    severity += ratios < severe_ratio
+    # One 4-byte gather per cell instead of four single-byte ones
+    return HEATMAP_PALETTE.view(np.uint32)[:, 0][severity].view(np.uint8).reshape(severity.shape + (4,))
+
+def worst_in_blocks(ratios, factor):
+    """
+    Minimum of each factor x factor block of ratios (partial blocks at the edges included).
+    """
+    h, w = ratios.shape
+    out = np.full((-(-h // factor), -(-w // factor)), np.inf, dtype=ratios.dtype)
+    for dy in range(factor):
+        for dx in range(factor):
+            part = ratios[dy::factor, dx::factor]
+            view = out[:part.shape[0], :part.shape[1]]
+            np.minimum(view, part, out=view)
+    return out
+
+def analyze_region(text_rgb, target, heatmap, pixels):
+    """
+    (region_contrast stats, heatmap RGBA or None) of a grab. Runs on the sampling worker.
+    """
+    if pixels.size == 0:
+        return None
+    stats = region_contrast(text_rgb, pixels, target, PERCENTILES)
+    return stats, heatmap_rgba(stats) if heatmap else None
+
+class RegionSelectWindow(QWidget):
+    """
+    Dims the whole desktop and lets the user drag out a rectangle.
+    Emits region_selected with the rectangle in global coordinates.
+    """
+    region_selected = Signal(QRect)
+    cancelled = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setCursor(Qt.CrossCursor)
+        self.setGeometry(QGuiApplication.primaryScreen().virtualGeometry())
+        self.origin = None
+        self.current = None
+
+    def selection(self):
+        if self.origin is None or self.current is None:
+            return QRect()
+        return QRect(self.origin, self.current).normalized()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 60))
+        sel = self.selection()
+        if not sel.isEmpty():
+            # Clear the selected area so the user sees what they are measuring
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.fillRect(sel, Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            painter.setPen(QPen(QColor("#ffffff"), 1, Qt.DashLine))
+            painter.drawRect(sel)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.origin = self.current = event.position().toPoint()
+            self.update()
+        elif event.button() == Qt.RightButton:
+            self.close()
+            self.cancelled.emit()
+
+    def mouseMoveEvent(self, event):
+        if self.origin is not None:
+            self.current = event.position().toPoint()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self.origin is None:
+            return
+        sel = self.selection()
+        self.close()
+        if sel.width() < 2 or sel.height() < 2:
+            self.cancelled.emit()
+            return
+        self.region_selected.emit(sel.translated(self.geometry().topLeft()))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.close()
+            self.cancelled.emit()
+        else:
+            super().keyPressEvent(event)
+
+class HeatmapOverlay(QWidget):
+    """
+    Click-through window over the measured region that tints failing pixels.
+    On Windows 10 2004+ it is excluded from screen capture, so live refreshes can
+    grab underneath it; elsewhere the dialog hides it around each grab.
+    """
+    def __init__(self):
+        super().__init__()
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool
+                            | Qt.WindowTransparentForInput)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.image = QImage()
+        self.worst_pos = None
+        self.excluded_from_capture = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if IS_WINDOWS and not self.excluded_from_capture:
+            try:
+                hwnd = int(self.winId())
+                self.excluded_from_capture = bool(
+                    ctypes.windll.user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE))
+            except Exception:
+                self.excluded_from_capture = False
+
+    def set_heatmap(self, rgba, worst_pos=None):
+        rgba = np.ascontiguousarray(rgba)
+        h, w = rgba.shape[:2]
+        self.image = QImage(rgba.data, w, h, w * 4, QImage.Format_RGBA8888).copy()
+        self.worst_pos = worst_pos
+        self.update()
+
+    def paintEvent(self, event):
+        if self.image.isNull():
+            return
+        painter = QPainter(self)
+        # The grab may be in device pixels; stretch it over the logical rectangle
+        painter.drawImage(self.rect(), self.image)
+        if self.worst_pos is not None:
+            sx = self.width() / self.image.width()
+            sy = self.height() / self.image.height()
+            center = QPoint(int((self.worst_pos[0] + 0.5) * sx), int((self.worst_pos[1] + 0.5) * sy))
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor("#ffffff"), 2))
+            painter.drawEllipse(center, 6, 6)
+            painter.setPen(QPen(QColor("#000000"), 1))
+            painter.drawEllipse(center, 8, 8)
+
+class RegionContrastDialog(QDialog):
+    """
+    Worst-case and percentile contrast of a text color over a screen region,
+    recomputed live from a fresh grab while 'Live' is on.
+    Grabs and stats run on sampler (a BackgroundSampler), newest request wins.
+    """
+    request_reselect = Signal()
+
+    def __init__(self, sampler, region, text_hex="#FFFFFF", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Region Contrast")
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.WindowStaysOnTopHint)
+        self.sampler = sampler
+        self.region = QRect(region)
+        self.text_hex = text_hex
+        self.last_stats = None
+        # Results of requests older than this were made for another region or setting
+        self.min_seq = 0
+
+        self.overlay = HeatmapOverlay()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.sampler.region_ready.connect(self.on_region_ready)
+
+        self.setup_ui()
+        self.invalidate()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Text"))
+        self.text_le = QLineEdit(self.text_hex)
+        self.text_le.setFixedWidth(80)
+        self.text_le.textChanged.connect(self.on_text_changed)
+        controls.addWidget(self.text_le)
+        self.target_combo = QComboBox()
+        for name, ratio in TARGET_LEVELS.items():
+            self.target_combo.addItem(f"{name} ({ratio:g}:1)", name)
+        self.target_combo.currentIndexChanged.connect(self.invalidate)
+        controls.addWidget(self.target_combo)
+        layout.addLayout(controls)
+
+        grid = QGridLayout()
+        self.stat_labels = {}
+        rows = [("worst", "Worst case"), (1, "1st percentile"), (5, "5th percentile"),
+                (50, "Median"), ("fail", "Failing pixels")]
+        for row, (key, title) in enumerate(rows):
+            grid.addWidget(QLabel(title, objectName="ResultLabel"), row, 0)
+            val = QLabel("-")
+            val.setStyleSheet("font-weight: bold;")
+            grid.addWidget(val, row, 1)
+            self.stat_labels[key] = val
+        layout.addLayout(grid)
+
+        toggles = QHBoxLayout()
+        self.live_check = QCheckBox("Live")
+        self.live_check.toggled.connect(self.set_live)
+        toggles.addWidget(self.live_check)
+        self.heatmap_check = QCheckBox("Heatmap")
+        self.heatmap_check.toggled.connect(self.invalidate)
+        if not IS_WINDOWS:
+            self.heatmap_check.setToolTip("Hidden while Live is on, so the overlay doesn't end up in the grabs")
+        toggles.addWidget(self.heatmap_check)
+        reselect_btn = QPushButton("Reselect")
+        reselect_btn.clicked.connect(self.request_reselect.emit)
+        toggles.addWidget(reselect_btn)
+        layout.addLayout(toggles)
+
+    def set_region(self, region):
+        self.region = QRect(region)
+        self.invalidate()
+
+    def set_text_color(self, hex_val):
+        self.text_le.setText(hex_val)
+
+    def on_text_changed(self, text):
+        try:
+            color, _alpha = parse_color(text)
+        except ValueError:
+            return
+        self.text_hex = color.hex
+        self.invalidate()
+
+    def set_live(self, live):
+        if live:
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+            if self.isVisible():
+                # Bring back the heatmap kept down while live (see overlay_in_grabs)
+                self.invalidate()
+
+    def overlay_in_grabs(self):
+        return not self.overlay.excluded_from_capture
+
+    def invalidate(self):
+        """
+        Region, text color, target or heatmap changed: drop results still in flight and
+        measure again.
+        """
+        if self.overlay.isVisible() and self.overlay_in_grabs():
+            # One hide per change, never per live tick, so the overlay doesn't flicker
+            self.overlay.hide()
+            QTimer.singleShot(OVERLAY_SETTLE_MS, lambda: self.refresh(invalidate=True))
+        else:
+            self.refresh(invalidate=True)
+
+    def refresh(self, invalidate=False):
+        r = self.region
+        heatmap = self.heatmap_check.isChecked() and not (self.live_check.isChecked() and self.overlay_in_grabs())
+        analyze = partial(analyze_region, hex_to_rgb(self.text_hex),
+                          TARGET_LEVELS[self.target_combo.currentData()], heatmap)
+        seq = self.sampler.request_region((r.x(), r.y(), r.width(), r.height()), analyze,
+                                          token=REGION_CONTRAST_TOKEN)
+        if invalidate:
+            self.min_seq = seq
+
+    def on_region_ready(self, result):
+        if result.token != REGION_CONTRAST_TOKEN or result.seq < self.min_seq or result.value is None:
+            return
+        stats, rgba = result.value
+        self.last_stats = stats
+
+        self.stat_labels["worst"].setText(f"{stats['worst']:.2f}:1")
+        for p, ratio in stats["percentiles"].items():
+            self.stat_labels[p].setText(f"{ratio:.2f}:1")
+        self.stat_labels["fail"].setText(f"{stats['fail_fraction']:.1%}")
+        self.update_overlay(rgba)
+
+    def update_overlay(self, rgba):
+        if rgba is None or not self.heatmap_check.isChecked() or not self.isVisible():
+            self.overlay.hide()
+            return
+        self.overlay.setGeometry(self.region)
+        # Put the worst-pixel marker on the heatmap's grid, which is binned for large regions
+        h, w = self.last_stats["ratios"].shape
+        x, y = self.last_stats["worst_pos"]
+        self.overlay.set_heatmap(rgba, (x * rgba.shape[1] // w, y * rgba.shape[0] // h))
+        self.overlay.show()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.last_stats is not None:
+            # Shown again (e.g. a cancelled reselect): the screen and heatmap may be stale
+            self.invalidate()
+
+    def hideEvent(self, event):
+        # Covers close and Esc (reject), which hides without a closeEvent
+        self.live_check.setChecked(False)
+        self.overlay.hide()
+        super().hideEvent(event)
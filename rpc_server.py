@@ -0,0 +1,504 @@
+import os
+import hmac
+import json
+import base64
+import asyncio
+import secrets
+import threading
+import concurrent.futures
+
+import numpy as np
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+
+from color_logic import (generate_palettes, rgb_to_hex, rgb_to_cmyk, rgb_to_hls_wrapper,
+                         generate_accessible_palette, HARMONY_SCHEMES)
+from contrast_utils import calculate_contrast, suggest_passing_colors, contrast_matrix, wcag_masks
+from css_colors import parse_rgb
+from dominant_colors import dominant_colors
+from icc_utils import (read_profile, is_cmyk_profile, srgb_to_press_cmyk, find_cmyk_profiles,
+                       GAMUT_WARNING_DELTA_E)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47321
+GUI_CALL_TIMEOUT = 5.0
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+# Clients read the per-session token from here; only the user running the app can
+TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".nullcolorpicker", "rpc-token")
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32001
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+# --- Method Implementations ---
+
+def _parse_color(value):
+    """
+    Accepts any CSS color string ("#RRGGBB", "RRGGBB", "rgb(...)", "oklch(...)", names, ...;
+    alpha is dropped) or [r, g, b].
+    """
+    if isinstance(value, str):
+        try:
+            r, g, b = parse_rgb(value)
+        except ValueError:
+            raise RpcError(INVALID_PARAMS, f"Invalid color: {value!r}")
+        return r, g, b
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        try:
+            r, g, b = (int(c) for c in value)
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, f"Invalid color: {value!r}")
+        if all(0 <= c <= 255 for c in (r, g, b)):
+            return r, g, b
+    raise RpcError(INVALID_PARAMS, f"Invalid color: {value!r}")
+
+def _convert_one(rgb, formats, cmyk=None):
+    r, g, b = rgb
+    out = {}
+    for fmt in formats:
+        if fmt == "hex":
+            out["hex"] = rgb_to_hex(r, g, b)
+        elif fmt == "rgb":
+            out["rgb"] = [r, g, b]
+        elif fmt == "hsl":
+            h, l, s = rgb_to_hls_wrapper(r, g, b)
+            out["hsl"] = [round(h * 360, 2), round(s * 100, 2), round(l * 100, 2)]
+        elif fmt == "cmyk":
+            if cmyk is None:
+                out["cmyk"] = list(rgb_to_cmyk(r, g, b))
+            else:
+                values, gamut_error = cmyk
+                out["cmyk"] = values
+                out["in_gamut"] = gamut_error <= GAMUT_WARNING_DELTA_E
+        else:
+            raise RpcError(INVALID_PARAMS, f"Unknown format: {fmt!r}")
+    return out
+
+def rpc_convert(colors, to=("hex", "rgb", "hsl", "cmyk"), cmyk_profile=None):
+    """
+    Converts a list of colors in one call. Each entry gets one key per requested format.
+    With cmyk_profile (path of a CMYK ICC profile), CMYK comes from that press profile,
+    all colors in one transform, and each entry also gets "in_gamut". The "convert"
+    method only passes paths that went through resolve_cmyk_profile.
+    """
+    if not isinstance(colors, list):
+        raise RpcError(INVALID_PARAMS, "colors must be a list")
+    formats = [to] if isinstance(to, str) else list(to)
+    rgbs = [_parse_color(c) for c in colors]
+    if not cmyk_profile or "cmyk" not in formats:
+        return [_convert_one(rgb, formats) for rgb in rgbs]
+
+    profile = read_profile(cmyk_profile)
+    if not is_cmyk_profile(profile):
+        raise RpcError(INVALID_PARAMS, f"Not a CMYK profile: {cmyk_profile!r}")
+    cmyk, gamut_errors = srgb_to_press_cmyk(rgbs, profile)
+    return [_convert_one(rgb, formats, (values, error))
+            for rgb, values, error in zip(rgbs, cmyk.tolist(), gamut_errors.tolist())]
+
+def resolve_cmyk_profile(key, profiles):
+    """
+    Path of the press profile a client named, looked up among the allowed
+    [(description, path)] by path, file name or description. Clients can only pick
+    from these; arbitrary paths are never opened.
+    """
+    if not isinstance(key, str):
+        raise RpcError(INVALID_PARAMS, "cmyk_profile must be a string")
+    wanted = os.path.normcase(key)
+    for description, path in profiles:
+        if wanted in (os.path.normcase(path), os.path.normcase(os.path.basename(path))) \
+                or key.lower() == description.lower():
+            return path
+    raise RpcError(INVALID_PARAMS, f"Unknown CMYK profile: {key!r} (see cmyk_profiles)")
+
+def rpc_palettes(color):
+    r, g, b = _parse_color(color)
+    palettes = generate_palettes(r, g, b)
+    return {name: [c["hex"] for c in colors] for name, colors in palettes.items()}
+
+def rpc_contrast(fg, bg):
+    fg_hex = rgb_to_hex(*_parse_color(fg))
+    bg_hex = rgb_to_hex(*_parse_color(bg))
+    ratio = calculate_contrast(fg_hex, bg_hex)
+    return {
+        "ratio": round(ratio, 4),
+        "normal_aa": ratio >= 4.5,
+        "normal_aaa": ratio >= 7.0,
+        "large_aa": ratio >= 3.0,
+        "large_aaa": ratio >= 4.5,
+    }
+
+def rpc_suggest(fg, bg, target=4.5, mode="hsl"):
+    """
+    Returns {"lighter": ..., "darker": ...} candidates (see suggest_passing_colors).
+    """
+    if mode not in ("hsl", "oklch"):
+        raise RpcError(INVALID_PARAMS, f"Unknown mode: {mode!r}")
+    fg_hex = rgb_to_hex(*_parse_color(fg))
+    bg_hex = rgb_to_hex(*_parse_color(bg))
+    found = suggest_passing_colors(fg_hex, bg_hex, float(target), mode)
+    for c in found.values():
+        if c:
+            c["rgb"] = list(c["rgb"])
+    return found
+
+def rpc_contrast_matrix(fg, bg):
+    """
+    Ratios for every fg/bg pair plus WCAG pass masks, computed in one vectorized pass.
+    """
+    try:
+        ratios = contrast_matrix([rgb_to_hex(*_parse_color(c)) for c in fg],
+                                 [rgb_to_hex(*_parse_color(c)) for c in bg])
+    except TypeError:
+        raise RpcError(INVALID_PARAMS, "fg and bg must be lists of colors")
+    return {
+        "ratios": np.round(ratios, 4).tolist(),
+        "pass": {level: mask.tolist() for level, mask in wcag_masks(ratios).items()},
+    }
+
+def rpc_accessible_palette(bg, seed, count=6, target=4.5, min_delta_e=10.0, scheme=None):
+    """
+    Colors reaching `target` against bg and at least min_delta_e apart
+    (see generate_accessible_palette).
+    """
+    if scheme is not None and scheme not in HARMONY_SCHEMES:
+        raise RpcError(INVALID_PARAMS, f"Unknown scheme: {scheme!r}")
+    if not 1 <= int(count) <= 64:
+        raise RpcError(INVALID_PARAMS, "count must be between 1 and 64")
+    palette = generate_accessible_palette(_parse_color(bg), _parse_color(seed), int(count),
+                                          float(target), float(min_delta_e), scheme)
+    for c in palette:
+        c["rgb"] = list(c["rgb"])
+    return palette
+
+def build_methods(sampler=None, cmyk_profiles=find_cmyk_profiles):
+    """
+    Returns {name: (callable, needs_gui)}.
+    Sampling methods are only registered when a sampler (ScreenSampler) is given,
+    and always run on the GUI thread. cmyk_profiles() lists the press profiles
+    clients may convert through, as [(description, path)].
+    """
+    def convert(colors, to=("hex", "rgb", "hsl", "cmyk"), cmyk_profile=None):
+        if cmyk_profile:
+            cmyk_profile = resolve_cmyk_profile(cmyk_profile, cmyk_profiles())
+        return rpc_convert(colors, to, cmyk_profile)
+
+    def list_cmyk_profiles():
+        return [{"name": description, "file": os.path.basename(path)} for description, path in cmyk_profiles()]
+
+    methods = {
+        "ping": (lambda: "pong", False),
+        "convert": (convert, False),
+        "cmyk_profiles": (list_cmyk_profiles, False),
+        "palettes": (rpc_palettes, False),
+        "contrast": (rpc_contrast, False),
+        "contrast_matrix": (rpc_contrast_matrix, False),
+        "suggest": (rpc_suggest, False),
+        "accessible_palette": (rpc_accessible_palette, False),
+    }
+    if sampler is not None:
+        def get_pixel_color(x, y):
+            return list(sampler.get_pixel_color(int(x), int(y)))
+
+        def get_average_color(x, y, size=1):
+            return list(sampler.get_average_color(int(x), int(y), int(size)))
+
+        def grab_area(x, y, width, height):
+            if width <= 0 or height <= 0:
+                raise RpcError(INVALID_PARAMS, "width and height must be positive")
+            image = sampler.grab_area(int(x), int(y), int(width), int(height)).toImage()
+            image = image.convertToFormat(QImage.Format_RGB888)
+            # Scanlines are 4-byte aligned; strip the padding so clients get tight RGB rows
+            row_bytes = image.width() * 3
+            stride = image.bytesPerLine()
+            raw = bytes(image.constBits())[:stride * image.height()]
+            if stride != row_bytes:
+                raw = b"".join(raw[i * stride:i * stride + row_bytes] for i in range(image.height()))
+            return {
+                "width": image.width(),
+                "height": image.height(),
+                "format": "rgb888",
+                "pixels": base64.b64encode(raw).decode("ascii"),
+            }
+
+        def dominant(x, y, width, height, k=6, method="kmeans"):
+            if width <= 0 or height <= 0:
+                raise RpcError(INVALID_PARAMS, "width and height must be positive")
+            if method not in ("kmeans", "median_cut"):
+                raise RpcError(INVALID_PARAMS, f"Unknown method: {method!r}")
+            pixels = sampler.grab_array(int(x), int(y), int(width), int(height))
+            colors = dominant_colors(pixels, int(k), method)
+            for c in colors:
+                c["rgb"] = list(c["rgb"])
+            return colors
+
+        methods["get_pixel_color"] = (get_pixel_color, True)
+        methods["get_average_color"] = (get_average_color, True)
+        methods["grab_area"] = (grab_area, True)
+        methods["dominant_colors"] = (dominant, True)
+    return methods
+
+# --- GUI Thread Bridge ---
+
+class GuiInvoker(QObject):
+    """
+    Runs callables on the thread this object lives in (the GUI thread).
+    Emitting from the server thread queues the call through the Qt event loop.
+    """
+    invoke = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.invoke.connect(self._run)
+
+    def _run(self, job):
+        fn, future = job
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def call(self, fn):
+        future = concurrent.futures.Future()
+        self.invoke.emit((fn, future))
+        return future
+
+# --- Server ---
+
+def write_token_file(token, path=TOKEN_FILE):
+    """
+    Writes the session token to a file only the current user can read.
+    """
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    # O_EXCL: never write through a file or link someone else put there
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+
+class RpcServer:
+    """
+    JSON-RPC 2.0 server on localhost, running its own asyncio loop in a daemon thread.
+    Speaks newline-delimited JSON, or plain HTTP POST for curl-style clients.
+    Batches (a JSON array of requests) are answered in a single response.
+
+    Every client proves it can read the session token: NDJSON connections send an
+    "authenticate" request first, HTTP requests an "Authorization: Bearer" header.
+    HTTP requests from browsers (an Origin header, or a Host other than this server) are refused.
+    """
+    def __init__(self, methods, host=DEFAULT_HOST, port=DEFAULT_PORT, invoker=None,
+                 token=None, token_path=None):
+        self.methods = methods
+        self.host = host
+        self.port = port
+        self.invoker = invoker
+        self.token = token or secrets.token_urlsafe(32)
+        self.token_path = token_path
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self._started = threading.Event()
+        self._error = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="RpcServer", daemon=True)
+        self.thread.start()
+        self._started.wait()
+        if self._error:
+            raise self._error
+        # Report the real port when 0 was requested
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.token_path:
+            try:
+                write_token_file(self.token, self.token_path)
+            except OSError:
+                self.stop()
+                raise
+        return self.port
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.thread = None
+        if self.token_path:
+            try:
+                os.unlink(self.token_path)
+            except OSError:
+                pass
+
+    def check_token(self, token):
+        return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    def _authenticate(self, line):
+        """
+        Checks the opening "authenticate" request of an NDJSON connection; returns (ok, response).
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            request = {}
+        req_id = request.get("id")
+        params = request.get("params")
+        if isinstance(params, dict):
+            token = params.get("token")
+        else:
+            token = params[0] if isinstance(params, list) and params else None
+        if request.get("method") == "authenticate" and self.check_token(token):
+            return True, {"jsonrpc": "2.0", "id": req_id, "result": True}
+        return False, _error_response(req_id, UNAUTHORIZED, "Unauthorized: authenticate with the session token first")
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port, limit=MAX_MESSAGE_BYTES))
+        except OSError as e:
+            self._error = e
+            self._started.set()
+            return
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            first = await reader.readline()
+            if first.startswith((b"POST ", b"GET ")):
+                await self._handle_http(first, reader, writer)
+                return
+            line = first
+            authenticated = False
+            while line:
+                if line.strip() and not authenticated:
+                    authenticated, response = self._authenticate(line)
+                    writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    if not authenticated:
+                        return
+                elif line.strip():
+                    response = await self.handle_payload(line)
+                    if response is not None:
+                        writer.write(response + b"\n")
+                        await writer.drain()
+                line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http(self, request_line, reader, writer):
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        # A page in a browser (directly or through DNS rebinding) always sends an Origin
+        # or a foreign Host; local tools send neither
+        if "origin" in headers or headers.get("host", "").lower() not in (
+                f"127.0.0.1:{self.port}", f"localhost:{self.port}"):
+            status = b"403 Forbidden"
+        else:
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not self.check_token(token.strip()):
+                status = b"401 Unauthorized"
+            elif not request_line.startswith(b"POST ") or length <= 0:
+                status = b"405 Method Not Allowed"
+            else:
+                status = None
+        if status:
+            writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+        body = await reader.readexactly(length)
+        response = await self.handle_payload(body) or b""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: " + str(len(response)).encode() + b"\r\nConnection: close\r\n\r\n" + response)
+        await writer.drain()
+
+    async def handle_payload(self, data):
+        """
+        Decodes one message (single request or batch) and returns the encoded response,
+        or None when everything in it was a notification.
+        """
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return json.dumps(_error_response(None, PARSE_ERROR, "Parse error")).encode("utf-8")
+
+        if isinstance(message, list):
+            if not message:
+                return json.dumps(_error_response(None, INVALID_REQUEST, "Empty batch")).encode("utf-8")
+            responses = [await self._dispatch(req) for req in message]
+            responses = [r for r in responses if r is not None]
+            return json.dumps(responses).encode("utf-8") if responses else None
+
+        response = await self._dispatch(message)
+        return json.dumps(response).encode("utf-8") if response is not None else None
+
+    async def _dispatch(self, request):
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+
+        req_id = request.get("id")
+        is_notification = "id" not in request
+        params = request.get("params", [])
+
+        try:
+            entry = self.methods.get(request["method"])
+            if entry is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            fn, needs_gui = entry
+
+            if isinstance(params, dict):
+                call = lambda: fn(**params)
+            elif isinstance(params, list):
+                call = lambda: fn(*params)
+            else:
+                raise RpcError(INVALID_PARAMS, "params must be an array or object")
+
+            if needs_gui:
+                if self.invoker is None:
+                    raise RpcError(INTERNAL_ERROR, "Sampling is not available")
+                result = await asyncio.wait_for(asyncio.wrap_future(self.invoker.call(call)), GUI_CALL_TIMEOUT)
+            else:
+                result = call()
+        except RpcError as e:
+            return None if is_notification else _error_response(req_id, e.code, e.message)
+        except TypeError as e:
+            return None if is_notification else _error_response(req_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            return None if is_notification else _error_response(req_id, INTERNAL_ERROR, str(e))
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+def _error_response(req_id, code, message):
+    return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
@@ -0,0 +1,292 @@
+import time
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal, Qt
+
+from capture_backends import create_backend
+from image_utils import qimage_to_array, center_average
+from pin_monitor import sample_areas
+
+class SampleResult:
+    """
+    One capture produced by the worker. `image` is the QImage patch, `patch` the same
+    pixels as an (H, W, 3) array, `color` the averaged sample at its center.
+    """
+    __slots__ = ("seq", "generation", "x", "y", "image", "patch", "color", "timestamp")
+
+    def __init__(self, seq, generation, x, y, image, patch, color):
+        self.seq = seq
+        self.generation = generation
+        self.x = x
+        self.y = y
+        self.image = image
+        self.patch = patch
+        self.color = color
+        self.timestamp = time.monotonic()
+
+class AreasResult:
+    """
+    Mean colors of a set of screen rects, as an (N, 3) array in request order.
+    `grabs` is how many captures it took (one per screen group).
+    """
+    __slots__ = ("seq", "generation", "token", "colors", "grabs", "timestamp")
+
+    def __init__(self, seq, generation, token, colors, grabs):
+        self.seq = seq
+        self.generation = generation
+        self.token = token
+        self.colors = colors
+        self.grabs = grabs
+        self.timestamp = time.monotonic()
+
+class RegionResult:
+    """
+    A grabbed screen rect (x, y, w, h) and what the requester's analyze() made of its
+    (H, W, 3) pixels on the worker.
+    """
+    __slots__ = ("seq", "token", "rect", "value", "timestamp")
+
+    def __init__(self, seq, token, rect, value):
+        self.seq = seq
+        self.token = token
+        self.rect = rect
+        self.value = value
+        self.timestamp = time.monotonic()
+
+class _SamplingWorker(QObject):
+    """
+    Lives on the sampling thread (or the GUI thread for backends that must stay there).
+    Frame requests are coalesced: only the newest pending one is ever grabbed.
+    """
+    frame_done = Signal()
+    sample_done = Signal(object)
+    areas_done = Signal(object)
+    region_done = Signal(object)
+    _wake = Signal()
+    _sample_requested = Signal(object)
+    _areas_wake = Signal()
+    _region_wake = Signal(object)
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+        self.frame_writer = None
+        self.writer_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.pending = None
+        self.wake_pending = False
+        self.pending_areas = None
+        self.pending_regions = {}
+        self.latest = None
+        self.generation = 0
+        # Queued even when we stay on the GUI thread, so requests made inside
+        # a tick never grab synchronously and can still be coalesced
+        self._wake.connect(self._process_frame, Qt.QueuedConnection)
+        self._sample_requested.connect(self._process_sample, Qt.QueuedConnection)
+        self._areas_wake.connect(self._process_areas, Qt.QueuedConnection)
+        self._region_wake.connect(self._process_region, Qt.QueuedConnection)
+
+    def _grab(self, job):
+        seq, generation, x, y, capture_size, sample_size = job
+        half = capture_size // 2
+        image = self.backend.grab(x - half, y - half, capture_size, capture_size)
+        patch = qimage_to_array(image)
+        color = center_average(patch, sample_size)
+        return SampleResult(seq, generation, x, y, image, patch, color)
+
+    def _process_frame(self):
+        with self.lock:
+            job, self.pending = self.pending, None
+            self.wake_pending = False
+        if job is None:
+            return
+        try:
+            result = self._grab(job)
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return
+
+        with self.writer_lock:
+            if self.frame_writer:
+                self.frame_writer.publish(result.patch, (result.x, result.y), result.color)
+
+        with self.lock:
+            if result.generation != self.generation:
+                return  # cancelled while grabbing
+            notify = self.latest is None
+            self.latest = result
+        if notify:
+            self.frame_done.emit()
+
+    def _process_sample(self, job):
+        try:
+            result = self._grab(job)
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return
+        with self.lock:
+            if result.generation != self.generation:
+                return
+        self.sample_done.emit(result)
+
+    def _grab_array(self, x, y, width, height):
+        return qimage_to_array(self.backend.grab(x, y, width, height))
+
+    def _process_areas(self):
+        with self.lock:
+            job, self.pending_areas = self.pending_areas, None
+        if job is None:
+            return
+        seq, generation, token, rects, groups = job
+        try:
+            colors = sample_areas(self._grab_array, rects, groups)
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return
+        self.areas_done.emit(AreasResult(seq, generation, token, colors, len(groups)))
+
+    def _process_region(self, token):
+        with self.lock:
+            job = self.pending_regions.pop(token, None)
+        if job is None:
+            return
+        seq, rect, analyze = job
+        try:
+            value = analyze(self._grab_array(*rect))
+        except Exception as e:
+            print(f"Capture Error: {e}")
+            return
+        self.region_done.emit(RegionResult(seq, token, rect, value))
+
+class BackgroundSampler(QObject):
+    """
+    GUI-side front end for off-thread screen sampling.
+
+    request_frame() may be called at any rate; the UI only ever receives the newest
+    finished frame through frame_ready, stale ones are dropped. request_sample() is a
+    one-shot grab that is never coalesced away. request_areas() averages many rects
+    with one grab per group and is coalesced like frames. request_region() grabs a
+    rect and analyzes it on the worker, coalesced per token. cancel() drops every
+    picker and pin request in flight; region requests are left to finish.
+    """
+    frame_ready = Signal(object)
+    sample_ready = Signal(object)
+    areas_ready = Signal(object)
+    region_ready = Signal(object)
+
+    def __init__(self, backend=None, parent=None):
+        super().__init__(parent)
+        self.backend = backend or create_backend()
+        self.worker = _SamplingWorker(self.backend)
+        self.thread = None
+        self.seq = 0
+
+        if self.backend.thread_safe:
+            self.thread = QThread()
+            self.thread.setObjectName("ScreenSampler")
+            self.worker.moveToThread(self.thread)
+            self.thread.start()
+
+        self.worker.frame_done.connect(self._on_frame_done, Qt.QueuedConnection)
+        self.worker.sample_done.connect(self._on_sample_done, Qt.QueuedConnection)
+        self.worker.areas_done.connect(self._on_areas_done, Qt.QueuedConnection)
+        self.worker.region_done.connect(self.region_ready, Qt.QueuedConnection)
+
+    @property
+    def off_thread(self):
+        return self.thread is not None
+
+    def set_frame_writer(self, writer):
+        """
+        Swaps the shared-memory writer. Returns once no publish into the old one is
+        in progress, so the caller can close it right after.
+        """
+        with self.worker.writer_lock:
+            self.worker.frame_writer = writer
+
+    def request_frame(self, x, y, capture_size=15, sample_size=1):
+        worker = self.worker
+        with worker.lock:
+            self.seq += 1
+            worker.pending = (self.seq, worker.generation, x, y, capture_size, sample_size)
+            if worker.wake_pending:
+                return self.seq
+            worker.wake_pending = True
+        worker._wake.emit()
+        return self.seq
+
+    def request_sample(self, x, y, sample_size=1):
+        worker = self.worker
+        with worker.lock:
+            self.seq += 1
+            job = (self.seq, worker.generation, x, y, max(1, sample_size), sample_size)
+        worker._sample_requested.emit(job)
+        return self.seq
+
+    def request_areas(self, rects, groups, token=None):
+        """
+        rects: [(x, y, w, h)]; groups: [(bounding box, [rect indices])] as made by
+        pin_monitor.group_by_screen. token comes back on the result unchanged.
+        """
+        worker = self.worker
+        with worker.lock:
+            self.seq += 1
+            idle = worker.pending_areas is None
+            worker.pending_areas = (self.seq, worker.generation, token, list(rects), groups)
+        if idle:
+            worker._areas_wake.emit()
+        return self.seq
+
+    def request_region(self, rect, analyze, token=None):
+        """
+        Grabs rect (x, y, w, h) and runs analyze(pixels) on the worker, so heavy stats
+        stay off the GUI thread; the RegionResult comes through region_ready. Only the
+        newest pending request per token is run.
+        """
+        worker = self.worker
+        with worker.lock:
+            self.seq += 1
+            idle = token not in worker.pending_regions
+            worker.pending_regions[token] = (self.seq, tuple(rect), analyze)
+        if idle:
+            worker._region_wake.emit(token)
+        return self.seq
+
+    def cancel(self):
+        """
+        Drops pending requests and any result not yet handed to the UI.
+        """
+        worker = self.worker
+        with worker.lock:
+            worker.generation += 1
+            worker.pending = None
+            worker.pending_areas = None
+            worker.latest = None
+
+    def stop(self):
+        self.cancel()
+        self.set_frame_writer(None)
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait(2000)
+            self.thread = None
+        # The worker thread is gone, so closing from here cannot race a grab
+        self.backend.close()
+
+    def _on_frame_done(self):
+        worker = self.worker
+        with worker.lock:
+            result, worker.latest = worker.latest, None
+            if result is None or result.generation != worker.generation:
+                return
+        self.frame_ready.emit(result)
+
+    def _on_sample_done(self, result):
+        if result.generation != self.worker.generation:
+            return
+        self.sample_ready.emit(result)
+
+    def _on_areas_done(self, result):
+        if result.generation != self.worker.generation:
+            return
+        self.areas_ready.emit(result)
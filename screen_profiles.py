@@ -0,0 +1,95 @@
+import numpy as np
+
+from PySide6.QtCore import QPoint
+from PySide6.QtGui import QGuiApplication
+
+from icc_utils import (get_screen_profile_path, read_profile, convert_array_to_srgb, standard_profile,
+                       STANDARD_PROFILES)
+
+class ScreenProfiles:
+    """
+    Monitor profile per screen, by QScreen.name(). The user's mapping (screen name ->
+    ICC file path or a STANDARD_PROFILES name) comes first, then the OS query. Each
+    screen's profile and converter are looked up once and kept until clear(), so
+    per-frame lookups are a dict hit and transforms are never rebuilt.
+    """
+    def __init__(self, mapping=None, query=get_screen_profile_path):
+        self.mapping = dict(mapping or {})
+        self.query = query
+        self._profiles = {}
+        self._converters = {}
+
+    def set_mapping(self, mapping):
+        self.mapping = dict(mapping or {})
+        self.clear()
+
+    def clear(self):
+        """
+        Forgets looked up profiles, e.g. after screens were added or removed.
+        """
+        self._profiles = {}
+        self._converters = {}
+
+    def profile(self, name):
+        """
+        Profile bytes for a screen, or None when it has none (treated as sRGB).
+        """
+        if name not in self._profiles:
+            self._profiles[name] = self._lookup(name)
+        return self._profiles[name]
+
+    def _lookup(self, name):
+        source = self.mapping.get(name)
+        if source in STANDARD_PROFILES:
+            return standard_profile(source)
+        if source:
+            profile = read_profile(source)
+            if profile is None:
+                print(f"ICC Error: cannot read {source} for screen {name}")
+            return profile
+        return read_profile(self.query(name)) if self.query else None
+
+    def converter(self, name):
+        """
+        A function converting (H, W, 3) uint8 arrays from the screen's profile to sRGB,
+        or None. The same function object is returned for a screen until clear().
+        """
+        if name not in self._converters:
+            profile = self.profile(name)
+            self._converters[name] = (None if profile is None else
+                                      lambda colors: convert_array_to_srgb(colors, profile))
+        return self._converters[name]
+
+    @staticmethod
+    def screen_name_at(x, y):
+        # Same fallback as the Qt capture backend: off-screen points use the primary screen
+        screen = QGuiApplication.screenAt(QPoint(x, y)) or QGuiApplication.primaryScreen()
+        return screen.name() if screen else ""
+
+    def converter_at(self, x, y):
+        return self.converter(self.screen_name_at(x, y))
+
+    def convert_color(self, color, x, y):
+        """
+        An RGB tuple sampled at (x, y), converted with that screen's profile.
+        """
+        to_srgb = self.converter_at(x, y)
+        if to_srgb is None:
+            return tuple(color)
+        r, g, b = to_srgb(np.array([[color]], dtype=np.uint8))[0, 0].tolist()
+        return r, g, b
+
+    def convert_colors(self, colors, points):
+        """
+        (N, 3) colors sampled at N (x, y) points, each converted with the profile of
+        its screen; one transform call per screen.
+        """
+        colors = np.array(colors, dtype=np.uint8)
+        by_screen = {}
+        for i, (x, y) in enumerate(points):
+            by_screen.setdefault(self.screen_name_at(x, y), []).append(i)
+        for name, indices in by_screen.items():
+            to_srgb = self.converter(name)
+            if to_srgb is not None:
+                colors[indices] = to_srgb(colors[None, indices])[0]
+        return colors
@@ -0,0 +1,101 @@
+import json
+import getpass
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket, QAbstractSocket
+
+SERVER_PREFIX = "NullColorPicker"
+CONNECT_TIMEOUT_MS = 250
+
+def default_server_name():
+    """
+    One server per user so two people on the same machine don't collide.
+    """
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return f"{SERVER_PREFIX}-{user}"
+
+def send_to_running_instance(args, server_name=None, timeout=CONNECT_TIMEOUT_MS):
+    """
+    Forwards launch arguments to an already running instance.
+    Returns True if an instance received them, False if none is listening.
+    Works without a QApplication so a second launch can exit before any GUI setup.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name or default_server_name())
+    if not socket.waitForConnected(timeout):
+        return False
+
+    socket.write(json.dumps(list(args)).encode("utf-8") + b"\n")
+    if not socket.waitForBytesWritten(timeout):
+        socket.abort()
+        return False
+
+    # Wait for the ack so we only exit once the running instance has the message
+    acked = False
+    while socket.waitForReadyRead(timeout):
+        if socket.canReadLine():
+            acked = bytes(socket.readLine()).strip() == b"ok"
+            break
+    socket.disconnectFromServer()
+    return acked
+
+class SingleInstanceServer(QObject):
+    """
+    Listens for forwarded launches and emits their arguments on the GUI thread.
+    """
+    message_received = Signal(list)
+
+    def __init__(self, server_name=None, parent=None):
+        super().__init__(parent)
+        self.server_name = server_name or default_server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self):
+        """
+        Starts listening unless another instance answers on the name. Returns False
+        if one does (the caller should forward its arguments there instead).
+        """
+        # Probe first: with access options set Qt renames its new socket over any
+        # existing one, which would take the name away from a live instance
+        probe = QLocalSocket()
+        probe.connectToServer(self.server_name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.abort()
+            return False
+        if self.server.listen(self.server_name):
+            return True
+        # Nobody answered, so the socket file is one a crashed instance left behind (Unix)
+        if self.server.serverError() == QAbstractSocket.AddressInUseError:
+            QLocalServer.removeServer(self.server_name)
+            return self.server.listen(self.server_name)
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            conn.readyRead.connect(lambda c=conn: self.on_ready_read(c))
+            conn.disconnected.connect(conn.deleteLater)
+            # Data may already be buffered before the slot was connected
+            if conn.bytesAvailable():
+                self.on_ready_read(conn)
+
+    def on_ready_read(self, conn):
+        while conn.canReadLine():
+            line = bytes(conn.readLine()).strip()
+            try:
+                args = json.loads(line.decode("utf-8"))
+            except ValueError:
+                conn.write(b"error\n")
+                continue
+            conn.write(b"ok\n")
+            conn.flush()
+            if isinstance(args, list):
+                self.message_received.emit([str(a) for a in args])
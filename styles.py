@@ -125,6 +125,10 @@ QLabel#CodeLabel {
 QLabel#CodeLabel:hover {
     color: #ffffff;
 }
+/* CMYK value the press profile cannot print */
+QLabel#CodeLabel[out_of_gamut="true"] {
+    color: #e5a50a;
+}
 /* Flashing State via Property */
 QLabel#CodeLabel[flashing="true"] {
     background-color: #ffffff;
@@ -272,6 +276,15 @@ QLabel#PassFail {
     font-weight: bold;
     font-size: 12px;
 }
+/* Pass/Fail State via Property */
+QLabel#PassFail[passed="true"] {
+    background-color: #4CAF50;
+    color: #ffffff;
+}
+QLabel#PassFail[passed="false"] {
+    background-color: #F44336;
+    color: #ffffff;
+}
 QLabel#SuggestionLabel {
     color: #aaaaaa;
     font-style: italic;
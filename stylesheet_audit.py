@@ -0,0 +1,404 @@
+# Stylesheet color audit: scans CSS, SCSS, LESS, JS or JSON theme files for every color
+# they use, in any CSS Color 4 syntax, and reports each distinct color once with its
+# count, spellings and properties, how far it is from the nearest design token
+# (custom properties, $variables, @variables and JSON keys), and the color /
+# background pairs of a rule that fail WCAG contrast.
+#
+#   python stylesheet_audit.py dist/bundle.css src/tokens.json -o audit.json --tolerance 3
+
+import re
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from color_logic import delta_e_2000, CSS_NAMED_COLORS
+from color_value import ColorArray
+from contrast_utils import luminance_array, contrast_ratio_array, TARGET_LEVELS
+from css_colors import parse_color
+
+# Files are read in pieces of about this many characters, so memory stays flat
+CHUNK_SIZE = 1 << 20
+# Colors this close (CIEDE2000) to a token but not equal are reported as near misses
+DEFAULT_TOLERANCE = 3.0
+# Invalid color strings listed in the report (all distinct ones are counted)
+MAX_INVALID = 100
+# Lines listed per failing contrast pair
+MAX_LINES = 20
+# Failing contrast pairs listed in the report, worst first (all of them are counted)
+MAX_FAILURES = 500
+
+# Properties that never hold a color, and families of them (margin-top, font-size, ...).
+# Their declarations, most of a typical stylesheet, are passed over inside the regex
+COLORLESS_PROPERTIES = (
+    "display", "position", "top", "right", "bottom", "left", "z-index", "float", "clear",
+    "width", "height", "box-sizing", "opacity", "visibility", "cursor", "content", "order",
+    "pointer-events", "user-select", "vertical-align", "white-space", "line-height",
+    "letter-spacing", "word-spacing", "word-break", "gap", "row-gap", "column-gap",
+    "text-align", "text-transform", "text-indent", "text-overflow", "border-radius",
+    "border-width", "border-style", "border-collapse", "border-spacing", "outline-width",
+    "outline-style", "outline-offset", "object-fit", "aspect-ratio", "will-change",
+)
+COLORLESS_FAMILIES = (
+    "margin", "padding", "inset", "min", "max", "flex", "grid", "font", "align", "justify",
+    "place", "overflow", "transition", "animation", "transform",
+)
+
+def _word_pattern(words):
+    """
+    Regex alternation of words as a trie (shared prefixes factored out), so a position
+    is ruled out after a character or two instead of after trying every word.
+    """
+    groups = {}
+    for word in words:
+        groups.setdefault(word[:1], []).append(word[1:])
+    parts = []
+    for first, rests in sorted(groups.items()):
+        tail = _word_pattern([r for r in rests if r]) if any(rests) else ""
+        if tail and "" in rests:
+            tail = f"(?:{tail})?"
+        parts.append(re.escape(first) + tail)
+    return parts[0] if len(parts) == 1 else "(?:" + "|".join(parts) + ")"
+
+_COLORLESS = "(?:%s|%s(?:-[\\w-]*)?)" % (_word_pattern(COLORLESS_PROPERTIES), _word_pattern(COLORLESS_FAMILIES))
+
+# One pass over the text. Comments are skipped and braces delimit rules (and JSON
+# objects, whose keys make up token paths). A declaration "property: value" is
+# only looked for right after a ";", ",", brace or the chunk start, so selectors
+# like a:hover are not taken for one; its value may go on over lines without a ":".
+# "key": "value" pairs of JSON files are declarations too. Declarations of
+# COLORLESS_PROPERTIES, the bulk of a stylesheet, are consumed with the separator or
+# brace before them, and "} selector {" is one match, so most of the text never
+# reaches the Python loop.
+_TOKENS = re.compile(r"""
+    /(?:\*.*?\*/|(?<![:\w]/)/[^\n]*)                                  # comments, not "://"
+  | "((?:[^"\\\n]|\\.)*)"\s*:\s*(?:"((?:[^"\\\n]|\\.)*)"|(\{))       # 1, 2, 3: JSON key, value or object
+  | (?:(\}(?:\s|/\*.*?\*/)*[^{};"/]*\{|[{}])|[;,]|^)                 # 4: brace, or a closing and the next opening one
+    (?:\s|/\*.*?\*/|COLORLESS\s*:[^;{}]*;)*                           # colorless declarations are passed over
+    (?:((?:--|[$@])?[a-zA-Z_][\w-]*)\s*:(?!:)\s*                       # 5: property
+       ([^;{}\n]*(?:\n[^;{}\n:]*)*))?                                  # 6: value
+    (?(4)|(?(5)|(?!)))                                                # a brace, a declaration or both
+""".replace("COLORLESS", _COLORLESS), re.VERBOSE | re.DOTALL)
+
+# Colors inside a value: hex, color functions and bare words (checked against the names)
+_COLORS = re.compile(r"""
+    (?<!\w)\#[0-9a-fA-F]{3,8}(?![\w-])
+  | \b(?:rgba?|hsla?|hwb|lab|lch|oklab|oklch|color)\([^()]{0,200}\)
+  | (?<![\w.\#$@-])[a-zA-Z]{3,20}(?![\w-])
+""", re.VERBOSE | re.IGNORECASE)
+
+# References to a token in a value: var(--name), $name or @name
+_REFERENCE = re.compile(r"var\(\s*(--[\w-]+)|(?<![\w-])([$@][\w-]+)")
+
+_COLOR_NAMES = frozenset(CSS_NAMED_COLORS) | {"transparent"}
+# Declarations paired up for the contrast check, within a rule
+_SLOTS = {"color": "color", "background": "background", "background-color": "background"}
+# W3C design token files keep the color under "value" / "$value" of the named object
+_TOKEN_VALUE_KEYS = {"value", "$value"}
+
+def _chunks(stream, chunk_size):
+    """
+    Pieces of a text stream that end after a ";" or brace (or a newline when there is
+    none) and never inside an unclosed /* comment, so no declaration is split between two.
+    """
+    rest = ""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        text = rest + data
+        cut = max(text.rfind(";"), text.rfind("{"), text.rfind("}")) + 1 or text.rfind("\n") + 1
+        opened = text.rfind("/*", 0, cut)
+        if opened > text.rfind("*/", 0, cut):
+            cut = opened
+        if cut <= 0:
+            rest = text
+            continue
+        yield text[:cut]
+        rest = text[cut:]
+    if rest:
+        yield rest
+
+def scan_stylesheet(stream, chunk_size=CHUNK_SIZE):
+    """
+    Streams a text file and collects its colors. Each distinct spelling is parsed
+    once; colors are merged by value and alpha. Returns
+    {"colors": {(0xRRGGBB, alpha): entry}, "tokens": {name: (Color, alpha)},
+     "pairs": [(line, color, background)], "invalid": [{"text", "line"}], "characters"},
+    where a pair's colors are (Color, alpha) or, for values without a literal color,
+    the value text to resolve against tokens. JSON tokens are named by their key path
+    ("color.primary").
+    """
+    colors = {}
+    spellings = {}  # spelling -> colors entry, or None when it is not a color
+    values = {}     # declaration value -> its colors entries
+    uses = {}       # (property, value) -> [times declared, slot, pair key or value text]
+    tokens = {}
+    rules = {}      # rule number -> {"color"/"background": ((Color, alpha) or value, line)}
+    invalid = []
+    characters = 0
+    line = 1
+    rule, path = 0, ()
+    rule_count = 0
+    stack = []
+
+    for chunk in _chunks(stream, chunk_size):
+        pos = 0  # line is the line number at chunk[pos]; it is only brought forward when needed
+        for m in _TOKENS.finditer(chunk):
+            kind = m.lastindex
+            if kind is None:
+                continue
+            if kind >= 4:
+                brace, prop, value = m.group(4, 5, 6)
+                if brace:
+                    if brace[0] == "}":
+                        rule, path = stack.pop() if stack else (0, ())
+                    if brace[-1] == "{":
+                        stack.append((rule, path))
+                        rule_count += 1
+                        rule = rule_count
+                    if kind == 4:
+                        continue
+                # The common case, kept short: repeats are only counted here
+                use = (prop, value)
+                seen = uses.get(use)
+                if seen:
+                    seen[0] += 1
+                    if seen[1]:
+                        start = m.start(5)
+                        line += chunk.count("\n", pos, start)
+                        pos = start
+                        slots = rules.get(rule)
+                        if slots is None:
+                            slots = rules[rule] = {}
+                        slots[seen[1]] = (seen[2], line)
+                    continue
+                name = prop if prop[0] in "-$@" else None
+                start = m.start(5)
+            elif kind == 3:
+                stack.append((rule, path))
+                rule_count += 1
+                rule, path = rule_count, path + (m.group(1),)
+                continue
+            else:
+                prop, value = use = m.group(1, 2)
+                seen = uses.get(use)
+                name = ".".join(path if prop in _TOKEN_VALUE_KEYS and path else path + (prop,))
+                start = m.start()
+
+            line += chunk.count("\n", pos, start)
+            pos = start
+            found = values.get(value)
+            if found is None:
+                found = values[value] = _value_colors(value, spellings, colors, invalid, line)
+            if found and name:
+                found[0]["tokens"].add(name)
+                tokens.setdefault(name, found[0]["key"])
+            slot = _SLOTS.get(prop.lower())
+            key = found[0]["key"] if found else value
+            if slot:
+                rules.setdefault(rule, {})[slot] = (key, line)
+            if seen:
+                seen[0] += 1
+            else:
+                uses[use] = [1, slot, key]
+        line += chunk.count("\n", pos)
+        characters += len(chunk)
+
+    for (prop, value), (count, _, _) in uses.items():
+        for entry in values[value]:
+            entry["count"] += count
+            entry["properties"].add(prop)
+    pairs = [(min(r["color"][1], r["background"][1]), r["color"][0], r["background"][0])
+             for r in rules.values() if "color" in r and "background" in r]
+    return {"colors": colors, "tokens": tokens, "pairs": pairs, "invalid": invalid,
+            "characters": characters}
+
+def _value_colors(value, spellings, colors, invalid, line):
+    """
+    The colors entries of the colors in a declaration value starting at line, in order.
+    Each spelling is parsed once; a new color gets its entry on the way.
+    """
+    found = []
+    for c in _COLORS.finditer(value):
+        text = c.group()
+        entry = spellings.get(text, False)
+        if entry is False:
+            entry = spellings[text] = _parse_spelling(text, colors, invalid,
+                                                      line + value.count("\n", 0, c.start()))
+        if entry is not None:
+            found.append(entry)
+    return tuple(found)
+
+def _parse_spelling(text, colors, invalid, line):
+    """
+    The colors entry for a new spelling, or None for words that are not color names
+    and for invalid colors, which go to invalid.
+    """
+    if text[0].isalpha() and "(" not in text and text.lower() not in _COLOR_NAMES:
+        return None
+    try:
+        key = parse_color(text)
+    except ValueError:
+        invalid.append({"text": text, "line": line})
+        return None
+    color, alpha = key
+    entry = colors.get((color.value, alpha))
+    if entry is None:
+        entry = colors[color.value, alpha] = {"key": key, "count": 0, "line": line, "spellings": set(),
+                               "properties": set(), "tokens": set()}
+    entry["spellings"].add(text)
+    return entry
+
+def resolve_reference(value, tokens):
+    """
+    (Color, alpha) of the first var(--name), $name or @name reference in a declaration
+    value that names a known token, or None.
+    """
+    for m in _REFERENCE.finditer(value):
+        name = m.group(1) or m.group(2)
+        if name in tokens:
+            return tokens[name]
+    return None
+
+def nearest_tokens(lab, token_lab, candidates=8):
+    """
+    (index of the nearest token, CIEDE2000 to it) for each of (N, 3) Lab colors.
+    CIEDE2000 is only worked out for the few tokens nearest in plain Lab distance,
+    which always include the CIEDE2000 nearest one in practice.
+    """
+    d76 = (lab ** 2).sum(axis=1)[:, None] - 2 * lab @ token_lab.T + (token_lab ** 2).sum(axis=1)
+    k = min(candidates, len(token_lab))
+    near = np.argpartition(d76, k - 1, axis=1)[:, :k]
+    de = delta_e_2000(lab[:, None, :], token_lab[near])
+    best = np.argmin(de, axis=1)
+    rows = np.arange(len(lab))
+    return near[rows, best], de[rows, best]
+
+def audit_colors(scan, tolerance=DEFAULT_TOLERANCE, level="AA"):
+    """
+    JSON-ready report of a scan_stylesheet() result:
+    "colors" (most used first) with hex, alpha, count, first line, spellings,
+    properties, defining tokens and the nearest token with its CIEDE2000;
+    "near_misses": colors within tolerance of a token without being equal to one;
+    "contrast_failures": distinct color / background pairs of a rule below the WCAG
+    level (worst first, with the lines they occur on; the first MAX_FAILURES of
+    "contrast_failure_count"), translucent colors composited over their background
+    and backgrounds over white.
+    """
+    entries = sorted(scan["colors"].values(), key=lambda e: (-e["count"], e["line"]))
+    token_names = list(scan["tokens"])
+    records = []
+    for entry in entries:
+        color, alpha = entry["key"]
+        records.append({
+            "hex": "#%06X" % color.value,
+            "alpha": alpha,
+            "count": entry["count"],
+            "line": entry["line"],
+            "spellings": sorted(entry["spellings"]),
+            "properties": sorted(entry["properties"]),
+            "tokens": sorted(entry["tokens"]),
+        })
+
+    near_misses = []
+    if token_names and records:
+        lab = ColorArray([e["key"][0].rgb for e in entries]).lab()
+        token_lab = ColorArray([scan["tokens"][n][0].rgb for n in token_names]).lab()
+        nearest, de = nearest_tokens(lab, token_lab)
+        for record, i, d in zip(records, nearest.tolist(), de.tolist()):
+            record["nearest_token"] = token_names[i]
+            record["delta_e"] = round(d, 2)
+            if not record["tokens"] and 0 < d <= tolerance:
+                near_misses.append({"hex": record["hex"], "line": record["line"], "count": record["count"],
+                                    "token": token_names[i], "delta_e": round(d, 2)})
+
+    # Identical color / background pairs are checked once
+    pairs = {}
+    for line, fg, bg in scan["pairs"]:
+        fg = fg if isinstance(fg, tuple) else resolve_reference(fg, scan["tokens"])
+        bg = bg if isinstance(bg, tuple) else resolve_reference(bg, scan["tokens"])
+        if fg and bg:
+            pairs.setdefault((fg[0].value, fg[1], bg[0].value, bg[1]), []).append(line)
+    failures = []
+    failure_count = 0
+    if pairs:
+        table = np.array(list(pairs), dtype=np.float64)
+        fg_alpha, bg_alpha = table[:, 1], table[:, 3]
+        fg_rgb, bg_rgb = (np.stack([v // 65536, v // 256 % 256, v % 256], axis=1)
+                          for v in (table[:, 0], table[:, 2]))
+        bg_rgb = bg_rgb * bg_alpha[:, None] + 255 * (1 - bg_alpha[:, None])
+        fg_rgb = fg_rgb * fg_alpha[:, None] + bg_rgb * (1 - fg_alpha[:, None])
+        ratios = contrast_ratio_array(luminance_array(np.rint(fg_rgb).astype(np.uint8)),
+                                      luminance_array(np.rint(bg_rgb).astype(np.uint8)))
+        # Records only for the failures listed, found and ordered in numpy
+        failing = np.flatnonzero(ratios < TARGET_LEVELS[level])
+        failure_count = len(failing)
+        ratios = np.round(ratios, 2)
+        counts = np.fromiter(map(len, pairs.values()), dtype=np.int64, count=len(pairs))
+        failing = failing[np.lexsort((-counts[failing], ratios[failing]))][:MAX_FAILURES]
+        keys, line_lists = list(pairs), list(pairs.values())
+        for i in failing.tolist():
+            fg, fa, bg, ba = keys[i]
+            failures.append({"color": "#%06X" % fg, "color_alpha": fa, "background": "#%06X" % bg,
+                             "background_alpha": ba, "ratio": float(ratios[i]),
+                             "count": len(line_lists[i]), "lines": sorted(line_lists[i])[:MAX_LINES]})
+
+    return {
+        "colors": records,
+        "tokens": len(token_names),
+        "near_misses": near_misses,
+        "contrast_pairs": len(pairs),
+        "contrast_failures": failures,
+        "contrast_failure_count": failure_count,
+        "invalid": scan["invalid"][:MAX_INVALID],
+        "invalid_count": len(scan["invalid"]),
+    }
+
+def audit_file(path, tolerance=DEFAULT_TOLERANCE, level="AA", chunk_size=CHUNK_SIZE):
+    """
+    scan_stylesheet() + audit_colors() of a file, with "path", "characters" and
+    "seconds" added.
+    """
+    start = time.perf_counter()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        scan = scan_stylesheet(f, chunk_size)
+    report = {"path": path, "characters": scan["characters"]}
+    report.update(audit_colors(scan, tolerance, level))
+    report["seconds"] = round(time.perf_counter() - start, 4)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit the colors used by stylesheets and theme files.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("-o", "--output", help="JSON file (default: stdout)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="CIEDE2000 within which a color counts as a near miss of a token")
+    parser.add_argument("--level", choices=tuple(TARGET_LEVELS), default="AA",
+                        help="WCAG level color / background pairs must pass")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for path in args.files:
+        try:
+            reports.append(audit_file(path, args.tolerance, args.level))
+        except OSError as e:
+            parser.error(str(e))
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(reports if len(reports) > 1 else reports[0], out, indent=2)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    for r in reports:
+        print(f"{r['path']}: {len(r['colors'])} colors, {len(r['near_misses'])} near misses, "
+              f"{r['contrast_failure_count']} failing pairs in {r['seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
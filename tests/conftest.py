@@ -0,0 +1,24 @@
+import os
+import time
+
+# Tests run without a display; this has to be set before Qt creates its application
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def pump(app):
+    """
+    Processes Qt events until condition() holds or the timeout runs out.
+    """
+    def wait(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+    return wait
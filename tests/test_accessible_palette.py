@@ -0,0 +1,38 @@
+import time
+import itertools
+
+import pytest
+
+from color_logic import generate_accessible_palette, delta_e
+from contrast_utils import calculate_contrast
+from rpc_server import rpc_accessible_palette, RpcError
+
+@pytest.mark.parametrize("bg, seed, scheme, target", [
+    ((255, 255, 255), (40, 90, 200), None, 4.5),
+    ((18, 18, 18), (200, 60, 60), "Triadic", 7.0),
+    ((240, 235, 220), (0, 160, 120), "Analogous", 3.0),
+])
+def test_palette_meets_constraints(bg, seed, scheme, target):
+    start = time.perf_counter()
+    palette = generate_accessible_palette(bg, seed, count=12, target_ratio=target,
+                                          min_delta_e=10.0, scheme=scheme)
+    assert time.perf_counter() - start < 1.0
+    assert len(palette) == 12
+    bg_hex = "#{:02X}{:02X}{:02X}".format(*bg)
+    for c in palette:
+        assert calculate_contrast(c["hex"], bg_hex) >= target
+    for a, b in itertools.combinations(palette, 2):
+        assert delta_e(a["rgb"], b["rgb"]) >= 10.0 - 1e-6
+
+def test_first_color_stays_close_to_passing_seed():
+    # The seed already passes AA on white, so it should come back (almost) unchanged
+    palette = generate_accessible_palette((255, 255, 255), (30, 60, 160), count=1)
+    assert palette[0]["delta_e"] < 2.0
+
+def test_impossible_target_returns_empty():
+    assert generate_accessible_palette((128, 128, 128), (255, 0, 0), count=4, target_ratio=7.0) == []
+
+def test_rpc_validates_scheme():
+    assert len(rpc_accessible_palette("#FFFFFF", "#336699", count=3)) == 3
+    with pytest.raises(RpcError):
+        rpc_accessible_palette("#FFFFFF", "#336699", scheme="Pentadic")
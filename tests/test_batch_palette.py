@@ -0,0 +1,88 @@
+import io
+import json
+
+import numpy as np
+from PIL import Image, ImageCms
+
+from batch_palette import find_images, load_reduced, analyze_image, run_batch, main
+from color_logic import nearest_named_color, nearest_named_colors, CSS_NAMED_COLORS
+
+def two_tone(h=300, w=400, left=(200, 30, 30), right=(20, 60, 160)):
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    img[:, :w * 3 // 4] = left
+    img[:, w * 3 // 4:] = right
+    return img
+
+def test_named_colors():
+    assert len(CSS_NAMED_COLORS) == 148
+    assert nearest_named_color(255, 0, 0) == ("red", 0.0)
+    name, de = nearest_named_color(102, 51, 152)
+    assert name == "rebeccapurple" and 0 < de < 1
+    names, de = nearest_named_colors(np.array([[0, 0, 0], [255, 255, 255]]))
+    assert names == ["black", "white"] and de.max() < 1e-6
+
+def test_find_images_walks_sorted_and_filters(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("b.png", "a.JPG", "notes.txt", "sub/c.tif"):
+        (tmp_path / name).write_bytes(b"")
+    found = [p.replace(str(tmp_path), "") for p in find_images(str(tmp_path))]
+    assert found == ["/a.JPG", "/b.png", "/sub/c.tif"]
+    assert len(list(find_images(str(tmp_path), recursive=False))) == 2
+
+def test_load_reduced_bounds_pixels(tmp_path):
+    path = str(tmp_path / "big.png")
+    Image.fromarray(two_tone(1200, 1600)).save(path)
+    pixels, size = load_reduced(path, max_pixels=100_000)
+    assert size == (1600, 1200)
+    assert pixels.shape[0] * pixels.shape[1] <= 100_000
+
+def test_load_reduced_applies_embedded_profile(tmp_path):
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    path = str(tmp_path / "tagged.png")
+    Image.fromarray(two_tone(10, 10)).save(path, icc_profile=srgb)
+    pixels, _ = load_reduced(path)
+    assert np.abs(pixels.astype(int) - two_tone(10, 10)).max() <= 1
+
+def test_analyze_image(tmp_path):
+    path = str(tmp_path / "img.png")
+    Image.fromarray(two_tone()).save(path)
+    record = analyze_image(path, k=2)
+    assert (record["width"], record["height"]) == (400, 300)
+    assert [c["hex"] for c in record["palette"]] == ["#C81E1E", "#143CA0"]
+    assert record["palette"][0]["fraction"] == 0.75
+    assert record["palette"][0]["name"] == "firebrick"
+    assert record["average"]["rgb"] == [155, 38, 62]
+    json.dumps(record)
+
+def test_unreadable_file_is_reported(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    record = analyze_image(str(path))
+    assert record["path"] == str(path) and "error" in record
+
+def test_batch_streams_json_lines(tmp_path):
+    for i in range(5):
+        Image.fromarray(two_tone(left=(40 * i, 100, 100))).save(tmp_path / f"{i}.png")
+    (tmp_path / "broken.jpg").write_bytes(b"")
+    paths = list(find_images(str(tmp_path)))
+
+    out = io.StringIO()
+    stats = run_batch(paths, out, workers=2, k=3)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(r["path"] for r in records) == sorted(paths)
+    assert stats["images"] == 6 and stats["failed"] == 1
+    assert stats["images_per_second"] > 0
+
+    # The pool and the in-process path agree
+    serial = io.StringIO()
+    run_batch(paths, serial, workers=1, k=3)
+    by_path = {r["path"]: r for r in map(json.loads, serial.getvalue().splitlines())}
+    for r in records:
+        assert r.get("palette") == by_path[r["path"]].get("palette")
+
+def test_cli_writes_output_file(tmp_path, capsys):
+    Image.fromarray(two_tone()).save(tmp_path / "a.png")
+    out = tmp_path / "out.jsonl"
+    assert main([str(tmp_path), "-o", str(out), "--workers", "1", "-k", "2"]) == 0
+    assert len(out.read_text().splitlines()) == 1
+    assert "images/s" in capsys.readouterr().err
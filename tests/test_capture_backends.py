@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+
+from capture_backends import (SyntheticBackend, QtGrabBackend, create_backend, native_rect,
+                              is_bgrx_format, PIXEL_TILE_SECONDS)
+from image_utils import qimage_to_array
+
+def test_synthetic_pattern_and_padding(app):
+    backend = SyntheticBackend(size=(300, 200))
+    assert backend.pixel(10, 20) == (10, 20, 30)
+
+    # Grabs hanging off the top-left corner are padded with black, not shifted
+    patch = qimage_to_array(backend.grab(-2, -2, 5, 5))
+    assert patch.shape == (5, 5, 3)
+    assert patch[0, 0].tolist() == [0, 0, 0]
+    assert patch[2, 2].tolist() == [0, 0, 0]
+    assert patch[4, 3].tolist() == [1, 2, 3]
+
+class PatternQtBackend(QtGrabBackend):
+    """
+    QtGrabBackend whose grabs come from the synthetic pattern, counted.
+    """
+    def __init__(self):
+        super().__init__()
+        self.pattern = SyntheticBackend(size=(800, 600))
+        self.grabs = []
+
+    def grab(self, x, y, width, height):
+        self.grabs.append((x, y, width, height))
+        return self.pattern.grab(x, y, width, height)
+
+def test_qt_pixels_share_one_grab_per_frame(app):
+    backend = PatternQtBackend()
+    points = [(40, 50), (41, 52), (63, 63), (33, 40)]
+    assert [backend.pixel(x, y) for x, y in points] == [backend.pattern.pixel(x, y) for x, y in points]
+    assert backend.grabs == [(32, 32, 32, 32)]
+    backend.pixel(64, 50)  # next tile
+    assert len(backend.grabs) == 2
+    time.sleep(PIXEL_TILE_SECONDS * 2)
+    backend.pixel(64, 50)  # a frame later the screen may have changed
+    assert len(backend.grabs) == 3
+
+def test_sampler_uses_selected_backend(app):
+    from main import ScreenSampler
+
+    screen = np.zeros((50, 50, 3), dtype=np.uint8)
+    screen[20:23, 20:23] = (90, 60, 30)
+    screen[21, 21] = (120, 60, 30)
+    previous = ScreenSampler.backend
+    ScreenSampler.backend = SyntheticBackend(screen)
+    try:
+        assert ScreenSampler.get_pixel_color(21, 21) == (120, 60, 30)
+        assert ScreenSampler.get_average_color(21, 21, 3) == (93, 60, 30)
+        assert ScreenSampler.grab_area(0, 0, 15, 15).width() == 15
+    finally:
+        ScreenSampler.backend = previous
+
+def test_create_backend_selection(app, monkeypatch):
+    assert isinstance(create_backend("synthetic"), SyntheticBackend)
+    assert isinstance(create_backend("does-not-exist"), QtGrabBackend)
+    monkeypatch.setenv("NCP_CAPTURE_BACKEND", "synthetic")
+    assert isinstance(create_backend(), SyntheticBackend)
+    monkeypatch.delenv("NCP_CAPTURE_BACKEND")
+    assert create_backend().name in ("qt", "gdi")  # x11shm is opt-in
+
+def test_x11_rects_are_mapped_to_native_pixels():
+    screens = [((0, 0, 960, 540), 2.0), ((960, 0, 1280, 720), 1.0)]
+    assert native_rect(10, 10, 40, 30, screens) == ((20, 20, 80, 60), 2.0)
+    assert native_rect(1000, 5, 15, 15, screens) == ((1000, 5, 15, 15), 1.0)
+    assert native_rect(5, 5, 1, 1, []) == ((5, 5, 1, 1), 1.0)
+    # Only 32 bpp BGRX is read straight into a QImage
+    assert is_bgrx_format(32, 0, 0xFF0000, 0xFF00, 0xFF)
+    assert not is_bgrx_format(32, 1, 0xFF0000, 0xFF00, 0xFF)
+    assert not is_bgrx_format(16, 0, 0xF800, 0x7E0, 0x1F)
+    assert not is_bgrx_format(32, 0, 0x3FF00000, 0xFFC00, 0x3FF)
@@ -0,0 +1,63 @@
+import gc
+import pickle
+
+import numpy as np
+import pytest
+
+from color_logic import rgb_to_hex, rgb_to_hsl_string, rgb_to_cmyk, rgb_to_hls_wrapper, rgb_to_lab
+from color_value import Color, ColorArray, as_color
+from contrast_utils import hex_to_rgb, to_rgb_array
+
+def test_colors_are_interned_and_immutable():
+    a = Color(10, 20, 30)
+    assert Color(10, 20, 30) is a
+    assert Color.from_hex("#0A141E") is a and as_color("0a141e") is a and as_color(a) is a
+    assert pickle.loads(pickle.dumps(a)) is a
+    with pytest.raises(AttributeError):
+        a.value = 0
+    with pytest.raises(ValueError):
+        Color(256, 0, 0)
+
+    # Interning does not keep colors alive
+    value = Color(1, 2, 3).value
+    gc.collect()
+    assert value not in Color._interned
+
+def test_behaves_like_a_tuple():
+    c = Color(1, 2, 255)
+    r, g, b = c
+    assert (r, g, b) == (1, 2, 255) and c[2] == 255 and len(c) == 3
+    assert c == (1, 2, 255) and c == [1, 2, 255] and c != (1, 2, 3)
+    assert {(1, 2, 255): "x"}[c] == "x"
+    assert rgb_to_hex(*c) == c.hex
+
+def test_derived_forms_match_the_functions_and_are_cached():
+    rng = np.random.default_rng(0)
+    for r, g, b in rng.integers(0, 256, (200, 3)).tolist():
+        c = Color(r, g, b)
+        assert c.hex == rgb_to_hex(r, g, b)
+        assert c.hls == rgb_to_hls_wrapper(r, g, b)
+        assert c.hsl_string == rgb_to_hsl_string(r, g, b)
+        assert c.cmyk == rgb_to_cmyk(r, g, b)
+        assert c.lab == pytest.approx(rgb_to_lab(r, g, b))
+    c = Color(40, 90, 200)
+    assert c.hex is c.hex and c.hsl_string is c.hsl_string
+
+def test_hex_parsing():
+    assert hex_to_rgb("#fff") == (255, 255, 255)
+    assert hex_to_rgb("8F8F8F") == (143, 143, 143)
+    for bad in ("#12345", "#GGGGGG", "", "#1234567"):
+        with pytest.raises(ValueError):
+            hex_to_rgb(bad)
+
+def test_color_array():
+    colors = ColorArray([Color(0, 0, 0), (255, 0, 0), "#00FF00"])
+    assert len(colors) == 3 and colors.rgb.dtype == np.uint8
+    assert colors[1] is Color(255, 0, 0)
+    assert list(colors) == [(0, 0, 0), (255, 0, 0), (0, 255, 0)]
+    assert colors.hex() == ["#000000", "#FF0000", "#00FF00"]
+    assert colors.cmyk().tolist() == [list(rgb_to_cmyk(*c)) for c in colors]
+    assert colors[1:].hex() == ["#FF0000", "#00FF00"]
+    assert np.asarray(colors) is colors.rgb
+    assert to_rgb_array(colors) is colors.rgb
+    assert len(ColorArray()) == 0
@@ -0,0 +1,35 @@
+import pytest
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtGui import QImage, QColor
+from PySide6.QtTest import QTest
+
+from widgets import ContrastMatrixWidget
+from color_logic import generate_palettes
+from contrast_utils import calculate_contrast
+
+def test_levels_match_scalar_contrast(app):
+    colors = [c["rgb"] for c in generate_palettes(40, 90, 200)["Monochromatic"]] + [(0, 0, 0), (255, 255, 255)]
+    widget = ContrastMatrixWidget(colors)
+    for i, fg in enumerate(widget.hexes):
+        for j, bg in enumerate(widget.hexes):
+            ratio = calculate_contrast(fg, bg)
+            expected = 3 if ratio >= 7 else 2 if ratio >= 4.5 else 1 if ratio >= 3 else 0
+            assert widget.ratios[i, j] == pytest.approx(ratio)
+            assert widget.levels[i, j] == expected
+
+def test_paint_and_click(app):
+    widget = ContrastMatrixWidget([(0, 0, 0), (255, 255, 255)])
+    widget.resize(widget.sizeHint())
+    image = QImage(widget.size(), QImage.Format_RGB888)
+    image.fill(QColor(1, 2, 3))
+    widget.render(image)
+    # Bottom-right cell is white on white (the diagonal is left undecorated)
+    cell = widget.HEADER + widget.CELL + widget.CELL // 2
+    assert image.pixelColor(cell, cell) == QColor(255, 255, 255)
+
+    clicked = []
+    widget.pair_clicked.connect(lambda fg, bg: clicked.append((fg, bg)))
+    top_right = QPoint(widget.HEADER + widget.CELL + 3, widget.HEADER + 3)
+    assert widget.cell_at(top_right) == (0, 1)
+    QTest.mouseClick(widget, Qt.LeftButton, pos=top_right)
+    assert clicked == [("#000000", "#FFFFFF")]
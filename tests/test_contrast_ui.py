@@ -0,0 +1,45 @@
+from PySide6.QtTest import QTest
+
+import contrast_ui
+from contrast_ui import ContrastCheckerDialog, evaluate_pair, EVAL_DEBOUNCE_MS
+
+def settle():
+    QTest.qWait(EVAL_DEBOUNCE_MS * 3)
+
+def test_rapid_input_evaluates_once(app, monkeypatch):
+    dlg = ContrastCheckerDialog()
+    calls = []
+    real = contrast_ui.cached_suggestions
+    monkeypatch.setattr(contrast_ui, "cached_suggestions", lambda *a: calls.append(a) or real(*a))
+
+    # Simulates holding a key over the FG field: many valid values in a burst
+    for v in range(0x60, 0x90):
+        dlg.fg_le.setText(f"#{v:02X}{v:02X}{v:02X}")
+    dlg.set_color("#000000", False)
+    settle()
+
+    assert dlg.fg_color == "#8F8F8F"
+    assert dlg.ratio_lbl.text() == "Ratio: 6.49:1"
+    assert calls == []  # passes AA, nothing to suggest
+    dlg.set_color("#555555", True)
+    settle()
+    assert len(calls) == 1
+
+def test_badges_use_dynamic_property(app):
+    dlg = ContrastCheckerDialog()
+    dlg.set_color("#777777", True)
+    dlg.set_color("#FFFFFF", False)
+    settle()
+    assert dlg.normal_aa.property("passed") is False
+    assert dlg.large_aa.property("passed") is True
+    assert dlg.normal_aa.text() == "AA Fail"
+    assert dlg.normal_aa.styleSheet() == ""
+
+def test_pair_evaluation_is_memoized(app):
+    evaluate_pair.cache_clear()
+    dlg = ContrastCheckerDialog()
+    for _ in range(3):
+        dlg.swap_colors()
+        settle()
+    info = evaluate_pair.cache_info()
+    assert info.misses == 2 and info.hits >= 2
@@ -0,0 +1,113 @@
+import colorsys
+import random
+
+import pytest
+
+import numpy as np
+
+from contrast_utils import (calculate_contrast, calculate_luminance, suggest_passing_color,
+                            suggest_passing_colors, hex_to_rgb, rgb_to_hex, contrast_matrix,
+                            wcag_masks, luminance_array, calculate_apca, apca_matrix,
+                            apca_font_guidance, suggest_apca_colors)
+from color_logic import rgb_to_oklch
+
+def brute_force(fg_hex, bg_hex, target, lighter):
+    # Reference: fine linear scan of HSL lightness for a color on the given side of BG
+    bg_lum = calculate_luminance(*hex_to_rgb(bg_hex))
+    r, g, b = hex_to_rgb(fg_hex)
+    h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+    steps = 4000
+    for i in range(steps + 1):
+        t = l + (1 - l) * i / steps if lighter else l - l * i / steps
+        rgb = tuple(int(round(c * 255)) for c in colorsys.hls_to_rgb(h, t, s))
+        on_side = calculate_luminance(*rgb) > bg_lum if lighter else calculate_luminance(*rgb) < bg_lum
+        if on_side and calculate_contrast(rgb_to_hex(*rgb), bg_hex) >= target:
+            return rgb
+    return None
+
+@pytest.mark.parametrize("target", [3.0, 4.5, 7.0])
+def test_matches_fine_scan(target):
+    rng = random.Random(7)
+    for _ in range(12):
+        fg = rgb_to_hex(*(rng.randrange(256) for _ in range(3)))
+        bg = rgb_to_hex(*(rng.randrange(256) for _ in range(3)))
+        found = suggest_passing_colors(fg, bg, target)
+        for direction in ("lighter", "darker"):
+            expected = brute_force(fg, bg, target, direction == "lighter")
+            candidate = found[direction]
+            if expected is None:
+                assert candidate is None
+                continue
+            assert candidate["ratio"] >= target
+            assert calculate_luminance(*candidate["rgb"]) == pytest.approx(calculate_luminance(*expected), abs=2e-3)
+
+def test_oklch_mode_passes_and_keeps_hue():
+    hue = rgb_to_oklch(*hex_to_rgb("#3366CC"))[2]
+    found = suggest_passing_colors("#3366CC", "#224488", 4.5, mode="oklch")
+    lighter = found["lighter"]
+    assert lighter["ratio"] >= 4.5
+    assert calculate_contrast(lighter["hex"], "#224488") >= 4.5
+    # On a mid gray both directions exist; every candidate stays on the original hue
+    both = suggest_passing_colors("#3366CC", "#777777", 3.0, mode="oklch")
+    assert both["lighter"] and both["darker"]
+    for candidate in (lighter, both["lighter"], both["darker"]):
+        h = rgb_to_oklch(*hex_to_rgb(candidate["hex"]))[2]
+        assert abs((h - hue + 180) % 360 - 180) < 2.0
+
+def test_picks_closest_direction():
+    # Mid grey on white: darkening a little beats lightening (impossible here)
+    assert suggest_passing_color("#777777", "#FFFFFF") == "#767676"
+    # Already passing colors come back unchanged
+    assert suggest_passing_color("#000000", "#FFFFFF") == "#000000"
+
+def test_lut_matches_formula():
+    for v in range(256):
+        c = v / 255.0
+        lin = c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+        assert calculate_luminance(v, v, v) == pytest.approx(lin)
+
+def test_contrast_matrix_matches_scalar():
+    rng = np.random.default_rng(3)
+    fg = rng.integers(0, 256, (20, 3), dtype=np.uint8)
+    bg = [rgb_to_hex(*c) for c in rng.integers(0, 256, (7, 3)).tolist()]
+    ratios = contrast_matrix(fg, bg)
+    assert ratios.shape == (20, 7)
+    for i, f in enumerate(fg.tolist()):
+        for j, b in enumerate(bg):
+            assert ratios[i, j] == pytest.approx(calculate_contrast(rgb_to_hex(*f), b))
+
+    masks = wcag_masks(ratios)
+    assert np.array_equal(masks["AA"], ratios >= 4.5)
+    assert np.array_equal(masks["AAA"], ratios >= 7.0)
+    assert luminance_array(fg).shape == (20,)
+
+@pytest.mark.parametrize("text, bg, expected", [
+    # Reference values from the APCA-W3 test suite
+    ("#888888", "#FFFFFF", 63.056469930209424),
+    ("#FFFFFF", "#888888", -68.54146436644962),
+    ("#000000", "#AAAAAA", 58.146262578561334),
+    ("#AAAAAA", "#000000", -56.24113336839742),
+])
+def test_apca_reference_values(text, bg, expected):
+    assert calculate_apca(text, bg) == pytest.approx(expected, abs=1e-9)
+
+def test_apca_matrix_matches_scalar():
+    rng = random.Random(3)
+    colors = [rgb_to_hex(*(rng.randrange(256) for _ in range(3))) for _ in range(40)] + ["#000000", "#FFFFFF"]
+    matrix = apca_matrix(colors, colors)
+    for i, text in enumerate(colors):
+        for j, bg in enumerate(colors):
+            assert matrix[i, j] == pytest.approx(calculate_apca(text, bg), abs=1e-9)
+
+def test_apca_font_guidance():
+    assert apca_font_guidance(10) == {}
+    assert apca_font_guidance(-77)[400] == 18  # rounds down to the Lc 75 row
+    assert 100 not in apca_font_guidance(35)
+
+def test_apca_suggestions_reach_target():
+    found = suggest_apca_colors("#8A8A8A", "#909090", 40)
+    assert found["darker"]["lc"] >= 40
+    assert found["lighter"]["lc"] <= -40
+    assert calculate_apca(found["darker"]["hex"], "#909090") == pytest.approx(found["darker"]["lc"])
+    # Nothing lighter than white can reach Lc 60 on a light background
+    assert suggest_apca_colors("#EEEEEE", "#FFFFFF", 60)["lighter"] is None
@@ -0,0 +1,53 @@
+import pytest
+
+from color_value import Color
+from css_colors import parse_color, parse_rgb
+from rpc_server import rpc_convert, RpcError
+
+RED = Color(255, 0, 0)
+
+def test_hex_and_names():
+    assert parse_color("#f00") == (RED, 1.0)
+    assert parse_color("FF0000") == (RED, 1.0)
+    assert parse_color("#0f08") == (Color(0, 255, 0), 0.5333)
+    assert parse_color("#FF000080") == (RED, 0.502)
+    assert parse_color(" RebeccaPurple ") == (Color(102, 51, 153), 1.0)
+    assert parse_color("transparent")[1] == 0.0
+    # Interned: the same Color object however it was written
+    assert parse_color("red")[0] is parse_color("#ff0000")[0]
+
+@pytest.mark.parametrize("text", [
+    "rgb(255 0 0)", "rgb(255, 0, 0)", "rgb(100% 0% 0%)", "rgba(255,0,0,1)",
+    "hsl(0 100% 50%)", "hsl(0deg, 100%, 50%)", "hsla(1turn 100% 50% / 1)",
+    "hwb(0 0% 0%)", "lab(54.29 80.81 69.89)", "lch(54.29% 106.84 40.85deg)",
+    "oklab(0.628 0.2249 0.1258)", "oklch(62.8% 0.2577 29.23)",
+    "color(srgb 1 0 0)", "color(srgb-linear 1 0 0)", "color(xyz-d65 0.4124 0.2126 0.0193)",
+])
+def test_functions_agree_on_red(text):
+    assert parse_color(text) == (RED, 1.0)
+
+def test_alpha_and_wide_gamut():
+    assert parse_color("rgb(255 0 0 / 50%)") == (RED, 0.5)
+    assert parse_color("rgba(0,0,255,.25)") == (Color(0, 0, 255), 0.25)
+    assert parse_color("hwb(0 60% 60%)")[0] == (128, 128, 128)
+    assert parse_color("rgb(none 255 0)")[0] == (0, 255, 0)
+    # Out of sRGB: the hue is kept and chroma reduced, never a clipped hue shift
+    r, g, b = parse_rgb("color(display-p3 1 0 0)")
+    assert r == 255 and g < 80 and b < 80
+    r, g, b = parse_rgb("color(rec2020 0 1 0)")
+    assert g > 200 and g > b > r
+    assert parse_rgb("oklch(100% 0.4 120)") == (255, 255, 255)
+
+@pytest.mark.parametrize("text", [
+    "", "currentcolor", "var(--accent)", "#12345", "#GGG", "rgb(1 2)", "hsl(10% 50% 50%)",
+    "color(foo 1 2 3)", "blurple", "rgb(1 2 3",
+])
+def test_invalid(text):
+    with pytest.raises(ValueError):
+        parse_color(text)
+
+def test_rpc_accepts_css_colors():
+    result = rpc_convert(["oklch(62.8% 0.2577 29.23)", "hsl(120 100% 25% / .5)", "navy"], to=["hex"])
+    assert [r["hex"] for r in result] == ["#FF0000", "#008000", "#000080"]
+    with pytest.raises(RpcError):
+        rpc_convert(["var(--x)"], to=["hex"])
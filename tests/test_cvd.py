@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from color_logic import (simulate_cvd, simulate_cvd_array, CVD_MATRICES,
+                         srgb_to_linear, linear_to_srgb)
+from image_utils import qimage_to_array, array_to_qimage
+from sampling_worker import SampleResult
+
+@pytest.mark.parametrize("kind", list(CVD_MATRICES))
+def test_matches_float_reference(kind):
+    rng = np.random.default_rng(5)
+    rgb = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    lin = srgb_to_linear(rgb / 255.0) @ CVD_MATRICES[kind].T
+    expected = np.rint(linear_to_srgb(lin) * 255)
+    assert np.abs(simulate_cvd_array(rgb, kind).astype(int) - expected).max() <= 1
+    # Neutrals are unaffected by every simulation
+    assert simulate_cvd(255, 255, 255, kind) == (255, 255, 255)
+    assert simulate_cvd(0, 0, 0, kind) == (0, 0, 0)
+
+def test_red_green_confusion():
+    red = simulate_cvd(200, 40, 40, "deuteranopia")
+    green = simulate_cvd(60, 140, 40, "deuteranopia")
+    assert abs(red[0] - red[1]) < 40 and abs(green[0] - green[1]) < 40
+    r, g, b = simulate_cvd(200, 40, 40, "achromatopsia")
+    assert r == g == b
+
+def test_magnifier_frame_is_simulated(app):
+    from main import MagnifierWindow
+    patch = np.zeros((15, 15, 3), dtype=np.uint8)
+    patch[...] = (255, 0, 0)
+    result = SampleResult(1, 0, 0, 0, array_to_qimage(patch), patch, (255, 0, 0))
+
+    mag = MagnifierWindow()
+    mag.set_frame(result)
+    assert mag.frame_image is result.image
+    mag.set_cvd_mode("protanopia")
+    mag.set_frame(result)
+    shown = qimage_to_array(mag.frame_image)
+    assert tuple(shown[7, 7]) == simulate_cvd(255, 0, 0, "protanopia")
+
+def test_contrast_preview_is_simulated(app):
+    from contrast_ui import ContrastCheckerDialog
+    dlg = ContrastCheckerDialog()
+    dlg.cvd_combo.setCurrentIndex(dlg.cvd_combo.findData("achromatopsia"))
+    dlg.set_color("#FF0000", True)
+    dlg.update_results()
+    assert "color: #7F7F7F" in dlg.preview_lbl.styleSheet()
@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+import pytest
+
+from dominant_colors import (dominant_colors, color_histogram, pack_rgb, unpack_rgb,
+                             binned_histogram, subsample, count_unique_colors)
+
+def blocks(h=400, w=600, noise=0, seed=0):
+    # Three flat regions covering 1/2, 1/3 and 1/6 of the image
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    img[:, :w // 2] = (200, 30, 30)
+    img[:, w // 2:w * 5 // 6] = (20, 60, 160)
+    img[:, w * 5 // 6:] = (240, 240, 240)
+    if noise:
+        jitter = np.random.default_rng(seed).integers(-noise, noise + 1, img.shape)
+        img = np.clip(img.astype(int) + jitter, 0, 255).astype(np.uint8)
+    return img
+
+def test_pack_round_trip():
+    rng = np.random.default_rng(2)
+    px = rng.integers(0, 256, (50, 3), dtype=np.uint8)
+    packed = pack_rgb(px)
+    assert packed[0] == (int(px[0, 0]) << 16) | (int(px[0, 1]) << 8) | int(px[0, 2])
+    np.testing.assert_array_equal(unpack_rgb(packed), px)
+
+def test_exact_histogram():
+    colors, counts = color_histogram(blocks())
+    assert [tuple(c) for c in colors] == [(200, 30, 30), (20, 60, 160), (240, 240, 240)]
+    assert counts.tolist() == [120000, 80000, 40000]
+
+def test_count_unique_colors():
+    img = blocks(noise=3)
+    assert count_unique_colors(img) == len(color_histogram(img)[0])
+    assert count_unique_colors(blocks()) == 3
+
+def test_binned_histogram_keeps_true_means():
+    img = blocks(noise=2)
+    colors, counts = binned_histogram(img)
+    assert counts.sum() == 400 * 600
+    assert len(colors) <= 3 * 8  # noise of +-2 spans at most two 5-bit bins per channel
+    # Bin colors are true means, so the weighted total matches the image mean
+    np.testing.assert_allclose(np.average(colors, axis=0, weights=counts),
+                               img.reshape(-1, 3).mean(axis=0))
+
+@pytest.mark.parametrize("method", ["kmeans", "median_cut"])
+def test_recovers_blocks(method):
+    found = dominant_colors(blocks(noise=4), k=3, method=method)
+    assert [c["fraction"] for c in found] == pytest.approx([1 / 2, 1 / 3, 1 / 6], abs=0.01)
+    expected = [(200, 30, 30), (20, 60, 160), (240, 240, 240)]
+    for c, e in zip(found, expected):
+        assert np.abs(np.array(c["rgb"]) - e).max() <= 2
+
+def test_4k_region_is_fast():
+    rng = np.random.default_rng(0)
+    img = np.repeat(np.repeat(blocks(216, 384, noise=6), 10, axis=0), 10, axis=1)
+    img[:800] = rng.integers(0, 256, (800, 3840, 3), dtype=np.uint8)
+    assert subsample(img).shape[0] * subsample(img).shape[1] <= 1 << 18
+    start = time.perf_counter()
+    found = dominant_colors(img, k=8)
+    assert time.perf_counter() - start < 1.0
+    assert len(found) == 8
+    assert sum(c["fraction"] for c in found) == pytest.approx(1.0)
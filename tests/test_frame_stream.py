@@ -0,0 +1,86 @@
+import sys
+import uuid
+import subprocess
+
+import numpy as np
+import pytest
+
+from frame_stream import FrameStreamWriter, FrameStreamReader, WRITER_PID_OFFSET
+
+@pytest.fixture
+def writer():
+    w = FrameStreamWriter(f"ncp-test-{uuid.uuid4().hex[:12]}", slot_count=4, max_width=16, max_height=16)
+    yield w
+    w.close()
+
+def test_name_collision_fails_unless_the_writer_is_gone(writer):
+    with pytest.raises(FileExistsError):
+        FrameStreamWriter(writer.name, slot_count=4, max_width=16, max_height=16)
+    # The live stream is untouched
+    seq = writer.publish(np.zeros((2, 2, 3), dtype=np.uint8), (1, 2), (3, 4, 5))
+    reader = FrameStreamReader(writer.name)
+    assert reader.read().seq == seq
+    reader.close()
+
+    if sys.platform != "win32":
+        # A block whose writer process has exited (as after a crash) is taken over
+        proc = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+        writer.buf[WRITER_PID_OFFSET:WRITER_PID_OFFSET + 8] = int(proc.stdout).to_bytes(8, "little")
+        second = FrameStreamWriter(writer.name, slot_count=4, max_width=16, max_height=16)
+        second.close()
+
+def test_round_trip(writer):
+    reader = FrameStreamReader(writer.name)
+    assert reader.read() is None
+
+    patch = np.arange(15 * 15 * 3, dtype=np.uint8).reshape(15, 15, 3)
+    seq = writer.publish(patch, (100, 200), (10, 20, 30))
+
+    frame = reader.read()
+    assert frame.seq == seq
+    assert frame.cursor == (100, 200)
+    assert frame.color == (10, 20, 30)
+    assert np.array_equal(frame.pixels, patch)
+    assert frame.is_valid()
+    del frame
+    reader.close()
+
+def test_lapped_frame_is_detected(writer):
+    reader = FrameStreamReader(writer.name)
+    patch = np.zeros((4, 4, 3), dtype=np.uint8)
+    first = writer.publish(patch, (0, 0), (0, 0, 0))
+    frame = reader.read(first)
+
+    # slot_count frames later the writer reuses the slot the reader is holding
+    for _ in range(writer.slot_count):
+        writer.publish(patch, (0, 0), (0, 0, 0))
+
+    assert not frame.is_valid()
+    assert reader.read(first) is None
+    del frame
+    reader.close()
+
+def test_sampling_worker_publishes_its_capture(writer, pump):
+    from capture_backends import SyntheticBackend
+    from sampling_worker import BackgroundSampler
+
+    screen = np.zeros((100, 100, 3), dtype=np.uint8)
+    screen[:] = (0, 128, 255)
+    sampler = BackgroundSampler(SyntheticBackend(screen))
+    sampler.set_frame_writer(writer)
+    frames = []
+    sampler.frame_ready.connect(frames.append)
+
+    # Publishing reuses the frame captured for the magnifier
+    sampler.request_frame(50, 50, 15, 3)
+    pump(lambda: frames)
+    sampler.stop()
+
+    reader = FrameStreamReader(writer.name)
+    frame = reader.read()
+    assert frame.color == (0, 128, 255)
+    assert frame.cursor == (50, 50)
+    assert frame.pixels.shape == (15, 15, 3)
+    del frame
+    reader.close()
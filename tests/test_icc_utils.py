@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageCms
+
+from icc_utils import (build_rgb_profile, convert_to_srgb, convert_array_to_srgb, read_profile,
+                       profile_description)
+
+D65 = (0.3127, 0.3290)
+SRGB_PRIMARIES = ((0.64, 0.33), (0.30, 0.60), (0.15, 0.06))
+ADOBE_PRIMARIES = ((0.64, 0.33), (0.21, 0.71), (0.15, 0.06))
+
+@pytest.fixture
+def wide_gamut_path(tmp_path):
+    path = tmp_path / "wide.icc"
+    path.write_bytes(build_rgb_profile(ADOBE_PRIMARIES, D65, 563 / 256, "Wide"))
+    return str(path)
+
+def test_built_srgb_profile_is_identity():
+    profile = build_rgb_profile(SRGB_PRIMARIES, D65, "srgb", "Synthetic sRGB")
+    assert profile_description(profile) == "Synthetic sRGB"
+    a = np.random.default_rng(0).integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    assert np.abs(convert_array_to_srgb(a, profile).astype(int) - a).max() <= 1
+
+def test_wide_gamut_conversion(wide_gamut_path):
+    # Adobe RGB mid blue is noticeably less red in sRGB; white stays white
+    r, g, b = convert_to_srgb(100, 150, 200, wide_gamut_path)
+    assert r < 80 and abs(g - 150) <= 3 and abs(b - 200) <= 5
+    assert convert_to_srgb(255, 255, 255, wide_gamut_path) == (255, 255, 255)
+
+    # Same result as building the transform from scratch, as convert_to_srgb used to
+    im = ImageCms.profileToProfile(Image.new("RGB", (1, 1), (100, 150, 200)),
+                                   ImageCms.getOpenProfile(wide_gamut_path),
+                                   ImageCms.createProfile("sRGB"), outputMode="RGB")
+    assert (r, g, b) == im.getpixel((0, 0))
+
+def test_read_profile_follows_file_changes(wide_gamut_path, tmp_path):
+    first = read_profile(wide_gamut_path)
+    assert read_profile(wide_gamut_path) is first
+    os.utime(wide_gamut_path, ns=(1, 1))
+    with open(wide_gamut_path, "wb") as f:
+        f.write(b"changed")
+    os.utime(wide_gamut_path, ns=(2, 2))
+    assert read_profile(wide_gamut_path) == b"changed"
+    assert read_profile(str(tmp_path / "missing.icc")) is None
+    assert read_profile(None) is None
+
+def test_read_profile_only_reads_small_regular_files(tmp_path, monkeypatch):
+    assert read_profile(str(tmp_path)) is None
+    if os.path.exists("/dev/zero"):
+        assert read_profile("/dev/zero") is None
+    if hasattr(os, "mkfifo"):
+        os.mkfifo(tmp_path / "pipe.icc")
+        assert read_profile(str(tmp_path / "pipe.icc")) is None
+    big = tmp_path / "big.icc"
+    big.write_bytes(b"\0" * 1024)
+    monkeypatch.setattr("icc_utils.MAX_PROFILE_BYTES", 1000)
+    assert read_profile(str(big)) is None
+    assert convert_to_srgb(1, 2, 3, None) == (1, 2, 3)
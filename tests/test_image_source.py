@@ -0,0 +1,140 @@
+import numpy as np
+from PIL import Image, ImageCms
+
+from image_source import open_image, downsample, ArraySource, TileCache, Tile, TileLoader
+from image_utils import array_to_qimage
+from image_picker_ui import ImagePickerDialog
+from icc_utils import get_embedded_profile, convert_array_to_srgb
+
+def gradient(h, w):
+    ys, xs = np.mgrid[0:h, 0:w]
+    return np.stack([xs % 256, ys % 256, (xs + ys) % 256], axis=-1).astype(np.uint8)
+
+def test_downsample_matches_box_mean():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, (37, 51, 3), dtype=np.uint8)
+    for f in (2, 4, 8):
+        h, w = -(-37 // f), -(-51 // f)
+        padded = np.pad(a, ((0, h * f - 37), (0, w * f - 51), (0, 0)), mode="edge")
+        expected = np.floor(padded.reshape(h, f, w, f, 3).mean(axis=(1, 3)) + 0.5)
+        np.testing.assert_array_equal(downsample(a, f), expected)
+
+def test_levels_and_tiles():
+    src = ArraySource(gradient(1100, 1500))
+    assert src.level_count == 3  # 1500 -> 750 -> 375
+    assert src.tile_grid(0) == (3, 3)
+    assert src.tile_rect(0, 2, 2) == (1024, 1024, 476, 76)
+    # Resident and on-demand levels agree with a direct reduction
+    for level in (1, 2):
+        full = downsample(src.levels[0], 1 << level)
+        np.testing.assert_array_equal(src.read_tile(level, 0, 0), full[:512, :512])
+
+def test_patch_from_tiles_matches_direct_read():
+    src = ArraySource(gradient(700, 900))
+    for x, y in [(511, 511), (0, 0), (899, 699), (5, 600)]:
+        keys = src.patch_tiles(x, y, 15)
+        tiles = {k: src.read_tile(*k) for k in keys}
+        np.testing.assert_array_equal(src.compose_patch(tiles, x, y, 15), src.read_patch(x, y, 15))
+    assert src.compose_patch({}, 511, 511, 15) is None
+    # Outside the image is black, like a screen grab past the edge
+    assert not src.read_patch(0, 0, 15)[:7].any()
+
+def test_uncompressed_files_are_memory_mapped(tmp_path):
+    a = gradient(300, 201)
+    for name in ("img.tif", "img.bmp", "img.ppm"):
+        path = str(tmp_path / name)
+        Image.fromarray(a).save(path)
+        src = open_image(path)
+        assert isinstance(src, ArraySource)
+        assert isinstance(src.levels[0], np.memmap)
+        np.testing.assert_array_equal(src.read_region(0, 0, 0, 201, 300), a)
+
+def test_png_is_decoded_once(tmp_path):
+    a = gradient(40, 60)
+    path = str(tmp_path / "img.png")
+    Image.fromarray(a).save(path)
+    src = open_image(path)
+    assert isinstance(src, ArraySource)
+    assert isinstance(src.levels[0], np.memmap)
+    np.testing.assert_array_equal(src.read_patch(30, 20, 3), a[19:22, 29:32])
+
+def test_jpeg_is_decoded_once_into_a_memmap(tmp_path, monkeypatch):
+    monkeypatch.setattr("image_source.BAND_PIXELS", 1600 * 100)  # several bands
+    a = np.zeros((1200, 1600, 3), dtype=np.uint8)
+    a[:, 800:] = (200, 40, 90)
+    path = str(tmp_path / "img.jpg")
+    Image.fromarray(a).save(path, quality=95)
+    src = open_image(path)
+    assert isinstance(src.levels[0], np.memmap)
+    assert src.level_count == 3 and 2 in src.levels  # pyramid built while opening
+    with Image.open(path) as im:
+        np.testing.assert_array_equal(src.levels[0], np.asarray(im.convert("RGB")))
+    tile = src.read_tile(0, 2, 1)
+    assert tile.shape == (512, 512, 3)
+    assert np.abs(tile[256, 256].astype(int) - (200, 40, 90)).max() <= 3
+    coarse = src.read_tile(2, 0, 0)
+    assert coarse.shape == (300, 400, 3)
+    assert coarse[150, 50].max() <= 3 and abs(int(coarse[150, 350, 0]) - 200) <= 3
+
+def test_palette_images_are_converted(tmp_path):
+    a = gradient(30, 20)
+    path = str(tmp_path / "img.gif")
+    Image.fromarray(a).convert("P").save(path)
+    with Image.open(path) as im:
+        expected = np.asarray(im.convert("RGB"))
+    np.testing.assert_array_equal(open_image(path).read_region(0, 0, 0, 20, 30), expected)
+
+def test_embedded_profile(tmp_path):
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    path = str(tmp_path / "tagged.png")
+    Image.fromarray(gradient(8, 8)).save(path, icc_profile=srgb)
+    assert get_embedded_profile(path) == srgb
+    assert open_image(path).profile == srgb
+    a = gradient(8, 8)
+    assert np.abs(convert_array_to_srgb(a, srgb).astype(int) - a).max() <= 1
+    assert convert_array_to_srgb(a, None) is a
+
+def test_tile_cache_evicts_least_recent():
+    tile = Tile(np.zeros((10, 10, 3), dtype=np.uint8), np.zeros((10, 10, 3), dtype=np.uint8))
+    cache = TileCache(max_bytes=tile.nbytes * 2)
+    cache.put("a", tile)
+    cache.put("b", tile)
+    cache.get("a")
+    cache.put("c", tile)
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+def test_loader_delivers_requested_tiles(pump):
+    loader = TileLoader()
+    sources, tiles = [], {}
+    loader.opened.connect(sources.append)
+    loader.tile_ready.connect(tiles.__setitem__)
+    src = ArraySource(gradient(600, 600))
+    loader.open(lambda: src)
+    pump(lambda: sources)
+    loader.request([(1, 0, 0), (0, 1, 1)])
+    pump(lambda: len(tiles) == 2)
+    loader.stop()
+    assert sources == [src]
+    np.testing.assert_array_equal(tiles[(0, 1, 1)].raw, src.read_tile(0, 1, 1))
+
+def test_picker_dialog_picks_full_resolution(pump):
+    a = gradient(900, 1300)
+    dlg = ImagePickerDialog(sample_size=3, color_managed=False)
+    picked, patches = [], []
+    dlg.color_picked.connect(picked.append)
+    dlg.patch_changed.connect(patches.append)
+    dlg.set_image(array_to_qimage(a), "test")
+    pump(lambda: dlg.canvas.source is not None)
+    assert dlg.canvas.level() > 0  # fitted, so a coarse level is shown
+
+    # Not loaded yet: the pick reads the pixels directly
+    dlg.pick(700, 600)
+    assert picked[-1] == tuple(int(c) for c in a[599:602, 699:702].reshape(-1, 3).mean(axis=0))
+
+    # Hovering loads the full-resolution tile and then feeds the magnifier
+    dlg.on_hovered(100, 50)
+    pump(lambda: patches)
+    dlg.loader.stop()
+    result = patches[-1]
+    assert result.patch.shape == (15, 15, 3)
+    np.testing.assert_array_equal(result.patch[7, 7], a[50, 100])
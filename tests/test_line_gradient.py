@@ -0,0 +1,98 @@
+import numpy as np
+from PySide6.QtCore import QPoint
+
+from capture_backends import SyntheticBackend
+from line_gradient import line_points, sample_line, simplify_stops, css_angle, css_linear_gradient
+from color_logic import rgb_array_to_lab, delta_e_2000
+from gradient_ui import GradientDialog
+
+class CountingBackend(SyntheticBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grabs = []
+
+    def grab_array(self, x, y, width, height):
+        self.grabs.append((x, y, width, height))
+        return super().grab_array(x, y, width, height)
+
+def ramp_screen():
+    # Red to blue over x = 0..199, then flat blue
+    screen = np.zeros((50, 300, 3), dtype=np.uint8)
+    t = np.linspace(0, 1, 200)
+    screen[:, :200, 0] = np.rint(255 * (1 - t))[None]
+    screen[:, :200, 2] = np.rint(255 * t)[None]
+    screen[:, 200:, 2] = 255
+    return screen
+
+def test_line_points():
+    xs, ys = line_points(0, 0, 10, 5)
+    assert len(xs) == 11 and (xs[0], ys[0], xs[-1], ys[-1]) == (0, 0, 10, 5)
+    assert np.all(np.diff(xs) == 1)
+    xs, ys = line_points(3, 8, 3, -2, samples=5)
+    assert xs.tolist() == [3] * 5 and ys.tolist() == [8, 6, 3, 0, -2]
+
+def test_sample_line_uses_one_grab():
+    backend = CountingBackend(size=(400, 300))
+    colors, positions = sample_line(backend.grab_array, 10, 20, 110, 70)
+    assert len(backend.grabs) == 1 and backend.grabs[0] == (10, 20, 101, 51)
+    xs, ys = line_points(10, 20, 110, 70)
+    np.testing.assert_array_equal(colors, backend.array[ys, xs])
+    assert positions[0] == 0 and positions[-1] == 1 and np.all(np.diff(positions) > 0)
+
+def test_sample_line_averages_blocks():
+    backend = CountingBackend(size=(400, 300))
+    colors, _ = sample_line(backend.grab_array, 120, 40, 20, 90, samples=7, sample_size=5)
+    assert len(backend.grabs) == 1
+    for (x, y), color in zip(zip(*line_points(120, 40, 20, 90, 7)), colors):
+        block = backend.array[y - 2:y + 3, x - 2:x + 3].reshape(-1, 3)
+        np.testing.assert_array_equal(color, block.sum(axis=0) // 25)
+
+def test_sample_line_on_hidpi_grab():
+    # At a device pixel ratio of 2 a w x h grab comes back as 2w x 2h
+    backend = CountingBackend(size=(400, 300))
+    def grab_2x(x, y, w, h):
+        return backend.grab_array(x, y, w, h).repeat(2, axis=0).repeat(2, axis=1)
+    colors, _ = sample_line(grab_2x, 10, 20, 110, 70)
+    xs, ys = line_points(10, 20, 110, 70)
+    np.testing.assert_array_equal(colors, backend.array[ys, xs])
+    colors, _ = sample_line(grab_2x, 120, 40, 20, 90, samples=7, sample_size=5)
+    for (x, y), color in zip(zip(*line_points(120, 40, 20, 90, 7)), colors):
+        block = backend.array[y - 2:y + 3, x - 2:x + 3].reshape(-1, 3)
+        np.testing.assert_array_equal(color, block.sum(axis=0) // 25)
+
+def test_simplify_keeps_corners_within_tolerance():
+    backend = SyntheticBackend(ramp_screen())
+    colors, positions = sample_line(backend.grab_array, 0, 10, 299, 10)
+    keep = simplify_stops(colors, positions, tolerance=2.0)
+    assert keep[0] == 0 and keep[-1] == 299
+    assert len(keep) <= 6 and any(abs(i - 199) <= 2 for i in keep)
+
+    # Every sample is within tolerance of the interpolated gradient
+    interp = np.stack([np.interp(positions, positions[keep], colors[keep, c]) for c in range(3)], axis=-1)
+    assert delta_e_2000(rgb_array_to_lab(colors), rgb_array_to_lab(interp)).max() <= 2.0
+
+    assert simplify_stops(colors[:2], positions[:2]) == [0, 1]
+    assert simplify_stops(np.full((50, 3), 77), np.linspace(0, 1, 50)) == [0, 49]
+
+def test_css_output():
+    assert css_angle(0, 0, 10, 0) == 90
+    assert css_angle(0, 0, 0, 10) == 180
+    assert css_angle(0, 10, 0, 0) == 0
+    assert css_angle(0, 0, -10, 0) == 270
+    css = css_linear_gradient([((255, 0, 0), 0.0), ((0, 0, 255), 2 / 3), ((0, 0, 255), 1.0)], 90)
+    assert css == "linear-gradient(90deg, #FF0000 0%, #0000FF 66.67%, #0000FF 100%)"
+
+def test_dialog(app):
+    backend = SyntheticBackend(ramp_screen())
+    dlg = GradientDialog(backend.grab_array, QPoint(0, 10), QPoint(299, 10))
+    assert dlg.css_le.text().startswith("linear-gradient(90deg, #FF0000 0%")
+    assert dlg.css_le.text().endswith("#0000FF 100%)")
+    history = []
+    dlg.stops_to_history.connect(history.append)
+    dlg.mode_combo.setCurrentIndex(dlg.mode_combo.findData("even"))
+    assert len(dlg.colors) == dlg.samples_spin.value()
+    dlg.tolerance_spin.setValue(20.0)
+    assert len(dlg.stops) <= 3
+    dlg.stops_to_history.emit([c for c, _ in dlg.stops])
+    assert history[0][0] == (255, 0, 0)
+    dlg.deleteLater()
@@ -1,8 +1,11 @@
 
+import numpy as np
 import pytest
 from PySide6.QtCore import QRect, QPoint
 from PySide6.QtGui import QPixmap, QImage, QColor
 from main import MagnifierWindow
+from image_utils import array_to_qimage, qimage_to_array
+from sampling_worker import SampleResult
 
 class MockScreen:
     def geometry(self):
@@ -55,3 +58,24 @@ def test_magnifier_update(magnifier):
     # It should be offset by 30, 30
     expected_pos = QPoint(130, 130)
     assert magnifier.pos() == expected_pos
+
+def test_magnifier_readout(magnifier):
+    magnifier.set_readout((255, 136, 0))
+    assert magnifier.readout == ("#FF8800", "255 136 0  ·  32° 100% 50%")
+    # The same color again is a no-op
+    magnifier.readout = None
+    magnifier.set_readout((255, 136, 0))
+    assert magnifier.readout is None
+    magnifier.clear_frame()
+    assert magnifier.readout_color is None
+    magnifier.grab()  # paints with and without a readout
+
+def test_magnifier_shows_corrected_patch(magnifier):
+    patch = np.full((15, 15, 3), 100, dtype=np.uint8)
+    result = SampleResult(1, 0, 0, 0, array_to_qimage(patch), patch, (100, 100, 100))
+
+    magnifier.set_frame(result)
+    assert magnifier.frame_image is result.image
+    magnifier.set_transform(lambda a: 255 - a)
+    magnifier.set_frame(result)
+    assert qimage_to_array(magnifier.frame_image)[7, 7].tolist() == [155, 155, 155]
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from capture_backends import SyntheticBackend
+from sampling_worker import BackgroundSampler
+from pin_monitor import point_rect, group_by_screen, sample_areas, PinMonitor
+from pin_monitor_ui import PinMonitorPanel
+
+SCREENS = [(0, 0, 1920, 1080), (1920, 0, 2560, 1440)]
+
+class CountingBackend(SyntheticBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grabs = []
+
+    def grab_array(self, x, y, width, height):
+        self.grabs.append((x, y, width, height))
+        return super().grab_array(x, y, width, height)
+
+def test_point_rect_is_centered():
+    assert point_rect(100, 50) == (100, 50, 1, 1)
+    assert point_rect(100, 50, 5) == (98, 48, 5, 5)
+
+def test_groups_by_screen_with_bounding_boxes():
+    rects = [(10, 10, 1, 1), (2000, 100, 4, 4), (500, 900, 20, 10), (3000, 1000, 1, 1), (-50, -50, 1, 1)]
+    groups = group_by_screen(rects, SCREENS)
+    assert groups == [((10, 10, 510, 900), [0, 2]),
+                      ((2000, 100, 1001, 901), [1, 3]),
+                      ((-50, -50, 1, 1), [4])]
+
+def test_one_grab_per_screen_serves_every_pin():
+    backend = CountingBackend(size=(4480, 1440))
+    rects = [point_rect(x, y, 3) for x, y in [(5 + 37 * i, 3 + 41 * i) for i in range(20)]]
+    rects.append((2100, 200, 30, 20))
+    colors = sample_areas(backend.grab_array, rects, group_by_screen(rects, SCREENS))
+    assert len(backend.grabs) == 2
+
+    for rect, color in zip(rects, colors):
+        x, y, w, h = rect
+        expected = backend.array[y:y + h, x:x + w].reshape(-1, 3).sum(axis=0) // (w * h)
+        np.testing.assert_array_equal(color, expected)
+
+def test_hidpi_grab_is_sliced_in_device_pixels():
+    # At a device pixel ratio of 2 a w x h grab comes back as 2w x 2h
+    backend = SyntheticBackend(size=(400, 300))
+    def grab_2x(x, y, w, h):
+        return backend.grab_array(x, y, w, h).repeat(2, axis=0).repeat(2, axis=1)
+    rects = [(10, 10, 1, 1), (30, 25, 4, 3), (49, 39, 1, 1)]
+    colors = sample_areas(grab_2x, rects, [((10, 10, 40, 30), [0, 1, 2])])
+    for rect, color in zip(rects, colors):
+        x, y, w, h = rect
+        expected = backend.array[y:y + h, x:x + w].reshape(-1, 3).sum(axis=0) // (w * h)
+        np.testing.assert_array_equal(color, expected)
+
+def test_drift_is_reported_once_and_rebased():
+    monitor = PinMonitor(threshold=2.0)
+    pin = monitor.add((0, 0, 1, 1))
+    assert pin.label == "Point 1"
+    assert monitor.update([(100, 100, 100)], timestamp=1.0) == []
+    assert monitor.update([(101, 100, 100)], timestamp=2.0) == []
+    assert 0 < pin.delta_e < 2 and pin.changed_at == 1.0
+
+    drifts = monitor.update([(140, 100, 100)], timestamp=3.0)
+    assert [(p, old, new) for p, old, new, _ in drifts] == [(pin, (100, 100, 100), (140, 100, 100))]
+    assert drifts[0][3] > 2 and pin.reference == (140, 100, 100) and pin.changed_at == 3.0
+    assert monitor.update([(140, 100, 100)], timestamp=4.0) == []
+
+    version = monitor.version
+    monitor.add((5, 5, 10, 10), kind="region")
+    assert monitor.version != version and monitor.pins[1].label == "Region 2"
+    with pytest.raises(ValueError):
+        monitor.update([(0, 0, 0)])
+
+def test_sampler_serves_areas_off_thread(pump):
+    backend = CountingBackend(size=(800, 600))
+    sampler = BackgroundSampler(backend)
+    results = []
+    sampler.areas_ready.connect(results.append)
+    rects = [(10, 20, 1, 1), (300, 400, 2, 2), (700, 5, 1, 1)]
+    sampler.request_areas(rects, group_by_screen(rects, [(0, 0, 800, 600)]), token=7)
+    pump(lambda: results)
+    sampler.stop()
+
+    result = results[0]
+    assert result.token == 7 and result.grabs == 1 and len(backend.grabs) == 1
+    assert result.colors.tolist() == [[10, 20, 30], [44, 144, 189], [700 % 256, 5, 705 % 256]]
+
+def test_panel_updates_and_notifies(app):
+    panel = PinMonitorPanel()
+    drifts = []
+    panel.color_drifted.connect(lambda *args: drifts.append(args))
+    panel.add_pin((0, 0, 1, 1))
+    panel.add_pin((10, 10, 4, 4), kind="region")
+    panel.update_colors(np.array([[255, 0, 0], [0, 0, 255]]))
+    assert panel.table.item(0, 2).text() == "#FF0000" and panel.table.item(1, 1).text() == "Region 2"
+
+    panel.update_colors(np.array([[255, 0, 0], [0, 128, 0]]))
+    assert drifts and drifts[0][:3] == ("Region 2", "#0000FF", "#008000")
+    assert "Region 2" in panel.status_lbl.text()
+
+    panel.table.selectRow(0)
+    panel.remove_selected()
+    assert len(panel.monitor) == 1 and panel.table.rowCount() == 1
+    panel.deleteLater()
@@ -0,0 +1,142 @@
+import struct
+
+import numpy as np
+import pytest
+
+from color_logic import rgb_array_to_lab, rgb_to_cmyk, linear_to_srgb, _RGB_TO_XYZ, _D65_WHITE
+from icc_utils import (srgb_to_press_cmyk, cmyk_array, find_cmyk_profiles, is_cmyk_profile,
+                       build_rgb_profile, _press_transforms, GAMUT_WARNING_DELTA_E)
+from rpc_server import rpc_convert, build_methods, RpcError
+
+# A made-up press: the plain CMYK formula, printed with 70% of the chroma on paper
+# that never gets darker than 8%, so saturated screen colors are out of its gamut.
+CHROMA, FLOOR = 0.7, 0.08
+
+def _press_rgb(cmyk):
+    c, m, y, k = np.moveaxis(cmyk, -1, 0)
+    rgb = np.stack([(1 - c) * (1 - k), (1 - m) * (1 - k), (1 - y) * (1 - k)], axis=-1)
+    lum = rgb.mean(axis=-1, keepdims=True)
+    return FLOOR + (1 - FLOOR) * (lum + CHROMA * (rgb - lum))
+
+def _lab_to_rgb(lab):
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f > 6 / 29, f ** 3, (116 * f - 16) * 27 / 24389) * _D65_WHITE
+    return linear_to_srgb(xyz @ np.linalg.inv(_RGB_TO_XYZ).T)
+
+def _rgb_to_press_cmyk(rgb):
+    rgb = (rgb - FLOOR) / (1 - FLOOR)
+    lum = rgb.mean(axis=-1, keepdims=True)
+    rgb = np.clip(lum + (rgb - lum) / CHROMA, 0, 1)
+    k = 1 - rgb.max(axis=-1, keepdims=True)
+    cmy = np.where(k < 1, (1 - rgb - k) / np.maximum(1 - k, 1e-9), 0)
+    return np.concatenate([cmy, k], axis=-1)
+
+def _lut16(inputs, outputs, grid, clut):
+    data = b"mft2\0\0\0\0" + struct.pack(">BBBB", inputs, outputs, grid, 0)
+    data += b"".join(struct.pack(">i", v) for v in (65536, 0, 0, 0, 65536, 0, 0, 0, 65536))
+    data += struct.pack(">HH", 2, 2) + struct.pack(">HH", 0, 65535) * inputs
+    data += np.rint(np.clip(clut, 0, 65535)).astype(">u2").tobytes()
+    return data + struct.pack(">HH", 0, 65535) * outputs
+
+def build_press_profile(description="Test Press"):
+    # A2B0: CMYK -> Lab, B2A0: Lab -> CMYK, both with v2 16-bit Lab encoding
+    g = np.linspace(0, 1, 9)
+    cmyk = np.stack(np.meshgrid(g, g, g, g, indexing="ij"), axis=-1).reshape(-1, 4)
+    lab = rgb_array_to_lab(_press_rgb(cmyk) * 255)
+    a2b = np.stack([lab[:, 0] * 652.8, (lab[:, 1] + 128) * 256, (lab[:, 2] + 128) * 256], axis=-1)
+
+    g = np.linspace(0, 65535, 33)
+    enc = np.stack(np.meshgrid(g, g, g, indexing="ij"), axis=-1).reshape(-1, 3)
+    lab = np.stack([enc[:, 0] / 652.8, enc[:, 1] / 256 - 128, enc[:, 2] / 256 - 128], axis=-1)
+    b2a = _rgb_to_press_cmyk(_lab_to_rgb(lab)) * 65535
+
+    text = description.encode("ascii") + b"\0"
+    d50 = b"".join(struct.pack(">i", round(v * 65536)) for v in (0.9642, 1.0, 0.8249))
+    tags = [
+        (b"desc", b"desc\0\0\0\0" + struct.pack(">I", len(text)) + text + b"\0" * 79),
+        (b"cprt", b"text\0\0\0\0No copyright\0"),
+        (b"wtpt", b"XYZ \0\0\0\0" + d50),
+        (b"A2B0", _lut16(4, 3, 9, a2b)),
+        (b"B2A0", _lut16(3, 4, 33, b2a)),
+    ]
+    tags = [(sig, data + b"\0" * (-len(data) % 4)) for sig, data in tags]
+    offset = 128 + 4 + 12 * len(tags)
+    table, body = [struct.pack(">I", len(tags))], []
+    for sig, data in tags:
+        table.append(sig + struct.pack(">II", offset, len(data)))
+        body.append(data)
+        offset += len(data)
+    header = (struct.pack(">I", offset) + b"lcms" + struct.pack(">I", 0x02100000)
+              + b"prtrCMYKLab " + b"\0" * 12 + b"acsp" + b"\0" * 24
+              + struct.pack(">I", 0) + d50 + b"\0" * 48)
+    return header + b"".join(table) + b"".join(body)
+
+@pytest.fixture(scope="module")
+def press():
+    return build_press_profile()
+
+def test_press_conversion_and_gamut(press):
+    assert is_cmyk_profile(press)
+    cmyk, error = srgb_to_press_cmyk([(255, 255, 255), (128, 128, 128), (150, 120, 100),
+                                      (0, 0, 255), (0, 255, 0)], press)
+    assert cmyk.shape == (5, 4)
+    assert cmyk[0].tolist() == [0, 0, 0, 0]
+    c, m, y, k = cmyk[1].tolist()
+    assert k > 30 and max(c, m, y) <= 2
+    # Paper, greys and muted colors print; saturated blue and green cannot
+    assert (error[:3] < GAMUT_WARNING_DELTA_E).all()
+    assert (error[3:] > GAMUT_WARNING_DELTA_E).all()
+
+def test_batch_matches_single_conversions(press):
+    colors = np.random.default_rng(0).integers(0, 256, (5000, 3), dtype=np.uint8)
+    cmyk, error = srgb_to_press_cmyk(colors, press)
+    assert cmyk.shape == (5000, 4) and error.shape == (5000,)
+    assert cmyk.min() >= 0 and cmyk.max() <= 100
+    for i in (0, 1234, 4999):
+        one, de = srgb_to_press_cmyk(colors[i:i + 1], press)
+        assert one[0].tolist() == cmyk[i].tolist() and de[0] == pytest.approx(error[i])
+    assert _press_transforms(press) is _press_transforms(press)
+
+def test_cmyk_array_falls_back_to_the_formula(press):
+    colors = [(10, 200, 30), (0, 0, 0)]
+    cmyk, error = cmyk_array(colors)
+    assert cmyk.tolist() == [list(rgb_to_cmyk(*c)) for c in colors]
+    assert error.tolist() == [0, 0]
+    with pytest.raises(ValueError):
+        srgb_to_press_cmyk(colors, build_rgb_profile(((0.64, 0.33), (0.3, 0.6), (0.15, 0.06)),
+                                                     (0.3127, 0.3290)))
+    assert cmyk_array(colors, press)[0].tolist() != cmyk.tolist()
+
+def test_find_cmyk_profiles(press, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "Press.icc").write_bytes(press)
+    (tmp_path / "screen.icm").write_bytes(build_rgb_profile(((0.64, 0.33), (0.3, 0.6), (0.15, 0.06)),
+                                                            (0.3127, 0.3290)))
+    (tmp_path / "notes.txt").write_bytes(press)
+    assert find_cmyk_profiles([str(tmp_path)]) == [("Test Press", str(tmp_path / "sub" / "Press.icc"))]
+    assert find_cmyk_profiles([str(tmp_path / "missing")]) == []
+
+def test_rpc_convert_through_press_profile(press, tmp_path):
+    path = tmp_path / "press.icc"
+    path.write_bytes(press)
+    result = rpc_convert(["#808080", [0, 0, 255]], to=["hex", "cmyk"], cmyk_profile=str(path))
+    assert result[0]["hex"] == "#808080" and result[0]["in_gamut"] is True
+    assert result[1]["in_gamut"] is False
+    assert result[1]["cmyk"] == srgb_to_press_cmyk([(0, 0, 255)], press)[0][0].tolist()
+    assert "in_gamut" not in rpc_convert(["#808080"], to=["cmyk"])[0]
+    with pytest.raises(RpcError):
+        rpc_convert(["#808080"], to=["cmyk"], cmyk_profile=str(tmp_path / "missing.icc"))
+
+def test_rpc_only_uses_listed_profiles(press, tmp_path):
+    path = tmp_path / "Press.icc"
+    path.write_bytes(press)
+    methods = build_methods(cmyk_profiles=lambda: [("Test Press", str(path))])
+    convert = methods["convert"][0]
+    expected = rpc_convert(["#808080"], to=["cmyk"], cmyk_profile=str(path))
+    for key in ("Test Press", "Press.icc", str(path)):
+        assert convert(["#808080"], to=["cmyk"], cmyk_profile=key) == expected
+    assert methods["cmyk_profiles"][0]() == [{"name": "Test Press", "file": "Press.icc"}]
+    for key in ("/dev/zero", str(tmp_path / "other.icc"), "../Press.icc"):
+        with pytest.raises(RpcError):
+            convert(["#808080"], to=["cmyk"], cmyk_profile=key)
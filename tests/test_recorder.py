@@ -0,0 +1,99 @@
+import csv
+
+import numpy as np
+import pytest
+
+from recorder import ColorRecorder
+from recorder_ui import RecorderDialog
+
+def random_colors(n, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (n, 3))
+
+def rolling_mean(colors, window):
+    out = []
+    for i in range(len(colors)):
+        chunk = colors[max(0, i - window + 1):i + 1]
+        out.append(np.floor(chunk.mean(axis=0) + 0.5))
+    return np.array(out)
+
+def fill(rec, colors, start=0):
+    for i, c in enumerate(colors.tolist(), start):
+        rec.append(i / 60, i, -i, c)
+
+def test_ring_keeps_newest_in_order():
+    rec = ColorRecorder(capacity=10)
+    arrays = (rec.times, rec.points, rec.colors, rec.averaged)
+    colors = random_colors(25)
+    fill(rec, colors)
+    assert len(rec) == 10 and rec.count == 25
+    data = rec.timeline()
+    np.testing.assert_array_equal(data["colors"], colors[-10:])
+    np.testing.assert_array_equal(data["points"][:, 0], np.arange(15, 25))
+    assert np.all(np.diff(data["times"]) > 0)
+    # Preallocated: recording never grows or replaces the buffers
+    assert all(a is b for a, b in zip(arrays, (rec.times, rec.points, rec.colors, rec.averaged)))
+    assert rec.latest() == (tuple(colors[-1].tolist()), tuple(colors[-1].tolist()))
+
+def test_moving_average_across_wraparound():
+    rec = ColorRecorder(capacity=16, window=5)
+    colors = random_colors(40, seed=1)
+    fill(rec, colors)
+    np.testing.assert_array_equal(rec.timeline()["averaged"], rolling_mean(colors, 5)[-16:])
+
+def test_window_change_applies_to_later_samples():
+    rec = ColorRecorder(capacity=32, window=3)
+    colors = random_colors(30, seed=2)
+    fill(rec, colors[:12])
+    rec.set_window(8)
+    fill(rec, colors[12:], start=12)
+    np.testing.assert_array_equal(rec.recent_averaged(18), rolling_mean(colors, 8)[12:])
+
+    rec.clear()
+    assert len(rec) == 0 and rec.latest() is None
+    fill(rec, colors[:4])
+    np.testing.assert_array_equal(rec.recent_averaged(4), rolling_mean(colors[:4], 8))
+
+def test_rate():
+    rec = ColorRecorder()
+    assert rec.rate() == 0.0
+    fill(rec, random_colors(120))
+    assert rec.rate() == pytest.approx(60.0)
+
+def test_export_csv(tmp_path):
+    rec = ColorRecorder(capacity=4, window=2)
+    fill(rec, np.array([[0, 0, 0], [10, 20, 30], [255, 255, 255], [0, 0, 0], [100, 100, 100]]))
+    path = tmp_path / "timeline.csv"
+    rec.export_csv(path)
+    rows = list(csv.reader(open(path, newline="")))
+    assert rows[0] == ["time_s", "x", "y", "hex", "r", "g", "b", "avg_hex", "avg_r", "avg_g", "avg_b"]
+    assert len(rows) == 5
+    assert rows[1] == ["0.0000", "1", "-1", "#0A141E", "10", "20", "30", "#050A0F", "5", "10", "15"]
+    assert rows[-1][3] == "#646464" and rows[-1][7] == "#323232"
+
+    # Each sample is converted for the point it was taken at
+    rec.export_csv(path, convert_colors=lambda colors, points: np.where(
+        np.array(points)[:, :1] > 1, 255 - colors, colors))
+    rows = list(csv.reader(open(path, newline="")))
+    assert rows[1][1] == "1" and rows[1][3] == "#0A141E"
+    assert rows[2][1] == "2" and rows[2][3] == "#000000"
+
+def test_dialog_shows_latest_samples(app):
+    dlg = RecorderDialog(ColorRecorder(capacity=100))
+    assert dlg.follows_cursor and dlg.rate == 60
+    fill(dlg.recorder, np.array([[255, 0, 0]] * 10))
+    dlg.refresh()
+    assert dlg.value_lbl.text() == "#FF0000"
+    assert dlg.strip.image is not None
+
+    dlg.window_spin.setValue(4)
+    assert dlg.recorder.window == 4
+    dlg.set_pinned_point(12, 34)
+    assert not dlg.follows_cursor and "point 12, 34" in dlg.stats_lbl.text()
+
+    states = []
+    dlg.recording_changed.connect(states.append)
+    dlg.show()
+    dlg.set_recording(True)
+    dlg.hide()
+    assert states == [True, False] and not dlg.record_btn.isChecked()
+    dlg.deleteLater()
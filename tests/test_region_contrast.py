@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pytest
+from PySide6.QtCore import QRect
+
+from capture_backends import SyntheticBackend
+from sampling_worker import BackgroundSampler
+from contrast_utils import region_contrast, calculate_contrast, rgb_to_hex
+from region_contrast_ui import RegionContrastDialog, heatmap_rgba
+
+def test_matches_scalar_contrast():
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    stats = region_contrast((255, 255, 255), pixels)
+    expected = np.array([[calculate_contrast("#FFFFFF", rgb_to_hex(*p)) for p in row]
+                         for row in pixels.tolist()])
+    np.testing.assert_allclose(stats["ratios"], expected, rtol=1e-5)
+    assert stats["worst"] == pytest.approx(expected.min(), rel=1e-5)
+    x, y = stats["worst_pos"]
+    assert expected[y, x] == pytest.approx(expected.min(), rel=1e-5)
+    assert stats["fail_fraction"] == pytest.approx((expected < 4.5).mean())
+    assert stats["percentiles"][50] == pytest.approx(np.percentile(expected, 50, method="lower"), rel=1e-5)
+
+def test_gradient_heatmap():
+    # Black text over a left-to-right gray ramp: only the dark side fails
+    ramp = np.repeat(np.linspace(0, 255, 256, dtype=np.uint8)[None, :, None], 3, axis=2).repeat(8, axis=0)
+    stats = region_contrast((0, 0, 0), ramp, target_ratio=4.5)
+    rgba = heatmap_rgba(stats)
+    assert rgba.shape == (8, 256, 4)
+    assert rgba[0, 0, 3] > rgba[0, 100, 3] > 0  # fails AA Large, then only AA
+    assert rgba[0, 255, 3] == 0
+    assert stats["worst_pos"] == (0, 0)
+
+def test_full_hd_region():
+    # Black page with a one-pixel light gray rule; white text fails only on the rule
+    pixels = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    pixels[501] = 200
+    stats = region_contrast((255, 255, 255), pixels)
+    assert stats["worst_pos"][1] == 501
+    assert stats["fail_fraction"] == pytest.approx(1 / 1080)
+    assert stats["percentiles"][50] == pytest.approx(21.0)
+    rgba = heatmap_rgba(stats)
+    # Binned to half resolution, and the rule still shows up
+    assert rgba.shape == (540, 960, 4)
+    assert (rgba[250, :, 3] > 0).all() and not rgba[:250, :, 3].any()
+    assert not rgba[251:, :, 3].any()
+
+class RecordingBackend(SyntheticBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grabs = []
+
+    def grab(self, x, y, width, height):
+        self.grabs.append(((x, y, width, height), threading.current_thread()))
+        return super().grab(x, y, width, height)
+
+def test_dialog_measures_on_the_sampler(pump):
+    screen = np.zeros((40, 50, 3), dtype=np.uint8)
+    screen[6:26, 5:35] = 119  # #777777 is 4.48:1 on white
+    backend = RecordingBackend(screen)
+    sampler = BackgroundSampler(backend)
+    dlg = RegionContrastDialog(sampler, QRect(5, 6, 30, 20), "#FFFFFF")
+    pump(lambda: dlg.last_stats is not None)
+    rect, thread = backend.grabs[0]
+    assert rect == (5, 6, 30, 20) and thread is not threading.main_thread()
+    assert dlg.stat_labels["worst"].text() == "4.48:1"
+    assert dlg.stat_labels["fail"].text() == "100.0%"
+    dlg.set_text_color("#000000")
+    pump(lambda: dlg.stat_labels["fail"].text() == "0.0%")
+    assert dlg.stat_labels["fail"].text() == "0.0%"
+    dlg.close()
+    sampler.stop()
@@ -0,0 +1,119 @@
+import os
+import json
+import socket
+import threading
+
+import pytest
+
+from rpc_server import (RpcServer, GuiInvoker, build_methods, METHOD_NOT_FOUND, INVALID_PARAMS,
+                        UNAUTHORIZED)
+
+TOKEN = "test-token"
+
+class FakeSampler:
+    @staticmethod
+    def get_pixel_color(x, y):
+        return (x % 256, y % 256, 7)
+
+    @staticmethod
+    def get_average_color(x, y, size):
+        return (1, 2, 3)
+
+@pytest.fixture
+def server():
+    srv = RpcServer(build_methods(), port=0, token=TOKEN)
+    srv.start()
+    yield srv
+    srv.stop()
+
+def call(port, payload, token=TOKEN):
+    auth = {"jsonrpc": "2.0", "id": 0, "method": "authenticate", "params": {"token": token}}
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as s:
+        s.sendall(json.dumps(auth).encode("utf-8") + b"\n" + json.dumps(payload).encode("utf-8") + b"\n")
+        buf = b""
+        while buf.count(b"\n") < 2:
+            chunk = s.recv(1 << 20)
+            if not chunk:
+                break
+            buf += chunk
+    lines = buf.splitlines()
+    return json.loads(lines[-1]) if len(lines) > 1 else json.loads(lines[0])
+
+def http_post(port, body, headers):
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as s:
+        s.sendall(b"POST / HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()).encode()
+                  + b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+        raw = b""
+        while True:
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            raw += chunk
+    return raw.partition(b"\r\n\r\n")
+
+def test_convert_many_in_one_round_trip(server):
+    colors = [[i % 256, (i * 7) % 256, (i * 13) % 256] for i in range(10000)]
+    resp = call(server.port, {"jsonrpc": "2.0", "id": 1, "method": "convert",
+                              "params": {"colors": colors, "to": ["hex"]}})
+    assert len(resp["result"]) == 10000
+    assert resp["result"][1] == {"hex": "#01070D"}
+
+def test_batch_and_errors(server):
+    resp = call(server.port, [
+        {"jsonrpc": "2.0", "id": 1, "method": "contrast", "params": ["#FFFFFF", "#000000"]},
+        {"jsonrpc": "2.0", "id": 2, "method": "nope"},
+        {"jsonrpc": "2.0", "id": 3, "method": "palettes", "params": {"color": "zz"}},
+        {"jsonrpc": "2.0", "method": "ping"},
+    ])
+    by_id = {r["id"]: r for r in resp}
+    assert len(resp) == 3  # notification gets no reply
+    assert by_id[1]["result"]["ratio"] == 21.0
+    assert by_id[2]["error"]["code"] == METHOD_NOT_FOUND
+    assert by_id[3]["error"]["code"] == INVALID_PARAMS
+
+def test_http_post(server):
+    body = json.dumps({"jsonrpc": "2.0", "id": 9, "method": "ping"}).encode("utf-8")
+    head, _, payload = http_post(server.port, body, {"Host": f"localhost:{server.port}",
+                                                     "Authorization": f"Bearer {TOKEN}"})
+    assert head.startswith(b"HTTP/1.1 200")
+    assert json.loads(payload)["result"] == "pong"
+
+def test_requests_need_the_token(server):
+    resp = call(server.port, {"jsonrpc": "2.0", "id": 1, "method": "ping"}, token="wrong")
+    assert resp["error"]["code"] == UNAUTHORIZED
+    body = b'{"jsonrpc": "2.0", "id": 1, "method": "ping"}'
+    host = f"127.0.0.1:{server.port}"
+    auth = f"Bearer {TOKEN}"
+    assert http_post(server.port, body, {"Host": host})[0].startswith(b"HTTP/1.1 401")
+    # Browser pages (an Origin, or a rebound host name) are refused even with the token
+    assert http_post(server.port, body, {"Host": host, "Origin": "https://example.com",
+                                         "Authorization": auth})[0].startswith(b"HTTP/1.1 403")
+    assert http_post(server.port, body, {"Host": f"evil.example:{server.port}",
+                                         "Authorization": auth})[0].startswith(b"HTTP/1.1 403")
+
+def test_token_file_is_private(tmp_path):
+    path = tmp_path / "rpc" / "token"
+    srv = RpcServer(build_methods(), port=0, token_path=str(path))
+    srv.start()
+    try:
+        assert path.read_text() == srv.token and len(srv.token) >= 32
+        if os.name == "posix":
+            assert path.stat().st_mode & 0o777 == 0o600
+        assert call(srv.port, {"jsonrpc": "2.0", "id": 1, "method": "ping"}, token=path.read_text())["result"] == "pong"
+    finally:
+        srv.stop()
+    assert not path.exists()
+
+def test_sampling_runs_on_gui_thread(pump):
+    srv = RpcServer(build_methods(FakeSampler), port=0, invoker=GuiInvoker(), token=TOKEN)
+    srv.start()
+    try:
+        result = {}
+        client = threading.Thread(target=lambda: result.update(call(srv.port, {
+            "jsonrpc": "2.0", "id": 1, "method": "get_pixel_color", "params": {"x": 300, "y": 5}})))
+        client.start()
+        pump(lambda: not client.is_alive(), timeout=10)
+        client.join()
+        assert result["result"] == [44, 5, 7]
+    finally:
+        srv.stop()
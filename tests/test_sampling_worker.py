@@ -0,0 +1,77 @@
+import time
+import threading
+
+import numpy as np
+
+from capture_backends import SyntheticBackend
+from sampling_worker import BackgroundSampler
+
+class SlowBackend(SyntheticBackend):
+    """
+    Simulates a slow compositor so requests pile up behind the current grab.
+    """
+    def grab(self, x, y, width, height):
+        time.sleep(0.02)
+        return super().grab(x, y, width, height)
+
+def test_frames_are_coalesced_to_latest(pump):
+    sampler = BackgroundSampler(SlowBackend())
+    assert sampler.off_thread
+    frames = []
+    sampler.frame_ready.connect(frames.append)
+
+    for i in range(50):
+        last = sampler.request_frame(100 + i, 40, 15, 1)
+
+    pump(lambda: frames and frames[-1].seq == last)
+    sampler.stop()
+
+    # Far fewer grabs than requests, and the UI ends on the newest position
+    assert len(frames) < 10
+    assert frames[-1].seq == last
+    assert frames[-1].color == ((149) % 256, 40, (149 + 40) % 256)
+    assert [f.seq for f in frames] == sorted(f.seq for f in frames)
+
+def test_cancel_drops_in_flight_results(pump):
+    sampler = BackgroundSampler(SlowBackend())
+    frames = []
+    sampler.frame_ready.connect(frames.append)
+
+    sampler.request_frame(10, 10)
+    sampler.cancel()
+    pump(lambda: False, timeout=0.2)
+    sampler.stop()
+    assert frames == []
+
+def test_sample_is_averaged(pump):
+    screen = np.zeros((20, 20, 3), dtype=np.uint8)
+    screen[9:12, 9:12] = (30, 60, 90)
+    screen[10, 10] = (120, 60, 90)
+    sampler = BackgroundSampler(SyntheticBackend(screen))
+    samples = []
+    sampler.sample_ready.connect(samples.append)
+
+    sampler.request_sample(10, 10, 3)
+    pump(lambda: samples)
+    sampler.stop()
+    assert samples[0].color == (40, 60, 90)
+
+def test_regions_are_analyzed_off_thread_and_coalesced(pump):
+    sampler = BackgroundSampler(SlowBackend(size=(200, 100)))
+    results = []
+    sampler.region_ready.connect(results.append)
+    threads = []
+    def analyze(pixels):
+        threads.append(threading.current_thread())
+        return pixels.shape, pixels.reshape(-1, 3).max(axis=0).tolist()
+
+    for i in range(20):
+        last = sampler.request_region((i, 0, 10, 5), analyze, token="a")
+    other = sampler.request_region((0, 0, 3, 3), analyze, token="b")
+    pump(lambda: {r.seq for r in results} >= {last, other})
+    sampler.stop()
+
+    assert len(results) < 10  # older requests for the same token were dropped
+    final = next(r for r in results if r.seq == last)
+    assert final.rect == (19, 0, 10, 5) and final.value[0] == (5, 10, 3)
+    assert threading.main_thread() not in threads
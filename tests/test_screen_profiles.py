@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from icc_utils import standard_profile, build_rgb_profile, profile_description, STANDARD_PROFILES
+from screen_profiles import ScreenProfiles
+
+@pytest.fixture
+def wide_path(tmp_path):
+    primaries, white, trc = STANDARD_PROFILES["Adobe RGB"]
+    path = tmp_path / "wide.icc"
+    path.write_bytes(build_rgb_profile(primaries, white, trc, "Wide"))
+    return str(path)
+
+def test_standard_profiles():
+    for name in STANDARD_PROFILES:
+        assert profile_description(standard_profile(name)) == name
+    assert standard_profile("Display P3") is standard_profile("Display P3")
+
+def test_mapping_comes_before_the_os(wide_path):
+    queried = []
+    def query(name):
+        queried.append(name)
+        return wide_path if name == "DP-2" else None
+
+    profiles = ScreenProfiles({"HDMI-1": "Display P3"}, query=query)
+    assert profiles.profile("HDMI-1") == standard_profile("Display P3")
+    assert profiles.profile("DP-1") is None
+    assert profiles.profile("DP-2") == open(wide_path, "rb").read()
+    assert queried == ["DP-1", "DP-2"]
+
+    # Looked up once per screen, and converters keep their identity
+    profiles.profile("DP-2")
+    assert queried == ["DP-1", "DP-2"]
+    assert profiles.converter("DP-2") is profiles.converter("DP-2")
+    assert profiles.converter("DP-1") is None
+
+    profiles.set_mapping({"DP-2": "sRGB"})
+    assert profiles.profile("DP-2") == standard_profile("sRGB")
+    assert profiles.profile("HDMI-1") is None
+
+def test_unreadable_mapped_file_falls_back_to_srgb(tmp_path):
+    profiles = ScreenProfiles({"DP-1": str(tmp_path / "missing.icc")}, query=None)
+    assert profiles.converter("DP-1") is None
+
+def test_conversion_uses_the_screen_profile(app, wide_path):
+    # The offscreen platform has a single screen; points off it fall back to it
+    name = app.primaryScreen().name()
+    profiles = ScreenProfiles({name: wide_path}, query=None)
+    assert profiles.screen_name_at(-5000, -5000) == name
+    r, g, b = profiles.convert_color((100, 150, 200), 10, 10)
+    assert r < 80 and profiles.convert_color((255, 255, 255), 10, 10) == (255, 255, 255)
+
+    colors = np.array([[100, 150, 200], [255, 255, 255]], dtype=np.uint8)
+    converted = profiles.convert_colors(colors, [(10, 10), (20, 20)])
+    assert converted[0].tolist() == [r, g, b] and converted[1].tolist() == [255, 255, 255]
+    assert colors[0].tolist() == [100, 150, 200]  # the input is not modified
+
+    profiles.set_mapping({})
+    assert profiles.convert_color((100, 150, 200), 10, 10) == (100, 150, 200)
@@ -0,0 +1,72 @@
+import os
+import sys
+import uuid
+import socket
+import subprocess
+
+import pytest
+from PySide6.QtCore import QDir
+
+from single_instance import SingleInstanceServer, send_to_running_instance
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A repeat launch through the entry point; exits 3 if it had to import the GUI
+CLIENT_SCRIPT = (
+    "import sys\n"
+    "from NullColorPicker import launch\n"
+    "code = launch(sys.argv[2:], sys.argv[1])\n"
+    "sys.exit(3 if 'main' in sys.modules else code)\n"
+)
+
+def launch_again(app, pump, name, *args):
+    """
+    Second "launch" in a separate interpreter, as a user double-starting the app would.
+    """
+    proc = subprocess.Popen([sys.executable, "-c", CLIENT_SCRIPT, name, *args], cwd=REPO_ROOT)
+    pump(lambda: proc.poll() is not None, timeout=15)
+    app.processEvents()
+    return proc.returncode
+
+def test_no_running_instance():
+    assert send_to_running_instance(["--pick"], f"ncp-test-{uuid.uuid4().hex}", timeout=100) is False
+
+def test_second_process_hands_off(app, pump):
+    name = f"ncp-test-{uuid.uuid4().hex}"
+    server = SingleInstanceServer(name)
+    assert server.listen()
+
+    received = []
+    server.message_received.connect(received.append)
+
+    assert launch_again(app, pump, name, "--pick") == 0
+    server.close()
+    assert received == [["--pick"]]
+
+def test_live_instance_keeps_its_socket(app, pump):
+    name = f"ncp-test-{uuid.uuid4().hex}"
+    first = SingleInstanceServer(name)
+    assert first.listen()
+    second = SingleInstanceServer(name)
+    assert not second.listen()
+    # The first instance still owns the name and gets the hand-off
+    received = []
+    first.message_received.connect(received.append)
+    assert first.server.isListening()
+    assert launch_again(app, pump, name, "--pick") == 0
+    first.close()
+    assert received == [["--pick"]]
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="stale socket files are a Unix thing")
+def test_stale_socket_is_replaced(app):
+    name = f"ncp-test-{uuid.uuid4().hex}"
+    path = os.path.join(QDir.tempPath(), name)
+    # A socket file nobody listens on, as a crashed instance leaves behind
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    server = SingleInstanceServer(name)
+    try:
+        assert server.listen()
+    finally:
+        server.close()
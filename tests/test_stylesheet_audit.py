@@ -0,0 +1,104 @@
+import io
+import json
+import time
+
+from PySide6.QtTest import QTest
+
+from contrast_ui import ContrastCheckerDialog, EVAL_DEBOUNCE_MS
+from stylesheet_audit import scan_stylesheet, audit_colors, audit_file, main
+
+CSS = """\
+:root { --primary: #3366FF; --text: rgb(20 20 20); }
+/* old colors: red #abcdef */
+.btn { color: #3367fe; background: var(--primary); border: 1px solid tomato; }
+#main .red:hover { color: rgba(200, 200, 200, .5); background-color: white }
+.hero {
+  background: url(a.svg#abc) no-repeat #ffffff;
+  color: var(--text);
+  box-shadow: 0 0 2px
+    hsl(0 0% 0% / 40%);
+}
+$accent: hsl(228deg 100% 60%);
+.bad { fill: #12345; stroke: RED }
+"""
+
+def report_of(text, **kw):
+    return audit_colors(scan_stylesheet(io.StringIO(text)), **kw)
+
+def test_scan_finds_colors_outside_comments_and_selectors():
+    scan = scan_stylesheet(io.StringIO(CSS), chunk_size=64)
+    found = {"#%06X" % value: entry for (value, alpha), entry in scan["colors"].items()}
+    assert "#ABCDEF" not in found  # comment
+    assert found["#FFFFFF"]["spellings"] == {"white", "#ffffff"}
+    assert found["#FFFFFF"]["properties"] == {"background", "background-color"}
+    assert found["#FF0000"]["line"] == 12 and found["#FF0000"]["spellings"] == {"RED"}
+    assert found["#000000"]["line"] == 9  # value continued on the next line
+    assert [i["text"] for i in scan["invalid"]] == ["#12345"]
+    assert set(scan["tokens"]) == {"--primary", "--text", "$accent"}
+    # Chunked reading gives the same result as reading at once
+    whole = scan_stylesheet(io.StringIO(CSS))
+    assert {k: v["count"] for k, v in whole["colors"].items()} == \
+           {k: v["count"] for k, v in scan["colors"].items()}
+
+def test_near_misses_and_contrast():
+    report = report_of(CSS)
+    near = {m["hex"]: m for m in report["near_misses"]}
+    assert near["#3367FE"]["token"] == "--primary" and near["#3367FE"]["delta_e"] < 1
+    # #3366FF itself is a token and hsl(228 100% 60%) is exactly it, so neither is a miss
+    assert "#3366FF" not in near
+    failures = {(f["color"], f["background"]): f for f in report["contrast_failures"]}
+    assert failures[("#3367FE", "#3366FF")]["lines"] == [3]  # through var(--primary)
+    assert failures[("#C8C8C8", "#FFFFFF")]["color_alpha"] == 0.5
+    assert ("#141414", "#FFFFFF") not in failures  # var(--text) on white passes
+    assert report["contrast_pairs"] == 3
+    assert report["contrast_failure_count"] == len(report["contrast_failures"]) == 2
+
+def test_colorless_declarations_are_passed_over():
+    text = ".a { font-family: Red Hat Display; margin: 0 }\n.b { display: block; color: #111; background: #fff }\n"
+    scan = scan_stylesheet(io.StringIO(text))
+    assert {value for value, alpha in scan["colors"]} == {0x111111, 0xFFFFFF}
+    assert [(line, color[0].value, background[0].value) for line, color, background in scan["pairs"]] == \
+           [(2, 0x111111, 0xFFFFFF)]
+
+def test_json_design_tokens():
+    tokens = '{"color": {"brand": {"$value": "#3366ff", "$type": "color"},\n' \
+             '  "muted": {"value": "oklch(70% 0.1 250 / 80%)"}}, "spacing": {"s": "4px"}}'
+    scan = scan_stylesheet(io.StringIO(tokens))
+    assert set(scan["tokens"]) == {"color.brand", "color.muted"}
+    assert scan["tokens"]["color.muted"][1] == 0.8
+
+def test_large_stylesheet_is_fast_and_dedupes():
+    rules = []
+    for i in range(20000):
+        rules.append(f".c-{i} .child:hover > a {{\n  display: flex;\n  margin: 0 auto;\n"
+                     f"  color: #{i % 500:06x};\n  background-color: rgb({i % 7} 40 60);\n"
+                     f"  border: 1px solid {('tomato', 'white', 'teal')[i % 3]};\n"
+                     f"  transition: all .2s ease-in-out;\n}}\n/* rule {i} */\n")
+    text = "".join(rules)
+    assert len(text) > 2_500_000
+    start = time.perf_counter()
+    report = report_of(text)
+    assert time.perf_counter() - start < 1.0
+    assert len(report["colors"]) == 500 + 7 + 3
+    assert sum(c["count"] for c in report["colors"]) == 3 * 20000
+    assert report["contrast_pairs"] == 3500  # distinct color / background combinations
+
+def test_cli_writes_report(tmp_path, capsys):
+    path = tmp_path / "theme.css"
+    path.write_text(CSS)
+    out = tmp_path / "audit.json"
+    assert main([str(path), "-o", str(out), "--tolerance", "0.1"]) == 0
+    report = json.loads(out.read_text())
+    assert report["path"] == str(path) and report["near_misses"] == []
+    assert report == {**audit_file(str(path), tolerance=0.1), "seconds": report["seconds"]}
+    assert "failing pairs" in capsys.readouterr().err
+
+def test_contrast_dialog_takes_any_css_color(app):
+    dlg = ContrastCheckerDialog()
+    dlg.fg_le.setText("oklch(62.8% 0.2577 29.23)")
+    dlg.bg_le.setText("hsl(0 0% 100% / 50%)")
+    QTest.qWait(EVAL_DEBOUNCE_MS * 3)
+    assert dlg.fg_color == "#FF0000" and dlg.bg_color == "#FFFFFF"
+    dlg.fg_le.setText("rgb(0 0")  # incomplete: keeps the last color
+    assert dlg.fg_color == "#FF0000"
+    dlg.close()
@@ -1,9 +1,12 @@
 from PySide6.QtWidgets import (QWidget, QLabel, QFrame, QVBoxLayout, QHBoxLayout,
-                               QAbstractButton, QApplication, QStyle)
+                               QAbstractButton, QApplication, QStyle, QToolTip)
 from PySide6.QtCore import Qt, Signal, QPropertyAnimation, QRect, QEasingCurve, QSize, QTimer, Property
-from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QClipboard, QCursor
+from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QClipboard, QCursor, QFont
 
-from color_logic import rgb_to_hex, rgb_to_hsl_string, rgb_to_cmyk
+from color_logic import simulate_cvd
+from color_value import Color, ColorArray, as_color
+from icc_utils import GAMUT_WARNING_DELTA_E
+from contrast_utils import contrast_matrix, wcag_masks
 
 class ToggleSwitch(QAbstractButton):
     stateChanged = Signal(bool)
@@ -67,6 +70,7 @@ class CopyLabel(QLabel):
         self.setAlignment(Qt.AlignCenter)
 
         self._flashing = False
+        self._out_of_gamut = False
 
         # Flash timer
         self.flash_timer = QTimer(self)
@@ -98,6 +102,28 @@ class CopyLabel(QLabel):
 
     flashing = Property(bool, get_flashing, set_flashing)
 
+    def get_out_of_gamut(self):
+        return self._out_of_gamut
+
+    def set_out_of_gamut(self, val):
+        if val == self._out_of_gamut:
+            return
+        self._out_of_gamut = val
+        self.style().unpolish(self)
+        self.style().polish(self)
+
+    out_of_gamut = Property(bool, get_out_of_gamut, set_out_of_gamut)
+
+    def set_gamut_error(self, delta_e):
+        """
+        Marks a CMYK label whose color the press cannot print (see icc_utils.cmyk_array).
+        """
+        out = delta_e > GAMUT_WARNING_DELTA_E
+        self.set_out_of_gamut(out)
+        tip = f"Out of the press gamut: prints ΔE {delta_e:.1f} away" if out else ""
+        if self.toolTip() != tip:
+            self.setToolTip(tip)
+
     def flash_effect(self):
         self.set_flashing(True)
         self.flash_timer.start(150)
@@ -185,9 +211,15 @@ class PaletteItem(QWidget):
     Composite widget: Color Box + Hex + RGB + HSL + CMYK
     Handles synced hover effects and dynamic label visibility.
     """
-    def __init__(self, r, g, b, settings):
+    def __init__(self, color, settings, cmyk=None):
+        """
+        color: a Color (or anything as_color takes). cmyk: precomputed (CMYK values,
+        gamut error), e.g. from one cmyk_array call for a whole palette; the plain
+        formula is used otherwise.
+        """
         super().__init__()
-        self.color_hex = rgb_to_hex(r, g, b)
+        self.color = as_color(color)
+        self.color_hex = self.color.hex
 
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -196,8 +228,15 @@ class PaletteItem(QWidget):
         self.setLayout(layout)
 
         # Color Box - Non-interactive for clicks/flash
-        self.box = FlashFrame(self.color_hex, interactive=False)
+        # Shows the simulated color when a vision simulation is active; labels stay true
+        cvd_mode = settings.get("cvd_mode", "none")
+        box_hex = self.color_hex
+        if cvd_mode != "none":
+            box_hex = Color(*simulate_cvd(*self.color, cvd_mode)).hex
+        self.box = FlashFrame(box_hex, interactive=False)
         self.box.setFixedSize(40, 40)
+        if cvd_mode != "none":
+            self.box.setToolTip(f"{self.color_hex} as seen with {cvd_mode}")
         layout.addWidget(self.box, 0, Qt.AlignCenter)
 
         # Create labels based on settings
@@ -209,18 +248,19 @@ class PaletteItem(QWidget):
             self.labels.append(lbl)
 
         if settings.get("show_rgb", True):
-            lbl = CopyLabel(f"rgb({r}, {g}, {b})")
+            lbl = CopyLabel("rgb({}, {}, {})".format(*self.color))
             layout.addWidget(lbl, 0, Qt.AlignCenter)
             self.labels.append(lbl)
 
         if settings.get("show_hsl", True):
-            lbl = CopyLabel(rgb_to_hsl_string(r, g, b))
+            lbl = CopyLabel(self.color.hsl_string)
             layout.addWidget(lbl, 0, Qt.AlignCenter)
             self.labels.append(lbl)
 
         if settings.get("show_cmyk", True):
-            c, m, y, k = rgb_to_cmyk(r, g, b)
+            (c, m, y, k), gamut_error = cmyk or (self.color.cmyk, 0.0)
             lbl = CopyLabel(f"cmyk({c},{m},{y},{k})")
+            lbl.set_gamut_error(gamut_error)
             layout.addWidget(lbl, 0, Qt.AlignCenter)
             self.labels.append(lbl)
 
@@ -230,3 +270,108 @@ class PaletteItem(QWidget):
 
     def on_label_hover(self, hovered):
         self.box.set_outline(hovered)
+
+class ContrastMatrixWidget(QWidget):
+    """
+    Pairwise contrast grid for a set of colors, painted in one pass.
+    Row = text color, column = background. Ratios and WCAG masks come from a single
+    vectorized contrast_matrix() call whenever the colors change, not per paint.
+    Clicking a cell emits pair_clicked(fg_hex, bg_hex).
+    """
+    pair_clicked = Signal(str, str)
+
+    CELL = 30
+    HEADER = 14
+    LEVEL_NAMES = ("Fail", "AA Large", "AA", "AAA")
+
+    def __init__(self, colors=(), parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.PointingHandCursor)
+        self.font_small = QFont()
+        self.font_small.setPixelSize(9)
+        self.set_colors(colors)
+
+    def set_colors(self, colors):
+        """
+        colors: a ColorArray or anything it takes (Colors, (r, g, b) tuples, hex strings).
+        """
+        self.colors = ColorArray(colors)
+        self.hexes = self.colors.hex()
+        self.qcolors = [QColor(*c) for c in self.colors.rgb.tolist()]
+        if len(self.colors):
+            self.ratios = contrast_matrix(self.colors, self.colors)
+            masks = wcag_masks(self.ratios)
+            # 3 = AAA, 2 = AA, 1 = AA Large only, 0 = fail
+            self.levels = masks["AAA"].astype(int) + masks["AA"] + masks["AA Large"]
+        else:
+            self.ratios = self.levels = None
+        self.updateGeometry()
+        self.update()
+
+    def sizeHint(self):
+        side = self.HEADER + len(self.colors) * self.CELL + 1
+        return QSize(side, side)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def cell_at(self, pos):
+        col = (pos.x() - self.HEADER) // self.CELL
+        row = (pos.y() - self.HEADER) // self.CELL
+        n = len(self.colors)
+        if pos.x() < self.HEADER or pos.y() < self.HEADER or row >= n or col >= n:
+            return None
+        return row, col
+
+    def paintEvent(self, event):
+        if not len(self.colors):
+            return
+        painter = QPainter(self)
+        painter.setFont(self.font_small)
+        h, c = self.HEADER, self.CELL
+        pass_pen = QPen(QColor("#4CAF50"), 2)
+        large_pen = QPen(QColor("#FFC107"), 1, Qt.DashLine)
+        dim = QColor(18, 18, 18, 190)
+
+        for i, color in enumerate(self.qcolors):
+            painter.fillRect(h + i * c, 0, c - 1, h - 2, color)
+            painter.fillRect(0, h + i * c, h - 2, c - 1, color)
+
+        for row, fg_color in enumerate(self.qcolors):
+            for col, bg_color in enumerate(self.qcolors):
+                rect = QRect(h + col * c, h + row * c, c - 1, c - 1)
+                painter.fillRect(rect, bg_color)
+                if row == col:
+                    continue
+                level = self.levels[row, col]
+                painter.setPen(fg_color)
+                painter.drawText(rect, Qt.AlignCenter, f"{self.ratios[row, col]:.1f}")
+                if level == 0:
+                    painter.fillRect(rect, dim)
+                else:
+                    painter.setPen(pass_pen if level >= 2 else large_pen)
+                    painter.setBrush(Qt.NoBrush)
+                    inner = rect.adjusted(1, 1, -1, -1)
+                    painter.drawRect(inner)
+                    if level == 3:
+                        painter.drawRect(inner.adjusted(2, 2, -2, -2))
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        cell = self.cell_at(event.position().toPoint())
+        if cell is None or cell[0] == cell[1]:
+            QToolTip.hideText()
+            return
+        row, col = cell
+        level = self.LEVEL_NAMES[self.levels[row, col]]
+        QToolTip.showText(event.globalPosition().toPoint(),
+                          f"{self.hexes[row]} on {self.hexes[col]}\n"
+                          f"{self.ratios[row, col]:.2f}:1  {level}", self)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        cell = self.cell_at(event.position().toPoint())
+        if cell and cell[0] != cell[1]:
+            self.pair_clicked.emit(self.hexes[cell[0]], self.hexes[cell[1]])